@@ -33,6 +33,43 @@ NEWS_SCRAPER_TIMEOUT = int(os.environ.get("NEWS_SCRAPER_TIMEOUT", "20"))
 NEWS_SCRAPER_DELAY_SEC = float(os.environ.get("NEWS_SCRAPER_DELAY_SEC", "1.0"))
 NEWS_SCRAPER_MAX_RETRIES = int(os.environ.get("NEWS_SCRAPER_MAX_RETRIES", "2"))
 NEWS_SCRAPER_USE_NEWSPAPER3K = os.environ.get("NEWS_SCRAPER_USE_NEWSPAPER3K", "true").lower() == "true"
+NEWS_SCRAPER_WORKERS = int(os.environ.get("NEWS_SCRAPER_WORKERS", "8"))
+NEWS_SCRAPER_EXTRACT_WORKERS = int(os.environ.get("NEWS_SCRAPER_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+NEWS_SCRAPER_FEED_STATE = Path(os.environ.get("NEWS_SCRAPER_FEED_STATE", str(INTERACTIONS_DIR / "cache" / "feed_state.json")))
+
+# Shared article fetch engine (services/fetch_engine.py)
+ARTICLE_FETCH_MAX_WORKERS = int(os.environ.get("ARTICLE_FETCH_MAX_WORKERS", "16"))
+ARTICLE_FETCH_PER_HOST = int(os.environ.get("ARTICLE_FETCH_PER_HOST", "2"))
+ARTICLE_FETCH_HOST_DELAY_SEC = float(os.environ.get("ARTICLE_FETCH_HOST_DELAY_SEC", "0.5"))
+ARTICLE_FETCH_DEADLINE_SEC = float(os.environ.get("ARTICLE_FETCH_DEADLINE_SEC", "20"))
+
+# Compressed article cache (services/article_store.py)
+ARTICLE_STORE_DIR = Path(os.environ.get("ARTICLE_STORE_DIR", str(INTERACTIONS_DIR / "cache" / "article_store")))
+ARTICLE_STORE_MAX_MB = float(os.environ.get("ARTICLE_STORE_MAX_MB", "512"))
+ARTICLE_STORE_TTL_DAYS = float(os.environ.get("ARTICLE_STORE_TTL_DAYS", "30"))
+ARTICLE_STORE_NEGATIVE_TTL_SEC = float(os.environ.get("ARTICLE_STORE_NEGATIVE_TTL_SEC", "86400"))
+ARTICLE_STORE_RETRY_AFTER_SEC = float(os.environ.get("ARTICLE_STORE_RETRY_AFTER_SEC", "900"))
+
+# LLM execution engine (services/llm_engine.py)
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "2"))
+LLM_TIMEOUT_SEC = float(os.environ.get("LLM_TIMEOUT_SEC", "60"))
+OPENROUTER_RPM = float(os.environ.get("OPENROUTER_RPM", "60"))
+OPENROUTER_TPM = float(os.environ.get("OPENROUTER_TPM", "200000"))
+GROQ_RPM = float(os.environ.get("GROQ_RPM", "30"))
+GROQ_TPM = float(os.environ.get("GROQ_TPM", "6000"))
+# Prompt context (services/context_builder.py): token budget for article
+# excerpts plus Wikipedia context, and the Wikipedia share of it
+LLM_CONTEXT_TOKENS = int(os.environ.get("LLM_CONTEXT_TOKENS", "2000"))
+LLM_CONTEXT_WIKI_TOKENS = int(os.environ.get("LLM_CONTEXT_WIKI_TOKENS", "400"))
+LLM_TOKENIZER = os.environ.get("LLM_TOKENIZER", "o200k_base")
+# LLM response cache (services/llm_cache.py), keyed by model + prompt
+LLM_CACHE_PATH = Path(os.environ.get("LLM_CACHE_PATH", str(INTERACTIONS_DIR / "cache" / "llm_responses.sqlite")))
+LLM_CACHE_TTL_DAYS = float(os.environ.get("LLM_CACHE_TTL_DAYS", "7"))
+LLM_CACHE_MAX_MB = float(os.environ.get("LLM_CACHE_MAX_MB", "64"))
 
 GDELT_LLM_MAX_PER_RUN = int(os.environ.get("GDELT_LLM_MAX_PER_RUN", "0"))
 GDELT_LLM_DELAY_SEC = float(os.environ.get("GDELT_LLM_DELAY_SEC", "0"))
+# Events per LLM call in run_update_gdelt (1 = one call per event)
+GDELT_LLM_BATCH_SIZE = int(os.environ.get("GDELT_LLM_BATCH_SIZE", "4"))
+GDELT_LLM_BATCH_TOKEN_BUDGET = int(os.environ.get("GDELT_LLM_BATCH_TOKEN_BUDGET", "16000"))
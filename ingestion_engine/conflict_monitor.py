@@ -4,6 +4,15 @@ from pathlib import Path
 from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Dict
 
+import numpy as np
+
+from ingestion_engine.transforms.event_scores import (
+    defaults_for,
+    fill_missing,
+    numeric_columns,
+    severity_scores,
+)
+
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
@@ -14,6 +23,9 @@ VIOLENCE_CODES = ['18', '180', '181', '182', '183', '184', '185', '186',
                   '20', '200', '201', '202', '203', '204']
 COERCION_CODES = ['17', '170', '171', '172', '173', '174', '175']
 
+# Goldstein fallback for features without a goldsteinscale property
+CATEGORY_GOLDSTEIN = {'violence': -8.0, 'protest': -3.0}
+
 
 class ConflictMonitor:
     def __init__(self, db_path: Optional[str] = None):
@@ -61,15 +73,45 @@ class ConflictMonitor:
             )
         """)
 
+        # Daily rollups maintained alongside conflict_events (see _refresh_rollups).
+        # No primary keys: rows are replaced per EventDate inside the ingest transaction.
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS conflict_country_daily (
+                EventDate DATE,
+                ActionGeo_CountryCode VARCHAR,
+                event_count BIGINT,
+                goldstein_sum DOUBLE,
+                goldstein_n BIGINT,
+                violence_count BIGINT,
+                protest_count BIGINT
+            )
+        """)
+
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS conflict_violence_daily (
+                EventDate DATE,
+                ActionGeo_FullName VARCHAR,
+                EventBaseCode VARCHAR,
+                event_count BIGINT,
+                min_goldstein DOUBLE,
+                sources_sum BIGINT,
+                max_severity DOUBLE
+            )
+        """)
+
+        rollup_rows = self.db.execute("SELECT COUNT(*) FROM conflict_country_daily").fetchone()[0]
+        if rollup_rows == 0:
+            self.rebuild_rollups()
+
     def categorize_and_filter(self, events: List[Dict]) -> List[Dict]:
-        filtered = []
+        selected = []
         
         for event in events:
             props = event.get("properties", {})
             event_code = props.get("eventcode", "")
             event_root = event_code[:2] if len(event_code) >= 2 else ""
             
-            if not event_root:
+            if not event_root or not props.get("eventid"):
                 continue
             
             is_conflict = (
@@ -88,21 +130,27 @@ class ConflictMonitor:
             elif event_root == '17':
                 event_category = 'coercion'
             
-            num_sources = props.get("importance", 1) or 1
-            num_mentions = props.get("importance", 1) or 1
-            
-            goldstein = -5.0
-            if event_category == 'violence':
-                goldstein = -8.0
-            elif event_category == 'protest':
-                goldstein = -3.0
-            
-            severity_score = (
-                -goldstein * 2 +
-                num_mentions * 0.5 +
-                num_sources * 1.5
-            )
-            
+            selected.append((event, props, event_code, event_root, event_category))
+        
+        if not selected:
+            return []
+        
+        # One vectorized pass over the real export values; category defaults
+        # only fill features that predate the numeric passthrough.
+        categories = [s[4] for s in selected]
+        cols = numeric_columns([s[1] for s in selected])
+        goldstein = fill_missing(cols["goldstein"], defaults_for(categories, CATEGORY_GOLDSTEIN, -5.0))
+        avg_tone = fill_missing(cols["avg_tone"], np.full(len(selected), -5.0))
+        severity = severity_scores(goldstein, cols["num_mentions"], cols["num_sources"])
+        derived_quad = np.array([4 if c in ['violence', 'coercion'] else 3 for c in categories])
+        quad_class = np.where(cols["quad_class"] > 0, cols["quad_class"], derived_quad)
+        
+        goldstein, avg_tone, severity = goldstein.tolist(), avg_tone.tolist(), severity.tolist()
+        num_mentions, num_sources = cols["num_mentions"].tolist(), cols["num_sources"].tolist()
+        quad_class = quad_class.tolist()
+        
+        filtered = []
+        for i, (event, props, event_code, event_root, event_category) in enumerate(selected):
             event_date_str = props.get("date", "")
             try:
                 if len(event_date_str) >= 8:
@@ -122,11 +170,11 @@ class ConflictMonitor:
                 "EventTimeAdded": datetime.now(timezone.utc),
                 "EventRootCode": event_root,
                 "EventBaseCode": event_code,
-                "QuadClass": 4 if event_category in ['violence', 'coercion'] else 3,
-                "GoldsteinScale": goldstein,
-                "NumMentions": num_mentions,
-                "NumSources": num_sources,
-                "AvgTone": -5.0,
+                "QuadClass": quad_class[i],
+                "GoldsteinScale": goldstein[i],
+                "NumMentions": num_mentions[i],
+                "NumSources": num_sources[i],
+                "AvgTone": avg_tone[i],
                 "Actor1CountryCode": props.get("actor1countrycode", ""),
                 "Actor2CountryCode": props.get("actor2countrycode", ""),
                 "Actor1Name": props.get("actor1", ""),
@@ -137,7 +185,7 @@ class ConflictMonitor:
                 "ActionGeo_Long": lng,
                 "SourceURL": props.get("sourceurl", ""),
                 "event_category": event_category,
-                "severity_score": severity_score
+                "severity_score": severity[i]
             }
             
             if filtered_event["GlobalEventID"]:
@@ -168,42 +216,112 @@ class ConflictMonitor:
     def store_events(self, conflict_events: List[Dict]):
         if not conflict_events:
             return
-        
-        for event in conflict_events:
-            try:
-                self.db.execute("""
-                    INSERT INTO conflict_events 
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT (GlobalEventID) DO UPDATE SET
-                        EventTimeAdded = EXCLUDED.EventTimeAdded,
-                        NumMentions = EXCLUDED.NumMentions,
-                        NumSources = EXCLUDED.NumSources,
-                        severity_score = EXCLUDED.severity_score
-                """, [
-                    event.get("GlobalEventID"),
-                    event.get("EventDate"),
-                    event.get("EventTimeAdded"),
-                    event.get("EventRootCode"),
-                    event.get("EventBaseCode"),
-                    event.get("QuadClass"),
-                    event.get("GoldsteinScale"),
-                    event.get("NumMentions"),
-                    event.get("NumSources"),
-                    event.get("AvgTone"),
-                    event.get("Actor1CountryCode"),
-                    event.get("Actor2CountryCode"),
-                    event.get("Actor1Name"),
-                    event.get("Actor2Name"),
-                    event.get("ActionGeo_CountryCode"),
-                    event.get("ActionGeo_FullName"),
-                    event.get("ActionGeo_Lat"),
-                    event.get("ActionGeo_Long"),
-                    event.get("SourceURL"),
-                    event.get("event_category"),
-                    event.get("severity_score")
-                ])
-            except Exception as e:
-                print(f"[ConflictMonitor] Store error for {event.get('GlobalEventID')}: {e}")
+
+        rows = [
+            [
+                event.get("GlobalEventID"),
+                event.get("EventDate"),
+                event.get("EventTimeAdded"),
+                event.get("EventRootCode"),
+                event.get("EventBaseCode"),
+                event.get("QuadClass"),
+                event.get("GoldsteinScale"),
+                event.get("NumMentions"),
+                event.get("NumSources"),
+                event.get("AvgTone"),
+                event.get("Actor1CountryCode"),
+                event.get("Actor2CountryCode"),
+                event.get("Actor1Name"),
+                event.get("Actor2Name"),
+                event.get("ActionGeo_CountryCode"),
+                event.get("ActionGeo_FullName"),
+                event.get("ActionGeo_Lat"),
+                event.get("ActionGeo_Long"),
+                event.get("SourceURL"),
+                event.get("event_category"),
+                event.get("severity_score")
+            ]
+            for event in conflict_events
+        ]
+        dates = {event.get("EventDate") for event in conflict_events if event.get("EventDate")}
+
+        self.db.begin()
+        try:
+            self.db.executemany("""
+                INSERT INTO conflict_events 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (GlobalEventID) DO UPDATE SET
+                    EventTimeAdded = EXCLUDED.EventTimeAdded,
+                    NumMentions = EXCLUDED.NumMentions,
+                    NumSources = EXCLUDED.NumSources,
+                    severity_score = EXCLUDED.severity_score
+            """, rows)
+            self._refresh_rollups(dates)
+            self.db.commit()
+        except Exception as e:
+            # The whole batch is rolled back; raise so the caller sees it was not stored
+            self.db.rollback()
+            print(f"[ConflictMonitor] Store error for batch of {len(rows)} events: {e}")
+            raise
+
+    def _refresh_rollups(self, dates):
+        """Recompute the daily rollups for the given EventDates from conflict_events.
+
+        Runs inside the caller's transaction, so each ingest batch and its
+        rollup rows commit together. Only the touched days are rescanned.
+        """
+        dates = sorted(dates)
+        if not dates:
+            return
+        placeholders = ", ".join("?" for _ in dates)
+
+        self.db.execute(f"DELETE FROM conflict_country_daily WHERE EventDate IN ({placeholders})", dates)
+        self.db.execute(f"""
+            INSERT INTO conflict_country_daily
+            SELECT
+                EventDate,
+                ActionGeo_CountryCode,
+                COUNT(*),
+                COALESCE(SUM(GoldsteinScale), 0),
+                COUNT(GoldsteinScale),
+                SUM(CASE WHEN event_category = 'violence' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN event_category = 'protest' THEN 1 ELSE 0 END)
+            FROM conflict_events
+            WHERE EventDate IN ({placeholders})
+            GROUP BY EventDate, ActionGeo_CountryCode
+        """, dates)
+
+        self.db.execute(f"DELETE FROM conflict_violence_daily WHERE EventDate IN ({placeholders})", dates)
+        self.db.execute(f"""
+            INSERT INTO conflict_violence_daily
+            SELECT
+                EventDate,
+                ActionGeo_FullName,
+                EventBaseCode,
+                COUNT(*),
+                MIN(GoldsteinScale),
+                SUM(NumSources),
+                MAX(severity_score)
+            FROM conflict_events
+            WHERE EventRootCode IN ('18', '19', '20')
+                AND EventDate IN ({placeholders})
+            GROUP BY EventDate, ActionGeo_FullName, EventBaseCode
+        """, dates)
+
+    def rebuild_rollups(self):
+        """Rebuild all daily rollups from conflict_events (e.g. for databases created before rollups existed)."""
+        dates = [row[0] for row in self.db.execute(
+            "SELECT DISTINCT EventDate FROM conflict_events WHERE EventDate IS NOT NULL"
+        ).fetchall()]
+        if not dates:
+            return
+        self.db.begin()
+        try:
+            self._refresh_rollups(dates)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            print(f"[ConflictMonitor] Rollup rebuild failed: {e}")
 
     def generate_alerts(self, high_impact: List[Dict]) -> List[Dict]:
         alerts = []
@@ -236,9 +354,15 @@ class ConflictMonitor:
             'alerts': alerts
         }
 
+    def _query(self, sql: str, params: List) -> List[tuple]:
+        """Run a read on its own cursor: DuckDB connections are not thread-safe,
+        and the API serves these queries from several threads at once."""
+        with self.db.cursor() as cur:
+            return cur.execute(sql, params).fetchall()
+
     def query_protests(self, days: int = 7, min_sources: int = 10) -> List[Dict]:
         cutoff = datetime.now(timezone.utc).date() - timedelta(days=days)
-        result = self.db.execute("""
+        result = self._query("""
             SELECT 
                 EventDate,
                 ActionGeo_FullName as Location,
@@ -254,7 +378,7 @@ class ConflictMonitor:
                 AND EventDate >= ?
                 AND NumSources > ?
             ORDER BY NumSources DESC, severity_score DESC
-        """, [cutoff, min_sources]).fetchall()
+        """, [cutoff, min_sources])
         
         columns = ['EventDate', 'Location', 'Actor1Name', 'Actor2Name', 
                    'NumSources', 'NumMentions', 'AvgTone', 'SourceURL', 'severity_score']
@@ -262,39 +386,39 @@ class ConflictMonitor:
 
     def query_mass_casualty(self, days: int = 7) -> List[Dict]:
         cutoff = datetime.now(timezone.utc).date() - timedelta(days=days)
-        result = self.db.execute("""
+        result = self._query("""
             SELECT 
-                ce.EventDate,
-                ce.ActionGeo_FullName,
-                ce.EventBaseCode,
-                ce.GoldsteinScale,
-                ce.NumSources,
-                ce.severity_score
-            FROM conflict_events ce
-            WHERE ce.EventRootCode IN ('18', '19', '20')
-                AND ce.EventDate >= ?
-            ORDER BY ce.severity_score DESC, ce.NumSources DESC
-        """, [cutoff]).fetchall()
+                EventDate,
+                ActionGeo_FullName,
+                EventBaseCode,
+                min_goldstein,
+                sources_sum,
+                max_severity,
+                event_count
+            FROM conflict_violence_daily
+            WHERE EventDate >= ?
+            ORDER BY max_severity DESC, sources_sum DESC
+        """, [cutoff])
         
         columns = ['EventDate', 'Location', 'EventCode', 'GoldsteinScale', 
-                   'NumSources', 'severity_score']
+                   'NumSources', 'severity_score', 'event_count']
         return [dict(zip(columns, row)) for row in result]
 
     def query_hotspots(self, days: int = 7) -> List[Dict]:
         cutoff = datetime.now(timezone.utc).date() - timedelta(days=days)
-        result = self.db.execute("""
+        result = self._query("""
             SELECT 
                 ActionGeo_CountryCode,
-                COUNT(*) as event_count,
-                AVG(GoldsteinScale) as avg_severity,
-                SUM(CASE WHEN event_category = 'violence' THEN 1 ELSE 0 END) as violence_count,
-                SUM(CASE WHEN event_category = 'protest' THEN 1 ELSE 0 END) as protest_count
-            FROM conflict_events
+                SUM(event_count) as event_count,
+                SUM(goldstein_sum) / NULLIF(SUM(goldstein_n), 0) as avg_severity,
+                SUM(violence_count) as violence_count,
+                SUM(protest_count) as protest_count
+            FROM conflict_country_daily
             WHERE EventDate >= ?
             GROUP BY ActionGeo_CountryCode
-            HAVING event_count > 5
+            HAVING SUM(event_count) > 5
             ORDER BY violence_count DESC, event_count DESC
-        """, [cutoff]).fetchall()
+        """, [cutoff])
         
         columns = ['CountryCode', 'event_count', 'avg_severity', 
                    'violence_count', 'protest_count']
@@ -3,9 +3,21 @@ from pathlib import Path
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional
 
+import numpy as np
+
+from ingestion_engine.transforms.event_scores import (
+    defaults_for,
+    fill_missing,
+    numeric_columns,
+    priority_scores,
+)
+
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
+# Goldstein fallback for features without a goldsteinscale property
+INTERACTION_GOLDSTEIN = {'conflict': -8.0, 'diplomatic': 3.0, 'economic': 2.0}
+
 
 class DiplomaticRelationsTracker:
     def __init__(self, db_path: Optional[str] = None):
@@ -53,6 +65,26 @@ class DiplomaticRelationsTracker:
             )
         """)
 
+        # Directed per-pair daily rollup of country_interactions (see _refresh_rollups).
+        # No primary key: rows are replaced per EventDate inside the ingest transaction.
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS pair_daily (
+                EventDate DATE,
+                Source_Country VARCHAR,
+                Target_Country VARCHAR,
+                interactions BIGINT,
+                goldstein_sum DOUBLE,
+                goldstein_n BIGINT,
+                conflict_count BIGINT,
+                conflict_goldstein_sum DOUBLE,
+                conflict_goldstein_n BIGINT
+            )
+        """)
+
+        rollup_rows = self.db.execute("SELECT COUNT(*) FROM pair_daily").fetchone()[0]
+        if rollup_rows == 0:
+            self.rebuild_rollups()
+
     def filter_bilateral_events(self, events: List[Dict]) -> List[Dict]:
         bilateral = []
         
@@ -69,7 +101,7 @@ class DiplomaticRelationsTracker:
         return bilateral
 
     def categorize_interactions(self, events: List[Dict]) -> List[Dict]:
-        categorized = []
+        selected = []
         
         diplomatic_codes = ['01', '02', '03', '04', '05', '06', '07', '08', '09']
         military_codes = ['15', '16', '17', '18', '19', '20']
@@ -78,6 +110,8 @@ class DiplomaticRelationsTracker:
         
         for event in events:
             props = event.get("properties", {})
+            if not props.get("eventid"):
+                continue
             event_code = props.get("eventcode", "")
             event_root = event_code[:2] if len(event_code) >= 2 else ""
             event_base = event_code[:3] if len(event_code) >= 3 else ""
@@ -92,6 +126,26 @@ class DiplomaticRelationsTracker:
             elif event_root in military_codes:
                 interaction_type = 'military'
             
+            selected.append((props, event_code, event_root, interaction_type))
+        
+        if not selected:
+            return []
+        
+        # Real GoldsteinScale / AvgTone / QuadClass / NumSources in one vectorized
+        # pass; per-type defaults only fill features without the numeric fields.
+        types = [s[3] for s in selected]
+        is_conflict = np.array([t == 'conflict' for t in types])
+        cols = numeric_columns([s[0] for s in selected])
+        goldstein = fill_missing(cols["goldstein"], defaults_for(types, INTERACTION_GOLDSTEIN, -5.0))
+        avg_tone = fill_missing(cols["avg_tone"], np.where(is_conflict, -5.0, 0.0))
+        derived_quad = np.where(is_conflict, 4, np.where(goldstein > 0, 1, 3))
+        quad_class = np.where(cols["quad_class"] > 0, cols["quad_class"], derived_quad)
+        
+        goldstein, avg_tone = goldstein.tolist(), avg_tone.tolist()
+        quad_class, num_sources = quad_class.tolist(), cols["num_sources"].tolist()
+        
+        categorized = []
+        for i, (props, event_code, event_root, interaction_type) in enumerate(selected):
             a1_code = props.get("actor1countrycode", "")
             a2_code = props.get("actor2countrycode", "")
             country_pair = '-'.join(sorted([a1_code, a2_code]))
@@ -105,18 +159,6 @@ class DiplomaticRelationsTracker:
             except:
                 event_date = datetime.now(timezone.utc).date()
             
-            goldstein = -5.0
-            if interaction_type == 'conflict':
-                goldstein = -8.0
-            elif interaction_type == 'diplomatic':
-                goldstein = 3.0
-            elif interaction_type == 'economic':
-                goldstein = 2.0
-            
-            cooperation_score = goldstein
-            
-            num_sources = props.get("importance", 1) or 1
-            
             categorized_event = {
                 "GlobalEventID": int(props.get("eventid", "0")) if props.get("eventid") else None,
                 "EventDate": event_date,
@@ -124,12 +166,12 @@ class DiplomaticRelationsTracker:
                 "Target_Country": a2_code,
                 "EventRootCode": event_root,
                 "EventBaseCode": event_code,
-                "QuadClass": 4 if interaction_type == 'conflict' else (1 if goldstein > 0 else 3),
-                "GoldsteinScale": goldstein,
+                "QuadClass": quad_class[i],
+                "GoldsteinScale": goldstein[i],
                 "interaction_type": interaction_type,
-                "cooperation_score": cooperation_score,
-                "NumSources": num_sources,
-                "AvgTone": -5.0 if interaction_type == 'conflict' else 0.0,
+                "cooperation_score": goldstein[i],
+                "NumSources": num_sources[i],
+                "AvgTone": avg_tone[i],
                 "SourceURL": props.get("sourceurl", ""),
                 "extracted_timestamp": datetime.now(timezone.utc),
                 "country_pair": country_pair
@@ -223,25 +265,21 @@ class DiplomaticRelationsTracker:
         return results
 
     def detect_significant_developments(self, interactions: List[Dict]) -> List[Dict]:
-        significant = []
+        if not interactions:
+            return []
         
-        for event in interactions:
-            num_sources = event.get("NumSources", 0)
-            goldstein = abs(event.get("GoldsteinScale", 0))
-            event_root = event.get("EventRootCode", "")
-            
-            if (num_sources > 15 or
-                goldstein > 7 or
-                event_root in ['19', '20']):
-                
-                priority_score = (
-                    num_sources * 2 +
-                    goldstein * 5 +
-                    (50 if event_root in ['19', '20'] else 0)
-                )
-                
-                event["priority_score"] = priority_score
-                significant.append(event)
+        num_sources = np.array([e.get("NumSources", 0) or 0 for e in interactions], dtype=np.float64)
+        goldstein = np.abs(np.array([e.get("GoldsteinScale", 0) or 0 for e in interactions], dtype=np.float64))
+        critical = np.array([e.get("EventRootCode", "") in ['19', '20'] for e in interactions])
+        
+        mask = (num_sources > 15) | (goldstein > 7) | critical
+        priority = priority_scores(num_sources, goldstein, critical).tolist()
+        
+        significant = []
+        for i in np.flatnonzero(mask):
+            event = interactions[i]
+            event["priority_score"] = priority[i]
+            significant.append(event)
         
         return sorted(significant, key=lambda x: x.get("priority_score", 0), reverse=True)
 
@@ -291,33 +329,88 @@ class DiplomaticRelationsTracker:
     def store_interactions(self, interactions: List[Dict]):
         if not interactions:
             return
-        
-        for event in interactions:
-            try:
-                self.db.execute("""
-                    INSERT INTO country_interactions 
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT (GlobalEventID) DO UPDATE SET
-                        extracted_timestamp = EXCLUDED.extracted_timestamp,
-                        NumSources = EXCLUDED.NumSources
-                """, [
-                    event.get("GlobalEventID"),
-                    event.get("EventDate"),
-                    event.get("Source_Country"),
-                    event.get("Target_Country"),
-                    event.get("EventRootCode"),
-                    event.get("EventBaseCode"),
-                    event.get("QuadClass"),
-                    event.get("GoldsteinScale"),
-                    event.get("interaction_type"),
-                    event.get("cooperation_score"),
-                    event.get("NumSources"),
-                    event.get("AvgTone"),
-                    event.get("SourceURL"),
-                    event.get("extracted_timestamp")
-                ])
-            except Exception as e:
-                print(f"[DiplomaticTracker] Store error for {event.get('GlobalEventID')}: {e}")
+
+        rows = [
+            [
+                event.get("GlobalEventID"),
+                event.get("EventDate"),
+                event.get("Source_Country"),
+                event.get("Target_Country"),
+                event.get("EventRootCode"),
+                event.get("EventBaseCode"),
+                event.get("QuadClass"),
+                event.get("GoldsteinScale"),
+                event.get("interaction_type"),
+                event.get("cooperation_score"),
+                event.get("NumSources"),
+                event.get("AvgTone"),
+                event.get("SourceURL"),
+                event.get("extracted_timestamp")
+            ]
+            for event in interactions
+        ]
+        dates = {event.get("EventDate") for event in interactions if event.get("EventDate")}
+
+        self.db.begin()
+        try:
+            self.db.executemany("""
+                INSERT INTO country_interactions 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (GlobalEventID) DO UPDATE SET
+                    extracted_timestamp = EXCLUDED.extracted_timestamp,
+                    NumSources = EXCLUDED.NumSources
+            """, rows)
+            self._refresh_rollups(dates)
+            self.db.commit()
+        except Exception as e:
+            # The whole batch is rolled back; raise so the caller sees it was not stored
+            self.db.rollback()
+            print(f"[DiplomaticTracker] Store error for batch of {len(rows)} interactions: {e}")
+            raise
+
+    def _refresh_rollups(self, dates):
+        """Recompute pair_daily for the given EventDates from country_interactions.
+
+        Runs inside the caller's transaction so the batch and its rollup rows
+        commit together. Only the touched days are rescanned.
+        """
+        dates = sorted(dates)
+        if not dates:
+            return
+        placeholders = ", ".join("?" for _ in dates)
+
+        self.db.execute(f"DELETE FROM pair_daily WHERE EventDate IN ({placeholders})", dates)
+        self.db.execute(f"""
+            INSERT INTO pair_daily
+            SELECT
+                EventDate,
+                Source_Country,
+                Target_Country,
+                COUNT(*),
+                COALESCE(SUM(GoldsteinScale), 0),
+                COUNT(GoldsteinScale),
+                SUM(CASE WHEN QuadClass = 4 THEN 1 ELSE 0 END),
+                COALESCE(SUM(CASE WHEN QuadClass = 4 THEN GoldsteinScale END), 0),
+                COUNT(CASE WHEN QuadClass = 4 THEN GoldsteinScale END)
+            FROM country_interactions
+            WHERE EventDate IN ({placeholders})
+            GROUP BY EventDate, Source_Country, Target_Country
+        """, dates)
+
+    def rebuild_rollups(self):
+        """Rebuild pair_daily from country_interactions (e.g. for databases created before rollups existed)."""
+        dates = [row[0] for row in self.db.execute(
+            "SELECT DISTINCT EventDate FROM country_interactions WHERE EventDate IS NOT NULL"
+        ).fetchall()]
+        if not dates:
+            return
+        self.db.begin()
+        try:
+            self._refresh_rollups(dates)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            print(f"[DiplomaticTracker] Rollup rebuild failed: {e}")
 
     def store_bilateral_relations(self, relations: List[Dict]):
         if not relations:
@@ -380,9 +473,23 @@ class DiplomaticRelationsTracker:
             'top_significant': significant[:10]
         }
 
+    def _query(self, sql: str, params: List) -> List[tuple]:
+        """Run a read on its own cursor: DuckDB connections are not thread-safe,
+        and the API serves these queries from several threads at once."""
+        with self.db.cursor() as cur:
+            return cur.execute(sql, params).fetchall()
+
     def query_network_centrality(self, days: int = 30) -> List[Dict]:
         cutoff = datetime.now(timezone.utc).date() - timedelta(days=days)
-        result = self.db.execute("""
+        result = self._query("""
+            WITH directed AS (
+                SELECT Source_Country, Target_Country,
+                       SUM(interactions) as interactions,
+                       SUM(goldstein_sum) / NULLIF(SUM(goldstein_n), 0) as avg_goldstein
+                FROM pair_daily
+                WHERE EventDate >= ?
+                GROUP BY Source_Country, Target_Country
+            )
             SELECT 
                 country,
                 COUNT(DISTINCT partner_country) as num_partners,
@@ -390,47 +497,43 @@ class DiplomaticRelationsTracker:
                 AVG(avg_goldstein) as avg_relation_quality
             FROM (
                 SELECT Source_Country as country, Target_Country as partner_country,
-                       COUNT(*) as interactions, AVG(GoldsteinScale) as avg_goldstein
-                FROM country_interactions
-                WHERE EventDate >= ?
-                GROUP BY Source_Country, Target_Country
+                       interactions, avg_goldstein
+                FROM directed
                 
                 UNION ALL
                 
                 SELECT Target_Country as country, Source_Country as partner_country,
-                       COUNT(*) as interactions, AVG(GoldsteinScale) as avg_goldstein
-                FROM country_interactions
-                WHERE EventDate >= ?
-                GROUP BY Target_Country, Source_Country
+                       interactions, avg_goldstein
+                FROM directed
             ) subquery
             GROUP BY country
             ORDER BY total_interactions DESC
             LIMIT 20
-        """, [cutoff, cutoff]).fetchall()
+        """, [cutoff])
         
         columns = ['country', 'num_partners', 'total_interactions', 'avg_relation_quality']
         return [dict(zip(columns, row)) for row in result]
 
     def query_conflict_pairs(self, days: int = 30) -> List[Dict]:
         cutoff = datetime.now(timezone.utc).date() - timedelta(days=days)
-        result = self.db.execute("""
+        result = self._query("""
             SELECT 
                 CASE 
                     WHEN Source_Country < Target_Country 
                     THEN Source_Country || '-' || Target_Country
                     ELSE Target_Country || '-' || Source_Country
                 END as country_pair,
-                COUNT(*) as conflict_events,
-                AVG(GoldsteinScale) as avg_severity,
+                SUM(conflict_count) as conflict_events,
+                SUM(conflict_goldstein_sum) / NULLIF(SUM(conflict_goldstein_n), 0) as avg_severity,
                 MIN(EventDate) as first_incident,
                 MAX(EventDate) as latest_incident
-            FROM country_interactions
-            WHERE QuadClass = 4
+            FROM pair_daily
+            WHERE conflict_count > 0
                 AND EventDate >= ?
             GROUP BY country_pair
-            HAVING COUNT(*) >= 3
+            HAVING SUM(conflict_count) >= 3
             ORDER BY conflict_events DESC, avg_severity ASC
-        """, [cutoff]).fetchall()
+        """, [cutoff])
         
         columns = ['country_pair', 'conflict_events', 'avg_severity', 
                    'first_incident', 'latest_incident']
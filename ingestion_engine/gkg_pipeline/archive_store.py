@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Compaction and querying of the retention Parquet archive.
+
+retention_cleanup.py writes one fragment per expired raw file:
+
+    {archive_dir}/raw_gkg/2024/01/01/20240101000000.gkg.parquet      (96 per day)
+    {archive_dir}/raw_gkgcounts/2024/01/01/20240101.gkgcounts.parquet
+
+compact() merges each finished day's fragments into one file sorted by the
+kind's SORT_KEYS, and (for MONTHLY_KINDS) each finished month's day files
+into one month file:
+
+    {archive_dir}/raw_gkg/2024/01/01/20240101.day.parquet
+    {archive_dir}/raw_gkgcounts/2024/01/202401.month.parquet
+
+A rewrite of an existing day or month file goes to a new versioned name
+(20240101.2.day.parquet, ...), and only counts once {archive_dir}/manifest.json
+(file -> level, date range, rows, source fragments) points at it; the old
+file and the merged inputs are deleted after that. A run interrupted at any
+step leaves either the old or the new state recorded, never both, and the
+next run removes the unrecorded leftovers. scan_sql(kind, start, end) lists only the files whose
+date range overlaps [start, end] for DuckDB read_parquet.
+
+USAGE:
+    python ingestion_engine/gkg_pipeline/archive_store.py --compact
+    python ingestion_engine/gkg_pipeline/archive_store.py --compact --monthly-after-days 35
+"""
+import argparse
+import calendar
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import duckdb
+import yaml
+
+# Sort order inside compacted files (row-group min/max stats follow it)
+SORT_KEYS: Dict[str, Tuple[str, ...]] = {
+    "raw_gkg": ("date", "gkgrecordid"),
+    "raw_gkgcounts": ("date", "country", "count_type"),
+}
+
+# Kinds whose day files are further merged per month. A month of raw GKG is
+# several GB, so raw_gkg stays at one file per day.
+MONTHLY_KINDS = ("raw_gkgcounts",)
+
+ROW_GROUP_SIZE = 122880
+MANIFEST_NAME = "manifest.json"
+
+
+def _sql_path(path: Path) -> str:
+    return str(path).replace("'", "''")
+
+
+def _parse_day_dir(path: Path) -> Optional[date]:
+    try:
+        return date(int(path.parent.parent.name), int(path.parent.name), int(path.name))
+    except ValueError:
+        return None
+
+
+class ArchiveStore:
+    def __init__(self, archive_root: str | Path, conn=None):
+        self.root = Path(archive_root).resolve()
+        self.conn = conn or duckdb.connect()
+        self.manifest_path = self.root / MANIFEST_NAME
+        self.manifest = self._load_manifest()
+
+    # Manifest -----------------------------------------------------------
+
+    def _load_manifest(self) -> Dict:
+        if self.manifest_path.exists():
+            return json.loads(self.manifest_path.read_text())
+        return {"version": 1, "files": {}}
+
+    def _save_manifest(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_name(MANIFEST_NAME + ".tmp")
+        tmp_path.write_text(json.dumps(self.manifest, indent=2, sort_keys=True))
+        os.replace(tmp_path, self.manifest_path)
+
+    def _relative(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def _entries(self, kind: str) -> Dict[str, Dict]:
+        prefix = f"{kind}/"
+        return {k: v for k, v in self.manifest["files"].items() if k.startswith(prefix)}
+
+    def compacted_sources(self, kind: str) -> set:
+        """Fragment names already merged into a compacted file."""
+        return {name for entry in self._entries(kind).values() for name in entry["sources"]}
+
+    def ranges(self, kind: str) -> List[Tuple[date, date]]:
+        """Contiguous [start, end] date ranges covered by compacted files."""
+        spans = sorted(
+            (date.fromisoformat(e["start"]), date.fromisoformat(e["end"]))
+            for e in self._entries(kind).values()
+        )
+        merged: List[Tuple[date, date]] = []
+        for start, end in spans:
+            if merged and start <= merged[-1][1] + timedelta(days=1):
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    # Layout -------------------------------------------------------------
+
+    def day_file(self, kind: str, day: date) -> Path:
+        """The recorded day file, or the name a first compaction writes."""
+        return self._live(kind, self.root / kind / day.strftime("%Y/%m/%d") / f"{day:%Y%m%d}.day.parquet")
+
+    def month_file(self, kind: str, year: int, month: int) -> Path:
+        """The recorded month file, or the name a first compaction writes."""
+        return self._live(kind, self.root / kind / f"{year:04d}/{month:02d}" / f"{year:04d}{month:02d}.month.parquet")
+
+    def _live(self, kind: str, default: Path) -> Path:
+        base, level = default.name.split(".")[0], default.name.split(".")[-2]
+        prefix = self._relative(default.parent) + "/"
+        for key in self._entries(kind):
+            name = key[len(prefix):] if key.startswith(prefix) else ""
+            if "/" not in name and name.startswith(base + ".") and name.endswith(f".{level}.parquet"):
+                return self.root / key
+        return default
+
+    @staticmethod
+    def _next_version(path: Path) -> Path:
+        """20240101.day.parquet -> 20240101.2.day.parquet -> 20240101.3.day.parquet ..."""
+        parts = path.name.split(".")
+        version = int(parts[1]) if len(parts) == 4 else 1
+        candidate = path
+        while candidate.exists():
+            version += 1
+            candidate = path.with_name(f"{parts[0]}.{version}.{parts[-2]}.parquet")
+        return candidate
+
+    def _drop_unrecorded(self, directory: Path, pattern: str):
+        """Remove compacted files the manifest does not point at: written by a
+        run that stopped before recording them, or replaced by a newer version."""
+        for path in directory.glob(pattern):
+            if self._relative(path) not in self.manifest["files"]:
+                path.unlink(missing_ok=True)
+
+    def files(self, kind: str) -> List[Tuple[date, date, Path]]:
+        """(start, end, path) for every live archive file of a kind, oldest first.
+
+        Compacted files count only once recorded in the manifest, and
+        fragments only until they are recorded as merged, so a run that
+        stopped half way never exposes the same rows twice.
+        """
+        recorded = self._entries(kind)
+        merged = self.compacted_sources(kind)
+        out = []
+        for path in (self.root / kind).glob("*/*/*.month.parquet"):
+            if self._relative(path) in recorded:
+                year, month = int(path.parent.parent.name), int(path.parent.name)
+                last = calendar.monthrange(year, month)[1]
+                out.append((date(year, month, 1), date(year, month, last), path))
+        for path in (self.root / kind).glob("*/*/*/*.parquet"):
+            day = _parse_day_dir(path.parent)
+            if not day:
+                continue
+            if path.name.endswith(".day.parquet"):
+                if self._relative(path) in recorded:
+                    out.append((day, day, path))
+            elif path.name not in merged:
+                out.append((day, day, path))
+        return sorted(out)
+
+    def fragments_by_day(self, kind: str) -> Dict[date, List[Path]]:
+        out: Dict[date, List[Path]] = {}
+        for path in (self.root / kind).glob("*/*/*/*.parquet"):
+            day = _parse_day_dir(path.parent)
+            if day and not path.name.endswith(".day.parquet"):
+                out.setdefault(day, []).append(path)
+        return {day: sorted(paths) for day, paths in sorted(out.items())}
+
+    # Querying -----------------------------------------------------------
+
+    def scan_sql(self, kind: str, start: Optional[date] = None, end: Optional[date] = None) -> Optional[str]:
+        """read_parquet() over only the files overlapping [start, end], or None."""
+        selected = [
+            p for s, e, p in self.files(kind)
+            if (start is None or e >= start) and (end is None or s <= end)
+        ]
+        if not selected:
+            return None
+        listing = ", ".join(f"'{_sql_path(p)}'" for p in selected)
+        return f"read_parquet([{listing}], union_by_name=true)"
+
+    def query(self, kind: str, sql: str, start: Optional[date] = None, end: Optional[date] = None):
+        """Run `sql` with {archive} replaced by the pruned scan; returns a DataFrame
+        (None if no archive files overlap the range)."""
+        source = self.scan_sql(kind, start, end)
+        if source is None:
+            return None
+        return self.conn.execute(sql.format(archive=source)).df()
+
+    # Compaction ---------------------------------------------------------
+
+    def _write_sorted(self, kind: str, inputs: List[Path], out_path: Path) -> int:
+        listing = ", ".join(f"'{_sql_path(p)}'" for p in inputs)
+        order = ", ".join(SORT_KEYS[kind])
+        tmp_path = out_path.with_name(out_path.name + ".tmp")
+        self.conn.execute(
+            f"COPY (SELECT * FROM read_parquet([{listing}], union_by_name=true) ORDER BY {order}) "
+            f"TO '{_sql_path(tmp_path)}' (FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE {ROW_GROUP_SIZE})"
+        )
+        rows = self.conn.execute(f"SELECT COUNT(*) FROM read_parquet('{_sql_path(tmp_path)}')").fetchone()[0]
+        os.replace(tmp_path, out_path)
+        return int(rows)
+
+    def _record(self, out_path: Path, level: str, start: date, end: date, rows: int, sources: List[str],
+                replaces: List[str]):
+        for key in replaces:
+            self.manifest["files"].pop(key, None)
+        self.manifest["files"][self._relative(out_path)] = {
+            "level": level,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "rows": rows,
+            "bytes": out_path.stat().st_size,
+            "sources": sorted(sources),
+            "compacted_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        self._save_manifest()
+
+    def compact_day(self, kind: str, day: date, fragments: List[Path]) -> Dict:
+        live = self.day_file(kind, day)
+        key = self._relative(live)
+        entry = self.manifest["files"].get(key) if live.exists() else None
+        done = set(entry["sources"]) if entry else set()
+        self._drop_unrecorded(live.parent, "*.day.parquet")
+
+        # Fragments already merged (an earlier run stopped before deleting them)
+        stale = [p for p in fragments if p.name in done]
+        new = [p for p in fragments if p.name not in done]
+        for path in stale:
+            path.unlink(missing_ok=True)
+        if not new:
+            return {"day": day.isoformat(), "fragments": 0, "rows": entry["rows"] if entry else 0}
+
+        # The recorded file stays untouched until the manifest points at its successor
+        out_path = self._next_version(live) if entry else live
+        inputs = ([live] if entry else []) + new
+        rows = self._write_sorted(kind, inputs, out_path)
+        self._record(out_path, "day", day, day, rows, list(done) + [p.name for p in new], [key] if entry else [])
+        if entry:
+            live.unlink(missing_ok=True)
+        for path in new:
+            path.unlink(missing_ok=True)
+        return {"day": day.isoformat(), "fragments": len(new), "rows": rows}
+
+    def compact_month(self, kind: str, year: int, month: int) -> Optional[Dict]:
+        recorded = self._entries(kind)
+        day_files = []
+        for path in sorted((self.root / kind / f"{year:04d}/{month:02d}").glob("*/*.day.parquet")):
+            if self._relative(path) in recorded:
+                day_files.append(path)
+            else:
+                # Already merged into the month file by a run that stopped early
+                path.unlink(missing_ok=True)
+        if not day_files:
+            return None
+        live = self.month_file(kind, year, month)
+        existing = recorded.get(self._relative(live)) if live.exists() else None
+        self._drop_unrecorded(live.parent, "*.month.parquet")
+        inputs = ([live] if existing else []) + day_files
+        replaced = [self._relative(p) for p in day_files]
+        sources = list(existing["sources"]) if existing else []
+        for key in replaced:
+            sources += recorded[key]["sources"]
+
+        out_path = self._next_version(live) if existing else live
+        rows = self._write_sorted(kind, inputs, out_path)
+        last = calendar.monthrange(year, month)[1]
+        self._record(out_path, "month", date(year, month, 1), date(year, month, last), rows, sources,
+                     replaced + ([self._relative(live)] if existing else []))
+        if existing:
+            live.unlink(missing_ok=True)
+        for path in day_files:
+            path.unlink(missing_ok=True)
+            try:
+                path.parent.rmdir()
+            except OSError:
+                pass
+        return {"month": f"{year:04d}-{month:02d}", "day_files": len(day_files), "rows": rows}
+
+    def compact(self, kinds: Optional[List[str]] = None, today: Optional[date] = None,
+                monthly_after_days: int = 35) -> Dict:
+        """Compact every finished day, then months older than monthly_after_days."""
+        today = today or datetime.now(timezone.utc).date()
+        report = {}
+        for kind in kinds or list(SORT_KEYS):
+            days = []
+            for day, fragments in self.fragments_by_day(kind).items():
+                if day < today:
+                    days.append(self.compact_day(kind, day, fragments))
+            months = []
+            if kind in MONTHLY_KINDS:
+                cutoff = today - timedelta(days=monthly_after_days)
+                pending = sorted({(s.year, s.month) for s, e, p in self.files(kind)
+                                  if s == e and p.name.endswith(".day.parquet")})
+                for year, month in pending:
+                    if date(year, month, calendar.monthrange(year, month)[1]) < cutoff:
+                        result = self.compact_month(kind, year, month)
+                        if result:
+                            months.append(result)
+            report[kind] = {
+                "days": days,
+                "months": months,
+                "ranges": [(s.isoformat(), e.isoformat()) for s, e in self.ranges(kind)],
+            }
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the GKG Parquet archive")
+    parser.add_argument("--config", type=str, default=None, help="Path to config.yaml")
+    parser.add_argument("--compact", action="store_true", help="Merge fragments into day/month files")
+    parser.add_argument("--monthly-after-days", type=int, default=35)
+    args = parser.parse_args()
+
+    config_path = args.config or Path(__file__).with_name("config.yaml")
+    with open(config_path, "r") as f:
+        paths = yaml.safe_load(f)["paths"]
+    store = ArchiveStore(paths.get("archive_dir", "data/archive/gkg"))
+
+    if args.compact:
+        report = store.compact(monthly_after_days=args.monthly_after_days)
+        for kind, result in report.items():
+            fragments = sum(d["fragments"] for d in result["days"])
+            print(f"{kind}: {fragments} fragments -> {len(result['days'])} day files, "
+                  f"{len(result['months'])} months compacted")
+    for kind in SORT_KEYS:
+        ranges = ", ".join(f"{s}..{e}" for s, e in store.ranges(kind)) or "none"
+        print(f"{kind} archived ranges: {ranges}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
-import io
+import os
+import shutil
+import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import requests
 import yaml
 
+# Fixed copy size for HTTP bodies and zip members; peak memory stays at about
+# one chunk per download regardless of GKG file size.
+CHUNK_SIZE = 1024 * 1024
+
 
 class GDELTFetcher:
     def __init__(self, config_path: str = None):
@@ -19,10 +26,41 @@ class GDELTFetcher:
         self.raw_gkg_dir.mkdir(parents=True, exist_ok=True)
         self.raw_counts_dir.mkdir(parents=True, exist_ok=True)
 
-    def _download_zip(self, url: str):
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
-        return zipfile.ZipFile(io.BytesIO(response.content))
+    def _download_to_file(self, url: str, dest_dir: Path) -> Path:
+        """Stream `url` to a temp file in dest_dir (same filesystem as the output)."""
+        with requests.get(url, timeout=60, stream=True) as response:
+            response.raise_for_status()
+            fd, tmp_name = tempfile.mkstemp(dir=dest_dir, suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as f_out:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        f_out.write(chunk)
+            except Exception:
+                os.unlink(tmp_name)
+                raise
+        return Path(tmp_name)
+
+    def _extract_first_member(self, zip_path: Path, out_dir: Path) -> Path:
+        """Copy the zip's first member to out_dir in CHUNK_SIZE pieces; atomic rename on completion."""
+        with zipfile.ZipFile(zip_path) as z:
+            csv_name = z.namelist()[0]
+            out_path = out_dir / Path(csv_name).name
+            part_path = out_path.with_name(out_path.name + '.part')
+            try:
+                with z.open(csv_name) as f_in, open(part_path, 'wb') as f_out:
+                    shutil.copyfileobj(f_in, f_out, CHUNK_SIZE)
+            except Exception:
+                part_path.unlink(missing_ok=True)
+                raise
+        os.replace(part_path, out_path)
+        return out_path
+
+    def _fetch_zip_member(self, url: str, out_dir: Path) -> Path:
+        zip_path = self._download_to_file(url, out_dir)
+        try:
+            return self._extract_first_member(zip_path, out_dir)
+        finally:
+            zip_path.unlink(missing_ok=True)
 
     def fetch_latest_15min(self):
         """Fetch latest 15-min GKG file from lastupdate.txt"""
@@ -44,15 +82,9 @@ class GDELTFetcher:
         if not gkg_url:
             raise RuntimeError("Could not locate gkg.csv.zip in lastupdate.txt")
 
-        with self._download_zip(gkg_url) as z:
-            csv_name = z.namelist()[0]
-            out_path = self.raw_gkg_dir / csv_name
-            with z.open(csv_name) as f_in, open(out_path, 'wb') as f_out:
-                f_out.write(f_in.read())
-
-        return out_path
+        return self._fetch_zip_member(gkg_url, self.raw_gkg_dir)
 
-    def fetch_daily_counts(self, date: datetime | None = None):
+    def fetch_daily_counts(self, date: datetime | None = None, skip_existing: bool = False):
         """Fetch daily gkgcounts file (yesterday by default)"""
         if date is None:
             date = datetime.now(timezone.utc) - timedelta(days=1)
@@ -60,23 +92,41 @@ class GDELTFetcher:
         date_str = date.strftime('%Y%m%d')
         zip_url = f"{self.gkg_counts_url}/{date_str}.gkgcounts.csv.zip"
         csv_url = f"{self.gkg_counts_url}/{date_str}.gkgcounts.csv"
+        out_path = self.raw_counts_dir / f"{date_str}.gkgcounts.csv"
 
-        try:
-            with self._download_zip(zip_url) as z:
-                csv_name = z.namelist()[0]
-                out_path = self.raw_counts_dir / csv_name
-                with z.open(csv_name) as f_in, open(out_path, 'wb') as f_out:
-                    f_out.write(f_in.read())
+        if skip_existing and out_path.exists() and out_path.stat().st_size > 0:
             return out_path
+
+        try:
+            return self._fetch_zip_member(zip_url, self.raw_counts_dir)
         except Exception:
             # fallback to direct csv
-            resp = requests.get(csv_url, timeout=60)
-            if not resp.ok:
+            try:
+                tmp_path = self._download_to_file(csv_url, self.raw_counts_dir)
+            except Exception:
                 raise RuntimeError(f"Failed to fetch gkgcounts for {date_str}")
-            out_path = self.raw_counts_dir / f"{date_str}.gkgcounts.csv"
-            out_path.write_bytes(resp.content)
+            os.replace(tmp_path, out_path)
             return out_path
 
+    def fetch_counts_range(self, start: datetime, end: datetime, max_workers: int = 4,
+                           skip_existing: bool = True) -> dict:
+        """Backfill daily gkgcounts for start..end (inclusive) with parallel downloads.
+
+        Returns {YYYYMMDD: path or None}; failures are printed and mapped to None.
+        """
+        days = [start + timedelta(days=i) for i in range((end.date() - start.date()).days + 1)]
+
+        def fetch(day):
+            try:
+                return self.fetch_daily_counts(day, skip_existing=skip_existing)
+            except Exception as e:
+                print(f"gkgcounts {day.strftime('%Y%m%d')} failed: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            paths = list(pool.map(fetch, days))
+        return {day.strftime('%Y%m%d'): path for day, path in zip(days, paths)}
+
 
 if __name__ == '__main__':
     fetcher = GDELTFetcher()
@@ -0,0 +1,144 @@
+"""
+One logical gdelt_metrics / gdelt_admin1_metrics relation over hot and cold data.
+
+Hot:  the day partitions under paths.metrics_dir (metrics_store.py), kept for
+      retention.processed_days.
+Cold: the processed daily CSVs that retention_cleanup.py archived to
+      {archive_dir}/processed/YYYY/MM/DD/{table}_YYYYMMDD.parquet before the
+      matching partitions were dropped.
+
+plan() picks the files for a date range: every hot partition in range, plus
+cold files only for days with no hot partition, so a day is never read
+twice. Everything is plain Parquet, so queries run on an in-memory DuckDB
+connection and never contend for the pipeline's database lock.
+"""
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import duckdb
+import yaml
+
+try:
+    from archive_store import ArchiveStore
+    from metrics_store import COLUMN_TYPES, TABLE_KEYS, MetricsStore
+except ModuleNotFoundError:
+    from ingestion_engine.gkg_pipeline.archive_store import ArchiveStore
+    from ingestion_engine.gkg_pipeline.metrics_store import COLUMN_TYPES, TABLE_KEYS, MetricsStore
+
+# Same groupings as DataProcessor.get_daily_summary
+MEASURES = {
+    "deaths": ("KILL", "CRISISLEXT03DEAD"),
+    "injured": ("INJURED", "CRISISLEXT02INJURED"),
+    "displaced": ("DISPLACED", "REFUGEES"),
+    "protests": ("PROTEST",),
+    "arrests": ("ARREST",),
+}
+
+MAX_PAGE_SIZE = 5000
+
+
+def _sql_path(path: Path) -> str:
+    return str(path).replace("'", "''")
+
+
+def metric_types(measure: str) -> tuple:
+    """A MEASURES name, or a single GKG count type (e.g. KILL)."""
+    return MEASURES.get(measure.lower(), (measure.upper(),))
+
+
+class MetricsHistory:
+    def __init__(self, metrics_dir: str | Path, archive_dir: str | Path, conn=None):
+        self.conn = conn or duckdb.connect()
+        self.store = MetricsStore(self.conn, metrics_dir)
+        self.archive = ArchiveStore(archive_dir, conn=self.conn)
+
+    @classmethod
+    def from_config(cls, config_path: str | Path | None = None):
+        config_path = config_path or Path(__file__).with_name("config.yaml")
+        with open(config_path, "r") as f:
+            paths = yaml.safe_load(f)["paths"]
+        return cls(paths.get("metrics_dir", "data/gkg_metrics"), paths.get("archive_dir", "data/archive/gkg"))
+
+    def plan(self, table: str, start: date, end: date) -> Dict[str, List[Path]]:
+        """Files to scan for [start, end]: hot partitions first, cold archive for the gaps."""
+        hot = self.store.partitions(table, since=start, before=end + timedelta(days=1))
+        hot_days = {day for day, _ in hot}
+        prefix = f"{table}_"
+        cold = [
+            path for day, _, path in self.archive.files("processed")
+            if start <= day <= end and day not in hot_days and path.name.startswith(prefix)
+            and path.name[len(prefix):len(prefix) + 8].isdigit()
+        ]
+        return {"hot": [p for _, p in hot], "cold": cold}
+
+    def relation_sql(self, table: str, start: date, end: date, plan: Optional[Dict] = None) -> str:
+        """FROM-clause source for one table over [start, end], hot and cold unified."""
+        plan = plan or self.plan(table, start, end)
+        names = TABLE_KEYS[table] + ("count", "num_sources")
+        columns = ", ".join(f"TRY_CAST({c} AS {COLUMN_TYPES[c]}) AS {c}" for c in names)
+        parts = []
+        for files in (plan["hot"], plan["cold"]):
+            if files:
+                listing = ", ".join(f"'{_sql_path(p)}'" for p in files)
+                parts.append(f"SELECT {columns} FROM read_parquet([{listing}], union_by_name=true)")
+        if not parts:
+            empty = ", ".join(f"NULL::{COLUMN_TYPES[c]} AS {c}" for c in names)
+            return f"(SELECT {empty} WHERE false)"
+        return "(" + " UNION ALL ".join(parts) + ")"
+
+    def timeseries(self, country: str, measure: str = "deaths", start: Optional[date] = None,
+                   end: Optional[date] = None, admin1: Optional[str] = None,
+                   limit: int = 1000, cursor: Optional[date] = None) -> Dict:
+        """Daily totals for one country (or admin1), oldest first, one page at a time.
+
+        Pages are keyed by date: each covers at most `limit` days from the
+        cursor (one row per day), so it only opens that window's files.
+        next_cursor is the last day covered, or None once `end` is reached.
+        """
+        end = end or date.today()
+        start = start or end - timedelta(days=5 * 365)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        page_start = max(start, cursor + timedelta(days=1)) if cursor else start
+        page_end = min(end, page_start + timedelta(days=limit - 1))
+        table = "gdelt_admin1_metrics" if admin1 else "gdelt_metrics"
+        types = metric_types(measure)
+
+        where = ["date BETWEEN ? AND ?", "country = ?",
+                 f"metric_type IN ({', '.join('?' for _ in types)})"]
+        params: list = [page_start, page_end, country, *types]
+        if admin1:
+            where.append("admin1 = ?")
+            params.append(admin1)
+
+        rows = []
+        plan = {"hot": [], "cold": []}
+        if page_start <= end:
+            plan = self.plan(table, page_start, page_end)
+            # Own cursor per call: the API shares one instance across threads
+            with self.conn.cursor() as cur:
+                rows = cur.execute(
+                    f"""
+                    SELECT date, SUM(count) AS value, SUM(num_sources) AS num_sources
+                    FROM {self.relation_sql(table, page_start, page_end, plan)}
+                    WHERE {' AND '.join(where)}
+                    GROUP BY date
+                    ORDER BY date
+                    """,
+                    params,
+                ).fetchall()
+
+        return {
+            "country": country,
+            "admin1": admin1,
+            "measure": measure,
+            "metric_types": list(types),
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "sources": {"hot_files": len(plan["hot"]), "cold_files": len(plan["cold"])},
+            "results": [
+                {"date": d.isoformat(), "value": int(v or 0), "num_sources": int(n or 0)}
+                for d, v, n in rows
+            ],
+            "next_cursor": page_end.isoformat() if page_start <= end and page_end < end else None,
+        }
@@ -0,0 +1,181 @@
+"""
+Date-partitioned Parquet storage for gdelt_metrics / gdelt_admin1_metrics.
+
+Each table is one Parquet file per day under metrics_dir:
+
+    {metrics_dir}/gdelt_metrics/2024-01-01.parquet
+    {metrics_dir}/gdelt_admin1_metrics/2024-01-01.parquet
+
+Rows are keyed by TABLE_KEYS. upsert() rewrites only the touched days'
+files, replacing rows whose key is present in the new data and keeping the
+rest, so reruns never double counts. The DuckDB database keeps a view per
+table over the files (refresh_views), and scan_sql(since=...) lists only the
+partitions needed for a date range so summaries do not read the full history.
+
+Databases created before the Parquet layout still hold base tables; they are
+moved into partitions (latest updated_at per key) by migrate_legacy_tables().
+"""
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+TABLE_KEYS: Dict[str, Tuple[str, ...]] = {
+    "gdelt_metrics": ("date", "country", "metric_type"),
+    "gdelt_admin1_metrics": ("date", "country", "admin1", "metric_type"),
+}
+
+VALUE_COLUMNS = ("count", "num_sources", "source", "updated_at")
+
+COLUMN_TYPES = {
+    "date": "DATE",
+    "country": "VARCHAR",
+    "admin1": "VARCHAR",
+    "metric_type": "VARCHAR",
+    "count": "BIGINT",
+    "num_sources": "BIGINT",
+    "source": "VARCHAR",
+    "updated_at": "TIMESTAMP",
+}
+
+
+def table_columns(table: str) -> Tuple[str, ...]:
+    return TABLE_KEYS[table] + VALUE_COLUMNS
+
+
+def _sql_path(path: Path) -> str:
+    return str(path).replace("'", "''")
+
+
+class MetricsStore:
+    def __init__(self, conn, metrics_dir: str | Path):
+        self.conn = conn
+        self.root = Path(metrics_dir).resolve()
+        for table in TABLE_KEYS:
+            (self.root / table).mkdir(parents=True, exist_ok=True)
+
+    def partition_path(self, table: str, day: date) -> Path:
+        return self.root / table / f"{day.isoformat()}.parquet"
+
+    def partitions(self, table: str, since: Optional[date] = None,
+                   before: Optional[date] = None) -> List[Tuple[date, Path]]:
+        """(day, path) for each partition file, oldest first, optionally bounded."""
+        out = []
+        for path in (self.root / table).glob("*.parquet"):
+            try:
+                day = datetime.strptime(path.stem, "%Y-%m-%d").date()
+            except ValueError:
+                continue
+            if since and day < since:
+                continue
+            if before and day >= before:
+                continue
+            out.append((day, path))
+        return sorted(out)
+
+    def scan_sql(self, table: str, since: Optional[date] = None) -> str:
+        """FROM-clause source over the table's partitions (only those >= since)."""
+        files = [p for _, p in self.partitions(table, since=since)]
+        if not files:
+            cols = ", ".join(f"NULL::{COLUMN_TYPES[c]} AS {c}" for c in table_columns(table))
+            return f"(SELECT {cols} WHERE false)"
+        listing = ", ".join(f"'{_sql_path(p)}'" for p in files)
+        return f"read_parquet([{listing}])"
+
+    def refresh_views(self):
+        for table in TABLE_KEYS:
+            if self.partitions(table):
+                source = f"read_parquet('{_sql_path(self.root / table)}/*.parquet')"
+            else:
+                source = self.scan_sql(table)
+            self.conn.execute(f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM {source}")
+
+    def upsert(self, table: str, source: str, refresh_views: bool = True) -> int:
+        """Merge rows from `source` (a relation with the table's key and value
+        columns, except updated_at) into the table's day partitions.
+        Returns the number of days rewritten."""
+        keys = ", ".join(TABLE_KEYS[table])
+        columns = ", ".join(table_columns(table))
+        self.conn.execute("DROP TABLE IF EXISTS _metrics_stage")
+        self.conn.execute(f"""
+            CREATE TEMP TABLE _metrics_stage AS
+            SELECT {", ".join(TABLE_KEYS[table])}, count, num_sources, source,
+                   CURRENT_TIMESTAMP::TIMESTAMP AS updated_at
+            FROM {source}
+            ORDER BY date
+        """)
+        days = [r[0] for r in self.conn.execute(
+            "SELECT DISTINCT date FROM _metrics_stage WHERE date IS NOT NULL ORDER BY date"
+        ).fetchall()]
+
+        for day in days:
+            path = self.partition_path(table, day)
+            tmp_path = path.with_name(path.name + ".tmp")
+            new_rows = f"SELECT {columns} FROM _metrics_stage WHERE date = DATE '{day.isoformat()}'"
+            if path.exists():
+                merged = f"""
+                    SELECT {columns} FROM read_parquet('{_sql_path(path)}') existing
+                    ANTI JOIN ({new_rows}) incoming USING ({keys})
+                    UNION ALL {new_rows}
+                """
+            else:
+                merged = new_rows
+            self.conn.execute(
+                f"COPY (SELECT * FROM ({merged}) ORDER BY {keys}) "
+                f"TO '{_sql_path(tmp_path)}' (FORMAT PARQUET, COMPRESSION ZSTD)"
+            )
+            os.replace(tmp_path, path)
+
+        self.conn.execute("DROP TABLE _metrics_stage")
+        if refresh_views:
+            self.refresh_views()
+        return len(days)
+
+    def drop_before(self, table: str, cutoff: date, apply: bool) -> Dict:
+        """Retention: count (and with apply, delete) partitions older than cutoff."""
+        all_parts = self.partitions(table)
+        old = [p for d, p in all_parts if d < cutoff]
+
+        def row_count(paths):
+            if not paths:
+                return 0
+            listing = ", ".join(f"'{_sql_path(p)}'" for p in paths)
+            return self.conn.execute(f"SELECT COUNT(*) FROM read_parquet([{listing}])").fetchone()[0]
+
+        total = row_count([p for _, p in all_parts])
+        old_rows = row_count(old)
+        deleted = 0
+        bytes_deleted = 0
+        if apply and old:
+            for path in old:
+                bytes_deleted += path.stat().st_size
+                path.unlink(missing_ok=True)
+            deleted = old_rows
+            self.refresh_views()
+        return {
+            "total": int(total),
+            "older_than_cutoff": int(old_rows),
+            "deleted": int(deleted),
+            "remaining": int(total - deleted),
+            "partitions_deleted": len(old) if apply else 0,
+            "bytes_deleted": bytes_deleted,
+        }
+
+    def is_legacy_table(self, table: str) -> bool:
+        return bool(self.conn.execute(
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE database_name = current_database() "
+            "AND schema_name = 'main' AND table_name = ?", [table]
+        ).fetchone()[0])
+
+    def migrate_legacy_tables(self):
+        """Move rows from pre-Parquet base tables into partitions, then drop them."""
+        for table in TABLE_KEYS:
+            if not self.is_legacy_table(table):
+                continue
+            keys = ", ".join(TABLE_KEYS[table])
+            self.upsert(table, f"""(
+                SELECT * FROM {table}
+                QUALIFY row_number() OVER (PARTITION BY {keys} ORDER BY updated_at DESC) = 1
+            )""", refresh_views=False)
+            self.conn.execute(f"DROP TABLE {table}")
+        self.refresh_views()
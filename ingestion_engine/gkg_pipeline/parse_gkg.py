@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+GKG 2.0 record parser: raw 15-minute gkg.csv files -> normalized Parquet tables.
+
+Each record's delimited fields are split once here and exploded into one row
+per entry, keyed by record_id and keeping the entry's character offset:
+
+    gkg_documents      one row per record (source, URL, V1.5 tone fields)
+    gkg_counts         V2.1Counts   CountType#Number#ObjectType#LocType#FullName#Country#ADM1#ADM2#Lat#Long#FeatureID#Offset
+    gkg_themes         V2EnhancedThemes         THEME,Offset
+    gkg_locations      V2EnhancedLocations      Type#FullName#Country#ADM1#ADM2#Lat#Long#FeatureID#Offset
+    gkg_persons        V2EnhancedPersons        Name,Offset
+    gkg_organizations  V2EnhancedOrganizations  Name,Offset
+
+Output layout: {out_dir}/{table}/{file stem}.parquet (zstd), so each table can
+be read with read_parquet('{out_dir}/gkg_themes/*.parquet').
+
+USAGE:
+    python ingestion_engine/gkg_pipeline/parse_gkg.py                     # every unparsed file in raw_gkg_dir
+    python ingestion_engine/gkg_pipeline/parse_gkg.py data/raw/gkg/*.gkg.csv --workers 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import yaml
+
+# Column positions in a GKG 2.0 row (see retention_cleanup.GKG_COLS)
+COL_RECORD_ID = 0
+COL_DATE = 1
+COL_SOURCE_COLLECTION = 2
+COL_SOURCE_NAME = 3
+COL_DOCUMENT = 4
+COL_V2COUNTS = 6
+COL_V2THEMES = 8
+COL_V2LOCATIONS = 10
+COL_V2PERSONS = 12
+COL_V2ORGANIZATIONS = 14
+COL_V2TONE = 15
+
+SCHEMAS = {
+    "gkg_documents": pa.schema([
+        ("record_id", pa.string()),
+        ("date", pa.timestamp("s")),
+        ("source_collection", pa.int8()),
+        ("source_name", pa.string()),
+        ("document_url", pa.string()),
+        ("tone", pa.float64()),
+        ("positive", pa.float64()),
+        ("negative", pa.float64()),
+        ("polarity", pa.float64()),
+        ("activity_density", pa.float64()),
+        ("self_group_density", pa.float64()),
+        ("word_count", pa.int64()),
+    ]),
+    "gkg_counts": pa.schema([
+        ("record_id", pa.string()),
+        ("count_type", pa.string()),
+        ("number", pa.int64()),
+        ("object_type", pa.string()),
+        ("location_type", pa.int8()),
+        ("location_name", pa.string()),
+        ("country_code", pa.string()),
+        ("adm1_code", pa.string()),
+        ("adm2_code", pa.string()),
+        ("lat", pa.float64()),
+        ("lon", pa.float64()),
+        ("feature_id", pa.string()),
+        ("char_offset", pa.int64()),
+    ]),
+    "gkg_themes": pa.schema([
+        ("record_id", pa.string()),
+        ("theme", pa.string()),
+        ("char_offset", pa.int64()),
+    ]),
+    "gkg_locations": pa.schema([
+        ("record_id", pa.string()),
+        ("location_type", pa.int8()),
+        ("location_name", pa.string()),
+        ("country_code", pa.string()),
+        ("adm1_code", pa.string()),
+        ("adm2_code", pa.string()),
+        ("lat", pa.float64()),
+        ("lon", pa.float64()),
+        ("feature_id", pa.string()),
+        ("char_offset", pa.int64()),
+    ]),
+    "gkg_persons": pa.schema([
+        ("record_id", pa.string()),
+        ("name", pa.string()),
+        ("char_offset", pa.int64()),
+    ]),
+    "gkg_organizations": pa.schema([
+        ("record_id", pa.string()),
+        ("name", pa.string()),
+        ("char_offset", pa.int64()),
+    ]),
+}
+
+
+def _float(value: str) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _int(value: str) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def _columns(table: str) -> Dict[str, list]:
+    return {name: [] for name in SCHEMAS[table].names}
+
+
+def _explode_named(field: str, record_id: str, out: Dict[str, list], value_col: str):
+    """Name,Offset;Name,Offset;... -> rows."""
+    record_ids, values, offsets = out["record_id"], out[value_col], out["char_offset"]
+    for entry in field.split(";"):
+        if not entry:
+            continue
+        name, _, offset = entry.rpartition(",")
+        if not name:
+            name, offset = offset, ""
+        record_ids.append(record_id)
+        values.append(name)
+        offsets.append(_int(offset))
+
+
+def _explode_counts(field: str, record_id: str, out: Dict[str, list]):
+    for entry in field.split(";"):
+        parts = entry.split("#")
+        if len(parts) < 11:
+            continue
+        out["record_id"].append(record_id)
+        out["count_type"].append(parts[0])
+        out["number"].append(_int(parts[1]))
+        out["object_type"].append(parts[2])
+        out["location_type"].append(_int(parts[3]))
+        out["location_name"].append(parts[4])
+        out["country_code"].append(parts[5])
+        out["adm1_code"].append(parts[6])
+        out["adm2_code"].append(parts[7])
+        out["lat"].append(_float(parts[8]))
+        out["lon"].append(_float(parts[9]))
+        out["feature_id"].append(parts[10])
+        out["char_offset"].append(_int(parts[11]) if len(parts) > 11 else None)
+
+
+def _explode_locations(field: str, record_id: str, out: Dict[str, list]):
+    for entry in field.split(";"):
+        parts = entry.split("#")
+        if len(parts) < 8:
+            continue
+        out["record_id"].append(record_id)
+        out["location_type"].append(_int(parts[0]))
+        out["location_name"].append(parts[1])
+        out["country_code"].append(parts[2])
+        out["adm1_code"].append(parts[3])
+        out["adm2_code"].append(parts[4])
+        out["lat"].append(_float(parts[5]))
+        out["lon"].append(_float(parts[6]))
+        out["feature_id"].append(parts[7])
+        out["char_offset"].append(_int(parts[8]) if len(parts) > 8 else None)
+
+
+def _append_document(row: List[str], out: Dict[str, list]):
+    tone = row[COL_V2TONE].split(",") if len(row) > COL_V2TONE else []
+    tone += [""] * (7 - len(tone))
+    out["record_id"].append(row[COL_RECORD_ID])
+    out["date"].append(_int(row[COL_DATE]))
+    out["source_collection"].append(_int(row[COL_SOURCE_COLLECTION]))
+    out["source_name"].append(row[COL_SOURCE_NAME])
+    out["document_url"].append(row[COL_DOCUMENT])
+    out["tone"].append(_float(tone[0]))
+    out["positive"].append(_float(tone[1]))
+    out["negative"].append(_float(tone[2]))
+    out["polarity"].append(_float(tone[3]))
+    out["activity_density"].append(_float(tone[4]))
+    out["self_group_density"].append(_float(tone[5]))
+    out["word_count"].append(_int(tone[6]))
+
+
+def _to_table(name: str, columns: Dict[str, list]) -> pa.Table:
+    schema = SCHEMAS[name]
+    if name == "gkg_documents":
+        # YYYYMMDDHHMMSS integers -> timestamps in one vectorized pass
+        raw = pa.array(columns["date"], type=pa.int64()).cast(pa.string())
+        columns = dict(columns, date=pc.strptime(raw, format="%Y%m%d%H%M%S", unit="s", error_is_null=True))
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def parse_gkg_file(path: str | Path) -> Dict[str, pa.Table]:
+    """Parse one GKG 2.0 file into {table name: pyarrow.Table}."""
+    out = {name: _columns(name) for name in SCHEMAS}
+    documents, counts, themes = out["gkg_documents"], out["gkg_counts"], out["gkg_themes"]
+    locations, persons, orgs = out["gkg_locations"], out["gkg_persons"], out["gkg_organizations"]
+
+    with open(path, "r", encoding="utf-8", errors="replace", newline="\n") as f:
+        for line in f:
+            row = line.rstrip("\r\n").split("\t")
+            if len(row) <= COL_V2TONE or not row[COL_RECORD_ID]:
+                continue
+            record_id = row[COL_RECORD_ID]
+            _append_document(row, documents)
+            if row[COL_V2COUNTS]:
+                _explode_counts(row[COL_V2COUNTS], record_id, counts)
+            if row[COL_V2THEMES]:
+                _explode_named(row[COL_V2THEMES], record_id, themes, "theme")
+            if row[COL_V2LOCATIONS]:
+                _explode_locations(row[COL_V2LOCATIONS], record_id, locations)
+            if row[COL_V2PERSONS]:
+                _explode_named(row[COL_V2PERSONS], record_id, persons, "name")
+            if row[COL_V2ORGANIZATIONS]:
+                _explode_named(row[COL_V2ORGANIZATIONS], record_id, orgs, "name")
+
+    return {name: _to_table(name, cols) for name, cols in out.items()}
+
+
+def output_stem(path: str | Path) -> str:
+    name = Path(path).name
+    return name[:-4] if name.endswith(".csv") else name
+
+
+def write_tables(tables: Dict[str, pa.Table], out_dir: str | Path, stem: str) -> Dict[str, Path]:
+    written = {}
+    for name, table in tables.items():
+        table_dir = Path(out_dir) / name
+        table_dir.mkdir(parents=True, exist_ok=True)
+        out_path = table_dir / f"{stem}.parquet"
+        tmp_path = out_path.with_name(out_path.name + ".tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, out_path)
+        written[name] = out_path
+    return written
+
+
+def parse_and_write(path: str | Path, out_dir: str | Path) -> Dict:
+    """Worker entry point: parse one file and write its Parquet tables."""
+    start = time.time()
+    try:
+        tables = parse_gkg_file(path)
+        write_tables(tables, out_dir, output_stem(path))
+        return {
+            "file": str(path),
+            "records": tables["gkg_documents"].num_rows,
+            "rows": {name: t.num_rows for name, t in tables.items()},
+            "elapsed_seconds": round(time.time() - start, 3),
+            "error": None,
+        }
+    except Exception as exc:
+        return {"file": str(path), "records": 0, "rows": {}, "elapsed_seconds": round(time.time() - start, 3),
+                "error": str(exc)}
+
+
+def is_parsed(path: str | Path, out_dir: str | Path) -> bool:
+    stem = output_stem(path)
+    return all((Path(out_dir) / name / f"{stem}.parquet").exists() for name in SCHEMAS)
+
+
+def parse_files(paths: List[str | Path], out_dir: str | Path, max_workers: int | None = None,
+                skip_existing: bool = True) -> List[Dict]:
+    """Parse many GKG files in a process pool; one result dict per file."""
+    todo = [p for p in paths if not (skip_existing and is_parsed(p, out_dir))]
+    if not todo:
+        return []
+    if len(todo) == 1 or max_workers == 1:
+        return [parse_and_write(p, out_dir) for p in todo]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(parse_and_write, todo, [out_dir] * len(todo)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse GKG 2.0 files into columnar Parquet tables")
+    parser.add_argument("files", nargs="*", help="gkg.csv files (default: all in raw_gkg_dir)")
+    parser.add_argument("--config", type=str, default=None, help="Path to config.yaml")
+    parser.add_argument("--out", type=str, default=None, help="Output dir (default: paths.gkg_parsed_dir)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="Re-parse files that already have output")
+    args = parser.parse_args()
+
+    config_path = args.config or Path(__file__).with_name("config.yaml")
+    with open(config_path, "r") as f:
+        paths = yaml.safe_load(f)["paths"]
+    out_dir = args.out or paths.get("gkg_parsed_dir", "data/processed/gkg")
+    files = args.files or sorted(Path(paths["raw_gkg_dir"]).glob("*.gkg.csv"))
+
+    start = time.time()
+    results = parse_files(files, out_dir, max_workers=args.workers, skip_existing=not args.force)
+    elapsed = time.time() - start
+    records = sum(r["records"] for r in results)
+    for r in results:
+        status = f"ERROR {r['error']}" if r["error"] else f"{r['records']} records in {r['elapsed_seconds']}s"
+        print(f"{r['file']}: {status}")
+    print(f"Parsed {len(results)} files, {records} records in {elapsed:.1f}s -> {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-import pandas as pd
 import duckdb
 import yaml
 
+try:
+    from metrics_store import MetricsStore
+    from retention_cleanup import GKGCOUNTS_COLS
+except ModuleNotFoundError:
+    from ingestion_engine.gkg_pipeline.metrics_store import MetricsStore
+    from ingestion_engine.gkg_pipeline.retention_cleanup import GKGCOUNTS_COLS
+
 
 class DataProcessor:
     def __init__(self, config_path: str = None):
@@ -15,101 +22,98 @@ class DataProcessor:
         self.processed_dir.mkdir(parents=True, exist_ok=True)
 
         self.conn = duckdb.connect(self.db_path)
+        self.store = MetricsStore(self.conn, self.config['paths'].get('metrics_dir', 'data/gkg_metrics'))
         self.setup_tables()
 
     def setup_tables(self):
-        self.conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS gdelt_metrics (
-                date DATE,
-                country VARCHAR,
-                metric_type VARCHAR,
-                count BIGINT,
-                num_sources BIGINT,
-                source VARCHAR,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-        )
-
-        self.conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS gdelt_admin1_metrics (
-                date DATE,
-                country VARCHAR,
-                admin1 VARCHAR,
-                metric_type VARCHAR,
-                count BIGINT,
-                num_sources BIGINT,
-                source VARCHAR,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-        )
+        # gdelt_metrics / gdelt_admin1_metrics are views over day-partitioned
+        # Parquet (see metrics_store.py); older databases are migrated here.
+        self.store.migrate_legacy_tables()
 
     def process_gdelt_counts(self, csv_path: str | Path):
-        cols = ['date', 'num_sources', 'count_type', 'number', 'object_type',
-                'geo_type', 'country', 'adm1', 'lat', 'lon', 'geo_id', 'urls']
-
-        df = pd.read_csv(
-            csv_path,
-            sep='\t',
-            header=None,
-            names=cols,
-            usecols=list(range(12)),
-            low_memory=False
-        )
-
-        df = df[df['count_type'].isin(self.config['metrics'])]
-        if df.empty:
-            return None
+        """Load one gkgcounts file into gdelt_metrics / gdelt_admin1_metrics.
 
-        df['date'] = pd.to_datetime(df['date'], format='%Y%m%d', errors='coerce')
-        df = df.dropna(subset=['date'])
-
-        agg_country = df.groupby(['date', 'country', 'count_type']).agg({
-            'number': 'sum',
-            'num_sources': 'sum'
-        }).reset_index()
-        agg_country.columns = ['date', 'country', 'metric_type', 'count', 'num_sources']
-        agg_country['source'] = 'GDELT'
-
-        agg_admin1 = df.groupby(['date', 'country', 'adm1', 'count_type']).agg({
-            'number': 'sum',
-            'num_sources': 'sum'
-        }).reset_index()
-        agg_admin1.columns = ['date', 'country', 'admin1', 'metric_type', 'count', 'num_sources']
-        agg_admin1['source'] = 'GDELT'
-
-        # Insert into DuckDB
-        self.conn.register('agg_country', agg_country)
+        DuckDB reads the raw file and computes both aggregations in a single
+        GROUPING SETS pass. Rows are upserted by key into the day partitions,
+        so re-processing a day is idempotent.
+        """
+        metrics = ", ".join(f"'{m}'" for m in self.config['metrics'])
+        self.conn.execute("DROP TABLE IF EXISTS _counts_agg")
         self.conn.execute(
-            """
-            INSERT INTO gdelt_metrics (date, country, metric_type, count, num_sources, source)
-            SELECT date, country, metric_type, count, num_sources, source FROM agg_country
-            """
+            f"""
+            CREATE TEMP TABLE _counts_agg AS
+            SELECT
+                TRY_STRPTIME(date, '%Y%m%d')::DATE AS date,
+                country,
+                adm1 AS admin1,
+                count_type AS metric_type,
+                SUM(TRY_CAST(number AS BIGINT)) AS count,
+                SUM(TRY_CAST(num_sources AS BIGINT)) AS num_sources,
+                GROUPING(adm1) = 0 AS is_admin1
+            FROM (
+                SELECT * REPLACE (
+                    -- GEO_FULLNAME ends in the country name ("Aleppo, Halab, Syria")
+                    NULLIF(trim(regexp_extract(geo_fullname, '[^,]*$')), '') AS country,
+                    -- Country-level locations carry the country code as GEO_ADM1CODE
+                    NULLIF(adm1, country) AS adm1
+                )
+                FROM read_csv(
+                    ?, delim='\t', header=false, quote='', all_varchar=true, null_padding=true,
+                    names=?
+                )
+            )
+            WHERE count_type IN ({metrics})
+              AND TRY_STRPTIME(date, '%Y%m%d') IS NOT NULL
+              AND country IS NOT NULL
+            GROUP BY GROUPING SETS (
+                (TRY_STRPTIME(date, '%Y%m%d')::DATE, country, count_type),
+                (TRY_STRPTIME(date, '%Y%m%d')::DATE, country, adm1, count_type)
+            )
+            HAVING GROUPING(adm1) = 1 OR adm1 IS NOT NULL
+            """,
+            [str(csv_path), GKGCOUNTS_COLS]
         )
 
-        self.conn.register('agg_admin1', agg_admin1)
-        self.conn.execute(
+        country_rows, admin1_rows, first_date = self.conn.execute(
             """
-            INSERT INTO gdelt_admin1_metrics (date, country, admin1, metric_type, count, num_sources, source)
-            SELECT date, country, admin1, metric_type, count, num_sources, source FROM agg_admin1
+            SELECT COUNT(*) FILTER (WHERE NOT is_admin1), COUNT(*) FILTER (WHERE is_admin1), MIN(date)
+            FROM _counts_agg
             """
-        )
+        ).fetchone()
+        if not country_rows:
+            self.conn.execute("DROP TABLE _counts_agg")
+            return None
+
+        self.store.upsert('gdelt_metrics', "(SELECT *, 'GDELT' AS source FROM _counts_agg WHERE NOT is_admin1)")
+        self.store.upsert('gdelt_admin1_metrics', "(SELECT *, 'GDELT' AS source FROM _counts_agg WHERE is_admin1)")
 
         # Emit daily processed files for convenience
-        day_str = agg_country['date'].iloc[0].strftime('%Y%m%d')
-        agg_country.to_csv(self.processed_dir / f"gdelt_metrics_{day_str}.csv", index=False)
-        agg_admin1.to_csv(self.processed_dir / f"gdelt_admin1_metrics_{day_str}.csv", index=False)
+        day_str = first_date.strftime('%Y%m%d')
+        outputs = (
+            ('gdelt_metrics', 'date, country, metric_type', 'NOT is_admin1'),
+            ('gdelt_admin1_metrics', 'date, country, admin1, metric_type', 'is_admin1'),
+        )
+        for table, keys, where in outputs:
+            out_path = self.processed_dir / f"{table}_{day_str}.csv"
+            self.conn.execute(
+                f"""
+                COPY (
+                    SELECT {keys}, count, num_sources, 'GDELT' AS source
+                    FROM _counts_agg WHERE {where} ORDER BY {keys}
+                ) TO '{out_path}' (HEADER)
+                """
+            )
+        self.conn.execute("DROP TABLE _counts_agg")
 
         return {
-            'country_rows': len(agg_country),
-            'admin1_rows': len(agg_admin1),
+            'country_rows': int(country_rows),
+            'admin1_rows': int(admin1_rows),
             'date': day_str
         }
 
     def get_daily_summary(self, days: int = 30):
+        # Only the last `days` partitions are read
+        since = datetime.now(timezone.utc).date() - timedelta(days=days)
         query = f"""
             SELECT
                 date,
@@ -118,7 +122,7 @@ class DataProcessor:
                 SUM(CASE WHEN metric_type IN ('INJURED', 'CRISISLEXT02INJURED') THEN count ELSE 0 END) AS injured,
                 SUM(CASE WHEN metric_type IN ('DISPLACED', 'REFUGEES') THEN count ELSE 0 END) AS displaced,
                 SUM(CASE WHEN metric_type = 'PROTEST' THEN count ELSE 0 END) AS protests
-            FROM gdelt_metrics
+            FROM {self.store.scan_sql('gdelt_metrics', since=since)}
             WHERE date >= CURRENT_DATE - INTERVAL '{days} days'
             GROUP BY date, country
             ORDER BY date DESC, country
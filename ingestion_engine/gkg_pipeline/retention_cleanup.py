@@ -1,14 +1,27 @@
 import argparse
 import json
+import os
 import re
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone, date
 from pathlib import Path
 
 import duckdb
-import pandas as pd
 import yaml
 
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    from archive_store import ArchiveStore
+    from metrics_store import MetricsStore
+except ModuleNotFoundError:
+    from ingestion_engine.gkg_pipeline.archive_store import ArchiveStore
+    from ingestion_engine.gkg_pipeline.metrics_store import MetricsStore
+
 
 GKG_COLS = [
     "gkgrecordid",
@@ -47,23 +60,35 @@ GKGCOUNTS_COLS = [
     "number",
     "object_type",
     "geo_type",
+    "geo_fullname",
     "country",
     "adm1",
     "lat",
     "lon",
     "geo_id",
+    "cameo_event_ids",
+    "sources",
     "urls",
 ]
 
 PARQUET_ENGINE = "pyarrow"
 PARQUET_COMPRESSION = "zstd"
 
+# CSV is converted in blocks of this many bytes. Arrow's streaming reader keeps
+# a fixed readahead of a few blocks, so a worker's memory is bounded by the
+# block size (~75 MB at 2 MiB) regardless of file size.
+ARCHIVE_BLOCK_SIZE = 2 * 1024 * 1024
+DEFAULT_ARCHIVE_WORKERS = 4
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description="GDELT retention cleanup")
     parser.add_argument("--config", type=str, default=None, help="Path to config.yaml")
     parser.add_argument("--apply", action="store_true", help="Apply deletions (default is dry-run)")
     parser.add_argument("--vacuum", action="store_true", help="Vacuum DuckDB after cleanup")
+    parser.add_argument("--compact", action="store_true", help="Compact archive fragments into day/month files")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Archive worker processes (default: retention.archive_workers or 4)")
     return parser.parse_args()
 
 
@@ -101,91 +126,159 @@ def parse_date_from_name(name: str):
     return None
 
 
-def get_dir_size(path: Path):
+def scan_dir(path: Path):
+    """One recursive scandir pass: total bytes/files plus the top-level files
+    (with sizes) that retention candidates are picked from."""
+    stats = {"bytes": 0, "files": 0, "top_level": []}
     if not path.exists():
-        return 0
-    total = 0
-    for file in path.rglob('*'):
-        if file.is_file():
-            total += file.stat().st_size
-    return total
-
-
-def count_files(path: Path):
-    if not path.exists():
-        return 0
-    return sum(1 for p in path.rglob('*') if p.is_file())
-
-
-def collect_candidates(path: Path, cutoff: datetime):
+        return stats
+    stack = [(path, True)]
+    while stack:
+        current, top = stack.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, False))
+                elif entry.is_file(follow_symlinks=False):
+                    size = entry.stat(follow_symlinks=False).st_size
+                    stats["bytes"] += size
+                    stats["files"] += 1
+                    if top:
+                        stats["top_level"].append((Path(entry.path), size))
+    return stats
+
+
+def collect_candidates(scan: dict, cutoff: datetime):
     candidates = []
-    if not path.exists():
-        return candidates
-    for file in path.iterdir():
-        if not file.is_file():
-            continue
+    for file, size in scan["top_level"]:
         file_date = parse_date_from_name(file.name)
         if file_date and file_date < cutoff:
-            candidates.append((file, file_date))
-    return candidates
+            candidates.append((file, file_date, size))
+    return sorted(candidates, key=lambda c: c[1])
 
 
-def archive_path_for(file: Path, file_date: datetime, file_kind: str, archive_root: Path):
-    subdir = archive_root / file_kind / file_date.strftime('%Y/%m/%d')
-    subdir.mkdir(parents=True, exist_ok=True)
+def archive_name(file: Path):
     base = file.name
     if base.endswith('.csv'):
         base = base[:-4]
-    return subdir / f"{base}.parquet"
-
-
-def load_dataframe_for_archive(file: Path, file_kind: str):
-    if file_kind == 'raw_gkg':
-        return pd.read_csv(
-            file,
-            sep='\t',
-            header=None,
-            names=GKG_COLS,
-            dtype=str,
-            low_memory=False
-        )
-    if file_kind == 'raw_gkgcounts':
-        return pd.read_csv(
-            file,
-            sep='\t',
-            header=None,
-            names=GKGCOUNTS_COLS,
-            dtype=str,
-            low_memory=False
+    return f"{base}.parquet"
+
+
+def archive_path_for(file: Path, file_date: datetime, file_kind: str, archive_root: Path):
+    subdir = archive_root / file_kind / file_date.strftime('%Y/%m/%d')
+    subdir.mkdir(parents=True, exist_ok=True)
+    return subdir / archive_name(file)
+
+
+def csv_options(file_kind: str):
+    """pyarrow.csv (read, parse, convert) options for each archived file kind.
+
+    Raw GDELT files are tab-separated without quoting and are kept as strings,
+    as before; processed CSVs have a header and keep inferred types.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pv
+
+    if file_kind in ("raw_gkg", "raw_gkgcounts"):
+        names = GKG_COLS if file_kind == "raw_gkg" else GKGCOUNTS_COLS
+        return (
+            pv.ReadOptions(column_names=names, block_size=ARCHIVE_BLOCK_SIZE),
+            pv.ParseOptions(delimiter="\t", quote_char=False),
+            pv.ConvertOptions(column_types={c: pa.string() for c in names}, strings_can_be_null=True),
         )
-    # processed
-    return pd.read_csv(file, low_memory=False)
+    return (
+        pv.ReadOptions(block_size=ARCHIVE_BLOCK_SIZE),
+        pv.ParseOptions(),
+        pv.ConvertOptions(),
+    )
+
+
+def peak_rss_mb(who=None):
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux
+    usage = resource.getrusage(resource.RUSAGE_SELF if who is None else who)
+    return round(usage.ru_maxrss / 1024, 1)
 
 
 def archive_file(file: Path, file_date: datetime, file_kind: str, archive_root: Path):
+    """Stream one CSV into Parquet, batch by batch. Runs in a worker process.
+
+    Returns a result dict: archive path, rows written, malformed rows skipped,
+    sizes, elapsed time and the worker's peak RSS, or an error.
+    """
+    start = time.time()
+    result = {
+        "file": str(file),
+        "archive_path": None,
+        "rows": 0,
+        "malformed_rows": 0,
+        "archive_bytes": 0,
+        "existing": False,
+        "error": None,
+    }
     if not parquet_available():
-        return None, "pyarrow not installed"
+        result["error"] = "pyarrow not installed"
+        return result
+    import pyarrow.csv as pv
+    import pyarrow.parquet as pq
+
     out_path = archive_path_for(file, file_date, file_kind, archive_root)
+    result["archive_path"] = str(out_path)
     if out_path.exists():
-        return out_path, None
-
-    df = load_dataframe_for_archive(file, file_kind)
-    df.to_parquet(
-        out_path,
-        index=False,
-        engine=PARQUET_ENGINE,
-        compression=PARQUET_COMPRESSION
-    )
-    return out_path, None
+        result["existing"] = True
+        result["archive_bytes"] = out_path.stat().st_size
+        return result
 
+    def skip_row(row):
+        result["malformed_rows"] += 1
+        return "skip"
 
-def cleanup_files(
+    read_opts, parse_opts, convert_opts = csv_options(file_kind)
+    if file_kind != "processed":
+        parse_opts.invalid_row_handler = skip_row
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    try:
+        reader = pv.open_csv(file, read_options=read_opts, parse_options=parse_opts,
+                             convert_options=convert_opts)
+        with pq.ParquetWriter(tmp_path, reader.schema, compression=PARQUET_COMPRESSION) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                result["rows"] += batch.num_rows
+        if result["malformed_rows"]:
+            # Keep the raw file (and no archive) rather than lose rows
+            tmp_path.unlink(missing_ok=True)
+            result["archive_path"] = None
+            result["error"] = f"{result['malformed_rows']} malformed rows; not archived"
+        else:
+            os.replace(tmp_path, out_path)
+            result["archive_bytes"] = out_path.stat().st_size
+    except Exception as exc:
+        tmp_path.unlink(missing_ok=True)
+        result["archive_path"] = None
+        result["error"] = str(exc)
+    result["elapsed_seconds"] = round(time.time() - start, 3)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def submit_archives(
+    pool: ProcessPoolExecutor,
     file_kind: str,
     source_dir: Path,
     cutoff: datetime,
     archive_root: Path,
-    apply: bool
+    apply: bool,
+    scan: dict | None = None,
+    compacted: set | None = None
 ):
+    """Submit archiving of one kind's files older than cutoff to `pool`.
+
+    Returns the kind's results dict and {future: (results, file, size)} for
+    collect_archives(). `compacted` holds fragment names already merged by
+    archive compaction; those files count as archived without being
+    converted again (and with apply are deleted right away).
+    """
     results = {
         "candidates": 0,
         "archived": 0,
@@ -193,35 +286,98 @@ def cleanup_files(
         "skipped": 0,
         "raw_bytes": 0,
         "archive_bytes": 0,
+        "deleted_bytes": 0,
+        "written": 0,
+        "written_bytes": 0,
+        "rows": 0,
+        "worker_peak_rss_mb": None,
         "errors": [],
     }
 
-    candidates = collect_candidates(source_dir, cutoff)
+    candidates = collect_candidates(scan if scan is not None else scan_dir(source_dir), cutoff)
     results["candidates"] = len(candidates)
 
-    for file, file_date in candidates:
-        results["raw_bytes"] += file.stat().st_size
-        try:
-            archive_path, error = archive_file(file, file_date, file_kind, archive_root)
-            if error:
-                results["skipped"] += 1
-                results["errors"].append({"file": str(file), "error": error})
-                continue
+    if compacted:
+        done = [c for c in candidates if archive_name(c[0]) in compacted]
+        candidates = [c for c in candidates if archive_name(c[0]) not in compacted]
+        for file, _, size in done:
             results["archived"] += 1
-            if archive_path and archive_path.exists():
-                results["archive_bytes"] += archive_path.stat().st_size
-
+            results["raw_bytes"] += size
             if apply:
                 file.unlink(missing_ok=True)
                 results["deleted"] += 1
+                results["deleted_bytes"] += size
+
+    futures = {
+        pool.submit(archive_file, file, file_date, file_kind, archive_root): (results, file, size)
+        for file, file_date, size in candidates
+    }
+    return results, futures
+
+
+def collect_archives(futures: dict, apply: bool):
+    """Wait for submit_archives() futures (of any kinds) as they finish and
+    fold each into its kind's results; a raw file is only deleted once its
+    Parquet copy exists. Files with malformed rows are left in place."""
+    for future in as_completed(futures):
+        results, file, size = futures[future]
+        results["raw_bytes"] += size
+        try:
+            archived = future.result()
         except Exception as exc:
+            archived = {"error": str(exc)}
+        if archived.get("peak_rss_mb") is not None:
+            results["worker_peak_rss_mb"] = max(results["worker_peak_rss_mb"] or 0, archived["peak_rss_mb"])
+        if archived["error"]:
             results["skipped"] += 1
-            results["errors"].append({"file": str(file), "error": str(exc)})
+            results["errors"].append({"file": str(file), "error": archived["error"]})
+            continue
+
+        results["archived"] += 1
+        results["rows"] += archived["rows"]
+        results["archive_bytes"] += archived["archive_bytes"]
+        if not archived["existing"]:
+            results["written"] += 1
+            results["written_bytes"] += archived["archive_bytes"]
+
+        if apply:
+            file.unlink(missing_ok=True)
+            results["deleted"] += 1
+            results["deleted_bytes"] += size
+
+
+def cleanup_files(
+    file_kind: str,
+    source_dir: Path,
+    cutoff: datetime,
+    archive_root: Path,
+    apply: bool,
+    pool: ProcessPoolExecutor | None = None,
+    scan: dict | None = None,
+    compacted: set | None = None
+):
+    """Archive (and with apply, delete) one kind's files older than cutoff.
+
+    Files are archived concurrently on `pool`. run_retention() submits all
+    kinds to one pool and waits once instead (submit_archives /
+    collect_archives).
+    """
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=DEFAULT_ARCHIVE_WORKERS)
+    try:
+        results, futures = submit_archives(
+            pool, file_kind, source_dir, cutoff, archive_root, apply, scan=scan, compacted=compacted
+        )
+        collect_archives(futures, apply)
+    finally:
+        if own_pool:
+            pool.shutdown()
 
     return results
 
 
-def cleanup_duckdb(db_path: Path, cutoff_date: date, apply: bool):
+def cleanup_duckdb(db_path: Path, cutoff_date: date, apply: bool, metrics_dir: Path | None = None):
     result = {
         "exists": False,
         "cutoff_date": cutoff_date.isoformat(),
@@ -233,7 +389,12 @@ def cleanup_duckdb(db_path: Path, cutoff_date: date, apply: bool):
 
     result["exists"] = True
     con = duckdb.connect(str(db_path))
+    store = MetricsStore(con, metrics_dir or Path("data/gkg_metrics"))
     for table in ["gdelt_metrics", "gdelt_admin1_metrics"]:
+        if not store.is_legacy_table(table):
+            # Day-partitioned Parquet: retention drops whole partition files
+            result[table] = store.drop_before(table, cutoff_date, apply)
+            continue
         total = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
         old = con.execute(
             f"SELECT COUNT(*) FROM {table} WHERE date < ?",
@@ -262,7 +423,8 @@ def write_report(report_dir: Path, report: dict):
     return report_path
 
 
-def run_retention(config_path: str | None = None, apply: bool = False, vacuum: bool = False):
+def run_retention(config_path: str | None = None, apply: bool = False, vacuum: bool = False,
+                  workers: int | None = None, compact: bool = False):
     start_time = time.time()
     config = load_config(config_path)
 
@@ -282,64 +444,97 @@ def run_retention(config_path: str | None = None, apply: bool = False, vacuum: b
     processed_dir = Path(paths['processed_dir'])
     archive_root = Path(paths.get('archive_dir', 'data/archive/gkg'))
     db_path = Path(paths['db_path'])
-
-    size_before = {
-        "raw_gkg_dir": get_dir_size(raw_gkg_dir),
-        "raw_gkgcounts_dir": get_dir_size(raw_counts_dir),
-        "processed_dir": get_dir_size(processed_dir),
-        "archive_dir": get_dir_size(archive_root),
-        "duckdb": db_path.stat().st_size if db_path.exists() else 0,
-    }
-
-    file_counts_before = {
-        "raw_gkg_dir": count_files(raw_gkg_dir),
-        "raw_gkgcounts_dir": count_files(raw_counts_dir),
-        "processed_dir": count_files(processed_dir),
-        "archive_dir": count_files(archive_root),
+    metrics_dir = Path(paths.get('metrics_dir', 'data/gkg_metrics'))
+
+    dirs = {
+        "raw_gkg_dir": raw_gkg_dir,
+        "raw_gkgcounts_dir": raw_counts_dir,
+        "processed_dir": processed_dir,
+        "archive_dir": archive_root,
+        "metrics_dir": metrics_dir,
     }
-
-    raw_gkg_results = cleanup_files(
-        "raw_gkg",
-        raw_gkg_dir,
-        raw_gkg_cutoff,
-        archive_root,
-        apply
-    )
-    raw_counts_results = cleanup_files(
-        "raw_gkgcounts",
-        raw_counts_dir,
-        raw_counts_cutoff,
-        archive_root,
-        apply
+    # One scan per directory; "after" figures are derived from what this run
+    # deleted and wrote rather than by walking the trees again.
+    scans = {name: scan_dir(path) for name, path in dirs.items()}
+    size_before = {name: scan["bytes"] for name, scan in scans.items()}
+    size_before["duckdb"] = db_path.stat().st_size if db_path.exists() else 0
+    file_counts_before = {name: scans[name]["files"] for name in dirs if name != "metrics_dir"}
+
+    archive = ArchiveStore(archive_root)
+    workers = workers or int(retention.get('archive_workers', DEFAULT_ARCHIVE_WORKERS))
+    archive_start = time.time()
+    kinds = (
+        ("raw_gkg", "raw_gkg_dir", raw_gkg_cutoff),
+        ("raw_gkgcounts", "raw_gkgcounts_dir", raw_counts_cutoff),
+        ("processed", "processed_dir", processed_cutoff),
     )
-    processed_results = cleanup_files(
-        "processed",
-        processed_dir,
-        processed_cutoff,
-        archive_root,
-        apply
-    )
-
-    db_results = cleanup_duckdb(db_path, processed_cutoff.date(), apply)
+    file_results = {}
+    futures = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Every kind's files are queued on the one pool before waiting, so the
+        # workers stay busy across kinds instead of draining after each one
+        for file_kind, dir_name, cutoff in kinds:
+            file_results[dir_name], submitted = submit_archives(
+                pool,
+                file_kind,
+                dirs[dir_name],
+                cutoff,
+                archive_root,
+                apply,
+                scan=scans[dir_name],
+                compacted=archive.compacted_sources(file_kind)
+            )
+            futures.update(submitted)
+        collect_archives(futures, apply)
+    archive_seconds = time.time() - archive_start
+
+    compaction = None
+    if compact:
+        # Merging moves bytes around inside archive_dir; rescan it afterwards
+        compaction = archive.compact()
+
+    db_results = cleanup_duckdb(db_path, processed_cutoff.date(), apply, metrics_dir)
 
     if apply and vacuum and db_path.exists():
         con = duckdb.connect(str(db_path))
         con.execute("VACUUM")
         con.close()
 
-    size_after = {
-        "raw_gkg_dir": get_dir_size(raw_gkg_dir),
-        "raw_gkgcounts_dir": get_dir_size(raw_counts_dir),
-        "processed_dir": get_dir_size(processed_dir),
-        "archive_dir": get_dir_size(archive_root),
-        "duckdb": db_path.stat().st_size if db_path.exists() else 0,
-    }
-
-    file_counts_after = {
-        "raw_gkg_dir": count_files(raw_gkg_dir),
-        "raw_gkgcounts_dir": count_files(raw_counts_dir),
-        "processed_dir": count_files(processed_dir),
-        "archive_dir": count_files(archive_root),
+    raw_gkg_results = file_results["raw_gkg_dir"]
+    raw_counts_results = file_results["raw_gkgcounts_dir"]
+    processed_results = file_results["processed_dir"]
+    size_after = dict(size_before)
+    file_counts_after = dict(file_counts_before)
+    for name, res in file_results.items():
+        size_after[name] -= res["deleted_bytes"]
+        file_counts_after[name] -= res["deleted"]
+        size_after["archive_dir"] += res["written_bytes"]
+        file_counts_after["archive_dir"] += res["written"]
+    size_after["metrics_dir"] -= sum(
+        db_results[t].get("bytes_deleted", 0) for t in ("gdelt_metrics", "gdelt_admin1_metrics") if db_results[t]
+    )
+    size_after["duckdb"] = db_path.stat().st_size if db_path.exists() else 0
+    if compaction is not None:
+        archive_scan = scan_dir(archive_root)
+        size_after["archive_dir"] = archive_scan["bytes"]
+        file_counts_after["archive_dir"] = archive_scan["files"]
+
+    archived_bytes = sum(r["raw_bytes"] for r in file_results.values())
+    archived_rows = sum(r["rows"] for r in file_results.values())
+    worker_peaks = [r["worker_peak_rss_mb"] for r in file_results.values() if r["worker_peak_rss_mb"] is not None]
+    archive_stats = {
+        "workers": workers,
+        "block_size_bytes": ARCHIVE_BLOCK_SIZE,
+        "files": sum(r["candidates"] for r in file_results.values()),
+        "rows": archived_rows,
+        "input_bytes": archived_bytes,
+        "elapsed_seconds": round(archive_seconds, 2),
+        "mb_per_second": round(archived_bytes / 1e6 / archive_seconds, 2) if archive_seconds else None,
+        "rows_per_second": round(archived_rows / archive_seconds) if archive_seconds else None,
+        "peak_rss_mb": {
+            "main": peak_rss_mb(),
+            "worker_max": max(worker_peaks) if worker_peaks else None,
+        },
     }
 
     report = {
@@ -360,12 +555,14 @@ def run_retention(config_path: str | None = None, apply: bool = False, vacuum: b
         "sizes_after_bytes": size_after,
         "file_counts_before": file_counts_before,
         "file_counts_after": file_counts_after,
+        "archive": archive_stats,
         "files": {
             "raw_gkg": raw_gkg_results,
             "raw_gkgcounts": raw_counts_results,
             "processed": processed_results,
         },
         "duckdb": db_results,
+        "compaction": compaction,
         "elapsed_seconds": round(time.time() - start_time, 2),
     }
 
@@ -383,7 +580,8 @@ def run_retention(config_path: str | None = None, apply: bool = False, vacuum: b
 
 def main():
     args = parse_args()
-    run_retention(config_path=args.config, apply=args.apply, vacuum=args.vacuum)
+    run_retention(config_path=args.config, apply=args.apply, vacuum=args.vacuum, workers=args.workers,
+                  compact=args.compact)
 
 
 if __name__ == '__main__':
@@ -1,8 +1,9 @@
 import argparse
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from fetch_gdelt import GDELTFetcher
+from parse_gkg import parse_files
 from process_data import DataProcessor
 from retention_cleanup import run_retention
 
@@ -13,6 +14,10 @@ def parse_args():
     parser.add_argument("--retention", action="store_true", help="Run retention cleanup after update (dry-run)")
     parser.add_argument("--retention-apply", action="store_true", help="Apply retention deletions")
     parser.add_argument("--vacuum", action="store_true", help="Vacuum DuckDB after retention")
+    parser.add_argument("--compact", action="store_true", help="Compact the Parquet archive after retention")
+    parser.add_argument("--backfill-days", type=int, default=0, help="Also fetch and process the N days before yesterday")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel downloads for --backfill-days")
+    parser.add_argument("--skip-parse", action="store_true", help="Do not parse the 15-min GKG file into Parquet")
     return parser.parse_args()
 
 
@@ -28,6 +33,16 @@ def main():
         print(f"Saved 15-min GKG: {gkg_path}")
     except Exception as e:
         print(f"15-min GKG fetch failed: {e}")
+        gkg_path = None
+
+    # 1b. Parse it into columnar tables (documents, counts, themes, locations, ...)
+    if gkg_path and not args.skip_parse:
+        parsed_dir = processor.config['paths'].get('gkg_parsed_dir', 'data/processed/gkg')
+        for result in parse_files([gkg_path], parsed_dir):
+            if result['error']:
+                print(f"GKG parse failed: {result['error']}")
+            else:
+                print(f"Parsed GKG: {result['rows']}")
 
     # 2. Fetch daily counts (yesterday)
     try:
@@ -43,6 +58,18 @@ def main():
         if result:
             print(f"Processed counts: {result}")
 
+    # 3b. Optional backfill of earlier days (parallel download, sequential DB writes)
+    if args.backfill_days > 0:
+        end = datetime.now(timezone.utc) - timedelta(days=2)
+        start = end - timedelta(days=args.backfill_days - 1)
+        backfilled = fetcher.fetch_counts_range(start, end, max_workers=args.workers)
+        for date_str, path in sorted(backfilled.items()):
+            if path is None:
+                continue
+            result = processor.process_gdelt_counts(path)
+            if result:
+                print(f"Backfilled {date_str}: {result}")
+
     # 4. Produce summary output (last 30 days)
     summary = processor.get_daily_summary(days=30)
     out_path = Path(processor.processed_dir) / 'gdelt_daily_summary.csv'
@@ -53,7 +80,8 @@ def main():
         run_retention(
             config_path=args.config,
             apply=args.retention_apply,
-            vacuum=args.vacuum
+            vacuum=args.vacuum,
+            compact=args.compact
         )
 
     print("=== Update Complete ===")
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Physical layout maintenance for the GDELT event tables in DuckDB.
+
+Firehose batches are appended in parse order, so rows for any given
+EventDate / category end up spread over every row group and DuckDB's
+min/max zone maps cannot skip anything. reorganize_table() rewrites a table
+clustered by its layout key so date and category filters prune whole row
+groups, and rebuilds its ART indexes (PRIMARY KEY / FOREIGN KEY plus any
+CREATE INDEX) in bulk from the sorted rows.
+
+The only point lookups against these tables are the GlobalEventID upserts
+(served by the primary-key ART) and the casualty_counts foreign key; every
+query_* method is a date/category range scan, which zone maps serve better
+than an ART index would. No extra secondary indexes are created, since each
+one would add cost to every ingest upsert.
+
+A rewrite drops and recreates the table, so in-process readers that open
+their own connection (gdelt_event_aggregator) hold REWRITE_LOCK while they
+query, and reorganize_table() holds it for the whole rewrite.
+
+USAGE (CRON - daily, or let FirehoseService call reorganize_if_due):
+    python ingestion_engine/maintenance/table_layout.py --db data/gdelt_conflicts.duckdb
+    python ingestion_engine/maintenance/table_layout.py --db data/gdelt_diplomacy.duckdb --force
+"""
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import duckdb
+
+# table -> clustering key (leading column is the one every query filters on)
+TABLE_LAYOUTS: Dict[str, Tuple[str, ...]] = {
+    "conflict_events": ("EventDate", "event_category", "EventRootCode"),
+    "country_interactions": ("EventDate", "interaction_type", "QuadClass"),
+}
+
+STATE_TABLE = "table_layout_state"
+
+REWRITE_LOCK = threading.Lock()
+
+
+def _setup_state(con):
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            table_name VARCHAR PRIMARY KEY,
+            order_by VARCHAR,
+            row_count BIGINT,
+            elapsed_seconds DOUBLE,
+            reorganized_at TIMESTAMP
+        )
+    """)
+
+
+def _table_sql(con, table: str) -> Optional[str]:
+    row = con.execute("""
+        SELECT sql FROM duckdb_tables()
+        WHERE database_name = current_database() AND schema_name = 'main' AND table_name = ?
+    """, [table]).fetchone()
+    return row[0] if row else None
+
+
+def _dependent_tables(con, table: str) -> List[Tuple[str, str]]:
+    """Tables holding a FOREIGN KEY to `table`; they must be dropped and restored with it."""
+    rows = con.execute("""
+        SELECT table_name, sql FROM duckdb_tables()
+        WHERE database_name = current_database() AND schema_name = 'main' AND table_name != ?
+    """, [table]).fetchall()
+    needle = f"references {table.lower()}("
+    return [(name, sql) for name, sql in rows if needle in sql.lower().replace(" (", "(")]
+
+
+def _index_sql(con, tables: List[str]) -> List[str]:
+    placeholders = ", ".join("?" for _ in tables)
+    rows = con.execute(f"""
+        SELECT sql FROM duckdb_indexes()
+        WHERE database_name = current_database() AND table_name IN ({placeholders}) AND sql IS NOT NULL
+    """, tables).fetchall()
+    return [r[0] for r in rows]
+
+
+def reorganize_table(con, table: str, order_by: Tuple[str, ...] = None) -> Optional[Dict]:
+    """Rewrite `table` sorted by `order_by` in a single transaction.
+
+    The table is recreated from its own catalog DDL so constraints are kept;
+    FOREIGN KEY dependents are snapshotted, dropped and restored around it.
+    Returns a summary dict, or None if the table does not exist.
+    """
+    order_by = order_by or TABLE_LAYOUTS[table]
+    create_sql = _table_sql(con, table)
+    if create_sql is None:
+        return None
+    dependents = _dependent_tables(con, table)
+    index_sql = _index_sql(con, [table] + [name for name, _ in dependents])
+    order_clause = ", ".join(order_by)
+
+    _setup_state(con)
+    with REWRITE_LOCK:
+        start = time.time()
+        con.begin()
+        try:
+            con.execute(f"CREATE TEMP TABLE _layout_{table} AS SELECT * FROM {table}")
+            for name, _ in dependents:
+                con.execute(f"CREATE TEMP TABLE _layout_{name} AS SELECT * FROM {name}")
+                con.execute(f"DROP TABLE {name}")
+            con.execute(f"DROP TABLE {table}")
+
+            con.execute(create_sql)
+            con.execute(f"INSERT INTO {table} SELECT * FROM _layout_{table} ORDER BY {order_clause}")
+            for name, dep_sql in dependents:
+                con.execute(dep_sql)
+                con.execute(f"INSERT INTO {name} SELECT * FROM _layout_{name}")
+            for sql in index_sql:
+                con.execute(sql)
+
+            for name in [table] + [name for name, _ in dependents]:
+                con.execute(f"DROP TABLE _layout_{name}")
+
+            row_count = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            elapsed = time.time() - start
+            con.execute(f"""
+                INSERT INTO {STATE_TABLE} VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (table_name) DO UPDATE SET
+                    order_by = EXCLUDED.order_by,
+                    row_count = EXCLUDED.row_count,
+                    elapsed_seconds = EXCLUDED.elapsed_seconds,
+                    reorganized_at = EXCLUDED.reorganized_at
+            """, [table, order_clause, row_count, elapsed, datetime.now(timezone.utc).replace(tzinfo=None)])
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+
+    return {
+        "table": table,
+        "order_by": list(order_by),
+        "rows": int(row_count),
+        "dependents": [name for name, _ in dependents],
+        "elapsed_seconds": round(elapsed, 3),
+    }
+
+
+def reorganize_database(con, force: bool = True, interval_hours: float = 24) -> List[Dict]:
+    """Reorganize every known event table present in `con`.
+
+    With force=False a table is only rewritten when its last reorganisation
+    is older than `interval_hours`.
+    """
+    _setup_state(con)
+    results = []
+    for table, order_by in TABLE_LAYOUTS.items():
+        if _table_sql(con, table) is None:
+            continue
+        if not force:
+            row = con.execute(
+                f"SELECT reorganized_at FROM {STATE_TABLE} WHERE table_name = ?", [table]
+            ).fetchone()
+            cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=interval_hours)
+            if row and row[0] and row[0] > cutoff:
+                continue
+        summary = reorganize_table(con, table, order_by)
+        if summary:
+            results.append(summary)
+    return results
+
+
+def reorganize_if_due(con, interval_hours: float = 24) -> List[Dict]:
+    """Periodic entry point: rewrite tables whose layout is older than interval_hours (0 disables)."""
+    if interval_hours <= 0:
+        return []
+    return reorganize_database(con, force=False, interval_hours=interval_hours)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster GDELT event tables by (EventDate, category)")
+    parser.add_argument("--db", action="append", required=True, help="DuckDB file (repeatable)")
+    parser.add_argument("--force", action="store_true", help="Reorganize even if done within --interval-hours")
+    parser.add_argument("--interval-hours", type=float, default=24)
+    args = parser.parse_args()
+
+    for db_path in args.db:
+        con = duckdb.connect(db_path)
+        results = reorganize_database(con, force=args.force, interval_hours=args.interval_hours)
+        con.close()
+        if not results:
+            print(f"{db_path}: nothing to reorganize")
+        for r in results:
+            print(f"{db_path}: {r['table']} ({r['rows']} rows) sorted by {', '.join(r['order_by'])} in {r['elapsed_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
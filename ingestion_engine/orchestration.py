@@ -41,6 +41,7 @@ if PREFECT_AVAILABLE:
         from server.app.services.hotspot import HotspotAnalyzer
         
         firehose = FirehoseService()
+        firehose.hydrate()
         analyzer = HotspotAnalyzer(firehose)
         
         hotspots = analyzer.analyze(
@@ -81,6 +82,7 @@ if PREFECT_AVAILABLE:
             from server.app.services.firehose import FirehoseService
             
             firehose = FirehoseService()
+            firehose.hydrate()
             if not firehose.history_data.get("features"):
                 return {'conflict_events': 0, 'alerts': []}
             
@@ -100,6 +102,7 @@ if PREFECT_AVAILABLE:
             from server.app.services.firehose import FirehoseService
             
             firehose = FirehoseService()
+            firehose.hydrate()
             if not firehose.history_data.get("features"):
                 return {'bilateral': 0}
             
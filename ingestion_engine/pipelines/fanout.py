@@ -0,0 +1,123 @@
+"""
+Single-pass fan-out of a firehose cycle to registered stage consumers.
+
+FirehoseService decodes each export once into an EventBatch and hands it to
+EventPipeline.run(). Every registered stage receives the same batch and runs
+on a shared thread pool, so history, conflict alerting and diplomacy work
+proceed concurrently instead of walking the feature list one after another.
+
+Stages are either awaited (the cycle waits for them before persisting) or
+detached (wait=False): a detached stage such as the LLM-backed interactions
+update is submitted and left running, and is skipped on later cycles while
+its previous run is still in flight, so it never holds back the cycle.
+
+Each stage is timed and isolated: an exception is captured into that stage's
+result dict and does not affect the other stages.
+
+Usage:
+    pipeline = EventPipeline(max_workers=4)
+    pipeline.register("history", lambda batch: ...)
+    pipeline.register("interactions", run_llm_stage, wait=False)
+    results = pipeline.run(EventBatch(features, ingest_time))
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+
+class EventBatch:
+    """One cycle's decoded features and their ingest time.
+
+    fresh is the subset not handed to the stages in an earlier cycle (default:
+    all of them); stages that must see an event only once read it instead of
+    features.
+    """
+
+    def __init__(self, features: List[Dict], ingest_time: Optional[datetime] = None,
+                 fresh: Optional[List[Dict]] = None):
+        self.features = features
+        self.ingest_time = ingest_time or datetime.now(timezone.utc)
+        self.fresh = features if fresh is None else fresh
+
+    def __len__(self):
+        return len(self.features)
+
+
+class EventPipeline:
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline")
+        self._stages: List[Dict] = []
+        self._inflight: Dict[str, Any] = {}
+        self._last_results: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, consumer: Callable[[EventBatch], Any],
+                 wait: bool = True, timeout: Optional[float] = None):
+        """Add a stage. `consumer(batch)` runs once per cycle on the pool.
+
+        wait=False detaches the stage from the cycle; `timeout` bounds how long
+        run() waits for an awaited stage (it keeps running past the timeout).
+        """
+        if any(s["name"] == name for s in self._stages):
+            raise ValueError(f"Stage already registered: {name}")
+        self._stages.append({"name": name, "consumer": consumer, "wait": wait, "timeout": timeout})
+
+    def stages(self) -> List[str]:
+        return [s["name"] for s in self._stages]
+
+    def _run_stage(self, stage: Dict, batch: EventBatch) -> Dict:
+        start = time.perf_counter()
+        try:
+            output = stage["consumer"](batch)
+            result = {"stage": stage["name"], "ok": True, "result": output, "error": None}
+        except Exception as e:
+            print(f"[Pipeline] Stage {stage['name']} failed: {e}")
+            result = {"stage": stage["name"], "ok": False, "result": None, "error": str(e)}
+        result["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+        result["detached"] = not stage["wait"]
+        with self._lock:
+            self._last_results[stage["name"]] = result
+        return result
+
+    def run(self, batch: EventBatch) -> Dict[str, Dict]:
+        """Hand `batch` to every stage and wait for the awaited ones.
+
+        Returns {stage name: result dict}. Detached stages report
+        {"status": "submitted"} or {"status": "skipped"} (previous run still
+        in flight); their timed result is available from last_results().
+        """
+        awaited = {}
+        results = {}
+        for stage in self._stages:
+            name = stage["name"]
+            if not stage["wait"]:
+                with self._lock:
+                    previous = self._inflight.get(name)
+                    if previous is not None and not previous.done():
+                        results[name] = {"stage": name, "status": "skipped"}
+                        continue
+                    self._inflight[name] = self._executor.submit(self._run_stage, stage, batch)
+                results[name] = {"stage": name, "status": "submitted"}
+                continue
+            awaited[name] = (stage, self._executor.submit(self._run_stage, stage, batch))
+
+        for name, (stage, future) in awaited.items():
+            done, _ = wait([future], timeout=stage["timeout"])
+            if done:
+                results[name] = future.result()
+            else:
+                results[name] = {"stage": name, "ok": False, "result": None,
+                                 "error": f"timed out after {stage['timeout']}s",
+                                 "elapsed_seconds": stage["timeout"], "detached": False}
+        return results
+
+    def last_results(self) -> Dict[str, Dict]:
+        """Most recent completed result per stage, including detached ones."""
+        with self._lock:
+            return dict(self._last_results)
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait)
@@ -1,95 +1,101 @@
 """
 Article Fetcher: fetches full-text content from URLs.
 Bridge until the full news scraper exists. Used by LLM Analysis Engine.
-"""
-import hashlib
-import re
-from pathlib import Path
-from typing import Dict, List, Optional
-
-REPO_ROOT = Path(__file__).resolve().parents[2]
-CACHE_DIR = REPO_ROOT / "data" / "interactions" / "cache" / "articles"
-DEFAULT_TIMEOUT = 15
-MAX_TEXT_LENGTH = 150000
-
-
-def _url_hash(url: str) -> str:
-    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
 
+Downloads go through the shared fetch engine (fetch_engine.py): pooled
+connections, per-host limits, and for fetch_articles() a concurrent fan-out
+with an overall deadline. Extracted text and failed fetches are kept in the
+article store (article_store.py). Text comes from the tiered extractor in
+text_extractor.py (lxml first, readability / bs4 only when needed).
+"""
+from typing import Dict, List, Optional, Tuple
 
-def _fetch_with_requests(url: str, timeout: int = DEFAULT_TIMEOUT) -> Optional[str]:
-    try:
-        import requests
-        r = requests.get(url, timeout=timeout, headers={"User-Agent": "GDELT-Streamer/1.0"})
-        r.raise_for_status()
-        return r.text
-    except Exception:
-        return None
+from ingestion_engine.services.article_store import get_store
+from ingestion_engine.services.fetch_engine import get_engine
+from ingestion_engine.services.near_dup import url_title_keys
+from ingestion_engine.services.text_extractor import extract
 
+DEFAULT_TIMEOUT = 15
 
-def _extract_text_readability(html: str) -> Optional[str]:
-    try:
-        from readability import Document
-        doc = Document(html)
-        return doc.summary()
-    except Exception:
-        return None
+try:
+    from ingestion_engine.config.manifest_config import ARTICLE_FETCH_DEADLINE_SEC as DEFAULT_DEADLINE
+except ImportError:
+    DEFAULT_DEADLINE = 20.0
 
 
-def _extract_text_bs4(html: str) -> Optional[str]:
-    try:
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html, "html.parser")
-        for tag in ("script", "style", "nav", "footer", "header"):
-            for e in soup.find_all(tag):
-                e.decompose()
-        text = soup.get_text(separator="\n", strip=True)
-        text = re.sub(r"\n{3,}", "\n\n", text)
-        return text[:MAX_TEXT_LENGTH] if text else None
-    except Exception:
-        return None
+def _extract_text(html: str) -> Optional[str]:
+    return extract(html).text
 
 
-def _extract_text(html: str) -> Optional[str]:
-    text = _extract_text_readability(html)
-    if text and len(text.strip()) > 100:
-        return text[:MAX_TEXT_LENGTH]
-    text = _extract_text_bs4(html)
-    return text
+def extract_and_store(url: str, html: str, status: int = 200) -> Optional[str]:
+    """Extract text from a downloaded page and record it (or the empty
+    extraction, as a short-lived negative entry) in the article store."""
+    article = extract(html, url)
+    if article.text:
+        get_store().put(url, article.text, status=status, extractor=article.extractor, meta=article.meta())
+    else:
+        get_store().put_failure(url, status, "no text extracted")
+    return article.text
 
 
 def fetch_article(url: str, use_cache: bool = True, timeout: int = DEFAULT_TIMEOUT) -> Optional[str]:
+    """Article text, or None. With use_cache, a recent failure (e.g. 404) is
+    served from the store as None instead of being fetched again."""
     if not url or not url.startswith("http"):
         return None
-    key = _url_hash(url)
-    cache_file = CACHE_DIR / f"{key}.txt"
-    if use_cache and cache_file.exists():
-        try:
-            return cache_file.read_text(encoding="utf-8", errors="replace")
-        except Exception:
-            pass
-    html = _fetch_with_requests(url, timeout=timeout)
-    if not html:
+    if use_cache:
+        entry = get_store().get(url)
+        if entry is not None:
+            return entry.text
+    result = get_engine().get(url, timeout=timeout)
+    if not result.ok:
+        get_store().put_failure(url, result.status, result.error)
         return None
-    text = _extract_text(html)
-    if text:
-        CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        try:
-            cache_file.write_text(text, encoding="utf-8")
-        except Exception:
-            pass
-    return text
+    return extract_and_store(url, result.text, result.status)
 
 
-def fetch_articles(urls: List[str], use_cache: bool = True, timeout: int = DEFAULT_TIMEOUT) -> Dict[str, str]:
-    seen = set()
-    result = {}
-    for url in urls:
-        url = (url or "").strip()
-        if not url or url in seen:
+def _split_known_stories(missing: List[str], store, cached: List[str]) -> Tuple[List[str], Dict[str, str]]:
+    """Split missing URLs by slug headline into (to fetch, {url: text of an
+    already cached copy}). URLs whose story is a cached URL of this batch, or
+    an earlier URL still to fetch, are dropped."""
+    taken = {key for url in cached for key in url_title_keys(url)}
+    keep, reused = [], {}
+    for url in missing:
+        keys = url_title_keys(url)
+        if taken.intersection(keys):
             continue
-        seen.add(url)
-        text = fetch_article(url, use_cache=use_cache, timeout=timeout)
+        taken.update(keys)
+        copy = store.find_title(url)
+        if copy is not None:
+            reused[url] = copy.text
+        else:
+            keep.append(url)
+    return keep, reused
+
+
+def fetch_articles(urls: List[str], use_cache: bool = True, timeout: int = DEFAULT_TIMEOUT,
+                   deadline: Optional[float] = DEFAULT_DEADLINE, skip_duplicates: bool = True) -> Dict[str, str]:
+    """Fetch all URLs concurrently (store hits and known failures first, no network).
+
+    Returns {url: text} in input order for the articles that were fetched
+    within `deadline` seconds; slower ones are left out. With skip_duplicates,
+    syndicated copies are recognised by their URL slug headline before any
+    download: a copy of a story cached under another URL gets that text, and
+    a copy of a story already in this batch is left out.
+    """
+    ordered = list(dict.fromkeys(u.strip() for u in urls if u and u.strip()))
+    store = get_store()
+    known = {u: store.get(u) for u in ordered} if use_cache else {}
+    missing = [u for u in ordered if u.startswith("http") and known.get(u) is None]
+    reused: Dict[str, str] = {}
+    if skip_duplicates:
+        missing, reused = _split_known_stories(missing, store, [u for u, e in known.items() if e is not None and e.ok])
+    fetched = get_engine().map(lambda u: fetch_article(u, use_cache=False, timeout=timeout), missing, deadline)
+    fetched.update(reused)
+    result = {}
+    for url in ordered:
+        entry = known.get(url)
+        text = entry.text if entry is not None else fetched.get(url)
         if text:
             result[url] = text
     return result
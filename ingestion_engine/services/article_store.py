@@ -0,0 +1,341 @@
+"""
+Content-addressed, compressed article cache with a SQLite index.
+
+Layout under root (default data/interactions/cache/article_store):
+    index.sqlite                one row per URL, one row per blob
+    blobs/ab/<sha256>.zst       extracted text, zstd (zlib .zz if zstandard
+                                is not installed); shared by every URL with
+                                the same text
+
+Each URL row records the HTTP status, fetch time, text length, the extractor
+used and optional metadata (title, published, authors). Failed fetches are
+stored as negative entries with their own short expiry, so a 404 is not
+re-fetched on every analysis request. Positive entries expire after
+ttl_seconds; past max_bytes, least recently read URLs are evicted and blobs
+no longer referenced are deleted.
+
+Entries missing from the index fall back to the legacy one-file-per-URL
+cache ({sha256(url)[:16]}.txt), which is imported on first read.
+
+Known stories (near_dup.py): every URL is indexed under its title / URL-slug
+keys, so find_title() can tell that a story is already cached before it is
+fetched.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+from ingestion_engine.services import near_dup
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_ROOT = REPO_ROOT / "data" / "interactions" / "cache" / "article_store"
+LEGACY_DIR = REPO_ROOT / "data" / "interactions" / "cache" / "articles"
+
+# Client errors that will not fix themselves soon
+PERMANENT_FAILURES = {400, 401, 403, 404, 410, 451}
+ACCESS_RESOLUTION = 60  # seconds; reads refresh accessed_at at most this often
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    digest TEXT,
+    status INTEGER,
+    length INTEGER,
+    extractor TEXT,
+    meta TEXT,
+    error TEXT,
+    fetched_at REAL,
+    accessed_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS articles_accessed ON articles (accessed_at);
+CREATE INDEX IF NOT EXISTS articles_digest ON articles (digest);
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    codec TEXT,
+    stored_bytes INTEGER,
+    created_at REAL
+);
+CREATE TABLE IF NOT EXISTS titles (
+    key TEXT,
+    url TEXT,
+    PRIMARY KEY (key, url)
+);
+"""
+
+
+@dataclass
+class ArticleEntry:
+    url: str
+    status: Optional[int]
+    text: Optional[str] = None
+    extractor: Optional[str] = None
+    meta: Dict = field(default_factory=dict)
+    error: Optional[str] = None
+    fetched_at: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.text is not None
+
+
+def _legacy_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+class ArticleStore:
+    def __init__(self, root: str | Path = DEFAULT_ROOT, max_bytes: int = 512 * 1024 * 1024,
+                 ttl_seconds: float = 30 * 86400, negative_ttl_seconds: float = 86400,
+                 retry_after_seconds: float = 900, legacy_dir: Optional[str | Path] = LEGACY_DIR):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.legacy_dir = Path(legacy_dir) if legacy_dir else None
+        self.codec = "zstd" if zstandard is not None else "zlib"
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.root / "index.sqlite", check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(stored_bytes), 0) FROM blobs").fetchone()[0]
+
+    # Blobs ---------------------------------------------------------------
+
+    def _blob_path(self, digest: str, codec: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}.{'zst' if codec == 'zstd' else 'zz'}"
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        return zlib.compress(data, 6)
+
+    @staticmethod
+    def _decompress(data: bytes, codec: str) -> bytes:
+        if codec == "zstd":
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def _write_blob(self, text: str) -> str:
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        if self.conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone():
+            return digest
+        payload = self._compress(data)
+        path = self._blob_path(digest, self.codec)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+        self.conn.execute("INSERT INTO blobs VALUES (?, ?, ?, ?)", (digest, self.codec, len(payload), time.time()))
+        self.total_bytes += len(payload)
+        return digest
+
+    def _read_blob(self, digest: str) -> Optional[str]:
+        row = self.conn.execute("SELECT codec FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if not row:
+            return None
+        try:
+            return self._decompress(self._blob_path(digest, row[0]).read_bytes(), row[0]).decode("utf-8")
+        except (OSError, zlib.error, ValueError) as e:
+            print(f"[ArticleStore] Unreadable blob {digest}: {e}")
+            return None
+
+    # Entries ---------------------------------------------------------------
+
+    def get(self, url: str) -> Optional[ArticleEntry]:
+        """Live entry for url (positive or negative), or None if it should be fetched."""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT digest, status, extractor, meta, error, fetched_at, accessed_at, expires_at "
+                "FROM articles WHERE url = ?", (url,),
+            ).fetchone()
+            if row is None:
+                return self._import_legacy(url)
+            digest, status, extractor, meta, error, fetched_at, accessed_at, expires_at = row
+            if expires_at is not None and expires_at < now:
+                return None
+            text = self._read_blob(digest) if digest else None
+            if digest and text is None:
+                return None
+            if accessed_at is None or accessed_at < now - ACCESS_RESOLUTION:
+                self.conn.execute("UPDATE articles SET accessed_at = ? WHERE url = ?", (now, url))
+                self.conn.commit()
+        return ArticleEntry(url, status, text, extractor, json.loads(meta) if meta else {}, error, fetched_at)
+
+    def put(self, url: str, text: str, status: int = 200, extractor: Optional[str] = None,
+            meta: Optional[Dict] = None, fetched_at: Optional[float] = None) -> ArticleEntry:
+        fetched_at = fetched_at or time.time()
+        with self._lock:
+            digest = self._write_blob(text)
+            self._index_titles(url, (meta or {}).get("title"))
+            self._upsert(url, digest, status, len(text), extractor, meta, None, fetched_at,
+                         fetched_at + self.ttl_seconds)
+            over_budget = self.total_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+        return ArticleEntry(url, status, text, extractor, meta or {}, None, fetched_at)
+
+    def put_failure(self, url: str, status: Optional[int] = None, error: Optional[str] = None) -> ArticleEntry:
+        """Negative entry: permanent client errors are kept negative_ttl_seconds,
+        anything else (timeouts, 5xx, empty extraction) retry_after_seconds."""
+        now = time.time()
+        ttl = self.negative_ttl_seconds if status in PERMANENT_FAILURES else self.retry_after_seconds
+        with self._lock:
+            self._upsert(url, None, status, 0, None, None, error, now, now + ttl)
+        return ArticleEntry(url, status, None, None, {}, error, now)
+
+    def _upsert(self, url, digest, status, length, extractor, meta, error, fetched_at, expires_at):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, digest, status, length, extractor, json.dumps(meta) if meta else None, error,
+             fetched_at, fetched_at, expires_at),
+        )
+        self.conn.commit()
+
+    def _index_titles(self, url: str, title: Optional[str]):
+        self.conn.executemany("INSERT OR IGNORE INTO titles VALUES (?, ?)",
+                              [(key, url) for key in near_dup.url_title_keys(url, title)])
+
+    # Known stories ------------------------------------------------------
+
+    def find_title(self, url: str, title: Optional[str] = None) -> Optional[ArticleEntry]:
+        """A live cached article (other than url) filed under the same headline
+        or URL-slug key: the story is already known, no need to fetch url."""
+        keys = near_dup.url_title_keys(url, title)
+        if not keys:
+            return None
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT t.url FROM titles t JOIN articles a ON a.url = t.url "
+                f"WHERE t.key IN ({','.join('?' * len(keys))}) AND t.url != ? AND a.digest IS NOT NULL "
+                f"ORDER BY a.fetched_at DESC",
+                keys + [url],
+            ).fetchall()
+        for (match,) in rows:
+            entry = self.get(match)
+            if entry is not None and entry.ok:
+                return entry
+        return None
+
+    def _import_legacy(self, url: str) -> Optional[ArticleEntry]:
+        if self.legacy_dir is None:
+            return None
+        path = self.legacy_dir / f"{_legacy_key(url)}.txt"
+        try:
+            text = path.read_text(encoding="utf-8", errors="replace")
+            fetched_at = path.stat().st_mtime
+        except OSError:
+            return None
+        digest = self._write_blob(text)
+        self._index_titles(url, None)
+        # Legacy files carry no fetch time worth expiring on; count from import
+        now = time.time()
+        self._upsert(url, digest, 200, len(text), "legacy", None, None, fetched_at, now + self.ttl_seconds)
+        return ArticleEntry(url, 200, text, "legacy", {}, None, fetched_at)
+
+    # Eviction -------------------------------------------------------------
+
+    def evict(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Drop expired entries, then least recently read ones until the blobs
+        fit in max_bytes, then unreferenced blobs."""
+        now = now or time.time()
+        with self._lock:
+            expired = self.conn.execute("DELETE FROM articles WHERE expires_at < ?", (now,)).rowcount
+            lru = 0
+            if self._blob_bytes(referenced_only=True) > self.max_bytes:
+                target = self.max_bytes * 0.9
+                rows = self.conn.execute(
+                    "SELECT a.url, a.digest, b.stored_bytes FROM articles a JOIN blobs b USING (digest) "
+                    "ORDER BY a.accessed_at"
+                ).fetchall()
+                total = self._blob_bytes(referenced_only=True)
+                for url, digest, size in rows:
+                    if total <= target:
+                        break
+                    self.conn.execute("DELETE FROM articles WHERE url = ?", (url,))
+                    lru += 1
+                    if not self.conn.execute("SELECT 1 FROM articles WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+                        total -= size
+            blobs = self._delete_orphan_blobs()
+            self.conn.commit()
+            self.total_bytes = self._blob_bytes()
+        return {"expired": expired, "evicted": lru, "blobs_deleted": blobs, "bytes": self.total_bytes}
+
+    def _blob_bytes(self, referenced_only: bool = False) -> int:
+        sql = "SELECT COALESCE(SUM(stored_bytes), 0) FROM blobs"
+        if referenced_only:
+            sql += " WHERE digest IN (SELECT digest FROM articles WHERE digest IS NOT NULL)"
+        return self.conn.execute(sql).fetchone()[0]
+
+    def _delete_orphan_blobs(self) -> int:
+        orphans = self.conn.execute(
+            "SELECT digest, codec FROM blobs WHERE digest NOT IN "
+            "(SELECT digest FROM articles WHERE digest IS NOT NULL)"
+        ).fetchall()
+        for digest, codec in orphans:
+            try:
+                self._blob_path(digest, codec).unlink()
+            except FileNotFoundError:
+                pass
+            self.conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+        self.conn.execute("DELETE FROM titles WHERE url NOT IN (SELECT url FROM articles)")
+        return len(orphans)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries, failures = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(digest IS NULL), 0) FROM articles").fetchone()
+            blobs, stored, text_chars = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(stored_bytes), 0), "
+                "(SELECT COALESCE(SUM(length), 0) FROM articles) FROM blobs").fetchone()
+        return {"entries": entries, "negative": failures, "blobs": blobs, "stored_bytes": stored,
+                "text_chars": text_chars, "codec": self.codec, "max_bytes": self.max_bytes}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ArticleStore:
+    """Process-wide store configured from manifest_config (ARTICLE_STORE_*)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            try:
+                from ingestion_engine.config.manifest_config import (
+                    ARTICLE_STORE_DIR,
+                    ARTICLE_STORE_MAX_MB,
+                    ARTICLE_STORE_TTL_DAYS,
+                    ARTICLE_STORE_NEGATIVE_TTL_SEC,
+                    ARTICLE_STORE_RETRY_AFTER_SEC,
+                )
+                _store = ArticleStore(
+                    ARTICLE_STORE_DIR,
+                    max_bytes=int(ARTICLE_STORE_MAX_MB * 1024 * 1024),
+                    ttl_seconds=ARTICLE_STORE_TTL_DAYS * 86400,
+                    negative_ttl_seconds=ARTICLE_STORE_NEGATIVE_TTL_SEC,
+                    retry_after_seconds=ARTICLE_STORE_RETRY_AFTER_SEC,
+                )
+            except ImportError:
+                _store = ArticleStore()
+        return _store
@@ -0,0 +1,231 @@
+"""
+Token-budgeted prompt context: the most relevant article passages for an
+event, counted in tokens rather than characters.
+
+- Counting: tiktoken with LLM_TOKENIZER (default o200k_base, gpt-4o's
+  encoding) when it is installed and its encoding file can be loaded;
+  otherwise a word-based approximation (about one token per 6 characters of
+  a word, one per punctuation mark).
+- Passages: article text split on paragraphs; paragraphs longer than
+  PASSAGE_TOKENS are split at sentence boundaries.
+- Ranking: BM25 over the passages of the event's articles, with query terms
+  from participants (country codes expanded to names and capitals via
+  data/country_info.json), location, description and type, plus a small
+  bonus for lead paragraphs. With no matching terms this degrades to "first
+  paragraphs first".
+- Filling: passages are taken greedily by score while they fit the budget
+  (source headers included), then printed per source in article order.
+
+Near-identical articles (syndicated copies) are collapsed first, so the
+budget goes to distinct reporting.
+
+    context = build_article_context(articles, event, budget_tokens=1600)
+"""
+import json
+import math
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+try:
+    from ingestion_engine.config.manifest_config import LLM_TOKENIZER
+except ImportError:
+    LLM_TOKENIZER = "o200k_base"
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+COUNTRY_INFO = REPO_ROOT / "data" / "country_info.json"
+
+PASSAGE_TOKENS = 160
+BM25_K1 = 1.2
+BM25_B = 0.75
+LEAD_BONUS = 0.5  # added to a passage's score, divided by (1 + its position in the article)
+SEPARATOR = "\n\n---\n\n"
+NO_ARTICLES = "No article content available."
+
+_WORD = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_TERM = re.compile(r"[^\W\d_]{3,}", re.UNICODE)
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_STOPWORDS = frozenset(
+    "and are but for from had has have her his its not that the their they this was were will with "
+    "about after also been into more over said than them then there these what when which while who".split()
+)
+
+_encoding = None
+_encoding_failed = False
+_encoding_lock = threading.Lock()
+_countries: Optional[Dict[str, List[str]]] = None
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is not None or _encoding_failed or tiktoken is None:
+        return _encoding
+    with _encoding_lock:
+        if _encoding is None and not _encoding_failed:
+            try:
+                _encoding = tiktoken.get_encoding(LLM_TOKENIZER)
+            except Exception as e:  # unknown name, or the encoding file cannot be downloaded
+                _encoding_failed = True
+                print(f"[ContextBuilder] tiktoken {LLM_TOKENIZER} unavailable ({type(e).__name__}), approximating")
+    return _encoding
+
+
+def _word_tokens(word: str) -> int:
+    if len(word) == 1:
+        return 1
+    return -(-len(word) // (6 if word.isascii() else 2))
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in text for the configured tokenizer (approximate without tiktoken)."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum(_word_tokens(m.group()) for m in _WORD.finditer(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of text within max_tokens."""
+    if not text or max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    used = 0
+    for m in _WORD.finditer(text):
+        used += _word_tokens(m.group())
+        if used > max_tokens:
+            return text[:m.start()].rstrip()
+    return text
+
+
+def split_passages(text: str, max_tokens: int = PASSAGE_TOKENS) -> List[str]:
+    """Paragraphs of text; long ones split into runs of whole sentences."""
+    passages = []
+    for paragraph in re.split(r"\n\s*\n|\n", text or ""):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) <= max_tokens:
+            passages.append(paragraph)
+            continue
+        current, used = [], 0
+        for sentence in _SENTENCE.split(paragraph):
+            cost = count_tokens(sentence)
+            if current and used + cost > max_tokens:
+                passages.append(" ".join(current))
+                current, used = [], 0
+            if cost > max_tokens:
+                sentence = truncate_tokens(sentence, max_tokens)
+                cost = max_tokens
+            current.append(sentence)
+            used += cost
+        if current:
+            passages.append(" ".join(current))
+    return passages
+
+
+def _terms(text: str) -> List[str]:
+    return [t for t in _TERM.findall((text or "").lower()) if t not in _STOPWORDS]
+
+
+def _country_names() -> Dict[str, List[str]]:
+    """ISO3 -> [name, capital] from data/country_info.json (empty if missing)."""
+    global _countries
+    if _countries is None:
+        try:
+            info = json.loads(COUNTRY_INFO.read_text(encoding="utf-8"))
+            _countries = {code: [v for v in (c.get("name"), c.get("capital")) if v]
+                          for code, c in info.items() if isinstance(c, dict)}
+        except (OSError, ValueError):
+            _countries = {}
+    return _countries
+
+
+def query_terms(event: Dict) -> Counter:
+    """Weighted query terms for an event: participants and location count
+    double, description and type once."""
+    query: Counter = Counter()
+    participants = event.get("participants") or []
+    if not isinstance(participants, list):
+        participants = [participants]
+    location = event.get("location") if isinstance(event.get("location"), dict) else {}
+    names = [str(p) for p in participants if p]
+    names += [str(location[k]) for k in ("iso", "name") if location.get(k)]
+    countries = _country_names()
+    for name in names:
+        for text in [name] + countries.get(name.upper(), []):
+            for term in _terms(text):
+                query[term] += 2
+    for term in _terms(f"{event.get('description') or ''} {event.get('type') or ''}"):
+        query[term] += 1
+    return query
+
+
+def rank_passages(passages: List[Tuple[int, int, str]], query: Counter) -> List[float]:
+    """BM25 score (plus lead bonus) for each (source, position, text) passage."""
+    docs = [Counter(_terms(text)) for _, _, text in passages]
+    if not docs:
+        return []
+    avg_len = sum(sum(d.values()) for d in docs) / len(docs) or 1.0
+    df = Counter(term for d in docs for term in d)
+    n = len(docs)
+    scores = []
+    for (_, position, _), doc in zip(passages, docs):
+        length = sum(doc.values())
+        score = 0.0
+        for term, weight in query.items():
+            tf = doc.get(term)
+            if not tf:
+                continue
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            score += weight * idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len))
+        scores.append(score + LEAD_BONUS / (1 + position))
+    return scores
+
+
+def build_article_context(articles: Dict[str, str], event: Optional[Dict] = None,
+                          budget_tokens: int = 1600) -> str:
+    """Prompt excerpts from articles ({url: text}) within budget_tokens; see module docstring."""
+    from .near_dup import representatives
+
+    sources = []
+    for url, (text, copies) in representatives({u: t for u, t in articles.items() if t}).items():
+        note = f" (+{copies} near-identical cop{'y' if copies == 1 else 'ies'})" if copies else ""
+        sources.append((f"[Source: {url}{note}]", split_passages(text)))
+    passages = [(s, i, text) for s, (_, parts) in enumerate(sources) for i, text in enumerate(parts)]
+    if not passages:
+        return NO_ARTICLES
+    scores = rank_passages(passages, query_terms(event or {}))
+
+    separator_cost = count_tokens(SEPARATOR)
+    remaining = budget_tokens
+    chosen: Dict[int, List[int]] = {}
+    for k in sorted(range(len(passages)), key=lambda k: (-scores[k], passages[k][0], passages[k][1])):
+        source, position, text = passages[k]
+        cost = count_tokens(text) + 1
+        if source not in chosen:
+            cost += count_tokens(sources[source][0]) + separator_cost + 2  # header, separator, "..."
+        if cost <= remaining:
+            chosen.setdefault(source, []).append(position)
+            remaining -= cost
+
+    parts = []
+    for source in sorted(chosen):
+        header, texts = sources[source]
+        positions = sorted(chosen[source])
+        body = "\n\n".join(texts[i] for i in positions)
+        if len(positions) < len(texts):
+            body += "\n..."
+        parts.append(f"{header}\n{body}")
+    return SEPARATOR.join(parts) if parts else NO_ARTICLES
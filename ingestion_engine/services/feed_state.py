@@ -0,0 +1,65 @@
+"""
+Per-feed polling state for news_scraper: conditional-GET validators and the
+entries already emitted.
+
+    {"version": 1, "feeds": {feed_url: {"etag", "modified", "seen", "checked_at"}}}
+
+etag / modified are passed back to feedparser.parse(), so an unchanged feed
+costs one 304 round trip and no body. seen holds the ids of entries already
+turned into events; it is trimmed to the ids still present in the feed, so it
+stays as small as the feed itself. Saved atomically (tmp + os.replace).
+"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+VERSION = 1
+
+
+class FeedState:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self.feeds: Dict[str, Dict[str, Any]] = {}
+        if self.path and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("version") == VERSION:
+                    self.feeds = data.get("feeds") or {}
+            except (OSError, ValueError):
+                self.feeds = {}
+
+    def conditional_args(self, feed_url: str) -> Dict[str, str]:
+        """etag / modified kwargs for feedparser.parse (empty on first poll)."""
+        state = self.feeds.get(feed_url) or {}
+        return {k: state[k] for k in ("etag", "modified") if state.get(k)}
+
+    def seen(self, feed_url: str) -> Set[str]:
+        return set((self.feeds.get(feed_url) or {}).get("seen") or [])
+
+    def update(self, feed_url: str, etag: Optional[str], modified: Optional[str],
+               current_ids: Iterable[str], emitted_ids: Iterable[str]):
+        """Record a 200 poll: new validators, and seen = ids still in the feed
+        that were emitted in this or an earlier run."""
+        current = list(dict.fromkeys(current_ids))
+        seen = self.seen(feed_url) | set(emitted_ids)
+        self.feeds[feed_url] = {
+            "etag": etag,
+            "modified": modified,
+            "seen": [i for i in current if i in seen],
+            "checked_at": int(time.time()),
+        }
+
+    def touch(self, feed_url: str):
+        """Record a 304 poll (validators and seen ids unchanged)."""
+        if feed_url in self.feeds:
+            self.feeds[feed_url]["checked_at"] = int(time.time())
+
+    def save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"version": VERSION, "feeds": self.feeds}, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
@@ -0,0 +1,170 @@
+"""
+Shared HTTP fetch engine for article downloads.
+
+One requests.Session (pooled keep-alive connections) behind a thread pool:
+- global cap: at most max_workers requests in flight,
+- per host: at most per_host concurrent requests, and request starts to the
+  same host spaced by at least per_host_delay seconds,
+- deadline: map() / fetch_many() return whatever finished in time. Queued
+  work is cancelled; requests already in flight finish in the background and
+  their results are dropped.
+
+Used by article_fetcher.fetch_article / fetch_articles and news_scraper.
+
+Usage:
+    engine = get_engine()
+    results = engine.fetch_many(urls, deadline=20)   # {url: FetchResult}
+    texts = engine.map(fetch_article, urls, deadline=20)
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "GDELT-Streamer/1.0"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: Optional[int] = None
+    text: Optional[str] = None
+    error: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status is not None and 200 <= self.status < 300 and self.text is not None
+
+
+def host_of(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+class HostLimiter:
+    """Per-host concurrency slots plus a minimum spacing between request starts."""
+
+    def __init__(self, per_host: int = 2, delay: float = 0.5):
+        self.per_host = max(1, per_host)
+        self.delay = max(0.0, delay)
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, host: str):
+        with self._lock:
+            sem = self._slots.setdefault(host, threading.Semaphore(self.per_host))
+        with sem:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.delay
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+class FetchEngine:
+    def __init__(self, max_workers: int = 16, per_host: int = 2, per_host_delay: float = 0.5,
+                 timeout: float = 15, user_agent: str = USER_AGENT):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.limiter = HostLimiter(per_host, per_host_delay)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = user_agent
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+
+    def get(self, url: str, timeout: Optional[float] = None, retries: int = 0, backoff: float = 1.0,
+            deadline_at: Optional[float] = None, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """GET one URL under the host limits. Connection errors, 429 and 5xx
+        are retried `retries` times with exponential backoff. deadline_at
+        (time.monotonic()) caps the request timeout and stops retries, including
+        when the backoff before the next one would run past it."""
+        timeout = timeout or self.timeout
+        result = FetchResult(url)
+        start = time.monotonic()
+        for attempt in range(retries + 1):
+            remaining = timeout if deadline_at is None else min(timeout, deadline_at - time.monotonic())
+            if remaining <= 0:
+                result.error = result.error or "deadline exceeded"
+                break
+            try:
+                with self.limiter.slot(host_of(url)):
+                    r = self.session.get(url, timeout=remaining, headers=headers)
+                result.status, result.error = r.status_code, None
+                if r.ok:
+                    result.text = r.text
+                    break
+                result.error = f"HTTP {r.status_code}"
+                if r.status_code not in RETRY_STATUSES:
+                    break
+            except requests.RequestException as e:
+                result.error = str(e) or type(e).__name__
+            if attempt < retries:
+                delay = backoff * (2 ** attempt)
+                if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+                    break  # the retry could not start before the deadline
+                time.sleep(delay)
+        result.elapsed_seconds = round(time.monotonic() - start, 3)
+        return result
+
+    def map(self, fn: Callable[[str], Any], urls: Iterable[str], deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Run fn(url) for each distinct URL on the pool. Returns {url: result}
+        in input order for calls that finished within `deadline` seconds;
+        calls that raised are left out."""
+        futures = {}
+        for url in urls:
+            if url and url not in futures:
+                futures[url] = self._pool.submit(fn, url)
+        done, pending = wait(futures.values(), timeout=deadline)
+        for f in pending:
+            f.cancel()
+        return {
+            url: f.result() for url, f in futures.items()
+            if f in done and f.exception() is None
+        }
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Run fn on the engine's pool (bounded by max_workers)."""
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def fetch_many(self, urls: Iterable[str], deadline: Optional[float] = None,
+                   timeout: Optional[float] = None, retries: int = 0) -> Dict[str, FetchResult]:
+        deadline_at = None if deadline is None else time.monotonic() + deadline
+        return self.map(lambda u: self.get(u, timeout, retries=retries, deadline_at=deadline_at), urls, deadline)
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> FetchEngine:
+    """Process-wide engine configured from manifest_config (ARTICLE_FETCH_*)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            try:
+                from ingestion_engine.config.manifest_config import (
+                    ARTICLE_FETCH_MAX_WORKERS,
+                    ARTICLE_FETCH_PER_HOST,
+                    ARTICLE_FETCH_HOST_DELAY_SEC,
+                )
+                _engine = FetchEngine(ARTICLE_FETCH_MAX_WORKERS, ARTICLE_FETCH_PER_HOST, ARTICLE_FETCH_HOST_DELAY_SEC)
+            except ImportError:
+                _engine = FetchEngine()
+        return _engine
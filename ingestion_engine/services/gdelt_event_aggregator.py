@@ -3,6 +3,7 @@ GDELT Event Aggregator: collects events from hotspots, anomalies, DBSCAN,
 diplomatic tracker, and conflict monitor with source URLs and confidence scores.
 Output format is canonical for the LLM analysis pipeline.
 """
+import hashlib
 import json
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
@@ -25,6 +26,12 @@ def _source_urls_from_top_sources(top_sources: List) -> List[str]:
     return urls
 
 
+def _stable_hash(value: Any) -> int:
+    """8-digit id suffix that is the same in every process (unlike hash(),
+    which is salted per interpreter), so ids and caches survive restarts."""
+    return int(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).hexdigest(), 16) % 10**8
+
+
 def _confidence_from_sources(source_count: int, event_count: int = 1) -> float:
     if source_count >= 10 and event_count >= 5:
         return 0.9
@@ -70,7 +77,7 @@ def collect_from_hotspots(max_location: int = 5, max_event: int = 5, max_actor:
             center_lng = item.get("center_lng")
 
             events.append({
-                "id": f"gdelt_hotspot_{kind}_{i}_{hash(key_val) % 10**8}",
+                "id": f"gdelt_hotspot_{kind}_{i}_{_stable_hash(key_val)}",
                 "source": "hotspot",
                 "type": kind,
                 "participants": [],
@@ -115,7 +122,7 @@ def collect_from_anomalies(history_path: Optional[Path] = None, max_anomalies: i
         confidence = min(0.95, 0.5 + z * 0.1)
 
         events.append({
-            "id": f"gdelt_anomaly_{i}_{hash(a.get('grid_key', '')) % 10**8}",
+            "id": f"gdelt_anomaly_{i}_{_stable_hash(a.get('grid_key', ''))}",
             "source": "anomaly",
             "type": "anomaly",
             "participants": [],
@@ -142,17 +149,21 @@ def collect_from_diplomatic(db_path: Optional[Path] = None, days: int = 7, limit
 
     try:
         import duckdb
-        db = duckdb.connect(str(db_path))
+        from ingestion_engine.maintenance.table_layout import REWRITE_LOCK
         cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).date()
-        result = db.execute("""
-            SELECT Source_Country, Target_Country, interaction_type, NumSources,
-                   GoldsteinScale, SourceURL, EventDate
-            FROM country_interactions
-            WHERE EventDate >= ?
-            ORDER BY NumSources DESC
-            LIMIT ?
-        """, [cutoff, limit]).fetchall()
-        db.close()
+        with REWRITE_LOCK:
+            db = duckdb.connect(str(db_path))
+            try:
+                result = db.execute("""
+                    SELECT Source_Country, Target_Country, interaction_type, NumSources,
+                           GoldsteinScale, SourceURL, EventDate
+                    FROM country_interactions
+                    WHERE EventDate >= ?
+                    ORDER BY NumSources DESC
+                    LIMIT ?
+                """, [cutoff, limit]).fetchall()
+            finally:
+                db.close()
     except Exception:
         return events
 
@@ -164,7 +175,7 @@ def collect_from_diplomatic(db_path: Optional[Path] = None, days: int = 7, limit
         confidence = _confidence_from_sources(num_src or 0, 1)
 
         events.append({
-            "id": f"gdelt_diplomatic_{i}_{hash(f'{src}-{tgt}-{evt_date}') % 10**8}",
+            "id": f"gdelt_diplomatic_{i}_{_stable_hash(f'{src}-{tgt}-{evt_date}')}",
             "source": "gdelt_diplomatic",
             "type": itype or "diplomatic",
             "participants": participants,
@@ -186,17 +197,21 @@ def collect_from_conflict(db_path: Optional[Path] = None, days: int = 7, limit:
 
     try:
         import duckdb
-        db = duckdb.connect(str(db_path))
+        from ingestion_engine.maintenance.table_layout import REWRITE_LOCK
         cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).date()
-        result = db.execute("""
-            SELECT Actor1CountryCode, Actor2CountryCode, ActionGeo_FullName,
-                   event_category, NumSources, severity_score, SourceURL
-            FROM conflict_events
-            WHERE EventDate >= ?
-            ORDER BY severity_score DESC, NumSources DESC
-            LIMIT ?
-        """, [cutoff, limit]).fetchall()
-        db.close()
+        with REWRITE_LOCK:
+            db = duckdb.connect(str(db_path))
+            try:
+                result = db.execute("""
+                    SELECT Actor1CountryCode, Actor2CountryCode, ActionGeo_FullName,
+                           event_category, NumSources, severity_score, SourceURL
+                    FROM conflict_events
+                    WHERE EventDate >= ?
+                    ORDER BY severity_score DESC, NumSources DESC
+                    LIMIT ?
+                """, [cutoff, limit]).fetchall()
+            finally:
+                db.close()
     except Exception:
         return events
 
@@ -208,7 +223,7 @@ def collect_from_conflict(db_path: Optional[Path] = None, days: int = 7, limit:
         confidence = min(0.9, 0.3 + (num_src or 0) * 0.05 + (severity or 0) * 0.02)
 
         events.append({
-            "id": f"gdelt_conflict_{i}_{hash(f'{a1}-{a2}-{location}') % 10**8}",
+            "id": f"gdelt_conflict_{i}_{_stable_hash(f'{a1}-{a2}-{location}')}",
             "source": "gdelt_conflict",
             "type": category or "conflict",
             "participants": participants,
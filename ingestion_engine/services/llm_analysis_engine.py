@@ -4,6 +4,7 @@ refined analysis and interaction metadata (visualization_type, arc_style, toast,
 """
 import json
 import os
+import threading
 import time
 from pathlib import Path
 from typing import Dict, Any, Optional, List
@@ -16,8 +17,6 @@ except Exception:
     pass
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
-CACHE_DIR = REPO_ROOT / "data" / "interactions" / "cache" / "llm_analysis"
-
 OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY")
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 MODEL = os.environ.get("OPENROUTER_MODEL", "openai/gpt-4o-mini")
@@ -25,6 +24,23 @@ GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
 GROQ_MODEL = os.environ.get("GROQ_MODEL", "llama-3.1-8b-instant")
 
+try:
+    from ingestion_engine.config.manifest_config import LLM_CONTEXT_TOKENS, LLM_CONTEXT_WIKI_TOKENS
+except ImportError:
+    LLM_CONTEXT_TOKENS, LLM_CONTEXT_WIKI_TOKENS = 2000, 400
+
+# Shared by the single-event and batch prompts; doubled braces because both are .format()ted
+ANALYSIS_RULES = """1. visualization_type:
+   - When Participant count is 2 or more, use "geodesic" (arc between two countries). Geodesic draws an arc between the first two countries in Participants.
+   - Use "geodesic" ONLY when there are at least TWO distinct countries in Participants (e.g. "USA, China" or "Israel, Lebanon").
+   - Use "dot" in ALL other cases: when Participants is empty, when there is only one country/actor, when the event is about a single location/hotspot/anomaly/actor, or when the event type is anomaly/hotspot/location/actor. Dot shows a single point on the map.
+2. For "dot" you MUST set location. Use event Location if given (lat/lon), or infer from description (e.g. "Israel" -> {{"iso": "ISR"}}, "United States" -> {{"iso": "USA"}}). Format: {{"lat": number, "lon": number}} or {{"iso": "XXX"}}. For "geodesic" set location to null.
+3. arc_style: "dashed" | "solid" | "dotted" (only for geodesic; use "solid" if dot).
+4. analysis: A long, structured summary (plain text). (a) Briefly summarise each linked article in turn (one short paragraph per source). (b) Then synthesise how they relate: agreement, contradiction, or different angles. (c) Then state the overall picture and implications in 1-2 short paragraphs. Use double newlines between paragraphs so the text can be rendered with clear breaks. If there are no articles, still provide a 2-4 sentence analysis from the GDELT description alone.
+5. toast_message: one short line for a notification.
+6. toast_type: "info" | "success" | "warning" | "error".
+7. confidence: 0.0-1.0."""
+
 ANALYSIS_PROMPT = """You are analyzing a geopolitical event for a map visualization. Output only valid JSON.
 
 GDELT Event Data:
@@ -42,117 +58,105 @@ Related Articles (excerpts):
 {wiki_context}
 
 RULES (follow strictly):
-1. visualization_type:
-   - When Participant count is 2 or more, use "geodesic" (arc between two countries). Geodesic draws an arc between the first two countries in Participants.
-   - Use "geodesic" ONLY when there are at least TWO distinct countries in Participants (e.g. "USA, China" or "Israel, Lebanon").
-   - Use "dot" in ALL other cases: when Participants is empty, when there is only one country/actor, when the event is about a single location/hotspot/anomaly/actor, or when the event type is anomaly/hotspot/location/actor. Dot shows a single point on the map.
-2. For "dot" you MUST set location. Use event Location if given (lat/lon), or infer from description (e.g. "Israel" -> {{"iso": "ISR"}}, "United States" -> {{"iso": "USA"}}). Format: {{"lat": number, "lon": number}} or {{"iso": "XXX"}}. For "geodesic" set location to null.
-3. arc_style: "dashed" | "solid" | "dotted" (only for geodesic; use "solid" if dot).
-4. analysis: A long, structured summary (plain text). (a) Briefly summarise each linked article in turn (one short paragraph per source). (b) Then synthesise how they relate: agreement, contradiction, or different angles. (c) Then state the overall picture and implications in 1-2 short paragraphs. Use double newlines between paragraphs so the text can be rendered with clear breaks. If there are no articles, still provide a 2-4 sentence analysis from the GDELT description alone.
-5. toast_message: one short line for a notification.
-6. toast_type: "info" | "success" | "warning" | "error".
-7. confidence: 0.0-1.0.
+""" + ANALYSIS_RULES + """
 
 Return valid JSON only with keys: analysis, visualization_type, arc_style, location, toast_message, toast_type, confidence."""
 
+BATCH_PROMPT = """You are analyzing {count} geopolitical events for a map visualization. Output only valid JSON.
 
-def _call_openrouter(prompt: str) -> tuple[Optional[str], Optional[int]]:
-    if not OPENROUTER_API_KEY:
-        return None, None
-    import requests
-    try:
-        r = requests.post(
-            OPENROUTER_URL,
-            headers={"Authorization": f"Bearer {OPENROUTER_API_KEY}", "Content-Type": "application/json"},
-            json={
-                "model": MODEL,
-                "messages": [
-                    {"role": "system", "content": "You are a geopolitical analyst. Respond only with valid JSON."},
-                    {"role": "user", "content": prompt},
-                ],
-                "response_format": {"type": "json_object"},
-            },
-            timeout=60,
-        )
-        if r.status_code == 429 or r.status_code >= 500:
-            return None, r.status_code
-        r.raise_for_status()
-        return r.json().get("choices", [{}])[0].get("message", {}).get("content"), None
-    except Exception as e:
-        status = getattr(getattr(e, "response", None), "status_code", None)
-        return None, status
-
-
-def _call_groq(prompt: str) -> Optional[str]:
-    if not GROQ_API_KEY:
-        return None
-    try:
-        import requests
-        r = requests.post(
-            GROQ_URL,
-            headers={"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"},
-            json={
-                "model": GROQ_MODEL,
-                "messages": [
-                    {"role": "system", "content": "You are a geopolitical analyst. Respond only with valid JSON."},
-                    {"role": "user", "content": prompt},
-                ],
-                "response_format": {"type": "json_object"},
-            },
-            timeout=60,
-        )
-        r.raise_for_status()
-        return r.json().get("choices", [{}])[0].get("message", {}).get("content")
-    except Exception:
-        return None
+Each element of the Events array is one GDELT event with its related article excerpts and Wikipedia context. Analyze every event on its own, using only that event's fields.
+
+Events (JSON array):
+{events_json}
+
+RULES for each event (follow strictly):
+""" + ANALYSIS_RULES + """
+
+Return valid JSON only: {{"results": [...]}} with exactly one object per event, in the same order, each with keys: event_id (copied from the event), analysis, visualization_type, arc_style, location, toast_message, toast_type, confidence."""
 
 
-_llm_provider_stats = {"openrouter_ok": 0, "openrouter_fail": 0, "groq_ok": 0, "groq_fail": 0}
+_engine = None
+_engine_lock = threading.Lock()
 
 
-def _call_llm(prompt: str) -> Optional[str]:
-    if OPENROUTER_API_KEY:
-        out, status = _call_openrouter(prompt)
-        if out:
-            _llm_provider_stats["openrouter_ok"] += 1
-            return out
-        if status is not None:
-            _llm_provider_stats["openrouter_fail"] += 1
-            if status == 429:
-                print(f"[LLM] OpenRouter rate limit (429), falling back to Groq")
-            else:
-                print(f"[LLM] OpenRouter failed ({status}), falling back to Groq")
-    if GROQ_API_KEY:
-        out = _call_groq(prompt)
-        if out:
-            _llm_provider_stats["groq_ok"] += 1
-            return out
-        _llm_provider_stats["groq_fail"] += 1
-    return None
+def _get_engine():
+    """Process-wide LLMEngine: OpenRouter first, Groq as failover (whichever
+    has an API key), limits from manifest_config (LLM_*, *_RPM, *_TPM)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            from .llm_engine import LLMEngine, Provider
+            try:
+                from ingestion_engine.config.manifest_config import (
+                    LLM_MAX_CONCURRENCY, LLM_MAX_RETRIES, LLM_TIMEOUT_SEC,
+                    OPENROUTER_RPM, OPENROUTER_TPM, GROQ_RPM, GROQ_TPM,
+                )
+            except ImportError:
+                LLM_MAX_CONCURRENCY, LLM_MAX_RETRIES, LLM_TIMEOUT_SEC = 8, 2, 60
+                OPENROUTER_RPM, OPENROUTER_TPM, GROQ_RPM, GROQ_TPM = 60, 200000, 30, 6000
+            providers = []
+            if OPENROUTER_API_KEY:
+                providers.append(Provider("openrouter", OPENROUTER_URL, MODEL, OPENROUTER_API_KEY,
+                                          rpm=OPENROUTER_RPM, tpm=OPENROUTER_TPM))
+            if GROQ_API_KEY:
+                providers.append(Provider("groq", GROQ_URL, GROQ_MODEL, GROQ_API_KEY, rpm=GROQ_RPM, tpm=GROQ_TPM))
+            _engine = LLMEngine(providers, max_concurrency=LLM_MAX_CONCURRENCY, retries=LLM_MAX_RETRIES,
+                                timeout=LLM_TIMEOUT_SEC)
+        return _engine
+
+
+def _call_llm(prompt: str, use_cache: bool = True) -> Optional[str]:
+    """Completion text for prompt. With use_cache, responses are reused by
+    (model, prompt) across events and runs, only valid JSON from the primary
+    model is stored (a failover reply is returned but not cached under the
+    primary model's key), and concurrent identical prompts share one call."""
+    engine = _get_engine()
+    if not use_cache:
+        return engine.complete(prompt).text
+    from .llm_cache import get_cache, prompt_key
+
+    model = engine.providers[0].model if engine.providers else ""
+    answered = {}
+
+    def compute() -> Optional[str]:
+        result = engine.complete(prompt)
+        answered["model"] = result.model
+        return result.text
+
+    return get_cache().get_or_compute(
+        prompt_key(model, prompt), compute, model=model,
+        cacheable=lambda text: answered.get("model") == model and _is_json_object(text),
+    )
+
+
+def _is_json_object(text: str) -> bool:
+    try:
+        return isinstance(json.loads(text), dict)
+    except (TypeError, ValueError):
+        return False
 
 
 def get_llm_provider_stats() -> Dict[str, int]:
-    return dict(_llm_provider_stats)
+    stats = {"openrouter_ok": 0, "openrouter_fail": 0, "groq_ok": 0, "groq_fail": 0}
+    stats.update(_get_engine().provider_stats())
+    return stats
 
 
 def reset_llm_provider_stats() -> None:
-    _llm_provider_stats.update(openrouter_ok=0, openrouter_fail=0, groq_ok=0, groq_fail=0)
+    _get_engine().reset_stats()
 
 
-def _article_excerpts(articles: Dict[str, str], max_chars_per: int = 3000, max_total: int = 8000) -> str:
-    parts = []
-    total = 0
-    for url, text in articles.items():
-        if not text or total >= max_total:
-            continue
-        excerpt = (text[:max_chars_per] + "...") if len(text) > max_chars_per else text
-        parts.append(f"[Source: {url}]\n{excerpt}")
-        total += len(excerpt)
-    return "\n\n---\n\n".join(parts) if parts else "No article content available."
+def _article_excerpts(articles: Dict[str, str], event: Optional[Dict] = None,
+                      budget_tokens: int = LLM_CONTEXT_TOKENS - LLM_CONTEXT_WIKI_TOKENS) -> str:
+    """Excerpts for the prompt: the passages most relevant to event that fit
+    budget_tokens; near-identical articles (syndicated copies) contribute one
+    representative, noted with how many copies it stands for."""
+    from .context_builder import build_article_context
+
+    return build_article_context(articles, event, budget_tokens)
 
 
 _wiki_cache: Dict[str, str] = {}
-_MAX_WIKI_CONTEXT = 2000
 
 
 def _fetch_wiki_context(event: Dict) -> str:
@@ -202,10 +206,61 @@ def _fetch_wiki_context(event: Dict) -> str:
                     break
     if not extracts:
         return ""
-    total = "\n\n".join(extracts)[:_MAX_WIKI_CONTEXT]
+    from .context_builder import truncate_tokens
+
+    total = truncate_tokens("\n\n".join(extracts), LLM_CONTEXT_WIKI_TOKENS)
     return f"Wikipedia context:\n{total}"
 
 
+def _prompt_fields(event: Dict, articles: Optional[Dict[str, str]], use_wikipedia: bool = True) -> Dict[str, Any]:
+    """ANALYSIS_PROMPT fields for one event. Wikipedia context takes up to
+    LLM_CONTEXT_WIKI_TOKENS; article excerpts fill the rest of LLM_CONTEXT_TOKENS."""
+    from .context_builder import count_tokens
+
+    participants = event.get("participants") or []
+    if not isinstance(participants, list):
+        participants = [participants] if participants else []
+    location = event.get("location")
+    wiki_context = (_fetch_wiki_context(event) if use_wikipedia else "").strip()
+    article_budget = LLM_CONTEXT_TOKENS - count_tokens(wiki_context)
+    return {
+        "event_type": event.get("type", "unknown"),
+        "participants": ", ".join(str(p) for p in participants) if participants else "(none)",
+        "participant_count": len(participants),
+        "location": json.dumps(location) if location else "N/A",
+        "description": (event.get("description") or "")[:500],
+        "confidence": event.get("confidence", 0.5),
+        "source_urls": ", ".join((event.get("source_urls") or [])[:5]),
+        "article_content": _article_excerpts(articles or {}, event, article_budget),
+        "wiki_context": wiki_context or "(none)",
+    }
+
+
+def _finish_analysis(out: Dict[str, Any], event: Dict, participant_count: int) -> Dict[str, Any]:
+    """Normalise an LLM analysis: location must be a dict, geodesic needs two
+    participants, a dot falls back to the event's location."""
+    location = event.get("location")
+    if not isinstance(out.get("location"), (dict, type(None))):
+        out["location"] = None
+    vt = (out.get("visualization_type") or "geodesic").lower()
+    if vt == "geodesic" and participant_count < 2:
+        out["visualization_type"] = "dot"
+        if not out.get("location") and location:
+            out["location"] = location
+    if out.get("visualization_type") == "dot" and not out.get("location") and location:
+        out["location"] = location
+    return out
+
+
+def _valid_analysis(out: Any) -> bool:
+    """Per-item check for batch output: an object with analysis text and a known visualization_type."""
+    return (
+        isinstance(out, dict)
+        and isinstance(out.get("analysis"), str) and bool(out["analysis"].strip())
+        and str(out.get("visualization_type") or "").lower() in ("geodesic", "dot")
+    )
+
+
 def analyze_event(
     event: Dict,
     articles: Optional[Dict[str, str]] = None,
@@ -218,63 +273,19 @@ def analyze_event(
     """
     Run LLM analysis on a GDELT event with optional article content.
     If lazy=True, return None without calling LLM (for lazy loading).
+    With use_cache, the LLM response is reused from llm_cache when the same model already saw the same prompt.
     If return_prompt=True, skip cache and return {"prompt": str, "raw_output": str, "parsed": dict}.
     """
     if lazy:
         return None
-    event_id = event.get("id") or ""
-    if use_cache and not return_prompt and event_id:
-        cache_file = CACHE_DIR / f"{event_id}.json"
-        if cache_file.exists():
-            try:
-                return json.loads(cache_file.read_text(encoding="utf-8"))
-            except Exception:
-                pass
-
-    articles = articles or {}
-    article_content = _article_excerpts(articles)
-    wiki_context = _fetch_wiki_context(event) if use_wikipedia else ""
-    if wiki_context:
-        wiki_context = wiki_context.strip()
-
-    participants = event.get("participants") or []
-    if not isinstance(participants, list):
-        participants = [participants] if participants else []
-    participant_count = len(participants)
-    participants_str = ", ".join(str(p) for p in participants) if participants else "(none)"
-    location = event.get("location")
-    location_str = json.dumps(location) if location else "N/A"
-
-    prompt = ANALYSIS_PROMPT.format(
-        event_type=event.get("type", "unknown"),
-        participants=participants_str,
-        participant_count=participant_count,
-        location=location_str,
-        description=(event.get("description") or "")[:500],
-        confidence=event.get("confidence", 0.5),
-        source_urls=", ".join((event.get("source_urls") or [])[:5]),
-        article_content=article_content[:12000],
-        wiki_context=wiki_context or "(none)",
-    )
+    fields = _prompt_fields(event, articles, use_wikipedia)
+    prompt = ANALYSIS_PROMPT.format(**fields)
 
-    raw = _call_llm(prompt)
+    raw = _call_llm(prompt, use_cache=use_cache and not return_prompt)
     if not raw:
         return {"prompt": prompt, "raw_output": "", "parsed": None} if return_prompt else None
     try:
-        out = json.loads(raw)
-        if not isinstance(out.get("location"), (dict, type(None))):
-            out["location"] = None
-        vt = (out.get("visualization_type") or "geodesic").lower()
-        if vt == "geodesic" and participant_count < 2:
-            out["visualization_type"] = "dot"
-            if not out.get("location") and location:
-                out["location"] = location
-        if out.get("visualization_type") == "dot" and not out.get("location") and location:
-            out["location"] = location
-        if event_id and use_cache and not return_prompt:
-            CACHE_DIR.mkdir(parents=True, exist_ok=True)
-            to_cache = {k: v for k, v in out.items() if k != "_raw_llm_json"}
-            (CACHE_DIR / f"{event_id}.json").write_text(json.dumps(to_cache, indent=2), encoding="utf-8")
+        out = _finish_analysis(json.loads(raw), event, fields["participant_count"])
         if return_raw and not return_prompt:
             out["_raw_llm_json"] = raw
         if return_prompt:
@@ -284,6 +295,159 @@ def analyze_event(
         return {"prompt": prompt, "raw_output": raw, "parsed": None} if return_prompt else None
 
 
+def _batch_item(event_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "event_id": event_id,
+        "type": fields["event_type"],
+        "participants": fields["participants"],
+        "participant_count": fields["participant_count"],
+        "location": fields["location"],
+        "description": fields["description"],
+        "confidence": fields["confidence"],
+        "source_urls": fields["source_urls"],
+        "articles": fields["article_content"],
+        "wikipedia": fields["wiki_context"],
+    }
+
+
+def _pack_batches(items: List[Dict[str, Any]], max_events: int, token_budget: int,
+                  output_tokens: int) -> List[List[Dict[str, Any]]]:
+    """Greedy, in order: start a new batch when the next event would take the
+    batch past max_events or past token_budget (rules + events + expected replies)."""
+    from .context_builder import count_tokens
+
+    overhead = count_tokens(BATCH_PROMPT.format(count=max_events, events_json=""))
+    batches, current, used = [], [], overhead
+    for item in items:
+        cost = count_tokens(json.dumps(item, ensure_ascii=False)) + output_tokens
+        if current and (len(current) >= max_events or used + cost > token_budget):
+            batches.append(current)
+            current, used = [], overhead
+        current.append(item)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _parse_batch(raw: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """{event_id: item} for the items of a batch reply that pass _valid_analysis."""
+    try:
+        data = json.loads(raw or "")
+    except (TypeError, ValueError):
+        return {}
+    items = data.get("results") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return {}
+    return {str(item["event_id"]): item for item in items
+            if _valid_analysis(item) and item.get("event_id") is not None}
+
+
+def analyze_events_batched(
+    events: List[Dict],
+    articles: Optional[List[Dict[str, str]]] = None,
+    use_cache: bool = True,
+    max_events: int = 4,
+    token_budget: int = 16000,
+    use_wikipedia: bool = True,
+    stats: Optional[Dict[str, int]] = None,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    analyze_event for many events with fewer LLM calls: events are packed into
+    batches (at most max_events, token_budget tokens including expected
+    replies) that share one copy of the rules, sent as a JSON array and
+    answered as {"results": [...]}. Each reply item is validated on its own;
+    only events whose item is missing or invalid fall back to analyze_event.
+    Items are stored in llm_cache under their single-event prompt (unless a
+    failover provider answered), and events already cached there are not
+    batched. Returns analyses in input order.
+    stats, if given, counts batches and events: batched, cached, single
+    (a batch of one goes out as a normal single-event call) and fallback.
+    """
+    from .llm_cache import get_cache, prompt_key
+    from .llm_engine import DEFAULT_OUTPUT_TOKENS
+
+    stats = stats if stats is not None else {}
+    for key in ("batches", "batched", "cached", "single", "fallback"):
+        stats.setdefault(key, 0)
+    engine = _get_engine()
+    model = engine.providers[0].model if engine.providers else ""
+    articles = articles or [{} for _ in events]
+    fields = engine.map(lambda i: _prompt_fields(events[i], articles[i], use_wikipedia), range(len(events)))
+    keys = [prompt_key(model, ANALYSIS_PROMPT.format(**f)) for f in fields]
+    results: List[Optional[Dict[str, Any]]] = [None] * len(events)
+
+    pending = []
+    for i, f in enumerate(fields):
+        cached = get_cache().get(keys[i]) if use_cache else None
+        if cached is not None and _is_json_object(cached):
+            results[i] = _finish_analysis(json.loads(cached), events[i], f["participant_count"])
+            stats["cached"] += 1
+        else:
+            pending.append(_batch_item(str(i), f))
+
+    def run_batch(batch: List[Dict[str, Any]]) -> List[int]:
+        """Index of every event in batch that still needs a single call."""
+        prompt = BATCH_PROMPT.format(count=len(batch), events_json=json.dumps(batch, ensure_ascii=False))
+        result = engine.complete(prompt, output_tokens=DEFAULT_OUTPUT_TOKENS * len(batch))
+        reply = _parse_batch(result.text)
+        failed = []
+        for item in batch:
+            i = int(item["event_id"])
+            out = reply.get(item["event_id"])
+            if out is None:
+                failed.append(i)
+                continue
+            out = {k: v for k, v in out.items() if k != "event_id"}
+            if use_cache and result.model == model:
+                get_cache().put(keys[i], json.dumps(out), model=model)
+            results[i] = _finish_analysis(out, events[i], fields[i]["participant_count"])
+        return failed
+
+    batches = _pack_batches(pending, max_events, token_budget, DEFAULT_OUTPUT_TOKENS)
+    singles = [int(b[0]["event_id"]) for b in batches if len(b) == 1]
+    batches = [b for b in batches if len(b) > 1]
+    failed = [i for indices in engine.map(run_batch, batches) for i in indices]
+    stats["batches"] += len(batches)
+    stats["batched"] += sum(len(b) for b in batches) - len(failed)
+    stats["single"] += len(singles)
+    stats["fallback"] += len(failed)
+    retry = singles + failed
+    for i, out in zip(retry, engine.map(
+        lambda i: analyze_event(events[i], articles[i], use_cache=use_cache, use_wikipedia=use_wikipedia), retry,
+    )):
+        results[i] = out
+    return results
+
+
+def _enrich(ev: Dict, analysis: Optional[Dict[str, Any]]) -> Dict:
+    """Event with its analysis fields, or placeholders when there is none."""
+    if analysis:
+        return {
+            **ev,
+            "llm_analysis": analysis.get("analysis", ""),
+            "llm_analysis_cached": True,
+            "visualization_type": analysis.get("visualization_type", "geodesic"),
+            "arc_style": analysis.get("arc_style", "solid"),
+            "location": analysis.get("location") or ev.get("location"),
+            "toast_message": analysis.get("toast_message", ""),
+            "toast_type": analysis.get("toast_type", "info"),
+            "confidence": analysis.get("confidence", ev.get("confidence", 0.5)),
+        }
+    participants = ev.get("participants") or []
+    vt = ev.get("visualization_type") or ("dot" if not participants else "geodesic")
+    return {
+        **ev,
+        "llm_analysis": "",
+        "llm_analysis_cached": False,
+        "visualization_type": vt,
+        "arc_style": ev.get("arc_style", "solid"),
+        "location": ev.get("location"),
+        "toast_message": ev.get("toast_message", ""),
+        "toast_type": ev.get("toast_type", "info"),
+    }
+
+
 def analyze_events_with_articles(
     events: List[Dict],
     fetch_articles_fn=None,
@@ -291,47 +455,48 @@ def analyze_events_with_articles(
     lazy_if_high_confidence: bool = True,
     confidence_threshold: float = 0.7,
     delay_sec: float = 0,
+    batch_size: int = 1,
+    batch_token_budget: int = 16000,
+    stats: Optional[Dict[str, int]] = None,
 ) -> List[Dict]:
     """
     For each event, optionally fetch articles, then run LLM analysis.
     If lazy_if_high_confidence and event confidence >= threshold, skip LLM and return placeholder.
-    delay_sec: sleep between events (rate limiting).
+    Events run concurrently on the LLM engine's pool (bounded by
+    LLM_MAX_CONCURRENCY, paced by its per-provider rate limits), so a run takes
+    roughly the slowest call rather than the sum. Results keep input order.
+    batch_size > 1 packs up to that many events per LLM call (see
+    analyze_events_batched; stats receives its counts).
+    delay_sec > 0 keeps the old sequential, one call per event mode with a fixed sleep between events.
     """
     if fetch_articles_fn is None:
         from .article_fetcher import fetch_articles
         fetch_articles_fn = fetch_articles
 
-    results = []
-    for i, ev in enumerate(events):
-        if delay_sec > 0 and i > 0:
-            time.sleep(delay_sec)
+    def is_lazy(ev: Dict) -> bool:
+        return lazy_if_high_confidence and (ev.get("confidence") or 0) >= confidence_threshold
+
+    def articles_for(ev: Dict) -> Dict[str, str]:
         urls = ev.get("source_urls") or []
-        articles = fetch_articles_fn(urls, use_cache=use_cache) if urls else {}
-        lazy = lazy_if_high_confidence and (ev.get("confidence") or 0) >= confidence_threshold
-        analysis = analyze_event(ev, articles=articles, use_cache=use_cache, lazy=lazy)
-        if analysis:
-            results.append({
-                **ev,
-                "llm_analysis": analysis.get("analysis", ""),
-                "llm_analysis_cached": True,
-                "visualization_type": analysis.get("visualization_type", "geodesic"),
-                "arc_style": analysis.get("arc_style", "solid"),
-                "location": analysis.get("location") or ev.get("location"),
-                "toast_message": analysis.get("toast_message", ""),
-                "toast_type": analysis.get("toast_type", "info"),
-                "confidence": analysis.get("confidence", ev.get("confidence", 0.5)),
-            })
-        else:
-            participants = ev.get("participants") or []
-            vt = ev.get("visualization_type") or ("dot" if not participants else "geodesic")
-            results.append({
-                **ev,
-                "llm_analysis": "",
-                "llm_analysis_cached": False,
-                "visualization_type": vt,
-                "arc_style": ev.get("arc_style", "solid"),
-                "location": ev.get("location"),
-                "toast_message": ev.get("toast_message", ""),
-                "toast_type": ev.get("toast_type", "info"),
-            })
-    return results
+        return fetch_articles_fn(urls, use_cache=use_cache) if urls else {}
+
+    def analyze_one(ev: Dict) -> Dict:
+        articles = articles_for(ev)
+        return _enrich(ev, analyze_event(ev, articles=articles, use_cache=use_cache, lazy=is_lazy(ev)))
+
+    if delay_sec > 0:
+        results = []
+        for i, ev in enumerate(events):
+            if i > 0:
+                time.sleep(delay_sec)
+            results.append(analyze_one(ev))
+        return results
+    if batch_size <= 1:
+        return _get_engine().map(analyze_one, events)
+
+    active = [i for i, ev in enumerate(events) if not is_lazy(ev)]
+    articles = _get_engine().map(lambda i: articles_for(events[i]), active)
+    analyses = analyze_events_batched([events[i] for i in active], articles, use_cache=use_cache,
+                                      max_events=batch_size, token_budget=batch_token_budget, stats=stats)
+    by_index = dict(zip(active, analyses))
+    return [_enrich(ev, by_index.get(i)) for i, ev in enumerate(events)]
@@ -0,0 +1,216 @@
+"""
+LLM response cache keyed by prompt, with in-flight request coalescing.
+
+The key is sha256 over (model, system prompt, normalised prompt), so a
+response is reused whenever the same model would see the same prompt, no
+matter which event id or run produced it. Normalisation only collapses
+whitespace.
+
+Responses live in one SQLite file (default
+data/interactions/cache/llm_responses.sqlite), compressed inline with zstd
+(zlib when zstandard is not installed). Entries expire after ttl_seconds;
+past max_bytes, least recently read entries are evicted.
+
+get_or_compute(key, fn) coalesces identical requests: while one thread is
+computing a key, other callers of the same key wait for its result instead
+of sending their own LLM call.
+
+    cache = get_cache()
+    text = cache.get_or_compute(prompt_key(model, prompt), lambda: call_llm(prompt))
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_PATH = REPO_ROOT / "data" / "interactions" / "cache" / "llm_responses.sqlite"
+ACCESS_RESOLUTION = 60  # seconds; reads refresh accessed_at at most this often
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT,
+    codec TEXT,
+    value BLOB,
+    stored_bytes INTEGER,
+    created_at REAL,
+    accessed_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join((prompt or "").split())
+
+
+def prompt_key(model: str, prompt: str, system: str = "") -> str:
+    """Stable cache key for a completion request."""
+    material = "\x00".join((model or "", normalize_prompt(system), normalize_prompt(prompt)))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path: str | Path = DEFAULT_PATH, ttl_seconds: float = 7 * 86400,
+                 max_bytes: int = 64 * 1024 * 1024):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.codec = "zstd" if zstandard is not None else "zlib"
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(stored_bytes), 0) FROM responses").fetchone()[0]
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        return zlib.compress(data, 6)
+
+    @staticmethod
+    def _decompress(data: bytes, codec: str) -> bytes:
+        if codec == "zstd":
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for key, or None when missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT codec, value, accessed_at, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[3] < now:
+                return None
+            codec, value, accessed_at, _ = row
+            try:
+                text = self._decompress(value, codec).decode("utf-8")
+            except (zlib.error, ValueError) as e:
+                print(f"[LLMCache] Unreadable entry {key[:12]}: {e}")
+                return None
+            if accessed_at < now - ACCESS_RESOLUTION:
+                self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self.conn.commit()
+        return text
+
+    def put(self, key: str, text: str, model: Optional[str] = None):
+        now = time.time()
+        payload = self._compress(text.encode("utf-8"))
+        with self._lock:
+            old = self.conn.execute("SELECT stored_bytes FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, self.codec, payload, len(payload), now, now, now + self.ttl_seconds),
+            )
+            self.conn.commit()
+            self.total_bytes += len(payload) - (old[0] if old else 0)
+            over_budget = self.total_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Optional[str]], model: Optional[str] = None,
+                       cacheable: Callable[[str], bool] = bool) -> Optional[str]:
+        """Cached value for key; otherwise compute() once across concurrent
+        callers and store its result when cacheable(result)."""
+        text = self.get(key)
+        if text is not None:
+            self._count("hits")
+            return text
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self._count("coalesced")
+            return future.result()
+        self._count("misses")
+        try:
+            text = compute()
+            if text and cacheable(text):
+                self.put(key, text, model)
+            future.set_result(text)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return text
+
+    def _count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def evict(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Drop expired entries, then least recently read ones until the cache
+        fits in 90% of max_bytes."""
+        now = now or time.time()
+        with self._lock:
+            expired = self.conn.execute("DELETE FROM responses WHERE expires_at < ?", (now,)).rowcount
+            total = self.conn.execute("SELECT COALESCE(SUM(stored_bytes), 0) FROM responses").fetchone()[0]
+            lru = 0
+            if total > self.max_bytes:
+                target = self.max_bytes * 0.9
+                for key, size in self.conn.execute(
+                    "SELECT key, stored_bytes FROM responses ORDER BY accessed_at"
+                ).fetchall():
+                    if total <= target:
+                        break
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    total -= size
+                    lru += 1
+            self.conn.commit()
+            self.total_bytes = total
+        return {"expired": expired, "evicted": lru, "bytes": total}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"entries": entries, "stored_bytes": self.total_bytes, "codec": self.codec,
+                    "max_bytes": self.max_bytes, **self.counts}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache:
+    """Process-wide cache configured from manifest_config (LLM_CACHE_*)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                from ingestion_engine.config.manifest_config import (
+                    LLM_CACHE_PATH,
+                    LLM_CACHE_TTL_DAYS,
+                    LLM_CACHE_MAX_MB,
+                )
+                _cache = LLMCache(
+                    LLM_CACHE_PATH,
+                    ttl_seconds=LLM_CACHE_TTL_DAYS * 86400,
+                    max_bytes=int(LLM_CACHE_MAX_MB * 1024 * 1024),
+                )
+            except ImportError:
+                _cache = LLMCache()
+        return _cache
@@ -0,0 +1,224 @@
+"""
+LLM execution engine: concurrent chat-completion calls with per-provider
+rate limits, retries and failover.
+
+- Concurrency: at most max_concurrency requests in flight (one pooled
+  requests.Session shared by a thread pool).
+- Rate limits: each provider has two token buckets, requests per minute and
+  tokens per minute. A call waits for both before it is sent, so bursts stay
+  under the provider's limits instead of tripping 429s.
+- Retries: 429, 5xx and connection errors are retried with exponential
+  backoff and full jitter (Retry-After is honoured when sent).
+- Failover: per request. When a provider gives up (retries spent, or another
+  error), the same prompt goes to the next provider in order.
+
+Providers are OpenAI-compatible /chat/completions endpoints, so tests can
+point a Provider at a local mock server.
+
+Usage:
+    engine = LLMEngine([Provider("openrouter", url, model, key, rpm=60)])
+    result = engine.complete(prompt)           # LLMResult
+    outputs = engine.map(analyze, events)      # fn(item) on the pool, in order
+"""
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SYSTEM_PROMPT = "You are a geopolitical analyst. Respond only with valid JSON."
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+CHARS_PER_TOKEN = 4
+DEFAULT_OUTPUT_TOKENS = 800
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text or "") // CHARS_PER_TOKEN)
+
+
+@dataclass
+class Provider:
+    name: str
+    url: str
+    model: str
+    api_key: Optional[str] = None
+    rpm: float = 60
+    tpm: float = 200_000
+    json_mode: bool = True
+
+
+@dataclass
+class LLMResult:
+    text: Optional[str] = None
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    status: Optional[int] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    elapsed_seconds: float = 0.0
+    usage: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.text)
+
+
+class TokenBucket:
+    """Refills at per_minute / 60 per second up to capacity (default: one
+    minute's worth). acquire(n) blocks until n tokens are available; a
+    request larger than capacity waits for a full bucket and goes negative."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, n: float = 1, deadline_at: Optional[float] = None) -> bool:
+        need = min(n, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= need:
+                    self.tokens -= n
+                    return True
+                wait = (need - self.tokens) / self.rate if self.rate > 0 else 1.0
+            if deadline_at is not None:
+                if now + wait > deadline_at:
+                    return False
+            time.sleep(min(wait, 1.0))
+
+    def adjust(self, delta: float):
+        """Charge (positive) or refund (negative) tokens after the fact, e.g.
+        when the response reports actual usage."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class LLMEngine:
+    def __init__(self, providers: List[Provider], max_concurrency: int = 8, retries: int = 2,
+                 backoff: float = 1.0, max_backoff: float = 30.0, timeout: float = 60,
+                 output_tokens: int = DEFAULT_OUTPUT_TOKENS):
+        self.providers = list(providers)
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.output_tokens = output_tokens
+        self.buckets = {p.name: (TokenBucket(p.rpm), TokenBucket(p.tpm)) for p in self.providers}
+        self.stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(1, len(self.providers)), pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def complete(self, prompt: str, system: str = SYSTEM_PROMPT, output_tokens: Optional[int] = None) -> LLMResult:
+        """Send one prompt, failing over across providers in order.
+        output_tokens is the expected reply size for rate limiting (default:
+        the engine's output_tokens)."""
+        start = time.monotonic()
+        result = LLMResult(error="no LLM provider configured")
+        for i, provider in enumerate(self.providers):
+            result = self._complete_with(provider, prompt, system, result.attempts, output_tokens)
+            if result.ok:
+                self._count(f"{provider.name}_ok")
+                break
+            self._count(f"{provider.name}_fail")
+            if i + 1 < len(self.providers):
+                print(f"[LLM] {provider.name} failed ({result.status or result.error}), "
+                      f"falling back to {self.providers[i + 1].name}")
+        result.elapsed_seconds = round(time.monotonic() - start, 3)
+        return result
+
+    def _complete_with(self, provider: Provider, prompt: str, system: str, attempts: int,
+                       output_tokens: Optional[int] = None) -> LLMResult:
+        requests_bucket, tokens_bucket = self.buckets[provider.name]
+        estimate = estimate_tokens(system) + estimate_tokens(prompt) + (output_tokens or self.output_tokens)
+        payload = {
+            "model": provider.model,
+            "messages": [{"role": "system", "content": system}, {"role": "user", "content": prompt}],
+        }
+        if provider.json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        headers = {"Content-Type": "application/json"}
+        if provider.api_key:
+            headers["Authorization"] = f"Bearer {provider.api_key}"
+
+        result = LLMResult(provider=provider.name, model=provider.model, attempts=attempts)
+        for attempt in range(self.retries + 1):
+            requests_bucket.acquire(1)
+            tokens_bucket.acquire(estimate)
+            result.attempts += 1
+            retry_after = None
+            with self._slots:
+                try:
+                    r = self.session.post(provider.url, headers=headers, json=payload, timeout=self.timeout)
+                    result.status, result.error = r.status_code, None
+                    if r.ok:
+                        body = r.json()
+                        result.usage = body.get("usage") or {}
+                        result.text = ((body.get("choices") or [{}])[0].get("message") or {}).get("content")
+                        if result.usage.get("total_tokens"):
+                            tokens_bucket.adjust(result.usage["total_tokens"] - estimate)
+                        if not result.text:
+                            result.error = "empty completion"
+                        return result
+                    result.error = f"HTTP {r.status_code}"
+                    if r.status_code not in RETRY_STATUSES:
+                        return result
+                    retry_after = r.headers.get("Retry-After")
+                except (requests.RequestException, ValueError) as e:
+                    result.status, result.error = None, str(e) or type(e).__name__
+            if attempt < self.retries:
+                time.sleep(self._delay(attempt, retry_after))
+        return result
+
+    def _delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Full jitter: uniform(0, backoff * 2**attempt), at least Retry-After."""
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+        try:
+            delay = max(delay, min(self.max_backoff, float(retry_after))) if retry_after else delay
+        except ValueError:
+            pass
+        return delay
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """fn(item) for every item on the engine's pool; results in input
+        order. Exceptions propagate, as with a plain loop."""
+        futures = [self._pool.submit(fn, item) for item in items]
+        return [f.result() for f in futures]
+
+    def provider_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.stats.clear()
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
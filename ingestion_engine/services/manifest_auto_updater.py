@@ -56,6 +56,8 @@ def run_update_gdelt() -> Dict[str, Any]:
         from ingestion_engine.config.manifest_config import (
             GDELT_LLM_MAX_PER_RUN,
             GDELT_LLM_DELAY_SEC,
+            GDELT_LLM_BATCH_SIZE,
+            GDELT_LLM_BATCH_TOKEN_BUDGET,
         )
     except Exception as e:
         return {"error": str(e)}
@@ -66,11 +68,15 @@ def run_update_gdelt() -> Dict[str, Any]:
     events = data.get("events", [])
     if GDELT_LLM_MAX_PER_RUN > 0:
         events = events[:GDELT_LLM_MAX_PER_RUN]
+    batch_stats = {}
     enriched = analyze_events_with_articles(
         events,
         use_cache=True,
         lazy_if_high_confidence=False,
         delay_sec=GDELT_LLM_DELAY_SEC,
+        batch_size=GDELT_LLM_BATCH_SIZE,
+        batch_token_budget=GDELT_LLM_BATCH_TOKEN_BUDGET,
+        stats=batch_stats,
     )
     to_submit = enriched
     result = receive_events(to_submit, source="gdelt")
@@ -79,6 +85,7 @@ def run_update_gdelt() -> Dict[str, Any]:
         "aggregated": len(data.get("events", [])),
         "submitted": len(to_submit),
         "llm_provider": llm_stats,
+        "llm_batch": batch_stats,
         **result,
     }
 
@@ -0,0 +1,174 @@
+"""
+Near-duplicate detection for article texts (syndicated wire copies).
+
+minhash() turns the set of 3-word shingles of a text into a 64-value MinHash
+signature; the fraction of positions where two signatures agree estimates
+the Jaccard similarity of the shingle sets, so a copy with its own byline,
+footer or a trimmed last paragraph still scores ~0.9 while unrelated stories
+score ~0. MinHashIndex finds signatures above a similarity threshold without
+comparing against everything (LSH): the signature is cut into 16 bands of 4
+values, and only entries sharing at least one whole band are compared.
+
+title_key() normalises a headline (or a URL slug, see slug_title) so that
+copies of a story can be recognised before they are fetched.
+
+    representatives({url: text})   # one article per near-duplicate cluster
+"""
+import hashlib
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+SHINGLE = 3
+DEFAULT_THRESHOLD = 0.7
+MIN_TITLE_WORDS = 4
+
+# one seed per hash function; fixed so stored signatures stay comparable
+_SEEDS = np.random.RandomState(1).randint(0, 1 << 62, NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the to was were will with".split()
+)
+
+
+def _h64(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finaliser (uint64, wrapping)."""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """MinHash signature (NUM_PERM uint32) over lowercase word 3-shingles; None for empty text."""
+    words = _WORD.findall((text or "").lower())
+    if not words:
+        return None
+    shingles = {" ".join(words[i:i + SHINGLE]) for i in range(max(1, len(words) - SHINGLE + 1))}
+    hashes = np.fromiter((_h64(s) for s in shingles), dtype=np.uint64, count=len(shingles))
+    return (_mix(hashes[:, None] ^ _SEEDS).min(axis=0) >> np.uint64(32)).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+def band_keys(signature: np.ndarray) -> List[int]:
+    """One 64-bit key per band."""
+    rows = len(signature) // BANDS
+    return [
+        int.from_bytes(hashlib.blake2b(signature[i * rows:(i + 1) * rows].tobytes(), digest_size=8).digest(),
+                       "little", signed=True)
+        for i in range(BANDS)
+    ]
+
+
+class MinHashIndex:
+    """In-memory LSH index with union-find clusters over added keys."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._bands: List[Dict[int, List[str]]] = [{} for _ in range(BANDS)]
+        self._parent: Dict[str, str] = {}
+        self._order: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._signatures
+
+    def near(self, signature: np.ndarray) -> List[str]:
+        """Keys whose estimated similarity is at least threshold, in insertion order."""
+        candidates = set()
+        for table, value in zip(self._bands, band_keys(signature)):
+            candidates.update(table.get(value, ()))
+        return sorted((k for k in candidates if similarity(signature, self._signatures[k]) >= self.threshold),
+                      key=self._order.__getitem__)
+
+    def add(self, key: str, signature: np.ndarray) -> List[str]:
+        """Index key and join it to the cluster of every near match; returns the matches."""
+        matches = [k for k in self.near(signature) if k != key]
+        self._order.setdefault(key, len(self._order))
+        self._signatures[key] = signature
+        self._parent.setdefault(key, key)
+        for table, value in zip(self._bands, band_keys(signature)):
+            table.setdefault(value, []).append(key)
+        for other in matches:
+            self._union(key, other)
+        return matches
+
+    def cluster(self, key: str) -> str:
+        """Cluster id: the earliest-added key of the cluster."""
+        root = key
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[key] != root:
+            self._parent[key], key = root, self._parent[key]
+        return root
+
+    def _union(self, a: str, b: str):
+        ra, rb = self.cluster(a), self.cluster(b)
+        if ra != rb:
+            first, second = sorted((ra, rb), key=self._order.__getitem__)
+            self._parent[second] = first
+
+
+def clusters(texts: Dict[str, str], threshold: float = DEFAULT_THRESHOLD) -> List[List[str]]:
+    """Group keys of near-identical texts; clusters and members keep input order."""
+    index = MinHashIndex(threshold)
+    for key, text in texts.items():
+        signature = minhash(text)
+        if signature is not None:
+            index.add(key, signature)
+    groups: Dict[str, List[str]] = {}
+    for key, text in texts.items():
+        groups.setdefault(index.cluster(key) if key in index else key, []).append(key)
+    return list(groups.values())
+
+
+def representatives(texts: Dict[str, str], threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Tuple[str, int]]:
+    """{key: (text, copies)} with one entry per cluster: the longest text,
+    placed where the cluster first appears; copies counts the others."""
+    out = {}
+    for group in clusters(texts, threshold):
+        best = max(group, key=lambda k: len(texts[k] or ""))
+        out[best] = (texts[best], len(group) - 1)
+    return out
+
+
+def title_key(title: Optional[str]) -> Optional[str]:
+    """Normalised headline: lowercase words without stopwords; None when too
+    short to identify a story (e.g. "Live updates"). Numbers are kept, so
+    dated live-blog slugs (...-news-01-15-24) stay distinct, but only words
+    count towards MIN_TITLE_WORDS."""
+    words = [w for w in _WORD.findall((title or "").lower()) if w not in _STOPWORDS]
+    return " ".join(words) if sum(not w.isdigit() for w in words) >= MIN_TITLE_WORDS else None
+
+
+def slug_title(url: str) -> Optional[str]:
+    """Headline-like slug from the last meaningful URL path segment
+    (/2024/03/05/ceasefire-talks-resume-in-cairo.html -> ceasefire talks resume in cairo)."""
+    for segment in reversed([s for s in urlparse(url or "").path.split("/") if s]):
+        segment = re.sub(r"\.(s?html?|php|aspx?)$", "", segment, flags=re.I)
+        if segment.count("-") + segment.count("_") >= MIN_TITLE_WORDS - 1:
+            return re.sub(r"[-_]+", " ", segment)
+    return None
+
+
+def url_title_keys(url: str, title: Optional[str] = None) -> List[str]:
+    """Distinct title keys for a URL: from its headline (if known) and its slug."""
+    keys: Iterable[Optional[str]] = (title_key(title), title_key(slug_title(url)))
+    return list(dict.fromkeys(k for k in keys if k))
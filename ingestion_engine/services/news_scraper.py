@@ -1,10 +1,24 @@
 """
-News scraper: RSS feeds -> article links -> fetch full text (newspaper3k / readability).
+News scraper: RSS feeds -> article links -> fetch full text (text_extractor tiers).
 Emits events to raw_news_events.json for the interactions pipeline.
+
+run() is pipelined: feeds are polled concurrently, article downloads go to a
+bounded FetchEngine pool with a per-host delay (no global sleep), and each
+downloaded page is handed straight to a process pool for extraction while
+other downloads continue. Pages already in the article store skip both.
+Extraction (text_extractor.py) tries a cheap lxml pass first and only runs
+heavier extractors when its output fails the quality check.
+
+Polls are incremental (feed_state.py): each feed is requested with the ETag /
+Last-Modified from the previous run, a 304 is skipped without parsing, and
+only entries not emitted before become events.
 """
 import json
+import multiprocessing
+import os
 import re
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from urllib.parse import urlparse, urlunparse
@@ -153,6 +167,14 @@ def _get_raw_news_path() -> Path:
         return REPO_ROOT / "data" / "interactions" / "raw_news_events.json"
 
 
+def _get_feed_state_path() -> Path:
+    try:
+        from ingestion_engine.config.manifest_config import NEWS_SCRAPER_FEED_STATE
+        return Path(NEWS_SCRAPER_FEED_STATE)
+    except ImportError:
+        return REPO_ROOT / "data" / "interactions" / "cache" / "feed_state.json"
+
+
 def _get_config() -> Dict[str, Any]:
     try:
         from ingestion_engine.config.manifest_config import (
@@ -160,41 +182,49 @@ def _get_config() -> Dict[str, Any]:
             NEWS_SCRAPER_DELAY_SEC,
             NEWS_SCRAPER_MAX_RETRIES,
             NEWS_SCRAPER_USE_NEWSPAPER3K,
+            NEWS_SCRAPER_WORKERS,
+            NEWS_SCRAPER_EXTRACT_WORKERS,
         )
         return {
             "timeout": NEWS_SCRAPER_TIMEOUT,
             "delay_sec": NEWS_SCRAPER_DELAY_SEC,
             "max_retries": NEWS_SCRAPER_MAX_RETRIES,
             "use_newspaper3k": NEWS_SCRAPER_USE_NEWSPAPER3K,
+            "workers": NEWS_SCRAPER_WORKERS,
+            "extract_workers": NEWS_SCRAPER_EXTRACT_WORKERS,
         }
     except ImportError:
-        return {"timeout": 20, "delay_sec": 1.0, "max_retries": 2, "use_newspaper3k": True}
+        return {"timeout": 20, "delay_sec": 1.0, "max_retries": 2, "use_newspaper3k": True,
+                "workers": 8, "extract_workers": min(4, os.cpu_count() or 1)}
 
 
-def _fetch_with_newspaper3k(url: str, timeout: int) -> Optional[Dict[str, Any]]:
-    try:
-        from newspaper import Article
-        art = Article(url)
-        art.download()
-        art.parse()
-        pub = art.publish_date
-        if pub and hasattr(pub, "isoformat"):
-            published = pub.isoformat()
-        elif pub:
-            published = str(pub)[:10]
-        else:
-            published = None
-        return {
-            "title": (art.title or "").strip() or None,
-            "text": (art.text or "").strip() or None,
-            "authors": list(art.authors) if art.authors else [],
-            "published": published,
-        }
-    except Exception:
-        return None
+def _extract_article(url: str, html: str, use_newspaper3k: bool) -> Dict[str, Any]:
+    """Text and metadata from a downloaded page via the tiered extractor
+    (lxml, readability, then newspaper3k if enabled, then bs4). Top-level so
+    it can run in a process pool."""
+    from ingestion_engine.services.text_extractor import extract
+
+    article = extract(html, url, use_newspaper3k=use_newspaper3k)
+    return {"text": article.text, "extractor": article.extractor, "title": article.title,
+            "published": article.published, "authors": article.authors}
 
 
-CACHE_DIR = REPO_ROOT / "data" / "interactions" / "cache" / "articles"
+def _article_info(text: Optional[str], meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": meta.get("title"),
+        "snippet": text[:500].replace("\n", " ") if text else None,
+        "published": meta.get("published"),
+        "authors": meta.get("authors") or [],
+    }
+
+
+def _store_extracted(store, url: str, status: int, out: Dict[str, Any]) -> Dict[str, Any]:
+    meta = {k: out[k] for k in ("title", "published", "authors") if out.get(k)}
+    if out["text"]:
+        store.put(url, out["text"], status=status, extractor=out["extractor"], meta=meta)
+    else:
+        store.put_failure(url, status, "no text extracted")
+    return _article_info(out["text"], meta)
 
 
 def _fetch_and_cache_article(
@@ -204,44 +234,129 @@ def _fetch_and_cache_article(
     max_retries: int,
     delay_sec: float,
 ) -> Tuple[Optional[str], Optional[str], Optional[str], List[str]]:
-    """Returns (title, description_snippet, published, authors)."""
-    from ingestion_engine.services.article_fetcher import fetch_article
-    import hashlib
-    cache_key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
-    cache_file = CACHE_DIR / f"{cache_key}.txt"
-
-    title_override = None
-    published = None
-    authors: List[str] = []
-
-    if use_newspaper3k:
-        for attempt in range(max_retries + 1):
-            out = _fetch_with_newspaper3k(url, timeout)
-            if out:
-                title_override = out.get("title")
-                text = out.get("text")
-                if text:
-                    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-                    try:
-                        cache_file.write_text(text, encoding="utf-8")
-                    except Exception:
-                        pass
-                published = out.get("published")
-                authors = out.get("authors") or []
-                snippet = (text or "")[:500].replace("\n", " ") if text else ""
-                return (title_override, snippet, published, authors)
-            if attempt < max_retries:
-                time.sleep(delay_sec * (2 ** attempt))
-
-    for attempt in range(max_retries + 1):
-        text = fetch_article(url, use_cache=True, timeout=timeout)
-        if text:
-            snippet = text[:500].replace("\n", " ")
-            return (title_override, snippet, published, authors)
-        if attempt < max_retries:
-            time.sleep(delay_sec * (2 ** attempt))
-
-    return (title_override, None, published, authors)
+    """Returns (title, description_snippet, published, authors) for one URL.
+
+    Served from the article store when it has the URL (including recent
+    failures). Otherwise the page is downloaded once through the shared fetch
+    engine (pooled connections, per-host limits, retries with backoff) and
+    extracted inline. run() uses the pipelined _fetch_full_texts() instead.
+    """
+    from ingestion_engine.services.article_store import get_store
+    from ingestion_engine.services.fetch_engine import get_engine
+
+    store = get_store()
+    entry = store.get(url)
+    if entry is not None:
+        info = _article_info(entry.text, entry.meta)
+    else:
+        result = get_engine().get(url, timeout=timeout, retries=max_retries, backoff=delay_sec)
+        if not result.ok:
+            store.put_failure(url, result.status, result.error)
+            return (None, None, None, [])
+        info = _store_extracted(store, url, result.status, _extract_article(url, result.text, use_newspaper3k))
+    return (info["title"], info["snippet"], info["published"], info["authors"])
+
+
+def _fetch_full_texts(
+    urls: List[str],
+    engine,
+    config: Dict[str, Any],
+    errors: List[Dict[str, str]],
+    verbose: bool = False,
+    titles: Optional[Dict[str, str]] = None,
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, int]]:
+    """Fetch and extract many articles: {url: article info}, plus counts.
+
+    Store hits are answered first. So are syndicated copies, recognised by
+    headline (titles, e.g. from RSS) or URL slug: a copy of a cached story
+    reuses that article, and a copy of another URL in this run waits for it.
+    The rest are downloaded on the engine's pool (per-host delay, retries);
+    each page is submitted for extraction to a process pool as soon as it
+    arrives, so downloads and parsing overlap.
+    """
+    from ingestion_engine.services.article_store import get_store
+    from ingestion_engine.services.near_dup import url_title_keys
+
+    store = get_store()
+    titles = titles or {}
+    use_newspaper3k = config.get("use_newspaper3k", True)
+    infos: Dict[str, Dict[str, Any]] = {}
+    pending = []
+    copies: Dict[str, str] = {}  # url -> url fetched in this run for the same story
+    claimed: Dict[str, str] = {}  # title key -> url fetched in this run
+    counts = {"cached": 0, "downloaded": 0, "failed": 0, "duplicates": 0}
+    for url in urls:
+        entry = store.get(url)
+        if entry is not None:
+            infos[url] = _article_info(entry.text, entry.meta)
+            counts["cached"] += 1
+            continue
+        keys = url_title_keys(url, titles.get(url))
+        first = next((claimed[k] for k in keys if k in claimed), None)
+        copy = None if first else store.find_title(url, titles.get(url))
+        if first:
+            copies[url] = first
+        elif copy is not None:
+            infos[url] = _article_info(copy.text, copy.meta)
+        else:
+            pending.append(url)
+            claimed.update((k, url) for k in keys)
+            continue
+        counts["duplicates"] += 1
+    if not pending:
+        return infos, counts
+
+    downloads = {
+        engine.submit(engine.get, url, config.get("timeout", 20), config.get("max_retries", 2),
+                      config.get("delay_sec", 1.0)): url
+        for url in pending
+    }
+    extract_workers = config.get("extract_workers", 0)
+    procs = None
+    if extract_workers > 0 and len(pending) > 1:
+        # spawn, not fork: this runs inside the threaded API server, and a forked
+        # child can inherit locks held by other threads
+        procs = ProcessPoolExecutor(max_workers=extract_workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        extractions = {}
+        for future in as_completed(downloads):
+            url = downloads[future]
+            result = future.result()
+            if not result.ok:
+                store.put_failure(url, result.status, result.error)
+                errors.append({"url": url, "error": result.error or "fetch failed"})
+                counts["failed"] += 1
+                if verbose:
+                    print(f"Fetch error {url}: {result.error}")
+                continue
+            counts["downloaded"] += 1
+            if procs is None:
+                infos[url] = _store_extracted(store, url, result.status,
+                                              _extract_article(url, result.text, use_newspaper3k))
+            else:
+                extractions[procs.submit(_extract_article, url, result.text, use_newspaper3k)] = (url, result.status)
+        for future in as_completed(extractions):
+            url, status = extractions[future]
+            try:
+                infos[url] = _store_extracted(store, url, status, future.result())
+            except Exception as e:
+                errors.append({"url": url, "error": f"extract failed: {e}"})
+    finally:
+        if procs is not None:
+            procs.shutdown()
+    for url, first in copies.items():
+        if first in infos:
+            infos[url] = infos[first]
+    return infos, counts
+
+
+def _make_engine(config: Dict[str, Any]):
+    """Per-run engine: one request at a time per host, spaced by delay_sec."""
+    from ingestion_engine.services.fetch_engine import FetchEngine
+
+    return FetchEngine(max_workers=config.get("workers", 8), per_host=1,
+                       per_host_delay=config.get("delay_sec", 1.0), timeout=config.get("timeout", 20),
+                       user_agent=USER_AGENTS[1])
 
 
 def _entry_link(entry: Any) -> Optional[str]:
@@ -257,6 +372,16 @@ def _entry_link(entry: Any) -> Optional[str]:
     return None
 
 
+def _entry_id(entry: Any, url: Optional[str]) -> Optional[str]:
+    entry_id = entry.get("id") if hasattr(entry, "get") else None
+    return str(entry_id) if entry_id else url
+
+
+def _feed_validator(feed: Any, name: str) -> Optional[str]:
+    value = feed.get(name) if isinstance(feed, dict) else None
+    return value if isinstance(value, str) and value else None
+
+
 def _entry_published(entry: Any) -> Optional[str]:
     published = getattr(entry, "published_parsed", None) or entry.get("published_parsed")
     if published and hasattr(published, "tm_year"):
@@ -276,101 +401,143 @@ def run(
     fetch_full_text: bool = True,
     write_events: bool = True,
     verbose: bool = False,
+    incremental: bool = True,
 ) -> Dict[str, Any]:
+    """Poll feeds and emit one event per new entry.
+
+    With incremental=True, feeds are requested conditionally and entries
+    emitted by an earlier run are skipped. The feed state is only saved when
+    write_events is set, so a dry run never hides entries from the next run.
+    """
+    from ingestion_engine.services.feed_state import FeedState
+
     try:
         import feedparser
     except ImportError:
         return {"error": "feedparser not installed", "events": [], "count": 0, "errors": []}
 
+    started = time.monotonic()
     config = _get_config()
-    timeout = config.get("timeout", 20)
-    delay_sec = config.get("delay_sec", 1.0)
-    max_retries = config.get("max_retries", 2)
-    use_newspaper3k = config.get("use_newspaper3k", True)
-
     feed_urls = feed_urls or _get_feed_urls()
-    events = []
-    seen_urls: set = set()
+    feed_urls = [u for u in feed_urls if u and u.startswith("http")]
     errors: List[Dict[str, str]] = []
+    items: List[Dict[str, Any]] = []
+    infos: Dict[str, Dict[str, Any]] = {}
+    counts = {"cached": 0, "downloaded": 0, "failed": 0, "duplicates": 0}
+    feed_counts = {"modified": 0, "not_modified": 0, "skipped_entries": 0}
+    state = FeedState(_get_feed_state_path() if incremental else None)
+    engine = _make_engine(config)
+    try:
+        # 1. Poll every feed concurrently (conditional GET when state has validators)
+        polls = {
+            u: engine.submit(feedparser.parse, u, request_headers={"User-Agent": USER_AGENTS[0]},
+                             **(state.conditional_args(u) if incremental else {}))
+            for u in feed_urls
+        }
+        seen_urls: set = set()
+        for rss_url, future in polls.items():
+            try:
+                feed = future.result()
+            except Exception as e:
+                errors.append({"feed": rss_url, "error": str(e)})
+                if verbose:
+                    print(f"Feed error {rss_url}: {e}")
+                continue
+            if getattr(feed, "status", None) == 304:
+                feed_counts["not_modified"] += 1
+                state.touch(rss_url)
+                continue
+            feed_counts["modified"] += 1
+
+            count = 0
+            already_seen = state.seen(rss_url) if incremental else set()
+            current_ids, emitted_ids = [], []
+            for entry in feed.entries:
+                url = _entry_link(entry)
+                entry_id = _entry_id(entry, url)
+                if entry_id:
+                    current_ids.append(entry_id)
+                if count >= max_articles_per_feed or not url or url in seen_urls:
+                    continue
+                if entry_id in already_seen:
+                    feed_counts["skipped_entries"] += 1
+                    continue
+                seen_urls.add(url)
+                emitted_ids.append(entry_id)
+                rss_summary = getattr(entry, "summary", None) or entry.get("summary") or entry.get("description") or ""
+                items.append({
+                    "url": url,
+                    "title": (getattr(entry, "title", None) or entry.get("title") or "").strip() or "Untitled",
+                    "description": _strip_html(str(rss_summary), 400),
+                    "published": _entry_published(entry),
+                })
+                count += 1
+            if incremental:
+                state.update(rss_url, _feed_validator(feed, "etag"), _feed_validator(feed, "modified"),
+                             current_ids, emitted_ids)
+        feeds_done = time.monotonic()
+
+        # 2. Download + extract full text (pipelined)
+        if fetch_full_text and items:
+            infos, counts = _fetch_full_texts([it["url"] for it in items], engine, config, errors, verbose,
+                                              titles={it["url"]: it["title"] for it in items})
+    finally:
+        engine.close()
 
-    for rss_url in feed_urls:
-        if not rss_url or not rss_url.startswith("http"):
-            continue
-        try:
-            feed = feedparser.parse(rss_url, request_headers={"User-Agent": USER_AGENTS[0]})
-        except Exception as e:
-            errors.append({"feed": rss_url, "error": str(e)})
-            if verbose:
-                print(f"Feed error {rss_url}: {e}")
-            continue
+    events = []
+    for it in items:
+        title, description, published = it["title"], it["description"], it["published"]
+        authors: List[str] = []
+        info = infos.get(it["url"])
+        if info:
+            if info["title"]:
+                title = info["title"]
+            snippet = info["snippet"]
+            if snippet:
+                description = snippet if len(snippet) > len(description) else description
+            if info["published"]:
+                published = info["published"]
+            if info["authors"]:
+                authors = info["authors"]
 
-        count = 0
-        for entry in feed.entries:
-            if count >= max_articles_per_feed:
-                break
-            url = _entry_link(entry)
-            if not url or url in seen_urls:
-                continue
-            seen_urls.add(url)
-
-            rss_title = (getattr(entry, "title", None) or entry.get("title") or "").strip() or "Untitled"
-            rss_summary = getattr(entry, "summary", None) or entry.get("summary") or entry.get("description") or ""
-            summary_plain = _strip_html(str(rss_summary), 400)
-            rss_published = _entry_published(entry)
-
-            title = rss_title
-            description = summary_plain
-            published = rss_published
-            authors: List[str] = []
-
-            if fetch_full_text:
-                time.sleep(delay_sec)
-                try:
-                    title_override, snippet, pub, auth = _fetch_and_cache_article(
-                        url, use_newspaper3k, timeout, max_retries, delay_sec
-                    )
-                    if title_override:
-                        title = title_override
-                    if snippet:
-                        description = snippet if len(snippet) > len(description) else description
-                    if pub:
-                        published = pub
-                    if auth:
-                        authors = auth
-                except Exception as e:
-                    errors.append({"url": url, "error": str(e)})
-                    if verbose:
-                        print(f"Fetch error {url}: {e}")
-
-            cat, sub = _infer_category_subtype(title, description)
-            events.append({
-                "name": title,
-                "title": title,
-                "source_url": url,
-                "description": description[:400] if description else "",
-                "participants": [],
-                "countries": [],
-                "type": cat,
-                "category": cat,
-                "subtype": sub,
-                "visualization_type": "dot",
-                "date": published,
-                "authors": authors,
-                "source": "news_scraper",
-            })
-            count += 1
+        cat, sub = _infer_category_subtype(title, description)
+        events.append({
+            "name": title,
+            "title": title,
+            "source_url": it["url"],
+            "description": description[:400] if description else "",
+            "participants": [],
+            "countries": [],
+            "type": cat,
+            "category": cat,
+            "subtype": sub,
+            "visualization_type": "dot",
+            "date": published,
+            "authors": authors,
+            "source": "news_scraper",
+        })
 
     if write_events and events:
         out_path = _get_raw_news_path()
         out_path.parent.mkdir(parents=True, exist_ok=True)
         with open(out_path, "w", encoding="utf-8") as f:
             json.dump({"events": events, "source": "news_scraper"}, f, indent=2)
+    if write_events and incremental:
+        state.save()
 
+    finished = time.monotonic()
     return {
         "events": events,
         "count": len(events),
         "errors": errors,
-        "feeds_processed": len([u for u in feed_urls if u and u.startswith("http")]),
+        "feeds_processed": len(feed_urls),
+        "feeds": feed_counts,
+        "articles": counts,
+        "elapsed_seconds": round(finished - started, 3),
+        "timings": {
+            "feeds_seconds": round(feeds_done - started, 3),
+            "articles_seconds": round(finished - feeds_done, 3),
+        },
     }
 
 
@@ -384,8 +551,8 @@ def run_from_gdelt_links(
 ) -> Dict[str, Any]:
     """Extract URLs from GDELT (latest + hotspots), fetch articles, emit events to raw_news_events."""
     from ingestion_engine.services.gdelt_link_extractor import extract_all
-    from ingestion_engine.services.article_fetcher import fetch_article
 
+    started = time.monotonic()
     result = extract_all(
         from_latest=from_latest,
         from_window=False,
@@ -402,24 +569,22 @@ def run_from_gdelt_links(
         return {"events": [], "count": 0, "errors": [], "gdelt_unique": result.get("unique_count", 0)}
 
     config = _get_config()
-    delay_sec = config.get("delay_sec", 1.0)
-    events = []
-    errors = []
-    for i, url in enumerate(urls):
+    errors: List[Dict[str, str]] = []
+    infos: Dict[str, Dict[str, Any]] = {}
+    if fetch_full_text:
         if verbose:
-            print(f"  [{i+1}/{len(urls)}] {url[:60]}...")
+            print(f"  Fetching {len(urls)} GDELT articles...")
+        engine = _make_engine(config)
+        try:
+            infos, _ = _fetch_full_texts(urls, engine, config, errors, verbose)
+        finally:
+            engine.close()
+
+    events = []
+    for url in urls:
         title = url.split("/")[-1].replace("-", " ").replace("_", " ")[:80] or "GDELT article"
-        description = ""
-        if fetch_full_text:
-            time.sleep(delay_sec)
-            try:
-                text = fetch_article(url, use_cache=True)
-                if text:
-                    description = _strip_html(text[:2000], 400)
-                    if not description:
-                        description = text[:400].replace("\n", " ")
-            except Exception as e:
-                errors.append({"url": url, "error": str(e)})
+        snippet = (infos.get(url) or {}).get("snippet") or ""
+        description = _strip_html(snippet, 400) or snippet[:400]
         cat, sub = _infer_category_subtype(title, description)
         events.append({
             "name": title,
@@ -446,6 +611,7 @@ def run_from_gdelt_links(
         "count": len(events),
         "errors": errors,
         "gdelt_unique": result.get("unique_count", 0),
+        "elapsed_seconds": round(time.monotonic() - started, 3),
     }
 
 
@@ -456,10 +622,10 @@ if __name__ == "__main__":
     p.add_argument("--no-write", action="store_true", help="Do not write raw_news_events.json")
     p.add_argument("--max", type=int, default=15, help="Max articles per feed")
     p.add_argument("--verbose", "-v", action="store_true")
-    p.add_argument("--no-newspaper3k", action="store_true", help="Use only readability/requests")
+    p.add_argument("--no-newspaper3k", action="store_true", help="Never escalate extraction to newspaper3k")
+    p.add_argument("--full", action="store_true", help="Ignore feed state: no conditional GET, emit every entry")
     p.add_argument("--gdelt", type=int, default=0, metavar="N", help="Use GDELT sources: extract N URLs and fetch as events")
     args = p.parse_args()
-    import os
     if args.no_newspaper3k:
         os.environ["NEWS_SCRAPER_USE_NEWSPAPER3K"] = "false"
 
@@ -477,8 +643,11 @@ if __name__ == "__main__":
             write_events=not args.no_write,
             max_articles_per_feed=args.max,
             verbose=args.verbose,
+            incremental=not args.full,
         )
         print(f"Collected {result.get('count', 0)} events from {result.get('feeds_processed', 0)} feeds")
+    if "elapsed_seconds" in result:
+        print(f"Wall clock: {result['elapsed_seconds']}s {result.get('timings', '')}")
     if result.get("error"):
         print("Error:", result["error"])
     if result.get("errors"):
@@ -0,0 +1,232 @@
+"""
+Article text extraction: cheap first, heavier extractors only when needed.
+
+extract(html) works on an already-downloaded page and always returns plain
+text (never HTML). Tiers, in order of cost:
+
+1. lxml     - one lxml parse; boilerplate tags dropped, the container with
+              the most paragraph text wins (link-heavy paragraphs skipped).
+2. readability - readability-lxml's summary, flattened to text.
+3. newspaper3k - only with use_newspaper3k; parses the given html (no second
+              download).
+4. bs4      - whole-page get_text() as a last resort.
+
+A tier's result is accepted when it passes good_enough(): enough characters,
+and paragraphs that read like prose rather than menus. If no tier passes
+(e.g. a one-paragraph brief), the first non-empty text is kept, since earlier
+tiers strip more boilerplate. Title, authors and published date come
+from the page's meta tags on the same lxml parse; newspaper3k fills them in
+when it runs.
+
+    article = extract(html, url)
+    article.text, article.extractor, article.title
+"""
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+MAX_TEXT_LENGTH = 150000
+MIN_TEXT_CHARS = 300
+MIN_AVG_PARAGRAPH_CHARS = 60
+MIN_PARAGRAPH_CHARS = 25
+MAX_LINK_DENSITY = 0.5
+
+BOILERPLATE_TAGS = ("script", "style", "noscript", "nav", "footer", "header", "aside", "form",
+                    "iframe", "svg", "button", "select", "figure")
+TEXT_TAGS = ("p", "h2", "h3", "blockquote", "pre")
+
+
+@dataclass
+class ExtractedArticle:
+    text: Optional[str] = None
+    extractor: Optional[str] = None
+    title: Optional[str] = None
+    published: Optional[str] = None
+    authors: List[str] = field(default_factory=list)
+    tried: List[str] = field(default_factory=list)
+
+    def meta(self) -> dict:
+        return {k: v for k, v in (("title", self.title), ("published", self.published),
+                                  ("authors", self.authors)) if v}
+
+
+def good_enough(text: Optional[str]) -> bool:
+    """Quality gate between tiers: long enough, and paragraphs average
+    sentence length (menus, cookie banners and link lists do not)."""
+    if not text or len(text) < MIN_TEXT_CHARS:
+        return False
+    paragraphs = [p for p in text.split("\n") if p.strip()]
+    return len(text) / max(1, len(paragraphs)) >= MIN_AVG_PARAGRAPH_CHARS
+
+
+def _clean(text: str) -> str:
+    text = re.sub(r"[ \t\r\f\v\xa0]+", " ", text)
+    text = re.sub(r" *\n *", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()[:MAX_TEXT_LENGTH]
+
+
+def _parse(html: str):
+    try:
+        import lxml.html
+        return lxml.html.document_fromstring(html)
+    except Exception:
+        return None
+
+
+def _node_text(node) -> str:
+    return " ".join(node.text_content().split())
+
+
+def _meta_content(doc, *xpaths: str) -> Optional[str]:
+    for xp in xpaths:
+        values = doc.xpath(xp)
+        for value in [values] if isinstance(values, str) else values:
+            value = " ".join(str(value).split())
+            if value:
+                return value
+    return None
+
+
+def _page_meta(doc, article: ExtractedArticle):
+    """Title, published date and authors from meta tags (before boilerplate is dropped)."""
+    if doc is None:
+        return
+    article.title = _meta_content(
+        doc, '//meta[@property="og:title"]/@content', '//meta[@name="twitter:title"]/@content',
+        "string(//h1[1])", "//title/text()",
+    )
+    published = _meta_content(
+        doc, '//meta[@property="article:published_time"]/@content', '//meta[@itemprop="datePublished"]/@content',
+        '//meta[@name="pubdate"]/@content', '//meta[@name="date"]/@content', "//time/@datetime",
+    )
+    article.published = published[:25] if published else None
+    authors = doc.xpath('//meta[@name="author"]/@content | //meta[@property="article:author"]/@content')
+    article.authors = list(dict.fromkeys(
+        a.strip() for a in authors if a.strip() and not a.strip().startswith("http")
+    ))
+
+
+def _extract_lxml(doc) -> Optional[str]:
+    """Paragraph-density extractor on an lxml tree (mutates the tree)."""
+    if doc is None:
+        return None
+    for node in doc.xpath("|".join(f"//{t}" for t in BOILERPLATE_TAGS)):
+        node.drop_tree()
+    scores = {}
+    for p in doc.iter("p"):
+        text = _node_text(p)
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        links = sum(len(_node_text(a)) for a in p.iter("a"))
+        if links / len(text) > MAX_LINK_DENSITY:
+            continue
+        parent = p.getparent()
+        if parent is None:
+            continue
+        scores[parent] = scores.get(parent, 0) + len(text)
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            scores[grandparent] = scores.get(grandparent, 0) + len(text) / 2
+    if not scores:
+        return None
+    best = max(scores, key=scores.get)
+    blocks = []
+    for node in best.iter(*TEXT_TAGS):
+        text = _node_text(node)
+        if not text or _inside_text_block(node, best):
+            continue
+        if node.tag == "p" and len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        links = sum(len(_node_text(a)) for a in node.iter("a"))
+        if links / len(text) > MAX_LINK_DENSITY:
+            continue
+        blocks.append(text)
+    return _clean("\n\n".join(blocks)) or None
+
+
+def _inside_text_block(node, root) -> bool:
+    """True for e.g. a <p> inside a <blockquote>: the outer block already has its text."""
+    for ancestor in node.iterancestors():
+        if ancestor is root:
+            return False
+        if ancestor.tag in TEXT_TAGS:
+            return True
+    return False
+
+
+def _html_to_text(fragment: str) -> Optional[str]:
+    """Flatten an HTML fragment to text, one block element per paragraph."""
+    try:
+        import lxml.html
+        node = lxml.html.fragment_fromstring(fragment, create_parent="div")
+    except Exception:
+        return None
+    blocks = [_node_text(n) for n in node.iter(*TEXT_TAGS) if not _inside_text_block(n, node)]
+    blocks = [b for b in blocks if b]
+    return _clean("\n\n".join(blocks) if blocks else _node_text(node)) or None
+
+
+def _extract_readability(html: str) -> Optional[str]:
+    try:
+        from readability import Document
+        return _html_to_text(Document(html).summary(html_partial=True))
+    except Exception:
+        return None
+
+
+def _extract_newspaper(html: str, url: str, article: ExtractedArticle) -> Optional[str]:
+    try:
+        from newspaper import Article
+        art = Article(url or "http://localhost/")
+        art.download(input_html=html)
+        art.parse()
+    except Exception:
+        return None
+    pub = art.publish_date
+    if pub:
+        article.published = pub.isoformat() if hasattr(pub, "isoformat") else str(pub)[:10]
+    article.title = (art.title or "").strip() or article.title
+    if art.authors:
+        article.authors = list(art.authors)
+    return _clean(art.text or "") or None
+
+
+def _extract_bs4(html: str) -> Optional[str]:
+    try:
+        from bs4 import BeautifulSoup
+        try:
+            soup = BeautifulSoup(html, "lxml")
+        except Exception:
+            soup = BeautifulSoup(html, "html.parser")
+        for e in soup.find_all(["script", "style", "noscript", "nav", "footer", "header", "aside"]):
+            e.decompose()
+        return _clean(soup.get_text(separator="\n", strip=True)) or None
+    except Exception:
+        return None
+
+
+def extract(html: str, url: str = "", use_newspaper3k: bool = False) -> ExtractedArticle:
+    """Plain text plus metadata from a downloaded page; see module docstring."""
+    article = ExtractedArticle()
+    if not html:
+        return article
+    doc = _parse(html)
+    _page_meta(doc, article)
+    tiers = [
+        ("lxml", lambda: _extract_lxml(doc)),
+        ("readability", lambda: _extract_readability(html)),
+    ]
+    if use_newspaper3k:
+        tiers.append(("newspaper3k", lambda: _extract_newspaper(html, url, article)))
+    tiers.append(("bs4", lambda: _extract_bs4(html)))
+    fallback = (None, None)
+    for name, run in tiers:
+        article.tried.append(name)
+        text = run()
+        if good_enough(text):
+            article.text, article.extractor = text, name
+            return article
+        if text and fallback[0] is None:
+            fallback = (text, name)
+    article.text, article.extractor = fallback
+    return article
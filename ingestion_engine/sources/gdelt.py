@@ -0,0 +1,598 @@
+"""
+Shared GDELT 2.0 stream parsing: lastupdate.txt, mentions, export and GKG counts.
+
+Used by the server firehose (server/app/services/firehose.py) and the CLI
+streamer (streamers/gdelt_firehose.py) so both parse, filter and serialize
+events the same way.
+
+GDELT files are unquoted tab-separated text, so rows are split with
+str.split('\t') rather than the csv module, and each row is rejected on the
+cheapest check first (column count, event code, source count) before any
+float parsing. stream_export() / stream_gkg_counts() yield FeatureBatch
+objects of at most batch_size features.
+
+The live state is stored as GeoJSON; encode_columnar() / encode_arrow()
+turn it into a column-oriented payload for /api/live?format=columnar|arrow.
+"""
+import io
+import json
+import os
+import zipfile
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+import requests
+
+from ingestion_engine.streamers.taxonomy import COLORS, GDELT_MAPPING
+from ingestion_engine.transforms.event_scores import export_numeric_fields
+
+LAST_UPDATE_URL = "http://data.gdeltproject.org/gdeltv2/lastupdate.txt"
+
+SOURCE_NAME = "GDELT Source"
+DEFAULT_BATCH_SIZE = 5000
+
+# Export (events) columns, GDELT 2.0
+EXPORT_MIN_COLUMNS = 58
+COL_EVENT_ID = 0
+COL_DATE = 1
+COL_ACTOR1_NAME = 6
+COL_ACTOR1_COUNTRY = 7
+COL_ACTOR2_NAME = 16
+COL_ACTOR2_COUNTRY = 17
+COL_EVENT_CODE = 26
+COL_NUM_SOURCES = 32
+COL_NUM_ARTICLES = 33
+COL_ACTIONGEO_FULLNAME = 52
+COL_ACTIONGEO_COUNTRY = 53
+COL_ACTIONGEO_ADM1 = 54
+COL_SOURCE_URL = 60
+# ActionGeo first, then Actor1Geo / Actor2Geo
+LAT_COLUMNS = (56, 40, 48)
+LON_COLUMNS = (57, 41, 49)
+
+# Mentions columns
+COL_MENTION_EVENT_ID = 0
+COL_MENTION_URL = 5
+
+# GKG columns used for count events
+COL_GKG_DATE = 1
+COL_GKG_SOURCE_NAME = 3
+COL_GKG_DOCUMENT = 4
+COL_GKG_V2COUNTS = 6
+
+# Root-code categories for event codes missing from the taxonomy (root_fallback=True)
+ROOT_CATEGORIES = {
+    "19": "CONFLICT",
+    "18": "VIOLENCE",
+    "14": "PROTEST",
+    "17": "CRIME",
+    "02": "DISPLACEMENT",
+}
+
+GKG_COUNT_CATEGORIES = {
+    "KILL": "CONFLICT",
+    "WOUND": "CONFLICT",
+    "DEATH": "CONFLICT",
+    "ARREST": "CRIME",
+    "KIDNAP": "CRIME",
+    "PROTEST": "PROTEST",
+    "DISPLACED": "DISPLACEMENT",
+    "REFUGEES": "DISPLACEMENT",
+    "EVACUATION": "DISPLACEMENT",
+}
+
+
+# Columnar live payload
+COLUMNAR_FORMAT = "gdelt-columnar"
+COLUMNAR_VERSION = 1
+# Derived from category on the client via the payload palette
+DERIVED_PROPERTIES = ("color",)
+
+
+@dataclass
+class UpdateUrls:
+    export: Optional[str] = None
+    mentions: Optional[str] = None
+    gkg: Optional[str] = None
+
+
+@dataclass
+class FeatureBatch:
+    kind: str                    # "export" or "gkg"
+    url: str
+    features: List[dict]
+    rows_read: int               # rows consumed from the file for this batch
+    ingest_time: datetime
+    index: int = 0
+    last: bool = False
+
+
+# lastupdate.txt ---------------------------------------------------------
+
+def parse_lastupdate(text: str) -> UpdateUrls:
+    """`size hash url` lines -> export / mentions / gkg URLs (mentions derived if absent)."""
+    urls = UpdateUrls()
+    for line in text.splitlines():
+        parts = line.strip().split(" ")
+        if len(parts) < 3:
+            continue
+        url = parts[2]
+        lower = url.lower()
+        if lower.endswith("mentions.csv.zip"):
+            urls.mentions = url
+        elif lower.endswith("export.csv.zip"):
+            urls.export = url
+        elif lower.endswith("gkg.csv.zip"):
+            urls.gkg = url
+    if urls.export and not urls.mentions:
+        urls.mentions = urls.export.replace(".export.", ".mentions.")
+    return urls
+
+
+def fetch_lastupdate(timeout: int = 30) -> UpdateUrls:
+    resp = requests.get(LAST_UPDATE_URL, timeout=timeout)
+    resp.raise_for_status()
+    return parse_lastupdate(resp.text)
+
+
+# Row iteration ----------------------------------------------------------
+
+def iter_zip_rows(content: bytes) -> Iterator[List[str]]:
+    """Tab-split rows of the first member of a zip archive."""
+    with zipfile.ZipFile(io.BytesIO(content)) as zf:
+        with zf.open(zf.namelist()[0]) as raw:
+            text = io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="")
+            for line in text:
+                yield line.rstrip("\r\n").split("\t")
+
+
+def iter_remote_rows(url: str, timeout: int = 60) -> Iterator[List[str]]:
+    resp = requests.get(url, timeout=timeout)
+    resp.raise_for_status()
+    yield from iter_zip_rows(resp.content)
+
+
+# Mentions ---------------------------------------------------------------
+
+def build_mention_map(rows: Iterable[List[str]]) -> Dict[str, Set[str]]:
+    """GlobalEventID -> set of http(s) article URLs."""
+    mention_map: Dict[str, Set[str]] = {}
+    for row in rows:
+        if len(row) <= COL_MENTION_URL:
+            continue
+        url = row[COL_MENTION_URL]
+        if not url.startswith("http"):
+            continue
+        eid = row[COL_MENTION_EVENT_ID]
+        urls = mention_map.get(eid)
+        if urls is None:
+            mention_map[eid] = {url}
+        else:
+            urls.add(url)
+    return mention_map
+
+
+def attach_sources(features: List[dict], mention_map: Dict[str, Set[str]]) -> List[dict]:
+    """Set each feature's sources to its primary URL plus every mention URL."""
+    for feat in features:
+        props = feat.get("properties") or {}
+        links = set(mention_map.get(str(props.get("eventid", "")), ()))
+        primary = props.get("sourceurl")
+        if primary:
+            links.add(primary)
+        props["sources"] = [{"url": u, "type": "article", "name": SOURCE_NAME} for u in sorted(links)]
+        feat["properties"] = props
+    return features
+
+
+# Export rows ------------------------------------------------------------
+
+def _first_float(row: List[str], columns) -> Optional[float]:
+    for idx in columns:
+        value = row[idx] if len(row) > idx else ""
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def _int(value: str) -> int:
+    try:
+        return int(float(value)) if value else 0
+    except ValueError:
+        return 0
+
+
+def categorize(code: str, mapping: Dict[str, str] = GDELT_MAPPING, root_fallback: bool = False) -> Optional[str]:
+    category = mapping.get(code)
+    if category is None and root_fallback:
+        category = ROOT_CATEGORIES.get(code[:2])
+    if category == "OTHER":
+        return None
+    return category
+
+
+def parse_export_row(row: List[str], mapping: Dict[str, str] = GDELT_MAPPING,
+                     colors: Dict[str, str] = COLORS, root_fallback: bool = False) -> Optional[dict]:
+    """One export row -> GeoJSON feature, or None if filtered out.
+
+    Dropped: short rows, event codes outside the taxonomy, events with no
+    sources, and rows without valid coordinates.
+    """
+    if len(row) < EXPORT_MIN_COLUMNS:
+        return None
+    code = row[COL_EVENT_CODE]
+    category = categorize(code, mapping, root_fallback)
+    if not category:
+        return None
+    num_sources = _int(row[COL_NUM_SOURCES])
+    if num_sources < 1:
+        return None
+
+    lat = _first_float(row, LAT_COLUMNS)
+    lng = _first_float(row, LON_COLUMNS)
+    if lat is None or lng is None or abs(lat) > 90 or abs(lng) > 180:
+        return None
+
+    source_url = row[COL_SOURCE_URL] if len(row) > COL_SOURCE_URL else ""
+    actor1 = row[COL_ACTOR1_NAME]
+    action_geo = row[COL_ACTIONGEO_FULLNAME]
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lng, lat]},
+        "properties": {
+            "category": category,
+            "date": row[COL_DATE],
+            "countryname": action_geo,
+            "name": f"{category}: {actor1 or 'Unidentified'}",
+            "color": colors.get(category, "#808080"),
+            "importance": _int(row[COL_NUM_ARTICLES]) or 1,
+            "eventid": row[COL_EVENT_ID],
+            "sourceurl": source_url,
+            "sources": [{"url": source_url, "type": "article", "name": SOURCE_NAME}] if source_url else [],
+            "eventcode": code,
+            "actor1": actor1,
+            "actor2": row[COL_ACTOR2_NAME],
+            "actiongeo": action_geo,
+            "actionadm1": row[COL_ACTIONGEO_ADM1],
+            "actor1countrycode": row[COL_ACTOR1_COUNTRY],
+            "actor2countrycode": row[COL_ACTOR2_COUNTRY],
+            "actiongeo_countrycode": row[COL_ACTIONGEO_COUNTRY],
+            **export_numeric_fields(row),
+        },
+    }
+
+
+# GKG count rows ---------------------------------------------------------
+
+def parse_gkg_counts_row(row: List[str], colors: Dict[str, str] = COLORS) -> List[dict]:
+    """V2.1Counts entries with coordinates and a known count type -> features."""
+    if len(row) <= COL_GKG_V2COUNTS or not row[COL_GKG_V2COUNTS]:
+        return []
+    source_name = row[COL_GKG_SOURCE_NAME]
+    if not source_name:
+        return []  # drop "ghost" reports without a publisher
+    date_str = row[COL_GKG_DATE]
+    document = row[COL_GKG_DOCUMENT]
+
+    features = []
+    for entry in row[COL_GKG_V2COUNTS].split(";"):
+        parts = entry.split("#")
+        if len(parts) < 10:
+            continue
+        ctype = parts[0]
+        category = GKG_COUNT_CATEGORIES.get(ctype)
+        if not category or not parts[8] or not parts[9]:
+            continue
+        try:
+            lat, lng = float(parts[8]), float(parts[9])
+        except ValueError:
+            continue
+        count = parts[1]
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [lng, lat]},
+            "properties": {
+                "category": category,
+                "name": f"{category}: {count} {parts[2] or 'people'}",
+                "date": date_str,
+                "color": colors.get(category, "#808080"),
+                "source": source_name,
+                "sourceurl": document,
+                "html": f"<b>{category}</b><br>Count: {count}<br>Type: {ctype}<br>Source: {source_name}",
+                # one record yields several counts, so the document URL alone is not a key
+                "event_sig": f"gkg:{document}|{ctype}|{count}|{lat}|{lng}",
+            },
+        })
+    return features
+
+
+# Streaming --------------------------------------------------------------
+
+def _batched(kind: str, url: str, rows: Iterable[List[str]], parse: Callable[[List[str]], List[dict]],
+             batch_size: int, ingest_time: datetime) -> Iterator[FeatureBatch]:
+    features: List[dict] = []
+    rows_read = 0
+    index = 0
+    for row in rows:
+        rows_read += 1
+        features.extend(parse(row))
+        if len(features) >= batch_size:
+            yield FeatureBatch(kind, url, features, rows_read, ingest_time, index)
+            features, rows_read, index = [], 0, index + 1
+    yield FeatureBatch(kind, url, features, rows_read, ingest_time, index, last=True)
+
+
+def stream_export(url: str, mention_map: Optional[Dict[str, Set[str]]] = None,
+                  batch_size: int = DEFAULT_BATCH_SIZE, ingest_time: Optional[datetime] = None,
+                  mapping: Dict[str, str] = GDELT_MAPPING, colors: Dict[str, str] = COLORS,
+                  root_fallback: bool = False, rows: Optional[Iterable[List[str]]] = None,
+                  ) -> Iterator[FeatureBatch]:
+    """Parse an export file into batches of finished features (sources from
+    mention_map, ingested_at and event_sig set). `rows` overrides the download."""
+    ingest_time = ingest_time or datetime.now(timezone.utc)
+    stamp = ingest_time.isoformat()
+    mention_map = mention_map or {}
+
+    def parse(row):
+        feat = parse_export_row(row, mapping, colors, root_fallback)
+        if feat is None:
+            return ()
+        attach_sources([feat], mention_map)
+        props = feat["properties"]
+        props["ingested_at"] = stamp
+        props["event_sig"] = event_signature(feat)
+        return (feat,)
+
+    source = rows if rows is not None else iter_remote_rows(url)
+    yield from _batched("export", url, source, parse, batch_size, ingest_time)
+
+
+def stream_gkg_counts(url: str, batch_size: int = DEFAULT_BATCH_SIZE, ingest_time: Optional[datetime] = None,
+                      colors: Dict[str, str] = COLORS, rows: Optional[Iterable[List[str]]] = None,
+                      ) -> Iterator[FeatureBatch]:
+    ingest_time = ingest_time or datetime.now(timezone.utc)
+    source = rows if rows is not None else iter_remote_rows(url)
+    yield from _batched("gkg", url, source, lambda row: parse_gkg_counts_row(row, colors), batch_size, ingest_time)
+
+
+# Rolling window ---------------------------------------------------------
+
+def event_signature(feature: dict) -> str:
+    """Stable dedup key: stored event_sig, else event id, else source URL,
+    else name/date/coordinates."""
+    props = feature.get("properties", {})
+    if props.get("event_sig"):
+        return props["event_sig"]
+    event_id = props.get("eventid")
+    if event_id:
+        return f"eid:{event_id}"
+    source = props.get("sourceurl")
+    if source:
+        return f"url:{source}"
+    coords = feature.get("geometry", {}).get("coordinates", [None, None])
+    name = props.get("name") or "unknown"
+    date_str = props.get("date") or ""
+    return f"sig:{name}|{date_str}|{coords[0]}|{coords[1]}"
+
+
+def prune_window(features: Iterable[dict], min_date: Optional[date] = None) -> List[dict]:
+    """Deduplicate by event_sig / signature (first wins) and drop events dated
+    before min_date (default: yesterday). Export events need importance >= 1."""
+    min_date = min_date or (datetime.now(timezone.utc).date() - timedelta(days=1))
+    min_yyyymmdd = min_date.strftime("%Y%m%d")
+    seen: Set[str] = set()
+    kept = []
+    for feat in features:
+        props = feat["properties"]
+        if props.get("importance", 0) < 1:
+            if props.get("source") == "GDELT_EXPORT":
+                continue
+            if not props.get("source_name") and not props.get("source"):
+                continue
+        sig = props.get("event_sig") or event_signature(feat)
+        if sig in seen:
+            continue
+        evt_date = str(props.get("date", ""))
+        if len(evt_date) >= 8 and evt_date[:8] < min_yyyymmdd:
+            continue
+        seen.add(sig)
+        kept.append(feat)
+    return kept
+
+
+# Output -----------------------------------------------------------------
+
+def encode_collection(collection: dict) -> bytes:
+    """Compact JSON for a FeatureCollection (no indentation or padding)."""
+    return json.dumps(collection, separators=(",", ":")).encode("utf-8")
+
+
+def write_atomic(path: str, payload: bytes):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+# Columnar payload --------------------------------------------------------
+#
+# {"format": "gdelt-columnar", "version": 1, "length": n,
+#  "coordinates": [lng0, lat0, lng1, lat1, ...],
+#  "palette": {category: color},
+#  "urls": [url, ...],
+#  "columns": {name: {"values": [...]}                      plain
+#                  | {"dictionary": [...], "codes": [...]}  repeated strings
+#                  | {"url_codes": [...]}                   sourceurl -> urls
+#                  | {"url_lists": [[...], ...]}}           sources -> urls
+# }
+#
+# A null value means the property is absent for that feature; decoding
+# drops it, so properties that were explicitly null come back missing.
+
+def _plain_sources(sources) -> bool:
+    return isinstance(sources, list) and all(
+        isinstance(s, dict) and s.keys() == {"url", "type", "name"}
+        and s["type"] == "article" and s["name"] == SOURCE_NAME
+        for s in sources
+    )
+
+
+def _property_columns(features: List[dict]) -> Dict[str, list]:
+    names: Dict[str, None] = {}
+    for feat in features:
+        for key in feat.get("properties") or {}:
+            if key not in DERIVED_PROPERTIES:
+                names.setdefault(key)
+    return {
+        name: [(feat.get("properties") or {}).get(name) for feat in features]
+        for name in names
+    }
+
+
+def _dictionary_worthwhile(values: list) -> bool:
+    strings = [v for v in values if v is not None]
+    if not strings or not all(isinstance(v, str) for v in strings):
+        return False
+    return len(set(strings)) * 2 <= len(strings)
+
+
+def _palette(features: List[dict], colors: Dict[str, str]) -> Dict[str, str]:
+    palette = {}
+    for feat in features:
+        props = feat.get("properties") or {}
+        category = props.get("category")
+        if category is not None and category not in palette:
+            palette[category] = props.get("color") or colors.get(category, "#808080")
+    return palette
+
+
+def to_columnar(collection: dict, colors: Dict[str, str] = COLORS) -> dict:
+    """FeatureCollection of Point features -> columnar dict (see layout above)."""
+    features = collection.get("features") or []
+    coordinates: List[float] = []
+    for feat in features:
+        lng, lat = feat["geometry"]["coordinates"][:2]
+        coordinates.extend((lng, lat))
+
+    url_index: Dict[str, int] = {}
+
+    def url_code(url):
+        if url is None:
+            return None
+        code = url_index.get(url)
+        if code is None:
+            code = url_index[url] = len(url_index)
+        return code
+
+    columns = {}
+    for name, values in _property_columns(features).items():
+        if name == "sourceurl" and all(v is None or isinstance(v, str) for v in values):
+            columns[name] = {"url_codes": [url_code(v) for v in values]}
+        elif name == "sources" and all(v is None or _plain_sources(v) for v in values):
+            columns[name] = {"url_lists": [
+                None if v is None else [url_code(s["url"]) for s in v] for v in values
+            ]}
+        elif _dictionary_worthwhile(values):
+            dictionary: Dict[str, int] = {}
+            codes = [None if v is None else dictionary.setdefault(v, len(dictionary)) for v in values]
+            columns[name] = {"dictionary": list(dictionary), "codes": codes}
+        else:
+            columns[name] = {"values": values}
+
+    return {
+        "format": COLUMNAR_FORMAT,
+        "version": COLUMNAR_VERSION,
+        "length": len(features),
+        "coordinates": coordinates,
+        "palette": _palette(features, colors),
+        "urls": list(url_index),
+        "columns": columns,
+    }
+
+
+def from_columnar(payload: dict) -> dict:
+    """Inverse of to_columnar(): rebuild the GeoJSON FeatureCollection,
+    with color derived from category through the palette."""
+    n = payload["length"]
+    urls = payload["urls"]
+    palette = payload["palette"]
+    coords = payload["coordinates"]
+
+    decoded = {}
+    for name, column in payload["columns"].items():
+        if "values" in column:
+            decoded[name] = column["values"]
+        elif "dictionary" in column:
+            dictionary = column["dictionary"]
+            decoded[name] = [None if c is None else dictionary[c] for c in column["codes"]]
+        elif "url_codes" in column:
+            decoded[name] = [None if c is None else urls[c] for c in column["url_codes"]]
+        else:
+            decoded[name] = [
+                None if codes is None else [{"url": urls[c], "type": "article", "name": SOURCE_NAME} for c in codes]
+                for codes in column["url_lists"]
+            ]
+
+    features = []
+    for i in range(n):
+        props = {name: values[i] for name, values in decoded.items() if values[i] is not None}
+        category = props.get("category")
+        if category in palette:
+            props["color"] = palette[category]
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [coords[2 * i], coords[2 * i + 1]]},
+            "properties": props,
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def encode_columnar(collection: dict, colors: Dict[str, str] = COLORS) -> bytes:
+    return json.dumps(to_columnar(collection, colors), separators=(",", ":")).encode("utf-8")
+
+
+def encode_arrow(collection: dict, colors: Dict[str, str] = COLORS) -> bytes:
+    """Arrow IPC stream of the same columns: lng/lat float64, repeated strings
+    dictionary-encoded, sources as list<string>. The palette is stored in
+    the schema metadata."""
+    import pyarrow as pa
+
+    features = collection.get("features") or []
+    arrays = {
+        "lng": pa.array([f["geometry"]["coordinates"][0] for f in features], pa.float64()),
+        "lat": pa.array([f["geometry"]["coordinates"][1] for f in features], pa.float64()),
+    }
+    for name, values in _property_columns(features).items():
+        if name == "sources" and all(v is None or _plain_sources(v) for v in values):
+            arrays[name] = pa.array([None if v is None else [s["url"] for s in v] for v in values],
+                                    pa.list_(pa.string()))
+            continue
+        try:
+            array = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # mixed types (e.g. int and str): serialize as text
+            array = pa.array([None if v is None else json.dumps(v) if not isinstance(v, str) else v
+                              for v in values], pa.string())
+        if pa.types.is_null(array.type):
+            array = array.cast(pa.string())
+        if _dictionary_worthwhile(values):
+            array = array.dictionary_encode()
+        arrays[name] = array
+
+    metadata = {
+        "format": COLUMNAR_FORMAT,
+        "version": str(COLUMNAR_VERSION),
+        "palette": json.dumps(_palette(features, colors), separators=(",", ":")),
+    }
+    table = pa.table(arrays).replace_schema_metadata(metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
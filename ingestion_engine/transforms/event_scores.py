@@ -0,0 +1,100 @@
+"""
+Vectorized scoring over the numeric GDELT export fields carried on each
+feature (goldsteinscale, nummentions, numsources, avgtone, quadclass), which the
+firehose parsers fill from the export row via export_numeric_fields().
+
+numeric_columns() reads a batch once into typed numpy arrays; the score
+functions then work on whole arrays, so ConflictMonitor and
+DiplomaticRelationsTracker share one formula instead of per-event branches.
+Features written before these fields existed (older gdelt_window.json, test
+fixtures) have NaN / 0 in the arrays and callers fill them with category
+defaults via fill_missing().
+"""
+from typing import Dict, Iterable, List, Mapping
+
+import numpy as np
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value) if value not in (None, "") else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_int(value) -> int:
+    try:
+        return int(float(value)) if value not in (None, "") else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def export_numeric_fields(row: List[str]) -> Dict:
+    """Typed numeric properties from a GDELT 2.0 export row.
+
+    29 QuadClass, 30 GoldsteinScale, 31 NumMentions, 32 NumSources, 34 AvgTone.
+    AvgTone is rounded to 3 places to keep the live JSON compact.
+    """
+    def field(idx):
+        return row[idx] if len(row) > idx else None
+
+    goldstein = _to_float(field(30))
+    avg_tone = _to_float(field(34))
+    return {
+        "quadclass": _to_int(field(29)),
+        "goldsteinscale": None if np.isnan(goldstein) else goldstein,
+        "nummentions": _to_int(field(31)),
+        "numsources": _to_int(field(32)),
+        "avgtone": None if np.isnan(avg_tone) else round(avg_tone, 3),
+    }
+
+
+def numeric_columns(props_list: List[Mapping]) -> Dict[str, np.ndarray]:
+    """Typed columns for a batch of feature properties.
+
+    goldstein / avg_tone are float64 with NaN where missing; quad_class is
+    int8 with 0 where missing. num_mentions / num_sources fall back to
+    `importance` (NumArticles) and then 1, matching the pre-passthrough scoring.
+    """
+    n = len(props_list)
+    goldstein = np.empty(n, dtype=np.float64)
+    avg_tone = np.empty(n, dtype=np.float64)
+    num_mentions = np.empty(n, dtype=np.int32)
+    num_sources = np.empty(n, dtype=np.int32)
+    quad_class = np.empty(n, dtype=np.int8)
+
+    for i, props in enumerate(props_list):
+        importance = _to_int(props.get("importance")) or 1
+        goldstein[i] = _to_float(props.get("goldsteinscale"))
+        avg_tone[i] = _to_float(props.get("avgtone"))
+        num_mentions[i] = _to_int(props.get("nummentions")) or importance
+        num_sources[i] = _to_int(props.get("numsources")) or importance
+        quad_class[i] = _to_int(props.get("quadclass"))
+
+    return {
+        "goldstein": goldstein,
+        "avg_tone": avg_tone,
+        "num_mentions": num_mentions,
+        "num_sources": num_sources,
+        "quad_class": quad_class,
+    }
+
+
+def defaults_for(labels: Iterable[str], table: Mapping[str, float], default: float) -> np.ndarray:
+    """Per-row default values looked up from a label -> value table."""
+    return np.array([table.get(label, default) for label in labels], dtype=np.float64)
+
+
+def fill_missing(values: np.ndarray, defaults: np.ndarray) -> np.ndarray:
+    """Replace NaN entries of `values` with the matching `defaults`."""
+    return np.where(np.isnan(values), defaults, values)
+
+
+def severity_scores(goldstein: np.ndarray, num_mentions: np.ndarray, num_sources: np.ndarray) -> np.ndarray:
+    """Conflict severity: negative Goldstein weighted x2 plus media attention."""
+    return -goldstein * 2 + num_mentions * 0.5 + num_sources * 1.5
+
+
+def priority_scores(num_sources: np.ndarray, goldstein: np.ndarray, critical: np.ndarray) -> np.ndarray:
+    """Diplomatic priority: sources x2 + |Goldstein| x5 + 50 for critical (19/20) roots."""
+    return num_sources * 2 + np.abs(goldstein) * 5 + np.where(critical, 50, 0)
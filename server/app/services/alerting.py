@@ -1,5 +1,6 @@
 import os
 import json
+import threading
 import requests
 from datetime import datetime, timezone
 from typing import List, Dict, Optional
@@ -11,6 +12,8 @@ class AlertingService:
         self.discord_webhook = os.getenv("DISCORD_WEBHOOK_URL")
         self.alert_threshold = float(os.getenv("ALERT_SEVERITY_THRESHOLD", "50.0"))
         self.alert_file = "data/live/alerts_latest.json"
+        # Conflict and diplomacy pipeline stages send concurrently
+        self._lock = threading.Lock()
 
     def send_alert(self, alerts: List[Dict], source: str = "conflict_monitor"):
         if not alerts:
@@ -87,7 +90,7 @@ class AlertingService:
                 "alerts": alerts
             }
             os.makedirs(os.path.dirname(self.alert_file), exist_ok=True)
-            with open(self.alert_file, 'w') as f:
+            with self._lock, open(self.alert_file, 'w') as f:
                 json.dump(alert_data, f, indent=2)
         except Exception as e:
             print(f"[Alerting] Save failed: {e}")
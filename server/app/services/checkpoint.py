@@ -1,4 +1,5 @@
 import json
+import os
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 
@@ -8,7 +9,14 @@ class CheckpointManager:
         self.checkpoint_file = Path(checkpoint_file)
         self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
 
-    def save_checkpoint(self, timestamp: datetime, processed_count: int = 0, metadata: dict = None):
+    def _write(self, state: dict):
+        # Atomic replace: a crash mid-write must not lose the dedup state
+        tmp_file = self.checkpoint_file.with_name(self.checkpoint_file.name + ".tmp")
+        tmp_file.write_text(json.dumps(state, indent=2))
+        os.replace(tmp_file, self.checkpoint_file)
+
+    def save_checkpoint(self, timestamp: datetime, processed_count: int = 0, metadata: dict = None,
+                        dedup: dict = None):
         state = {
             'last_timestamp': timestamp.isoformat(),
             'processed_count': processed_count,
@@ -16,8 +24,10 @@ class CheckpointManager:
         }
         if metadata:
             state['metadata'] = metadata
-        
-        self.checkpoint_file.write_text(json.dumps(state, indent=2))
+        if dedup:
+            state['dedup'] = dedup
+
+        self._write(state)
         return state
 
     def load_checkpoint(self) -> datetime:
@@ -52,5 +62,9 @@ class CheckpointManager:
         state = self.get_state()
         state['processed_count'] = state.get('processed_count', 0) + count
         state['updated_at'] = datetime.now(timezone.utc).isoformat()
-        self.checkpoint_file.write_text(json.dumps(state, indent=2))
+        self._write(state)
         return state
+
+    def load_dedup(self) -> dict:
+        """Persisted RollingDedup state ({} if none)."""
+        return self.get_state().get('dedup') or {}
@@ -0,0 +1,95 @@
+import base64
+import hashlib
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+
+def key_hash(key: str) -> int:
+    """64-bit key fingerprint; stored instead of the string to keep memory flat."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class RollingDedup:
+    """Seen-set over a sliding time window, bucketed by hour.
+
+    Keys (export URLs, event signatures) are kept as 64-bit hashes in the
+    bucket they were last seen in; whole buckets expire once they fall out
+    of the window, so memory is bounded by the keys of the last
+    window_hours rather than by uptime. Membership is one dict lookup.
+    to_state() / from_state() round-trip through the checkpoint JSON.
+    """
+
+    def __init__(self, window_hours: float = 72, bucket_seconds: int = 3600):
+        self.window_seconds = int(window_hours * 3600)
+        self.bucket_seconds = bucket_seconds
+        self._buckets: Dict[int, set] = {}
+        self._latest: Dict[int, int] = {}  # hash -> bucket it was last added to
+
+    def __len__(self):
+        return len(self._latest)
+
+    def __contains__(self, key: str) -> bool:
+        return key_hash(key) in self._latest
+
+    def _bucket(self, now: Optional[float]) -> int:
+        return int((time.time() if now is None else now) // self.bucket_seconds)
+
+    def add(self, key: str, now: Optional[float] = None) -> bool:
+        """Record key; True if it was not already in the window."""
+        h = key_hash(key)
+        bucket = self._bucket(now)
+        previous = self._latest.get(h)
+        if previous == bucket:
+            return False
+        if previous is not None:
+            self._buckets[previous].discard(h)
+        self._buckets.setdefault(bucket, set()).add(h)
+        self._latest[h] = bucket
+        return previous is None
+
+    def filter_new(self, keys: Iterable[str], now: Optional[float] = None) -> List[bool]:
+        """add() every key; per-key flags, True where the key is new."""
+        return [self.add(k, now) for k in keys]
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop buckets older than the window. Returns keys removed."""
+        oldest = self._bucket(now) - self.window_seconds // self.bucket_seconds
+        removed = 0
+        for bucket in [b for b in self._buckets if b < oldest]:
+            for h in self._buckets.pop(bucket):
+                del self._latest[h]
+                removed += 1
+        return removed
+
+    def to_state(self) -> dict:
+        return {
+            "window_hours": self.window_seconds / 3600,
+            "bucket_seconds": self.bucket_seconds,
+            "buckets": {
+                str(bucket): base64.b64encode(array("Q", sorted(hashes)).tobytes()).decode("ascii")
+                for bucket, hashes in sorted(self._buckets.items()) if hashes
+            },
+        }
+
+    def load_state(self, state: dict, now: Optional[float] = None):
+        """Merge a to_state() dict (bucketing of this instance wins), then prune."""
+        if state.get("bucket_seconds", self.bucket_seconds) != self.bucket_seconds:
+            return
+        for bucket, blob in (state.get("buckets") or {}).items():
+            hashes = array("Q")
+            hashes.frombytes(base64.b64decode(blob))
+            bucket = int(bucket)
+            for h in hashes:
+                if self._latest.get(h, bucket - 1) < bucket:
+                    self._buckets.get(self._latest.get(h), set()).discard(h)
+                    self._buckets.setdefault(bucket, set()).add(h)
+                    self._latest[h] = bucket
+        self.prune(now)
+
+    @classmethod
+    def from_state(cls, state: Optional[dict], window_hours: float = 72, now: Optional[float] = None):
+        dedup = cls(window_hours=window_hours, bucket_seconds=(state or {}).get("bucket_seconds", 3600))
+        if state:
+            dedup.load_state(state, now)
+        return dedup
@@ -1,22 +1,24 @@
-import requests
-import zipfile
-import io
-import csv
 import os
 import json
+import mmap
 import time
 import threading
 from datetime import datetime, timedelta, timezone
 from ..core.taxonomy import GDELT_MAPPING, THEME_MAPPING, COLORS
 from .checkpoint import CheckpointManager
 from .alerting import AlertingService
+from .dedup import RollingDedup
+from ingestion_engine.pipelines.fanout import EventBatch, EventPipeline
+from ingestion_engine.sources import gdelt
 
 class FirehoseService:
     def __init__(self):
         self.latest_data = {"type": "FeatureCollection", "features": []}
         self.last_update = None
         self.running = False
-        self.seen_urls = set()
+        # Export URLs and event signatures already processed; bounded to the
+        # last GDELT_DEDUP_HOURS and persisted with the checkpoint
+        self.dedup = RollingDedup(window_hours=float(os.getenv("GDELT_DEDUP_HOURS", "72")))
         self.output_file = "data/live/gdelt_latest.json"
         self.history_file = "data/live/gdelt_window.json"
         self.history_window_hours = int(os.getenv("GDELT_HISTORY_HOURS", "720"))
@@ -25,14 +27,82 @@ class FirehoseService:
         
         self.checkpoint_manager = CheckpointManager()
         self.alerting_service = AlertingService()
+        # One ConflictMonitor / DiplomaticRelationsTracker for the service's
+        # lifetime, shared by the pipeline stages and _reorganize_tables
+        self._stores = {}
+        self._stores_lock = threading.Lock()
+        self.pipeline = self._build_pipeline()
+        self.last_cycle_stages = {}
         
-        # Load initial state from disk
-        if os.path.exists(self.output_file):
+        # Startup readiness: snapshot -> hydrated -> first_fetch. Each phase
+        # records when it completed; see start() and /api/health.
+        self.fast_start = os.getenv("GDELT_FAST_START", "1").lower() not in ("0", "false", "no")
+        self.phase = "starting"
+        self.phases = {"snapshot": None, "hydrated": None, "first_fetch": None}
+        self.hydrated = False
+        self._snapshot = None
+        self._latest_bytes = None
+        self._encoded = {}  # format -> bytes for the current latest state
+        self._generation = 0
+        self._state_lock = threading.Lock()
+
+    def _mark_phase(self, name):
+        self.phases[name] = datetime.now(timezone.utc).isoformat()
+        self.phase = "ready" if name == "first_fetch" else name
+
+    def load_snapshot(self):
+        """Memory-map the last persisted gdelt_latest.json so /api/live can be
+        served byte-for-byte before anything is parsed."""
+        if os.path.exists(self.output_file) and os.path.getsize(self.output_file) > 0:
+            try:
+                with open(self.output_file, 'rb') as f:
+                    self._snapshot = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except Exception as e:
+                print(f"[Firehose] Snapshot map failed: {e}")
+        self._mark_phase("snapshot")
+
+    def latest_json(self):
+        """Serialized latest state: last cycle's bytes, else a view of the mapped
+        snapshot (no copy), else None."""
+        with self._state_lock:
+            if self._latest_bytes is not None:
+                return self._latest_bytes
+            if self._snapshot is not None:
+                return memoryview(self._snapshot)
+        return None
+
+    def latest_encoded(self, fmt):
+        """Latest state as "columnar" JSON or an "arrow" IPC stream, encoded
+        once per update and cached until the next one. None if no state yet."""
+        encoders = {"columnar": gdelt.encode_columnar, "arrow": gdelt.encode_arrow}
+        if fmt not in encoders:
+            raise ValueError(f"unknown live format: {fmt}")
+        with self._state_lock:
+            generation = self._generation
+            cached = self._encoded.get(fmt)
+        if cached is not None:
+            return cached
+        raw = self.latest_json()
+        if raw is None:
+            return None
+        payload = encoders[fmt](json.loads(bytes(raw)), COLORS)
+        with self._state_lock:
+            if self._generation == generation:
+                self._encoded[fmt] = payload
+        return payload
+
+    def hydrate(self):
+        """Parse the latest snapshot and rolling history window into memory."""
+        if self.hydrated:
+            return
+        if self._latest_bytes is None and os.path.exists(self.output_file):
             try:
                 with open(self.output_file, 'r') as f:
                     self.latest_data = json.load(f)
             except: pass
 
+        self._load_dedup()
+
         # Load rolling window history if available
         if os.path.exists(self.history_file):
             try:
@@ -40,25 +110,78 @@ class FirehoseService:
                     history_blob = json.load(f)
                 features = history_blob.get("features", [])
                 for feat in features:
-                    sig = self._signature(feat)
-                    if sig:
+                    sig = gdelt.event_signature(feat)
+                    if sig and sig not in self.history_index:
                         self.history_index[sig] = feat
                 self.history_data = {"type": "FeatureCollection", "features": list(self.history_index.values())}
                 print(f"[Firehose] Loaded history window: {len(self.history_index)} events")
             except Exception as e:
                 print(f"[Firehose] History load failed: {e}")
+        self.hydrated = True
+        self._mark_phase("hydrated")
+
+    def _load_dedup(self):
+        try:
+            self.dedup.load_state(self.checkpoint_manager.load_dedup())
+            # Checkpoints from before the dedup state still name the last export
+            last_export = (self.checkpoint_manager.get_state().get("metadata") or {}).get("export_url")
+            if last_export:
+                self.dedup.add(f"export:{last_export}")
+            print(f"[Firehose] Dedup state: {len(self.dedup)} keys")
+        except Exception as e:
+            print(f"[Firehose] Dedup state load failed: {e}")
 
     def start(self):
         if self.running: return
         self.running = True
-        # Startup procedure: fetch immediately to ensure data is ready.
+        self.load_snapshot()
+        if self.fast_start:
+            # Serve the snapshot now; hydrate and fetch in the background.
+            t = threading.Thread(target=self._warm_start, daemon=True)
+            t.start()
+            print("[Firehose] Service Started (fast start)")
+            return
+        # Blocking startup: fetch immediately to ensure data is ready.
+        self.hydrate()
+        self._first_fetch()
+        t = threading.Thread(target=self._loop, daemon=True)
+        t.start()
+        print("[Firehose] Service Started")
+
+    def stop(self):
+        """Stop the loop and close the DuckDB stores (server shutdown)."""
+        self.running = False
+        self.pipeline.shutdown()
+        with self._stores_lock:
+            for store in self._stores.values():
+                try:
+                    store.db.close()
+                except Exception as e:
+                    print(f"[Firehose] Store close failed: {e}")
+            self._stores = {}
+
+    def _first_fetch(self):
+        self.phase = "fetching"
         try:
             self._fetch_cycle()
+            self._mark_phase("first_fetch")
         except Exception as e:
             print(f"[Firehose] Startup fetch failed: {e}")
-        t = threading.Thread(target=self._loop, daemon=True)
-        t.start()
-        print("[Firehose] Service Started")
+            self.phase = "fetch_failed"
+
+    def _warm_start(self):
+        self.hydrate()
+        self._first_fetch()
+        self._loop()
+
+    def readiness(self):
+        return {
+            "phase": self.phase,
+            "ready": self.phases["first_fetch"] is not None,
+            "fast_start": self.fast_start,
+            "phases": dict(self.phases),
+            "history_events": len(self.history_index),
+        }
 
     def get_history(self, hours: int = 168, transnational: bool = False):
         """
@@ -113,94 +236,42 @@ class FirehoseService:
         while self.running:
             try:
                 self._fetch_cycle()
+                if self.phases["first_fetch"] is None:
+                    self._mark_phase("first_fetch")
             except Exception as e:
                 print(f"[Firehose] Error: {e}")
             time.sleep(60 * 15) # 15 min cycle
 
     def _fetch_cycle(self):
+        # Merge into the persisted history window, never over it
+        self.hydrate()
         print(f"[{datetime.now()}] Checking GDELT...")
         # 1. Get List
-        resp = requests.get("http://data.gdeltproject.org/gdeltv2/lastupdate.txt", timeout=30)
-        lines = resp.text.splitlines()
-
-        export_url = None
-        mentions_url = None
-        for line in lines:
-            parts = line.strip().split(' ')
-            if len(parts) < 3:
-                continue
-            url = parts[2]
-            url_lower = url.lower()
-            if "mentions" in url_lower and url_lower.endswith(".csv.zip"):
-                mentions_url = url
-            elif "export" in url_lower and url_lower.endswith(".csv.zip"):
-                export_url = url
-
-        # Fallback derivation if mentions not found but export is known
-        if export_url and not mentions_url:
-            mentions_url = export_url.replace(".export.", ".mentions.").replace("export.csv.zip", "mentions.csv.zip")
-
+        urls = gdelt.fetch_lastupdate(timeout=30)
+        export_url, mentions_url = urls.export, urls.mentions
         if not export_url or not mentions_url:
             print("  > GDELT lastupdate parse failed (missing export or mentions URL).")
             return
         
-        if export_url in self.seen_urls:
+        if f"export:{export_url}" in self.dedup:
             print("  > No new update.")
             return
 
         print(f"  > Downloading Export & Mentions...")
-        self.seen_urls.add(export_url)
         
         # 2. Extract Mentions First (to build URL map)
         mention_map = {} # GlobalEventID -> set(URLs)
         try:
-            r_m = requests.get(mentions_url, timeout=30)
-            z_m = zipfile.ZipFile(io.BytesIO(r_m.content))
-            with z_m.open(z_m.namelist()[0]) as f:
-                content = io.TextIOWrapper(f)
-                reader = csv.reader(content, delimiter='\t')
-                for row in reader:
-                    if len(row) < 6: continue
-                    eid = row[0]
-                    url = row[5]
-                    if not url:
-                        continue
-                    if not url.startswith("http"):
-                        continue
-                    if eid not in mention_map:
-                        mention_map[eid] = set()
-                    mention_map[eid].add(url)
+            mention_map = gdelt.build_mention_map(gdelt.iter_remote_rows(mentions_url, timeout=30))
         except Exception as e:
             print(f"  > Mentions Error: {e}")
 
-        # 3. Extract & Parse Export
-        r_e = requests.get(export_url)
-        z_e = zipfile.ZipFile(io.BytesIO(r_e.content))
-        
+        # 3. Extract & Parse Export (shared parser: sources, ingested_at, event_sig)
         features = []
         ingest_time = datetime.now(timezone.utc)
-        with z_e.open(z_e.namelist()[0]) as f:
-            content = io.TextIOWrapper(f)
-            reader = csv.reader(content, delimiter='\t')
-            for row in reader:
-                eid = row[0]
-                feat = self._parse_row(row)
-                if feat:
-                    # Append all links from mentions
-                    extra_links = mention_map.get(eid, set())
-                    # Seed with the primary link if not present
-                    primary_link = feat["properties"].get("sourceurl")
-                    all_urls = set(extra_links)
-                    if primary_link: all_urls.add(primary_link)
-                    
-                    feat["properties"]["sources"] = [
-                        {"url": u, "type": "article", "name": "GDELT Source"} 
-                        for u in sorted(list(all_urls))
-                    ]
-                    feat["properties"]["ingested_at"] = ingest_time.isoformat()
-                    feat["properties"]["eventid"] = eid
-                    feat["properties"]["event_sig"] = self._signature(feat)
-                    features.append(feat)
+        for batch in gdelt.stream_export(export_url, mention_map, ingest_time=ingest_time,
+                                         mapping=GDELT_MAPPING, colors=COLORS):
+            features.extend(batch.features)
         
         # 4. Update State
         self.latest_data = {
@@ -209,26 +280,47 @@ class FirehoseService:
         }
         self.last_update = datetime.now(timezone.utc)
 
-        # 4b. Update rolling window
-        self._update_history(features, ingest_time)
-        
-        # 4c. Process conflict events and send alerts
-        self._process_conflicts(features)
-        
-        # 4d. Process diplomatic relations
-        self._process_diplomacy(features)
-
-        if os.getenv("GDELT_INTERACTIONS_ON_FIREHOSE", "").lower() in ("1", "true", "yes"):
-            self._trigger_interactions_update()
+        # 4b-4d. Hand the batch once to the pipeline stages (history, conflict
+        # alerting, diplomacy, optional interactions update) running concurrently.
+        # History refreshes every event; conflicts and diplomacy only see events
+        # not stored in an earlier cycle (or before a restart). Signatures and
+        # the export are marked seen only once every awaited stage succeeded,
+        # so a failed cycle is retried from the same export; on that retry a
+        # stage that already succeeded skips the events it handled.
+        sigs = [f["properties"]["event_sig"] for f in features]
+        fresh = [f for f, sig in zip(features, sigs) if sig not in self.dedup]
+        if len(fresh) < len(features):
+            print(f"  > Skipped {len(features) - len(fresh)} already-processed events.")
+        results = self._run_pipeline(features, ingest_time, fresh) if features else {}
+        if all(r.get("ok", True) for r in results.values()):
+            self.dedup.filter_new(sigs)
+            self.dedup.add(f"export:{export_url}")
+        else:
+            # Stages that did succeed remember their events per stage, so the
+            # retry neither stores them twice nor resends their alerts
+            fresh_sigs = [f["properties"]["event_sig"] for f in fresh]
+            for name in ("conflicts", "diplomacy"):
+                if results.get(name, {}).get("ok"):
+                    self.dedup.filter_new(f"{name}:{sig}" for sig in fresh_sigs)
+            print("  > Pipeline stage failed; events stay unmarked and are retried next cycle.")
 
-        # 5. Persist
-        with open(self.output_file, 'w') as f:
-            json.dump(self.latest_data, f)
+        # 4e. Periodically re-cluster the event tables by (EventDate, category)
+        self._reorganize_tables()
 
-        with open(self.history_file, 'w') as f:
-            json.dump(self.history_data, f)
+        # 5. Persist (atomic replace, so a mapped snapshot stays valid until released)
+        latest_bytes = gdelt.encode_collection(self.latest_data)
+        with self._state_lock:
+            self._latest_bytes = latest_bytes
+            self._encoded = {}
+            self._generation += 1
+            # Dropped rather than closed: a response still sending a view of
+            # the map keeps it alive, and it is unmapped once that finishes
+            self._snapshot = None
+        gdelt.write_atomic(self.output_file, latest_bytes)
+        gdelt.write_atomic(self.history_file, gdelt.encode_collection(self.history_data))
         
-        # Save checkpoint
+        # Save checkpoint (with the dedup window, so a restart skips this export)
+        self.dedup.prune()
         self.checkpoint_manager.save_checkpoint(
             timestamp=ingest_time,
             processed_count=len(features),
@@ -236,108 +328,12 @@ class FirehoseService:
                 'export_url': export_url,
                 'mentions_url': mentions_url,
                 'features_count': len(features)
-            }
+            },
+            dedup=self.dedup.to_state(),
         )
             
         print(f"  > Updated {len(features)} events with multi-link support.")
 
-    def _parse_row(self, row):
-        try:
-            if len(row) < 58:
-                return None
-            def pick_value(indices):
-                for idx in indices:
-                    if idx < 0:
-                        if len(row) == 0:
-                            continue
-                        val = row[idx]
-                        if val:
-                            return val
-                        continue
-                    if len(row) > idx and row[idx]:
-                        return row[idx]
-                return ''
-
-            lat = pick_value([56, 53, 39])
-            lng = pick_value([57, 54, 40])
-            if not lat or not lng: return None
-
-            try:
-                lat_val = float(lat)
-                lng_val = float(lng)
-            except Exception:
-                return None
-            if abs(lat_val) > 90 or abs(lng_val) > 180:
-                return None
-            
-            code = row[26] if len(row) > 26 else '' # EventCode
-            actor1 = row[6] if len(row) > 6 else ''
-            actor2 = row[16] if len(row) > 16 else ''
-            action_geo = row[52] if len(row) > 52 else ''
-            action_adm1 = row[53] if len(row) > 53 else ''
-            
-            # Taxonomy
-            # Taxonomy
-            category = GDELT_MAPPING.get(code, "OTHER")
-            if category == "OTHER": return None # Strict Filter
-            
-            # Reliability: 32: NumSources, 33: NumArticles (GDELT v2)
-            try:
-                num_sources = int(float(row[32])) if row[32] else 0
-                num_articles = int(float(row[33])) if row[33] else 0
-            except:
-                num_sources = 0
-                num_articles = 0
-                
-            if num_sources < 1: return None # Drop zero source events
-            
-            # Country
-            country_name = action_geo or (row[52] if len(row) > 52 else '')
-            source_url = ''
-            source_url = pick_value([60, -1])
-            
-            # Transnational Fields
-            a1_code = row[7] if len(row) > 7 else ''
-            a2_code = row[17] if len(row) > 17 else ''
-            geo_code = row[51] if len(row) > 51 else ''
-
-            return {
-                "type": "Feature",
-                "geometry": {"type": "Point", "coordinates": [lng_val, lat_val]},
-                "properties": {
-                    "category": category,
-                    "date": row[1],
-                    "countryname": country_name,
-                    "name": f"{category}: {row[6] or 'Unidentified'}",
-                    "color": COLORS.get(category, '#808080'),
-                    "importance": num_articles or 1,
-                    "sourceurl": source_url,
-                    "sources": [{"url": source_url, "type": "article", "name": "GDELT"}] if source_url else [],
-                    "eventcode": code,
-                    "actor1": actor1,
-                    "actor2": actor2,
-                    "actiongeo": action_geo,
-                    "actionadm1": action_adm1,
-                    "actor1countrycode": a1_code,
-                    "actor2countrycode": a2_code,
-                    "actiongeo_countrycode": geo_code
-                }
-            }
-        except: return None
-
-    def _signature(self, feature):
-        props = feature.get("properties", {})
-        event_id = props.get("eventid")
-        if event_id:
-            return f"eid:{event_id}"
-        source = props.get("sourceurl")
-        if source:
-            return f"url:{source}"
-        coords = feature.get("geometry", {}).get("coordinates", [None, None])
-        name = props.get("name") or "unknown"
-        date = props.get("date") or ""
-        return f"sig:{name}|{date}|{coords[0]}|{coords[1]}"
-
     def _parse_ingested_at(self, feat):
         props = feat.get("properties", {})
         ts = props.get("ingested_at")
@@ -363,7 +359,7 @@ class FirehoseService:
     def _update_history(self, features, ingest_time):
         # Insert or refresh by signature
         for feat in features:
-            sig = feat.get("properties", {}).get("event_sig") or self._signature(feat)
+            sig = feat.get("properties", {}).get("event_sig") or gdelt.event_signature(feat)
             if not sig:
                 continue
             self.history_index[sig] = feat
@@ -380,50 +376,93 @@ class FirehoseService:
             "features": list(self.history_index.values())
         }
 
+    def _build_pipeline(self):
+        pipeline = EventPipeline(max_workers=int(os.getenv("GDELT_PIPELINE_WORKERS", "4")))
+        pipeline.register("history", lambda batch: self._update_history(batch.features, batch.ingest_time))
+        pipeline.register("conflicts", lambda batch: self._process_conflicts(
+            self._unhandled("conflicts", batch.fresh)))
+        pipeline.register("diplomacy", lambda batch: self._process_diplomacy(
+            self._unhandled("diplomacy", batch.fresh)))
+        if os.getenv("GDELT_INTERACTIONS_ON_FIREHOSE", "").lower() in ("1", "true", "yes"):
+            # LLM-backed; detached so it never holds back history or alerting
+            pipeline.register("interactions", lambda batch: self._trigger_interactions_update(), wait=False)
+        return pipeline
+
+    def _unhandled(self, stage, features):
+        """Events `stage` has not already stored (and alerted on) in a cycle
+        where another stage failed."""
+        return [f for f in features if f"{stage}:{f['properties']['event_sig']}" not in self.dedup]
+
+    def _run_pipeline(self, features, ingest_time, fresh=None):
+        results = self.pipeline.run(EventBatch(features, ingest_time, fresh))
+        self.last_cycle_stages = {
+            name: {k: v for k, v in r.items() if k != "result"} for name, r in results.items()
+        }
+        timings = ", ".join(
+            f"{name} {r['elapsed_seconds']}s" + ("" if r.get("ok") else " FAILED")
+            if "elapsed_seconds" in r else f"{name} {r['status']}"
+            for name, r in results.items()
+        )
+        print(f"[Firehose] Pipeline: {timings}")
+        return results
+
+    def conflict_monitor(self):
+        with self._stores_lock:
+            if "conflicts" not in self._stores:
+                from ingestion_engine.conflict_monitor import ConflictMonitor
+                self._stores["conflicts"] = ConflictMonitor()
+            return self._stores["conflicts"]
+
+    def diplomatic_tracker(self):
+        with self._stores_lock:
+            if "diplomacy" not in self._stores:
+                from ingestion_engine.diplomatic_tracker import DiplomaticRelationsTracker
+                self._stores["diplomacy"] = DiplomaticRelationsTracker()
+            return self._stores["diplomacy"]
+
     def _process_conflicts(self, features):
-        try:
-            from ingestion_engine.conflict_monitor import ConflictMonitor
-            
-            monitor = ConflictMonitor()
-            result = monitor.process_events(features)
-            
-            if result.get('alerts'):
-                self.alerting_service.send_alert(result['alerts'], source="conflict_monitor")
-        except ImportError as e:
-            print(f"[Firehose] Conflict monitor import failed: {e}")
-        except Exception as e:
-            print(f"[Firehose] Conflict processing failed: {e}")
+        result = self.conflict_monitor().process_events(features)
+        
+        if result.get('alerts'):
+            self.alerting_service.send_alert(result['alerts'], source="conflict_monitor")
+        return {"conflict_events": result.get('total_conflict_events', 0), "alerts": len(result.get('alerts', []))}
 
     def _process_diplomacy(self, features):
+        result = self.diplomatic_tracker().process_events(features)
+        
+        if result.get('top_escalation'):
+            escalation_alerts = [
+                {
+                    'timestamp': datetime.now(timezone.utc).isoformat(),
+                    'category': 'escalation',
+                    'severity': e.get('risk_score', 0),
+                    'location': e.get('country_pair', 'Unknown'),
+                    'description': f"Escalation risk: {e.get('risk_score', 0)}",
+                    'url': ''
+                }
+                for e in result['top_escalation'][:5]
+            ]
+            self.alerting_service.send_alert(escalation_alerts, source="diplomatic_tracker")
+        return {"escalations": len(result.get('top_escalation', []))}
+
+    def _reorganize_tables(self):
+        interval_hours = float(os.getenv("GDELT_TABLE_REORG_HOURS", "24"))
+        if interval_hours <= 0:
+            return
         try:
-            from ingestion_engine.diplomatic_tracker import DiplomaticRelationsTracker
-            
-            tracker = DiplomaticRelationsTracker()
-            result = tracker.process_events(features)
-            
-            if result.get('top_escalation'):
-                escalation_alerts = [
-                    {
-                        'timestamp': datetime.now(timezone.utc).isoformat(),
-                        'category': 'escalation',
-                        'severity': e.get('risk_score', 0),
-                        'location': e.get('country_pair', 'Unknown'),
-                        'description': f"Escalation risk: {e.get('risk_score', 0)}",
-                        'url': ''
-                    }
-                    for e in result['top_escalation'][:5]
-                ]
-                self.alerting_service.send_alert(escalation_alerts, source="diplomatic_tracker")
-        except ImportError as e:
-            print(f"[Firehose] Diplomatic tracker import failed: {e}")
+            from ingestion_engine.maintenance.table_layout import reorganize_if_due
+
+            # Runs after the awaited stages, so nothing else writes through these
+            # connections; detached readers wait on table_layout.REWRITE_LOCK
+            for store in (self.conflict_monitor(), self.diplomatic_tracker()):
+                for r in reorganize_if_due(store.db, interval_hours=interval_hours):
+                    print(f"[Firehose] Reorganized {r['table']} ({r['rows']} rows) in {r['elapsed_seconds']}s")
         except Exception as e:
-            print(f"[Firehose] Diplomatic processing failed: {e}")
+            print(f"[Firehose] Table reorganization failed: {e}")
 
     def _trigger_interactions_update(self):
-        try:
-            from ingestion_engine.services.manifest_auto_updater import run_update_gdelt
-            result = run_update_gdelt()
-            if result.get("submitted"):
-                print(f"[Firehose] Interactions update: {result.get('submitted')} events submitted")
-        except Exception as e:
-            print(f"[Firehose] Interactions update failed: {e}")
+        from ingestion_engine.services.manifest_auto_updater import run_update_gdelt
+        result = run_update_gdelt()
+        if result.get("submitted"):
+            print(f"[Firehose] Interactions update: {result.get('submitted')} events submitted")
+        return {"submitted": result.get("submitted", 0)}
@@ -1,5 +1,5 @@
 import os
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List
 from pydantic import BaseModel
@@ -38,19 +38,46 @@ acled = AcledService()
 def startup_event():
     firehose.start()
 
+@app.on_event("shutdown")
+def shutdown_event():
+    firehose.stop()
+
 @app.get("/")
 def root():
     return {"message": "GDELT-Streamer API is running", "endpoints": ["/api/live", "/api/cast"]}
 
 @app.get("/api/health")
 def health():
+    """Liveness plus firehose readiness (snapshot -> hydrated -> first_fetch)."""
+    return {"status": "ok", "firehose_running": firehose.running, **firehose.readiness()}
+
+_LIVE_MEDIA_TYPES = {
+    "geojson": "application/json",
+    "columnar": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
 
-    return {"status": "ok", "firehose_running": firehose.running}
 
 @app.get("/api/live")
-def get_live_events():
-    """Returns the latest in-memory GDELT state."""
-    return firehose.latest_data
+def get_live_events(format: str = "geojson"):
+    """Returns the latest GDELT state (served from the mapped snapshot until the first fetch).
+
+    format: geojson (default) | columnar (column arrays + string dictionaries,
+    color derived from category via the palette) | arrow (Arrow IPC stream).
+    """
+    if format not in _LIVE_MEDIA_TYPES:
+        return {"error": f"unknown format: {format}", "formats": list(_LIVE_MEDIA_TYPES)}
+    if format == "geojson":
+        payload = firehose.latest_json()
+        if payload is not None:
+            return Response(content=payload, media_type="application/json")
+        return firehose.latest_data
+    from ingestion_engine.sources import gdelt
+    payload = firehose.latest_encoded(format)
+    if payload is None:
+        encode = gdelt.encode_columnar if format == "columnar" else gdelt.encode_arrow
+        payload = encode(firehose.latest_data)
+    return Response(content=payload, media_type=_LIVE_MEDIA_TYPES[format])
 
 @app.get("/api/cast")
 def get_cast_forecast(country: str, admin1: str = None, year: int = None):
@@ -61,6 +88,80 @@ def get_cast_forecast(country: str, admin1: str = None, year: int = None):
     return acled.get_forecast(country, admin1, year)
 
 
+# --- Conflict / diplomacy analytics (served from DuckDB daily rollups) ---
+# Read through the firehose's own ConflictMonitor / DiplomaticRelationsTracker,
+# so the API and the ingest share one connection per database; their query_*
+# methods read on a cursor of their own per call.
+from fastapi import Query
+
+
+@app.get("/api/conflicts/hotspots")
+def get_conflict_hotspots(days: int = Query(7, ge=1, le=365)):
+    """Countries ranked by violence/event counts over the last `days` days."""
+    return {"days": days, "results": firehose.conflict_monitor().query_hotspots(days=days)}
+
+
+@app.get("/api/conflicts/mass-casualty")
+def get_conflict_mass_casualty(days: int = Query(7, ge=1, le=365)):
+    """Violent events (roots 18/19/20) per day, location and event code."""
+    return {"days": days, "results": firehose.conflict_monitor().query_mass_casualty(days=days)}
+
+
+@app.get("/api/diplomacy/centrality")
+def get_diplomacy_centrality(days: int = Query(30, ge=1, le=365)):
+    """Top 20 countries by bilateral interaction volume and partner count."""
+    return {"days": days, "results": firehose.diplomatic_tracker().query_network_centrality(days=days)}
+
+
+@app.get("/api/diplomacy/conflict-pairs")
+def get_diplomacy_conflict_pairs(days: int = Query(30, ge=1, le=365)):
+    """Country pairs with at least 3 material-conflict (QuadClass 4) events."""
+    return {"days": days, "results": firehose.diplomatic_tracker().query_conflict_pairs(days=days)}
+
+
+# --- Long-range GKG metrics (hot partitions + Parquet archive) ---
+import threading
+
+_metrics_history = None
+_analytics_lock = threading.Lock()
+
+
+def _get_metrics_history():
+    global _metrics_history
+    with _analytics_lock:
+        if _metrics_history is None:
+            from ingestion_engine.gkg_pipeline.metrics_history import MetricsHistory
+            _metrics_history = MetricsHistory.from_config()
+    return _metrics_history
+
+
+@app.get("/api/history/metrics")
+def get_metrics_history(
+    country: str,
+    measure: str = "deaths",
+    start: str = None,
+    end: str = None,
+    admin1: str = None,
+    limit: int = Query(1000, ge=1, le=5000),
+    cursor: str = None,
+):
+    """Daily series for a country (or admin1) over any range, e.g. 5 years of deaths.
+
+    measure: deaths | injured | displaced | protests | arrests, or a GKG count
+    type. Paginated by date: pass next_cursor back as cursor until it is null.
+    """
+    from datetime import date as _date
+    try:
+        start_d = _date.fromisoformat(start) if start else None
+        end_d = _date.fromisoformat(end) if end else None
+        cursor_d = _date.fromisoformat(cursor) if cursor else None
+    except ValueError as e:
+        return {"error": f"invalid date: {e}"}
+    return _get_metrics_history().timeseries(
+        country, measure=measure, start=start_d, end=end_d, admin1=admin1, limit=limit, cursor=cursor_d
+    )
+
+
 # --- GeoJSON (on-demand download from geoBoundaries / Natural Earth) ---
 from server.app.services.geojson_service import get_world, get_adm1, get_adm2, health as geodata_health
 
@@ -239,6 +340,9 @@ def run_news_scraper():
     scrape_result = run_scraper(fetch_full_text=True, write_events=True)
     if scrape_result.get("error"):
         return scrape_result
+    if not scrape_result.get("count"):
+        # nothing new (e.g. every feed answered 304): don't re-ingest the previous file
+        return {"scrape": scrape_result, "ingest": None}
     file_result = run_update_from_files()
     return {"scrape": scrape_result, "ingest": file_result.get("news")}
 
@@ -261,7 +365,6 @@ def interactions_status():
 
 
 # --- Wikipedia API (ingestion_engine/wiki.md) ---
-from fastapi import Query
 
 ADM_LOOKUP_PATH = Path("data/adm_lookup.json")
 _wiki_fetcher = None
@@ -9,6 +9,36 @@ function toGeoJSONApiUrl(path) {
     return null;
 }
 
+// Rebuild GeoJSON features from /api/live?format=columnar. color is not
+// shipped per feature; it comes from the category palette.
+export function decodeColumnar(payload) {
+    const { length, coordinates, palette, urls, columns } = payload;
+    const decoded = {};
+    for (const [name, col] of Object.entries(columns)) {
+        if (col.values) decoded[name] = col.values;
+        else if (col.dictionary) decoded[name] = col.codes.map(c => (c === null ? null : col.dictionary[c]));
+        else if (col.url_codes) decoded[name] = col.url_codes.map(c => (c === null ? null : urls[c]));
+        else decoded[name] = col.url_lists.map(codes => (codes === null ? null
+            : codes.map(c => ({ url: urls[c], type: 'article', name: 'GDELT Source' }))));
+    }
+    const names = Object.keys(decoded);
+    const features = new Array(length);
+    for (let i = 0; i < length; i++) {
+        const properties = {};
+        for (const name of names) {
+            const v = decoded[name][i];
+            if (v !== null) properties[name] = v;
+        }
+        if (properties.category in palette) properties.color = palette[properties.category];
+        features[i] = {
+            type: 'Feature',
+            geometry: { type: 'Point', coordinates: [coordinates[2 * i], coordinates[2 * i + 1]] },
+            properties,
+        };
+    }
+    return { type: 'FeatureCollection', features };
+}
+
 export class DataManager {
     constructor() {
         this.cache = {};
@@ -60,9 +90,14 @@ export class DataManager {
         return false;
     }
 
+    async fetchLive() {
+        const data = await this.fetchJSON(`${API_BASE}/api/live?format=columnar`);
+        return data && data.format === 'gdelt-columnar' ? decodeColumnar(data) : data;
+    }
+
     async waitForLiveData(retries = 12, delayMs = 1500) {
         for (let i = 0; i < retries; i++) {
-            const data = await this.fetchJSON(`${API_BASE}/api/live`);
+            const data = await this.fetchLive();
 
             if (data && Array.isArray(data.features) && data.features.length > 0) {
                 this.geoData = data;
@@ -79,7 +114,7 @@ export class DataManager {
 
     async fetchData() {
         // Call our new Fast backend
-        const data = await this.fetchJSON(`${API_BASE}/api/live`);
+        const data = await this.fetchLive();
         if (data) {
             // Hash check to avoid redraws? For now just raw updates
             this.geoData = data;
@@ -1,5 +1,4 @@
 import L from 'leaflet';
-import { API_BASE } from '../config.js';
 
 export class SufferingLayer {
     constructor(map, dataManager, uiManager, interactionManager = null) {
@@ -166,7 +165,7 @@ export class SufferingLayer {
     async refresh() {
         if (!this.isVisible) return;
 
-        const latest = this.data.geoData ?? await this.data.fetchJSON(`${API_BASE}/api/live`);
+        const latest = this.data.geoData ?? await this.data.fetchLive();
         const allFeatures = Array.isArray(latest?.features) ? latest.features : [];
 
         const sourceFeatures = this.regionGeometry
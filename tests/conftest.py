@@ -32,3 +32,11 @@ def temp_alert_file(tmp_path):
 def mock_event_collection():
     from tests.fixtures import create_mock_event_collection
     return create_mock_event_collection
+
+
+@pytest.fixture
+def http_server():
+    """Local HTTP server; set .routes before requesting (see tests/fixtures/http.py)."""
+    from tests.fixtures.http import LocalHTTPServer
+    with LocalHTTPServer() as server:
+        yield server
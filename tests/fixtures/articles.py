@@ -0,0 +1,67 @@
+import random
+from typing import List, Tuple
+
+SENTENCES = [
+    "Delegations from both governments met in the capital on Tuesday to discuss the ceasefire.",
+    "Officials said the talks would continue through the week despite renewed shelling near the border.",
+    "Aid agencies warned that access to the northern districts remains severely restricted.",
+    "The foreign minister told reporters that a framework agreement could be signed within days.",
+    "Local residents described long queues for fuel and bread as prices doubled in a month.",
+    "Analysts cautioned that previous agreements had collapsed within weeks of being announced.",
+    "A spokesperson for the opposition coalition rejected the proposal as incomplete.",
+    "The United Nations envoy urged all parties to protect civilians and allow convoys through.",
+]
+
+NAV = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(30))
+SIDEBAR = "".join(f'<p><a href="/story/{i}">Most read story number {i} about something else</a></p>' for i in range(12))
+COOKIE = "<div class='cookie'><p>We use cookies to improve your experience. Accept all cookies?</p></div>"
+
+
+def _paragraphs(rng: random.Random, n: int) -> List[str]:
+    return [" ".join(rng.sample(SENTENCES, 3)) for _ in range(n)]
+
+
+def _head(title: str) -> str:
+    return (f'<head><title>{title} | Example News</title><meta property="og:title" content="{title}">'
+            f'<meta name="author" content="Jane Reporter"><meta property="article:published_time" '
+            f'content="2024-03-05T10:00:00Z"><script>var x = {{"tracking": true}};</script>'
+            f"<style>body {{ color: black }}</style></head>")
+
+
+def semantic_page(rng: random.Random, i: int) -> str:
+    body = "".join(f"<p>{p}</p>" for p in _paragraphs(rng, rng.randint(6, 14)))
+    return (f"<html>{_head(f'Talks resume {i}')}<body><header><nav><ul>{NAV}</ul></nav></header>"
+            f"<article><h1>Talks resume {i}</h1>{body}</article><aside>{SIDEBAR}</aside>"
+            f"<footer><p>Copyright Example News. All rights reserved.</p></footer></body></html>")
+
+
+def div_soup_page(rng: random.Random, i: int) -> str:
+    body = "".join(f'<div class="para"><p>{p}</p></div>' if k % 3 == 0 else f"<p>{p}</p>"
+                   for k, p in enumerate(_paragraphs(rng, rng.randint(5, 12))))
+    comments = "".join(f'<div class="comment"><p>Comment {k}: great</p></div>' for k in range(20))
+    return (f"<html>{_head(f'Border report {i}')}<body><div id='top'><ul>{NAV}</ul></div>{COOKIE}"
+            f"<div id='main'><div class='story'><h1>Border report {i}</h1>{body}</div>"
+            f"<div class='related'>{SIDEBAR}</div></div><div id='comments'>{comments}</div></body></html>")
+
+
+def br_page(rng: random.Random, i: int) -> str:
+    """No <p> tags: text separated by <br>, which the lxml tier cannot score."""
+    body = "<br><br>".join(_paragraphs(rng, rng.randint(5, 10)))
+    return (f"<html>{_head(f'Wire copy {i}')}<body><div id='nav'><ul>{NAV}</ul></div>"
+            f"<div class='content'><h1>Wire copy {i}</h1><div class='text'>{body}</div></div></body></html>")
+
+
+def short_page(rng: random.Random, i: int) -> str:
+    """A brief: no tier reaches the quality bar, the longest text wins."""
+    return (f"<html>{_head(f'Brief {i}')}<body><ul>{NAV}</ul>"
+            f"<article><p>{SENTENCES[i % len(SENTENCES)]}</p></article></body></html>")
+
+
+PAGE_KINDS = {"semantic": semantic_page, "div_soup": div_soup_page, "br": br_page, "short": short_page}
+
+
+def article_corpus(n: int = 40, seed: int = 11) -> List[Tuple[str, str]]:
+    """(kind, html) pages cycling through PAGE_KINDS."""
+    rng = random.Random(seed)
+    kinds = list(PAGE_KINDS)
+    return [(kinds[i % len(kinds)], PAGE_KINDS[kinds[i % len(kinds)]](rng, i)) for i in range(n)]
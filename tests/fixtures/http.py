@@ -0,0 +1,83 @@
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+ARTICLE_HTML = (
+    "<html><head><title>Talks resume</title></head><body><article>"
+    + "<p>Ceasefire talks resumed in the capital today as delegations met.</p>" * 20
+    + "</article></body></html>"
+)
+
+
+class LocalHTTPServer:
+    """Threaded HTTP server on 127.0.0.1 for fetch tests.
+
+    routes maps a path prefix to (status, body, delay_seconds, content_type);
+    unknown paths serve ARTICLE_HTML. 200 responses carry an ETag and answer a
+    matching If-None-Match with 304. Tracks hits per path, body bytes sent and
+    the peak number of requests in flight.
+    """
+
+    def __init__(self, routes: Dict[str, Tuple[int, str, float, str]] = None):
+        self.routes = routes or {}
+        self.hits: Dict[str, int] = {}
+        self.bytes_sent = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._enter(self.path)
+                status, body, delay, ctype = server._route(self.path)
+                if delay:
+                    time.sleep(delay)
+                payload = body.encode("utf-8")
+                etag = '"%s"' % hashlib.sha1(payload).hexdigest()[:16]
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    status, payload = 304, b""
+                # leave before replying so a client's next request can't overlap this one
+                server._leave(len(payload))
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(payload)))
+                if status in (200, 304):
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.httpd.server_address[1]
+        self.base = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _route(self, path):
+        for prefix, route in self.routes.items():
+            if path.startswith(prefix):
+                return route
+        return 200, ARTICLE_HTML, 0, "text/html"
+
+    def _enter(self, path):
+        with self._lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def _leave(self, sent: int = 0):
+        with self._lock:
+            self.active -= 1
+            self.bytes_sent += sent
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_ANALYSIS = {
+    "analysis": "Delegations met to discuss the ceasefire.",
+    "visualization_type": "dot",
+    "arc_style": "solid",
+    "location": None,
+    "toast_message": "Talks resumed",
+    "toast_type": "info",
+    "confidence": 0.8,
+}
+
+
+def analysis_reply(invalid_descriptions=()) -> Callable[[str], str]:
+    """Reply builder for single and batch analysis prompts (BATCH_PROMPT's
+    JSON array): one DEFAULT_ANALYSIS per event, echoing the description.
+    Events whose description is in invalid_descriptions get an empty analysis."""
+    def reply(prompt: str) -> str:
+        if "Events (JSON array):\n" not in prompt:
+            return json.dumps(DEFAULT_ANALYSIS)
+        array = prompt.split("Events (JSON array):\n", 1)[1].split("\n\nRULES for each event", 1)[0]
+        results = [{**DEFAULT_ANALYSIS, "event_id": e["event_id"],
+                    "analysis": "" if e["description"] in invalid_descriptions else e["description"]}
+                   for e in json.loads(array)]
+        return json.dumps({"results": results})
+    return reply
+
+
+class MockLLMServer:
+    """OpenAI-compatible POST /chat/completions on 127.0.0.1 for LLM engine tests.
+
+    Each request sleeps `latency` seconds, then answers with the next status
+    from `script` (a list consumed in order, e.g. [429, 200]; empty means
+    200). `reply(prompt)` builds the completion text; by default a fixed
+    analysis JSON. Responses report usage with prompt tokens at ~4 chars per
+    token. Tracks hits, prompts received, tokens served and the peak number
+    of requests in flight.
+    """
+
+    def __init__(self, latency: float = 0.0, script: Optional[List[int]] = None,
+                 reply: Optional[Callable[[str], str]] = None, retry_after: Optional[str] = None):
+        self.latency = latency
+        self.script = list(script or [])
+        self.reply = reply or (lambda prompt: json.dumps(DEFAULT_ANALYSIS))
+        self.retry_after = retry_after
+        self.hits = 0
+        self.prompts: List[str] = []
+        self.statuses: List[int] = []
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                prompt = next((m.get("content", "") for m in reversed(body.get("messages") or [])
+                               if m.get("role") == "user"), "")
+                status = server._enter(prompt)
+                if server.latency:
+                    time.sleep(server.latency)
+                headers: Dict[str, str] = {"Content-Type": "application/json"}
+                prompt_tokens = completion_tokens = 0
+                if status == 200:
+                    text = server.reply(prompt)
+                    prompt_tokens = max(1, len(prompt) // 4)
+                    completion_tokens = max(1, len(text) // 4)
+                    payload = json.dumps({
+                        "model": body.get("model"),
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}}],
+                        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                                  "total_tokens": prompt_tokens + completion_tokens},
+                    }).encode("utf-8")
+                else:
+                    payload = json.dumps({"error": {"message": f"status {status}"}}).encode("utf-8")
+                    if status == 429 and server.retry_after:
+                        headers["Retry-After"] = server.retry_after
+                server._leave(prompt_tokens, completion_tokens)
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.httpd.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}/chat/completions"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _enter(self, prompt: str) -> int:
+        with self._lock:
+            self.hits += 1
+            self.prompts.append(prompt)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            status = self.script.pop(0) if self.script else 200
+            self.statuses.append(status)
+            return status
+
+    def _leave(self, prompt_tokens: int = 0, completion_tokens: int = 0):
+        with self._lock:
+            self.active -= 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
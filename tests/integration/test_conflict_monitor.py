@@ -39,6 +39,20 @@ class TestConflictMonitor:
         assert severity > 0
         assert isinstance(severity, (int, float))
 
+    def test_real_export_values_drive_scores(self):
+        event = create_mock_conflict_event(eventid="1", eventcode="190", importance=30)
+        event["properties"].update({
+            "goldsteinscale": -10.0, "nummentions": 12, "numsources": 4, "avgtone": -7.25, "quadclass": 4,
+        })
+        legacy = create_mock_conflict_event(eventid="2", eventcode="141", importance=30)
+        real, fallback = self.monitor.categorize_and_filter([event, legacy])
+        assert real['GoldsteinScale'] == -10.0
+        assert real['AvgTone'] == -7.25
+        assert (real['NumMentions'], real['NumSources']) == (12, 4)
+        assert real['severity_score'] == 10.0 * 2 + 12 * 0.5 + 4 * 1.5
+        assert fallback['GoldsteinScale'] == -3.0
+        assert fallback['NumSources'] == 30
+
     def test_high_impact_detection(self):
         events = [
             create_mock_conflict_event(eventid="1", eventcode="190", importance=50),
@@ -60,6 +74,18 @@ class TestConflictMonitor:
         count = self.monitor.db.execute("SELECT COUNT(*) FROM conflict_events").fetchone()[0]
         assert count >= len(categorized)
 
+    def test_failed_batch_raises_and_stores_nothing(self):
+        events = [
+            create_mock_conflict_event(eventid="1", eventcode="190"),
+            create_mock_conflict_event(eventid="2", eventcode="141"),
+        ]
+        categorized = self.monitor.categorize_and_filter(events)
+        categorized[-1]["GlobalEventID"] = "not-a-number"
+        with pytest.raises(Exception):
+            self.monitor.store_events(categorized)
+        count = self.monitor.db.execute("SELECT COUNT(*) FROM conflict_events").fetchone()[0]
+        assert count == 0
+
     def test_query_protests(self):
         events = [
             create_mock_conflict_event(eventid="1", eventcode="141", category="protest", importance=15),
@@ -108,3 +134,38 @@ class TestConflictMonitor:
         assert 'high_impact_count' in result
         assert 'alerts' in result
         assert result['total_conflict_events'] >= 0
+
+    def test_rollups_match_raw_and_are_idempotent(self):
+        events = create_mock_event_collection(count=12, event_type="conflict")
+        categorized = self.monitor.categorize_and_filter(events)
+        self.monitor.store_events(categorized)
+        self.monitor.store_events(categorized)
+        rollup_total = self.monitor.db.execute(
+            "SELECT SUM(event_count) FROM conflict_country_daily"
+        ).fetchone()[0]
+        raw_total = self.monitor.db.execute("SELECT COUNT(*) FROM conflict_events").fetchone()[0]
+        assert rollup_total == raw_total == len(categorized)
+        hotspots = self.monitor.query_hotspots(days=7)
+        assert hotspots[0]['event_count'] == len(categorized)
+        assert hotspots[0]['violence_count'] == 4
+        casualties = self.monitor.query_mass_casualty(days=7)
+        assert sum(c['event_count'] for c in casualties) == 4
+
+    def test_rollups_rebuilt_for_existing_database(self):
+        events = create_mock_event_collection(count=6, event_type="conflict")
+        self.monitor.store_events(self.monitor.categorize_and_filter(events))
+        self.monitor.db.execute("DELETE FROM conflict_country_daily")
+        self.monitor.db.close()
+        reopened = ConflictMonitor(db_path=str(self.test_db))
+        total = reopened.db.execute("SELECT SUM(event_count) FROM conflict_country_daily").fetchone()[0]
+        assert total == 6
+
+    def test_queries_from_many_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        events = create_mock_event_collection(count=12, event_type="conflict")
+        self.monitor.store_events(self.monitor.categorize_and_filter(events))
+        expected = self.monitor.query_hotspots(days=7)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: self.monitor.query_hotspots(days=7), range(64)))
+        assert all(r == expected for r in results)
@@ -42,6 +42,16 @@ class TestDiplomaticTracker:
         assert 'military' in interaction_types
         assert 'conflict' in interaction_types
 
+    def test_real_export_values_used_for_cooperation(self):
+        event = create_mock_bilateral_event(eventid="1", eventcode="04", actor1countrycode="USA", actor2countrycode="CHN")
+        event["properties"].update({"goldsteinscale": 7.0, "numsources": 3, "avgtone": 2.5, "quadclass": 1})
+        categorized = self.tracker.categorize_interactions([event])
+        assert categorized[0]['cooperation_score'] == 7.0
+        assert categorized[0]['GoldsteinScale'] == 7.0
+        assert categorized[0]['AvgTone'] == 2.5
+        assert categorized[0]['NumSources'] == 3
+        assert categorized[0]['QuadClass'] == 1
+
     def test_relation_metrics(self):
         events = [
             create_mock_bilateral_event(eventid="1", eventcode="01", actor1countrycode="USA", actor2countrycode="CHN"),
@@ -85,6 +95,19 @@ class TestDiplomaticTracker:
         count = self.tracker.db.execute("SELECT COUNT(*) FROM country_interactions").fetchone()[0]
         assert count >= len(categorized)
 
+    def test_failed_batch_raises_and_stores_nothing(self):
+        events = [
+            create_mock_bilateral_event(eventid="1", actor1countrycode="USA", actor2countrycode="CHN"),
+            create_mock_bilateral_event(eventid="2", actor1countrycode="USA", actor2countrycode="RUS"),
+        ]
+        bilateral = self.tracker.filter_bilateral_events(events)
+        categorized = self.tracker.categorize_interactions(bilateral)
+        categorized[-1]["GlobalEventID"] = "not-a-number"
+        with pytest.raises(Exception):
+            self.tracker.store_interactions(categorized)
+        count = self.tracker.db.execute("SELECT COUNT(*) FROM country_interactions").fetchone()[0]
+        assert count == 0
+
     def test_network_centrality_query(self):
         events = create_mock_event_collection(count=10, event_type="bilateral")
         bilateral = self.tracker.filter_bilateral_events(events)
@@ -141,3 +164,25 @@ class TestDiplomaticTracker:
         assert isinstance(significant, list)
         if significant:
             assert 'priority_score' in significant[0]
+
+    def test_rollup_queries_match_raw_table(self):
+        events = [
+            create_mock_bilateral_event(eventid="1", eventcode="18", actor1countrycode="USA", actor2countrycode="RUS"),
+            create_mock_bilateral_event(eventid="2", eventcode="19", actor1countrycode="RUS", actor2countrycode="USA"),
+            create_mock_bilateral_event(eventid="3", eventcode="20", actor1countrycode="USA", actor2countrycode="RUS"),
+            create_mock_bilateral_event(eventid="4", eventcode="01", actor1countrycode="USA", actor2countrycode="CHN"),
+        ]
+        categorized = self.tracker.categorize_interactions(self.tracker.filter_bilateral_events(events))
+        self.tracker.store_interactions(categorized)
+        self.tracker.store_interactions(categorized)
+
+        pairs = self.tracker.query_conflict_pairs(days=30)
+        assert len(pairs) == 1
+        assert pairs[0]['country_pair'] == 'RUS-USA'
+        assert pairs[0]['conflict_events'] == 3
+        assert pairs[0]['avg_severity'] == -8.0
+
+        centrality = {row['country']: row for row in self.tracker.query_network_centrality(days=30)}
+        assert centrality['USA']['total_interactions'] == 4
+        assert centrality['USA']['num_partners'] == 2
+        assert centrality['CHN']['total_interactions'] == 1
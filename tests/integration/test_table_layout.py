@@ -0,0 +1,75 @@
+import random
+import threading
+from pathlib import Path
+
+import pytest
+
+from ingestion_engine.conflict_monitor import ConflictMonitor
+from ingestion_engine.diplomatic_tracker import DiplomaticRelationsTracker
+from ingestion_engine.maintenance.table_layout import (
+    REWRITE_LOCK,
+    reorganize_database,
+    reorganize_if_due,
+    reorganize_table,
+)
+from ingestion_engine.services.gdelt_event_aggregator import collect_from_conflict
+from tests.fixtures import create_mock_event_collection
+
+pytestmark = pytest.mark.integration
+
+
+class TestTableLayout:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.monitor = ConflictMonitor(db_path=str(tmp_path / "test_conflicts.duckdb"))
+        self.tracker = DiplomaticRelationsTracker(db_path=str(tmp_path / "test_diplomacy.duckdb"))
+
+    def _store_shuffled(self, count=30):
+        events = create_mock_event_collection(count=count, event_type="conflict")
+        random.Random(7).shuffle(events)
+        categorized = self.monitor.categorize_and_filter(events)
+        self.monitor.store_events(categorized)
+        return categorized
+
+    def test_reorganize_sorts_rows_and_keeps_constraints(self):
+        stored = self._store_shuffled()
+        self.monitor.db.execute("INSERT INTO casualty_counts VALUES (?, 'KILL', 3, 'ctx', NULL)",
+                                [stored[0]["GlobalEventID"]])
+
+        summary = reorganize_table(self.monitor.db, "conflict_events")
+        assert summary["rows"] == len(stored)
+        assert summary["dependents"] == ["casualty_counts"]
+
+        keys = self.monitor.db.execute(
+            "SELECT EventDate, event_category, EventRootCode FROM conflict_events"
+        ).fetchall()
+        assert keys == sorted(keys)
+        assert self.monitor.db.execute("SELECT COUNT(*) FROM casualty_counts").fetchone()[0] == 1
+
+        self.monitor.store_events(stored[:3])
+        assert self.monitor.db.execute("SELECT COUNT(*) FROM conflict_events").fetchone()[0] == len(stored)
+        with pytest.raises(Exception):
+            self.monitor.db.execute("INSERT INTO casualty_counts VALUES (-1, 'KILL', 1, 'ctx', NULL)")
+
+    def test_reorganize_if_due_respects_interval(self):
+        self._store_shuffled(count=6)
+        first = reorganize_if_due(self.monitor.db, interval_hours=24)
+        assert [r["table"] for r in first] == ["conflict_events"]
+        assert reorganize_if_due(self.monitor.db, interval_hours=24) == []
+        assert reorganize_if_due(self.monitor.db, interval_hours=0) == []
+
+    def test_reorganize_database_skips_missing_tables(self):
+        results = reorganize_database(self.tracker.db)
+        assert [r["table"] for r in results] == ["country_interactions"]
+
+    def test_aggregator_reads_wait_for_rewrites(self):
+        self._store_shuffled()
+        results = []
+        with REWRITE_LOCK:  # as held by reorganize_table()
+            reader = threading.Thread(
+                target=lambda: results.append(collect_from_conflict(Path(self.monitor.db_path), limit=100)))
+            reader.start()
+            reader.join(timeout=0.3)
+            assert reader.is_alive() and not results
+        reader.join(timeout=10)
+        assert results and results[0]
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: article text extraction time per article, legacy vs tiered.
+
+legacy  - what news_scraper did before text_extractor.py: newspaper3k parse,
+          then readability summary (HTML), then BeautifulSoup html.parser.
+fetcher - what article_fetcher did: the readability-then-bs4 part alone.
+tiered  - text_extractor.extract(): lxml first, escalating to readability /
+          newspaper3k / bs4 only when the quality check fails.
+
+Runs over the fixture corpus in tests/fixtures/articles.py (semantic, div
+soup, <br>-separated and short pages), or over a directory of saved .html
+files with --input. Reports mean / p50 / p95 ms per article, the tier that
+produced each text, and how many outputs still contain HTML tags.
+
+    python tests/manual/bench_article_extraction.py
+    python tests/manual/bench_article_extraction.py --articles 400
+    python tests/manual/bench_article_extraction.py --input /tmp/pages
+"""
+import argparse
+import re
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+
+from ingestion_engine.services import text_extractor
+from tests.fixtures.articles import article_corpus
+
+TAG = re.compile(r"<[a-zA-Z/][^>]*>")
+
+
+def legacy_extract(html: str, url: str):
+    try:
+        from newspaper import Article
+        art = Article(url)
+        art.download(input_html=html)
+        art.parse()
+        if art.text and art.text.strip():
+            return art.text.strip(), "newspaper3k"
+    except Exception:
+        pass
+    return legacy_fetcher_extract(html, url)
+
+
+def legacy_fetcher_extract(html: str, url: str):
+    try:
+        from readability import Document
+        summary = Document(html).summary()
+        if summary and len(summary.strip()) > 100:
+            return summary, "readability"
+    except Exception:
+        pass
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in ("script", "style", "nav", "footer", "header"):
+        for e in soup.find_all(tag):
+            e.decompose()
+    return soup.get_text(separator="\n", strip=True) or None, "bs4"
+
+
+def tiered_extract(html: str, url: str):
+    article = text_extractor.extract(html, url, use_newspaper3k=True)
+    return article.text, article.extractor
+
+
+def run(name, fn, pages, repeat):
+    times, tiers, with_html, chars = [], Counter(), 0, 0
+    for kind, html in pages:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            text, tier = fn(html, "http://example.com/news/story")
+            best = min(best, time.perf_counter() - start)
+        times.append(best * 1e3)
+        tiers[tier] += 1
+        with_html += bool(text and TAG.search(text))
+        chars += len(text or "")
+    times.sort()
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    print(f"{name:<8}{statistics.mean(times):>9.2f}{statistics.median(times):>9.2f}{p95:>9.2f}"
+          f"{sum(times) / 1e3:>9.2f}{with_html:>7}{chars / len(pages):>9.0f}   {dict(tiers)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=200, help="fixture pages to generate")
+    parser.add_argument("--input", help="directory of .html files instead of the fixture corpus")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.input:
+        pages = [("file", p.read_text(encoding="utf-8", errors="replace"))
+                 for p in sorted(Path(args.input).glob("*.html"))]
+    else:
+        pages = article_corpus(args.articles)
+    print(f"pages: {len(pages)} {dict(Counter(k for k, _ in pages))}")
+
+    # warm imports (newspaper3k, readability) so the first page isn't charged for them
+    legacy_extract(pages[0][1], "http://example.com/")
+    tiered_extract(pages[0][1], "http://example.com/")
+
+    print(f"{'':<8}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'total s':>9}{'html':>7}{'chars':>9}   tiers")
+    run("legacy", legacy_extract, pages, args.repeat)
+    run("fetcher", legacy_fetcher_extract, pages, args.repeat)
+    run("tiered", tiered_extract, pages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark: query_* latency on synthetic conflict/diplomacy tables before and
+after table_layout.reorganize_table. Standalone - no server required.
+
+Rows are generated in random EventDate/category order (as firehose batches
+arrive), timed, then clustered by (EventDate, category) and timed again.
+
+    python tests/manual/bench_event_table_layout.py               # 10M rows per table
+    python tests/manual/bench_event_table_layout.py --rows 500000 --repeat 3
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from ingestion_engine.conflict_monitor import ConflictMonitor
+from ingestion_engine.diplomatic_tracker import DiplomaticRelationsTracker
+from ingestion_engine.maintenance.table_layout import reorganize_table
+
+COUNTRIES = ["USA", "CHN", "RUS", "UKR", "ISR", "IND", "PAK", "IRN", "SYR", "NGA",
+             "SDN", "MMR", "BRA", "MEX", "FRA", "GBR", "DEU", "TUR", "EGY", "ETH"]
+DAYS = 90
+
+
+def _country_expr(alias: str) -> str:
+    values = ", ".join(f"'{c}'" for c in COUNTRIES)
+    return f"([{values}])[1 + (hash({alias}) % {len(COUNTRIES)})::INT]"
+
+
+def generate_conflict_rows(db, rows: int):
+    db.execute(f"""
+        INSERT INTO conflict_events
+        SELECT
+            i,
+            CURRENT_DATE - (hash(i * 7) % {DAYS})::INT,
+            NOW()::TIMESTAMP,
+            (['14', '17', '18', '19', '20'])[1 + (hash(i * 11) % 5)::INT],
+            (['141', '173', '180', '190', '200'])[1 + (hash(i * 11) % 5)::INT],
+            4,
+            -10 + (hash(i * 13) % 200) / 10.0,
+            1 + (hash(i * 17) % 50)::INT,
+            1 + (hash(i * 19) % 30)::INT,
+            -10 + (hash(i * 23) % 200) / 10.0,
+            {_country_expr('i * 29')},
+            {_country_expr('i * 31')},
+            'Actor1', 'Actor2',
+            {_country_expr('i * 37')},
+            'Location ' || (hash(i * 41) % 500)::VARCHAR,
+            0.0, 0.0,
+            'https://example.com/' || i::VARCHAR,
+            (['protest', 'coercion', 'violence', 'violence', 'violence'])[1 + (hash(i * 11) % 5)::INT],
+            (hash(i * 43) % 1000) / 10.0
+        FROM range({rows}) t(i)
+    """)
+
+
+def generate_interaction_rows(db, rows: int):
+    db.execute(f"""
+        INSERT INTO country_interactions
+        SELECT
+            i,
+            CURRENT_DATE - (hash(i * 7) % {DAYS})::INT,
+            {_country_expr('i * 29')},
+            {_country_expr('i * 31')},
+            (['01', '04', '07', '15', '18', '19'])[1 + (hash(i * 11) % 6)::INT],
+            (['010', '040', '061', '150', '180', '190'])[1 + (hash(i * 11) % 6)::INT],
+            (CASE WHEN hash(i * 11) % 6 >= 4 THEN 4 ELSE 1 END),
+            -10 + (hash(i * 13) % 200) / 10.0,
+            (['diplomatic', 'diplomatic', 'economic', 'military', 'conflict', 'conflict'])[1 + (hash(i * 11) % 6)::INT],
+            0.0,
+            1 + (hash(i * 19) % 30)::INT,
+            -10 + (hash(i * 23) % 200) / 10.0,
+            'https://example.com/' || i::VARCHAR,
+            NOW()::TIMESTAMP
+        FROM range({rows}) t(i)
+    """)
+
+
+def time_call(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run_suite(monitor, tracker, repeat: int) -> dict:
+    latest_day = [monitor.db.execute("SELECT MAX(EventDate) FROM conflict_events").fetchone()[0]]
+
+    def refresh_conflict_rollups():
+        monitor.db.begin()
+        monitor._refresh_rollups(latest_day)
+        monitor.db.commit()
+
+    def refresh_pair_rollups():
+        tracker.db.begin()
+        tracker._refresh_rollups(latest_day)
+        tracker.db.commit()
+
+    return {
+        "query_protests(7d)": time_call(lambda: monitor.query_protests(days=7, min_sources=10), repeat),
+        "query_mass_casualty(7d)": time_call(lambda: monitor.query_mass_casualty(days=7), repeat),
+        "query_hotspots(7d)": time_call(lambda: monitor.query_hotspots(days=7), repeat),
+        "query_network_centrality(30d)": time_call(lambda: tracker.query_network_centrality(days=30), repeat),
+        "query_conflict_pairs(30d)": time_call(lambda: tracker.query_conflict_pairs(days=30), repeat),
+        "conflict rollup refresh (1 day)": time_call(refresh_conflict_rollups, repeat),
+        "pair rollup refresh (1 day)": time_call(refresh_pair_rollups, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event table layout")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Synthetic rows per table")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        monitor = ConflictMonitor(db_path=str(Path(tmp) / "bench_conflicts.duckdb"))
+        tracker = DiplomaticRelationsTracker(db_path=str(Path(tmp) / "bench_diplomacy.duckdb"))
+
+        print(f"Generating {args.rows:,} rows per table ...")
+        start = time.perf_counter()
+        generate_conflict_rows(monitor.db, args.rows)
+        generate_interaction_rows(tracker.db, args.rows)
+        monitor.rebuild_rollups()
+        tracker.rebuild_rollups()
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+        before = run_suite(monitor, tracker, args.repeat)
+
+        print("Reorganizing ...")
+        for db, table in ((monitor.db, "conflict_events"), (tracker.db, "country_interactions")):
+            summary = reorganize_table(db, table)
+            print(f"  {table}: {summary['rows']:,} rows in {summary['elapsed_seconds']}s")
+
+        after = run_suite(monitor, tracker, args.repeat)
+
+    print(f"\n{'query (median ms)':<34}{'before':>10}{'after':>10}{'speedup':>10}")
+    for name, b in before.items():
+        a = after[name]
+        print(f"{name:<34}{b:>10.2f}{a:>10.2f}{(b / a if a else 0):>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: DataProcessor.get_daily_summary latency over a year of history,
+append-only DuckDB table vs day-partitioned Parquet (metrics_store.py).
+Standalone - no network or server required.
+
+Synthetic rows cover --days days x --countries countries x 8 metrics. The
+legacy table also receives --reruns duplicate loads of every day, as repeated
+update_pipeline.py runs produced before keyed upserts.
+
+    python tests/manual/bench_gkg_metrics_summary.py
+    python tests/manual/bench_gkg_metrics_summary.py --days 365 --countries 250 --reruns 2 --repeat 10
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import duckdb
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from ingestion_engine.gkg_pipeline.process_data import DataProcessor
+
+METRICS = ["KILL", "INJURED", "CRISISLEXT03DEAD", "CRISISLEXT02INJURED",
+           "DISPLACED", "REFUGEES", "PROTEST", "ARREST"]
+
+LEGACY_SUMMARY = """
+    SELECT
+        date,
+        country,
+        SUM(CASE WHEN metric_type IN ('KILL', 'CRISISLEXT03DEAD') THEN count ELSE 0 END) AS deaths,
+        SUM(CASE WHEN metric_type IN ('INJURED', 'CRISISLEXT02INJURED') THEN count ELSE 0 END) AS injured,
+        SUM(CASE WHEN metric_type IN ('DISPLACED', 'REFUGEES') THEN count ELSE 0 END) AS displaced,
+        SUM(CASE WHEN metric_type = 'PROTEST' THEN count ELSE 0 END) AS protests
+    FROM gdelt_metrics
+    WHERE date >= CURRENT_DATE - INTERVAL '{days} days'
+    GROUP BY date, country
+    ORDER BY date DESC, country
+"""
+
+
+def synthetic_rows_sql(days: int, countries: int) -> str:
+    metrics = ", ".join(f"'{m}'" for m in METRICS)
+    return f"""(
+        SELECT
+            CURRENT_DATE - d::INT AS date,
+            'C' || lpad(c::VARCHAR, 3, '0') AS country,
+            ([{metrics}])[m::INT + 1] AS metric_type,
+            (hash(d, c, m) % 500)::BIGINT AS count,
+            (hash(c, m, d) % 50)::BIGINT AS num_sources,
+            'GDELT' AS source
+        FROM range({days}) t1(d), range({countries}) t2(c), range({len(METRICS)}) t3(m)
+    )"""
+
+
+def time_call(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gdelt_metrics summary latency")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--countries", type=int, default=250)
+    parser.add_argument("--reruns", type=int, default=2, help="Duplicate loads in the legacy table")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rows_sql = synthetic_rows_sql(args.days, args.countries)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        legacy = duckdb.connect(str(tmp / "legacy.duckdb"))
+        legacy.execute(f"CREATE TABLE gdelt_metrics AS SELECT *, NOW()::TIMESTAMP AS updated_at FROM {rows_sql}")
+        for _ in range(args.reruns):
+            legacy.execute(f"INSERT INTO gdelt_metrics SELECT *, NOW()::TIMESTAMP FROM {rows_sql}")
+        legacy_rows = legacy.execute("SELECT COUNT(*) FROM gdelt_metrics").fetchone()[0]
+
+        config = {
+            "paths": {
+                "db_path": str(tmp / "partitioned.duckdb"),
+                "processed_dir": str(tmp / "processed"),
+                "metrics_dir": str(tmp / "gkg_metrics"),
+            },
+            "metrics": METRICS,
+        }
+        (tmp / "config.yaml").write_text(yaml.safe_dump(config))
+        processor = DataProcessor(str(tmp / "config.yaml"))
+
+        start = time.perf_counter()
+        written = processor.store.upsert("gdelt_metrics", rows_sql)
+        load_s = time.perf_counter() - start
+        start = time.perf_counter()
+        processor.store.upsert("gdelt_metrics", rows_sql)
+        rerun_s = time.perf_counter() - start
+        part_rows = processor.conn.execute("SELECT COUNT(*) FROM gdelt_metrics").fetchone()[0]
+
+        print(f"legacy table: {legacy_rows:,} rows (incl. {args.reruns} rerun duplicates)")
+        print(f"partitioned:  {part_rows:,} rows in {written} day files "
+              f"(initial load {load_s:.1f}s, idempotent rerun {rerun_s:.1f}s)")
+
+        print(f"\n{'summary window':<16}{'legacy ms':>12}{'partitioned ms':>16}{'speedup':>10}")
+        for window in (7, 30, 90, 365):
+            a = time_call(lambda: legacy.execute(LEGACY_SUMMARY.format(days=window)).df(), args.repeat)
+            b = time_call(lambda: processor.get_daily_summary(days=window), args.repeat)
+            print(f"{f'{window} days':<16}{a:>12.2f}{b:>16.2f}{(a / b if b else 0):>9.1f}x")
+
+        legacy.close()
+
+
+if __name__ == "__main__":
+    main()
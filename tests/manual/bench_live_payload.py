@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/live payload size and parse time, GeoJSON vs columnar vs Arrow.
+
+Builds a synthetic live state by running export rows (varied actors,
+countries, categories, 0-4 mention URLs each) through the shared parser,
+or loads an existing gdelt_latest.json with --input. For each format it
+reports raw and gzip size, server-side encode time, and client parse time:
+Python always, and the browser path (JSON.parse + decodeColumnar from
+src/managers/DataManager.js) when node is on PATH.
+
+    python tests/manual/bench_live_payload.py
+    python tests/manual/bench_live_payload.py --events 50000
+    python tests/manual/bench_live_payload.py --input data/live/gdelt_latest.json
+"""
+import argparse
+import gzip
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+
+from ingestion_engine.sources import gdelt
+
+CODES = ["190", "193", "145", "141", "180", "0233", "1823", "020", "173"]
+COUNTRIES = [("SY", "SYR", "Damascus, Syria"), ("UA", "UKR", "Kyiv, Ukraine"), ("SD", "SDN", "Khartoum, Sudan"),
+             ("US", "USA", "Chicago, Illinois, United States"), ("IN", "IND", "Delhi, India"),
+             ("NG", "NGA", "Lagos, Nigeria"), ("FR", "FRA", "Paris, France")]
+ACTORS = ["POLICE", "MILITARY", "PROTESTER", "REBELS", "GOVERNMENT", "STUDENT", "", "CIVILIAN", "MILITANT"]
+
+
+def synthetic_collection(events: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    rows, mentions = [], {}
+    for i in range(events):
+        cc, iso3, place = rng.choice(COUNTRIES)
+        row = [""] * 61
+        row[0], row[1] = str(1_100_000_000 + i), "20240101"
+        row[6], row[7], row[16], row[17] = rng.choice(ACTORS), iso3, rng.choice(ACTORS), rng.choice(COUNTRIES)[1]
+        row[26], row[29], row[30] = rng.choice(CODES), str(rng.randint(1, 4)), str(rng.choice([-10, -5, 2.8, 3.4]))
+        row[31], row[32], row[33], row[34] = str(rng.randint(1, 40)), str(rng.randint(1, 6)), str(rng.randint(1, 40)), str(rng.uniform(-9, 3))
+        row[52], row[53], row[54] = place, cc, f"{cc}{rng.randint(1, 30):02d}"
+        row[56], row[57] = str(rng.uniform(-60, 60)), str(rng.uniform(-120, 120))
+        row[60] = f"https://news{rng.randint(1, 400)}.example.com/2024/01/01/story-{i}.html"
+        rows.append(row)
+        for k in range(rng.randint(0, 4)):
+            mentions.setdefault(row[0], set()).add(f"https://outlet{rng.randint(1, 900)}.example.org/a/{i}-{k}")
+    features = []
+    for batch in gdelt.stream_export("bench", mentions, rows=rows, root_fallback=True):
+        features.extend(batch.features)
+    return {"type": "FeatureCollection", "features": features}
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+NODE_SCRIPT = """
+import { decodeColumnar } from %(module)s;
+import fs from 'fs';
+const out = {};
+for (const [name, path] of [['geojson', %(geojson)s], ['columnar', %(columnar)s]]) {
+    const text = fs.readFileSync(path, 'utf8');
+    let best = Infinity;
+    for (let i = 0; i < %(repeat)d; i++) {
+        const t = performance.now();
+        const data = JSON.parse(text);
+        const fc = name === 'columnar' ? decodeColumnar(data) : data;
+        if (!fc.features.length) throw new Error('empty');
+        best = Math.min(best, performance.now() - t);
+    }
+    out[name] = best;
+}
+console.log(JSON.stringify(out));
+"""
+
+
+def node_parse_ms(payloads: dict, repeat: int):
+    node = shutil.which("node")
+    if not node:
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for name in ("geojson", "columnar"):
+            paths[name] = Path(tmp) / f"{name}.json"
+            paths[name].write_bytes(payloads[name])
+        script = NODE_SCRIPT % {
+            "module": json.dumps((REPO_ROOT / "src" / "managers" / "DataManager.js").as_uri()),
+            "geojson": json.dumps(str(paths["geojson"])),
+            "columnar": json.dumps(str(paths["columnar"])),
+            "repeat": repeat,
+        }
+        proc = subprocess.run([node, "--input-type=module", "-e", script], capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"node timing failed: {proc.stderr.strip()[:300]}")
+            return None
+        return json.loads(proc.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000, help="synthetic export rows")
+    parser.add_argument("--input", help="existing gdelt_latest.json instead of synthetic data")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input) as f:
+            collection = json.load(f)
+    else:
+        collection = synthetic_collection(args.events)
+    n = len(collection["features"])
+    print(f"features: {n}")
+
+    import pyarrow as pa
+
+    encoders = {
+        "geojson": gdelt.encode_collection,
+        "columnar": gdelt.encode_columnar,
+        "arrow": gdelt.encode_arrow,
+    }
+    parsers = {
+        "geojson": json.loads,
+        "columnar": lambda b: gdelt.from_columnar(json.loads(b)),
+        "arrow": lambda b: pa.ipc.open_stream(b).read_all(),
+    }
+    payloads, rows = {}, []
+    for name, encode in encoders.items():
+        payload, encode_s = timed(lambda: encode(collection), args.repeat)
+        payloads[name] = payload
+        _, parse_s = timed(lambda: parsers[name](payload), args.repeat)
+        rows.append((name, len(payload), len(gzip.compress(payload, 6)), encode_s, parse_s))
+
+    base_raw, base_gz = rows[0][1], rows[0][2]
+    print(f"{'format':<10}{'raw MB':>10}{'gzip MB':>10}{'vs raw':>8}{'vs gzip':>9}{'encode ms':>11}{'py parse ms':>13}")
+    for name, raw, gz, enc, prs in rows:
+        print(f"{name:<10}{raw / 1e6:>10.2f}{gz / 1e6:>10.2f}{raw / base_raw:>8.2f}{gz / base_gz:>9.2f}"
+              f"{enc * 1e3:>11.1f}{prs * 1e3:>13.1f}")
+    print("py parse: json.loads (geojson), json.loads + from_columnar (columnar), IPC read_all (arrow)")
+
+    node = node_parse_ms(payloads, args.repeat)
+    if node:
+        print(f"browser path (node): geojson JSON.parse {node['geojson']:.1f} ms, "
+              f"columnar JSON.parse + decodeColumnar {node['columnar']:.1f} ms")
+    else:
+        print("node not found: skipped browser-path timing")
+
+
+if __name__ == "__main__":
+    main()
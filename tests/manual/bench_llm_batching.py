@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tokens per event and wall time, per-event vs batched LLM analysis.
+
+Runs analyze_events_with_articles over synthetic aggregator events (two
+article excerpts each) against a local mock completions server
+(tests/fixtures/llm.py), once with batch_size=1 (one request per event, the
+ANALYSIS_PROMPT rules repeated every time) and once per --batch-size.
+Token counts are the mock's usage numbers (~4 chars per token).
+
+The mock answers after --latency seconds plus --ms-per-token for every output
+token, so a batch reply takes about as long as generating its events one by
+one; --rpm applies the provider's requests-per-minute limit (Groq's free tier
+is 30), which is where fewer requests pay off most.
+
+    python tests/manual/bench_llm_batching.py
+    python tests/manual/bench_llm_batching.py --events 40 --batch-size 4 8 --rpm 30
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+
+from ingestion_engine.services import llm_analysis_engine
+from ingestion_engine.services.llm_engine import LLMEngine, Provider
+from tests.fixtures.articles import SENTENCES
+from tests.fixtures.llm import MockLLMServer, analysis_reply
+
+COUNTRIES = ["USA", "CHN", "RUS", "UKR", "ISR", "LBN", "IRN", "TUR", "IND", "PAK"]
+
+
+def make_events(n: int, seed: int = 5):
+    rng = random.Random(seed)
+    events, articles = [], {}
+    for i in range(n):
+        urls = [f"https://news{k}.example.com/story-{i}" for k in range(2)]
+        for url in urls:
+            articles[url] = "\n\n".join(" ".join(rng.sample(SENTENCES, 4)) for _ in range(rng.randint(3, 6)))
+        events.append({
+            "id": f"gdelt_bench_{i}",
+            "type": rng.choice(["diplomacy", "conflict", "location"]),
+            "participants": rng.sample(COUNTRIES, rng.choice([0, 1, 2])),
+            "location": {"lat": round(rng.uniform(-40, 60), 3), "lon": round(rng.uniform(-120, 140), 3)},
+            "description": f"Event {i}: " + rng.choice(SENTENCES),
+            "confidence": 0.5,
+            "source_urls": urls,
+        })
+    return events, articles
+
+
+def run(label, events, articles, batch_size, args):
+    def reply(prompt, build=analysis_reply()):
+        text = build(prompt)
+        time.sleep(args.ms_per_token / 1e3 * len(text) // 4)
+        return text
+
+    with MockLLMServer(latency=args.latency, reply=reply) as server:
+        engine = LLMEngine([Provider("mock", server.url, "bench-model", "key", rpm=args.rpm, tpm=10_000_000)],
+                           max_concurrency=args.concurrency)
+        engine.buckets["mock"][0].tokens = 1  # no initial burst: start paced, as a busy minute would be
+        llm_analysis_engine._engine = engine
+        stats = {}
+        start = time.perf_counter()
+        results = llm_analysis_engine.analyze_events_with_articles(
+            events, fetch_articles_fn=lambda urls, use_cache=True: {u: articles[u] for u in urls},
+            use_cache=False, lazy_if_high_confidence=False, batch_size=batch_size, stats=stats,
+        )
+        elapsed = time.perf_counter() - start
+        engine.close()
+        ok = sum(1 for r in results if r["llm_analysis"])
+        n = len(events)
+        print(f"{label:<10}{server.hits:>9}{server.prompt_tokens / n:>12.0f}{server.completion_tokens / n:>12.0f}"
+              f"{(server.prompt_tokens + server.completion_tokens) / n:>12.0f}{elapsed:>9.2f}{ok:>6}/{n}"
+              f"   {json.dumps(stats) if stats else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=24)
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--latency", type=float, default=0.4, help="seconds per request before generation")
+    parser.add_argument("--ms-per-token", type=float, default=2.0, help="generation time per output token")
+    parser.add_argument("--rpm", type=float, default=60)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    llm_analysis_engine._fetch_wiki_context = lambda event: ""
+    events, articles = make_events(args.events)
+    print(f"events: {len(events)}  rpm: {args.rpm}  concurrency: {args.concurrency}")
+    print(f"{'':<10}{'requests':>9}{'in tok/ev':>12}{'out tok/ev':>12}{'tok/ev':>12}{'wall s':>9}{'ok':>9}")
+    run("per-event", events, articles, 1, args)
+    for size in args.batch_size:
+        run(f"batch {size}", events, articles, size, args)
+
+
+if __name__ == "__main__":
+    main()
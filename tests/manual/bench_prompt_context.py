@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prompt tokens and relevance, character-cut vs token-budgeted context.
+
+chars  - what analyze_event did before context_builder.py: each article cut to
+         its first 3000 characters, 8000 in total, 12000 in the prompt.
+tokens - context_builder.build_article_context(): passages ranked against the
+         event (BM25), filled greedily into LLM_CONTEXT_TOKENS minus the
+         Wikipedia share.
+
+Synthetic events: two-country events with --articles articles each; every
+article has one to three paragraphs naming the participants (by country
+name or capital) at random positions among unrelated filler. Reports mean
+prompt tokens (full ANALYSIS_PROMPT, no Wikipedia context), how many of the
+relevant paragraphs made it into the prompt, and build time.
+
+    python tests/manual/bench_prompt_context.py
+    python tests/manual/bench_prompt_context.py --events 200 --budget 1200
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+
+from ingestion_engine.services import context_builder, llm_analysis_engine
+from ingestion_engine.services.context_builder import count_tokens
+
+FILLER = [
+    "Markets in the region were calm as traders waited for new economic figures from the central bank.",
+    "The weather service forecast heavy rain across the coastal provinces for the rest of the week.",
+    "A local football club announced the signing of a new coach after a disappointing season.",
+    "Commuters faced delays on the main rail line after a signal failure near the northern terminal.",
+    "The city council approved a budget for road repairs and new street lighting in the suburbs.",
+    "Organisers said the film festival sold a record number of tickets despite the cold weather.",
+    "Health officials urged residents to get vaccinated ahead of the winter flu season.",
+    "A new shopping centre opened on the outskirts of town, creating several hundred jobs.",
+]
+PAIRS = [("ISR", "LBN"), ("USA", "CHN"), ("RUS", "UKR"), ("IND", "PAK"), ("IRN", "TUR"), ("EGY", "SDN")]
+
+
+def relevant_paragraph(rng, a, b, names):
+    na, nb = rng.choice(names[a]), rng.choice(names[b])
+    return rng.choice([
+        f"Officials from {na} and {nb} met to discuss the dispute, the first talks in months.",
+        f"Negotiators said {na} had offered concessions that {nb} described as insufficient.",
+        f"Analysts in {nb} warned that tensions with {na} could escalate without mediation.",
+    ])
+
+
+def make_events(n, articles_per_event, seed=9):
+    rng = random.Random(seed)
+    names = context_builder._country_names()
+    events = []
+    for i in range(n):
+        a, b = rng.choice(PAIRS)
+        articles, relevant = {}, []
+        for k in range(articles_per_event):
+            paragraphs = [" ".join(rng.sample(FILLER, 3)) + f" ({i}-{k}-{j})" for j in range(rng.randint(10, 30))]
+            for pos in rng.sample(range(len(paragraphs)), rng.randint(1, 3)):
+                paragraphs[pos] = relevant_paragraph(rng, a, b, names) + f" ({i}-{k}-{pos})"
+                relevant.append(paragraphs[pos])
+            articles[f"https://news{k}.example.com/{i}"] = "\n\n".join(paragraphs)
+        event = {"id": f"bench_{i}", "type": "diplomacy", "participants": [a, b],
+                 "description": f"Talks between {a} and {b}", "confidence": 0.5,
+                 "source_urls": list(articles)}
+        events.append((event, articles, relevant))
+    return events
+
+
+def legacy_excerpts(articles):
+    parts, total = [], 0
+    for url, text in articles.items():
+        if total >= 8000:
+            continue
+        excerpt = (text[:3000] + "...") if len(text) > 3000 else text
+        parts.append(f"[Source: {url}]\n{excerpt}")
+        total += len(excerpt)
+    return ("\n\n---\n\n".join(parts) if parts else "No article content available.")[:12000]
+
+
+def run(name, build, events):
+    tokens, recall, times = [], [], []
+    for event, articles, relevant in events:
+        start = time.perf_counter()
+        content = build(event, articles)
+        times.append((time.perf_counter() - start) * 1e3)
+        fields = llm_analysis_engine._prompt_fields(event, {}, use_wikipedia=False)
+        prompt = llm_analysis_engine.ANALYSIS_PROMPT.format(**{**fields, "article_content": content})
+        tokens.append(count_tokens(prompt))
+        recall.append(sum(p in content for p in relevant) / len(relevant))
+    print(f"{name:<8}{statistics.mean(tokens):>11.0f}{max(tokens):>11}{statistics.mean(recall) * 100:>12.1f}"
+          f"{statistics.mean(times):>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--articles", type=int, default=3, help="articles per event")
+    parser.add_argument("--budget", type=int, default=llm_analysis_engine.LLM_CONTEXT_TOKENS,
+                        help="article token budget (LLM_CONTEXT_TOKENS)")
+    args = parser.parse_args()
+
+    events = make_events(args.events, args.articles)
+    tokenizer = "tiktoken " + context_builder.LLM_TOKENIZER if context_builder._get_encoding() else "approximate"
+    print(f"events: {len(events)}  articles/event: {args.articles}  budget: {args.budget}  tokenizer: {tokenizer}")
+    print(f"{'':<8}{'tokens':>11}{'max':>11}{'relevant %':>12}{'ms':>10}")
+    run("chars", lambda event, articles: legacy_excerpts(articles), events)
+    run("tokens", lambda event, articles: context_builder.build_article_context(articles, event, args.budget), events)
+
+
+if __name__ == "__main__":
+    main()
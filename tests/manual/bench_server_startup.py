@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: server time-to-first-request with and without GDELT_FAST_START.
+
+Starts uvicorn server.main:app in a temp working directory seeded with a
+synthetic data/live snapshot and history window, then measures:
+  - time until GET /api/health answers,
+  - latency of the first GET /api/live,
+  - time until /api/health reports ready (first fetch done; needs network).
+
+The first fetch is a real GDELT download and writes the conflict/diplomacy
+DuckDB files under data/ as the server normally would.
+
+    python tests/manual/bench_server_startup.py
+    python tests/manual/bench_server_startup.py --events 20000 --history 200000 --ready-timeout 0
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+
+from tests.fixtures import create_mock_gdelt_event
+
+
+def write_state(workdir: Path, events: int, history: int):
+    live = workdir / "data" / "live"
+    live.mkdir(parents=True, exist_ok=True)
+    now = datetime.now(timezone.utc).isoformat()
+
+    def features(n):
+        out = []
+        for i in range(n):
+            feat = create_mock_gdelt_event(eventid=str(i), lat=(i % 170) - 85, lng=(i % 350) - 175,
+                                           sourceurl=f"https://example.com/{i}")
+            feat["properties"]["ingested_at"] = now
+            feat["properties"]["event_sig"] = f"eid:{i}"
+            out.append(feat)
+        return out
+
+    with open(live / "gdelt_latest.json", "w") as f:
+        json.dump({"type": "FeatureCollection", "features": features(events)}, f)
+    with open(live / "gdelt_window.json", "w") as f:
+        json.dump({"type": "FeatureCollection", "features": features(history)}, f)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure(workdir: Path, fast: bool, ready_timeout: float) -> dict:
+    port = free_port()
+    env = dict(os.environ, GDELT_FAST_START="1" if fast else "0",
+               PYTHONPATH=str(REPO_ROOT) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    result = {"mode": "fast" if fast else "blocking"}
+    try:
+        while True:
+            try:
+                health = requests.get(f"{base}/api/health", timeout=1).json()
+                break
+            except requests.RequestException:
+                if proc.poll() is not None:
+                    raise RuntimeError("server exited during startup")
+                time.sleep(0.02)
+        result["first_health_s"] = time.perf_counter() - start
+        result["phase_at_first_health"] = health.get("phase")
+
+        t = time.perf_counter()
+        live = requests.get(f"{base}/api/live", timeout=60)
+        result["first_live_ms"] = (time.perf_counter() - t) * 1000
+        result["first_live_events"] = len(live.json().get("features", []))
+
+        result["ready_s"] = None
+        deadline = time.perf_counter() + ready_timeout
+        while time.perf_counter() < deadline:
+            health = requests.get(f"{base}/api/health", timeout=5).json()
+            if health.get("ready") or health.get("phase") == "fetch_failed":
+                result["ready_s"] = time.perf_counter() - start
+                result["final_phase"] = health.get("phase")
+                break
+            time.sleep(0.25)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark server startup")
+    parser.add_argument("--events", type=int, default=5000, help="Events in the gdelt_latest.json snapshot")
+    parser.add_argument("--history", type=int, default=100000, help="Events in the gdelt_window.json history")
+    parser.add_argument("--ready-timeout", type=float, default=180, help="Seconds to wait for the first fetch (0 skips)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        print(f"Seeding snapshot ({args.events:,} events) and history ({args.history:,} events) ...")
+        write_state(workdir, args.events, args.history)
+        rows = [measure(workdir, fast, args.ready_timeout) for fast in (True, False)]
+
+    print(f"\n{'mode':<10}{'first /api/health':>20}{'first /api/live':>18}{'ready':>10}  phase")
+    for r in rows:
+        ready = f"{r['ready_s']:.2f}s" if r.get("ready_s") is not None else "-"
+        print(f"{r['mode']:<10}{r['first_health_s']:>19.2f}s{r['first_live_ms']:>16.1f}ms{ready:>10}  "
+              f"{r['phase_at_first_health']} -> {r.get('final_phase', '-')}")
+
+
+if __name__ == "__main__":
+    main()
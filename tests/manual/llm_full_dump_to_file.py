@@ -24,7 +24,7 @@ from ingestion_engine.services.llm_analysis_engine import (
     OPENROUTER_URL,
     OPENROUTER_API_KEY,
     MODEL,
-    _article_excerpts,
+    _prompt_fields,
 )
 
 import requests
@@ -38,26 +38,9 @@ def main():
     )
     urls = (ev.get("source_urls") or [])[:3]
     articles = fetch_articles(urls, use_cache=True) if urls else {}
-    article_content = _article_excerpts(articles, max_chars_per=3000, max_total=8000)
-
-    participants = ev.get("participants") or []
-    if not isinstance(participants, list):
-        participants = [participants] if participants else []
-    participant_count = len(participants)
-    participants_str = ", ".join(str(p) for p in participants) if participants else "(none)"
-    location = ev.get("location")
-    location_str = json.dumps(location) if location else "N/A"
-
-    prompt = ANALYSIS_PROMPT.format(
-        event_type=ev.get("type", "unknown"),
-        participants=participants_str,
-        participant_count=participant_count,
-        location=location_str,
-        description=(ev.get("description") or "")[:500],
-        confidence=ev.get("confidence", 0.5),
-        source_urls=", ".join((ev.get("source_urls") or [])[:5]),
-        article_content=article_content[:12000],
-    )
+    fields = _prompt_fields(ev, articles)
+    article_content = fields["article_content"]
+    prompt = ANALYSIS_PROMPT.format(**fields)
 
     request_body = {
         "model": MODEL,
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from ingestion_engine.pipelines.fanout import EventBatch, EventPipeline
+from tests.fixtures import create_mock_event_collection
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def pipeline():
+    p = EventPipeline(max_workers=4)
+    yield p
+    p.shutdown(wait=True)
+
+
+def test_every_stage_receives_the_same_batch(pipeline):
+    seen = {}
+    pipeline.register("a", lambda batch: seen.setdefault("a", batch))
+    pipeline.register("b", lambda batch: seen.setdefault("b", batch))
+    batch = EventBatch(create_mock_event_collection(count=3))
+    results = pipeline.run(batch)
+    assert seen["a"] is batch and seen["b"] is batch
+    assert all(r["ok"] for r in results.values())
+    assert all("elapsed_seconds" in r for r in results.values())
+
+
+def test_awaited_stages_run_concurrently(pipeline):
+    barrier = threading.Barrier(2, timeout=2)
+    pipeline.register("left", lambda batch: barrier.wait())
+    pipeline.register("right", lambda batch: barrier.wait())
+    results = pipeline.run(EventBatch([]))
+    assert results["left"]["ok"] and results["right"]["ok"]
+
+
+def test_failing_stage_is_isolated(pipeline):
+    def boom(batch):
+        raise RuntimeError("stage exploded")
+
+    pipeline.register("boom", boom)
+    pipeline.register("count", lambda batch: len(batch))
+    results = pipeline.run(EventBatch([{"properties": {}}] * 2))
+    assert results["boom"]["ok"] is False
+    assert "stage exploded" in results["boom"]["error"]
+    assert results["count"]["result"] == 2
+
+
+def test_detached_stage_does_not_block_and_skips_while_in_flight(pipeline):
+    release = threading.Event()
+    pipeline.register("slow_llm", lambda batch: release.wait(5), wait=False)
+    pipeline.register("history", lambda batch: "done")
+
+    start = time.perf_counter()
+    first = pipeline.run(EventBatch([]))
+    second = pipeline.run(EventBatch([]))
+    assert time.perf_counter() - start < 1
+    assert first["history"]["result"] == "done"
+    assert first["slow_llm"]["status"] == "submitted"
+    assert second["slow_llm"]["status"] == "skipped"
+
+    release.set()
+    for _ in range(50):
+        if "slow_llm" in pipeline.last_results():
+            break
+        time.sleep(0.02)
+    assert pipeline.last_results()["slow_llm"]["detached"] is True
+
+
+def test_duplicate_stage_name_rejected(pipeline):
+    pipeline.register("history", lambda batch: None)
+    with pytest.raises(ValueError):
+        pipeline.register("history", lambda batch: None)
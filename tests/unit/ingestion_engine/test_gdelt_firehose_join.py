@@ -1,5 +1,5 @@
 import copy
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import pytest
 
@@ -82,3 +82,10 @@ def test_prune_old_events_keeps_distinct_events_at_same_location():
     out = prune_old_events([a, b])
     ids = {f["properties"]["eventid"] for f in out}
     assert ids == {"E1", "E2"}
+
+
+def test_prune_old_events_window_follows_hours():
+    three_days_ago = (datetime.now(timezone.utc) - timedelta(days=3)).strftime("%Y%m%d")
+    old = create_mock_gdelt_event(eventid="OLD", date=three_days_ago)
+    assert prune_old_events([old]) == []
+    assert [f["properties"]["eventid"] for f in prune_old_events([old], hours=96)] == ["OLD"]
@@ -0,0 +1,162 @@
+import io
+import json
+import zipfile
+from datetime import date, datetime, timezone
+
+import pytest
+
+from ingestion_engine.sources import gdelt
+from tests.fixtures import create_mock_gdelt_event
+
+pytestmark = pytest.mark.unit
+
+LASTUPDATE = """\
+101 aaa http://data.gdeltproject.org/gdeltv2/20240101120000.export.CSV.zip
+102 bbb http://data.gdeltproject.org/gdeltv2/20240101120000.gkg.csv.zip
+"""
+
+
+def export_row(eid="1", code="190", num_sources="2", lat="33.5", lon="36.3", url="https://a.example/x"):
+    row = [""] * 61
+    row[0], row[1], row[6], row[7], row[17] = eid, "20240101", "REBELS", "SYR", "TUR"
+    row[26], row[29], row[30], row[31], row[32], row[33], row[34] = code, "4", "-10", "6", num_sources, "5", "-7.25"
+    row[52], row[53], row[54] = "Damascus, Syria", "SY", "SY13"
+    row[56], row[57], row[60] = lat, lon, url
+    return row
+
+
+def test_lastupdate_derives_mentions_url():
+    urls = gdelt.parse_lastupdate(LASTUPDATE)
+    assert urls.export.endswith("export.CSV.zip")
+    assert urls.mentions == "http://data.gdeltproject.org/gdeltv2/20240101120000.mentions.CSV.zip"
+    assert urls.gkg.endswith("gkg.csv.zip")
+
+
+def test_export_row_filters_and_fields():
+    feat = gdelt.parse_export_row(export_row())
+    props = feat["properties"]
+    assert feat["geometry"]["coordinates"] == [36.3, 33.5]
+    assert (props["category"], props["eventid"], props["importance"]) == ("CONFLICT", "1", 5)
+    assert (props["actiongeo_countrycode"], props["actionadm1"]) == ("SY", "SY13")
+    assert (props["quadclass"], props["numsources"]) == (4, 2)
+
+    assert gdelt.parse_export_row(export_row(code="010")) is None
+    assert gdelt.parse_export_row(export_row(num_sources="0")) is None
+    assert gdelt.parse_export_row(export_row(lat="", lon="")) is None
+    assert gdelt.parse_export_row(export_row(lat="95")) is None
+    assert gdelt.parse_export_row(export_row()[:40]) is None
+
+    # Actor1Geo coordinates are used when ActionGeo has none
+    row = export_row(lat="", lon="")
+    row[40], row[41] = "1.5", "2.5"
+    assert gdelt.parse_export_row(row)["geometry"]["coordinates"] == [2.5, 1.5]
+
+
+def test_root_fallback_only_when_requested():
+    row = export_row(code="1999")
+    assert gdelt.parse_export_row(row) is None
+    assert gdelt.parse_export_row(row, root_fallback=True)["properties"]["category"] == "CONFLICT"
+
+
+def test_stream_export_batches_with_sources_and_signatures():
+    rows = [export_row(eid=str(i)) for i in range(5)] + [export_row(eid="x", code="010")]
+    mentions = gdelt.build_mention_map([
+        ["1", "", "", "", "", "https://m.example/1"],
+        ["1", "", "", "", "", "not-a-url"],
+        ["short"],
+    ])
+    ingest = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    batches = list(gdelt.stream_export("u", mentions, batch_size=2, ingest_time=ingest, rows=rows))
+
+    assert [len(b.features) for b in batches] == [2, 2, 1]
+    assert batches[-1].last and sum(b.rows_read for b in batches) == 6
+    feat = batches[0].features[1]
+    assert [s["url"] for s in feat["properties"]["sources"]] == ["https://a.example/x", "https://m.example/1"]
+    assert feat["properties"]["event_sig"] == "eid:1"
+    assert feat["properties"]["ingested_at"] == ingest.isoformat()
+
+
+def test_zip_rows_split_on_tabs_without_quoting():
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        z.writestr("x.CSV", 'a\t"b\tc\r\nd\te\tf\n')
+    assert list(gdelt.iter_zip_rows(buf.getvalue())) == [["a", '"b', "c"], ["d", "e", "f"]]
+
+
+def test_gkg_counts_row():
+    row = ["id", "20240101120000", "1", "bbc.co.uk", "https://bbc.co.uk/a",
+           "", "KILL#12#people#4#Kabul#AF#AF13#4426#34.5#69.1#-1#120;THEME#1#x#1#Y#Y#Y##1#2#Y#5;ARREST#2##1#Z#Z#Z###Z#9"]
+    feats = gdelt.parse_gkg_counts_row(row)
+    assert len(feats) == 1
+    assert feats[0]["properties"]["name"] == "CONFLICT: 12 people"
+    assert feats[0]["properties"]["source"] == "bbc.co.uk"
+
+
+def test_gkg_counts_from_one_record_survive_prune_window():
+    today = datetime.now(timezone.utc).strftime("%Y%m%d")
+    row = ["id", today + "120000", "1", "bbc.co.uk", "https://bbc.co.uk/a", "",
+           "KILL#12#people#4#Kabul#AF#AF13#4426#34.5#69.1#-1#120;"
+           "KILL#3#people#4#Herat#AF#AF11#4427#34.3#62.2#-1#480;"
+           "ARREST#2##1#Z#Z#Z#0#1.5#2.5#Z#900"]
+    feats = gdelt.parse_gkg_counts_row(row)
+    assert len(feats) == 3
+    assert len({gdelt.event_signature(f) for f in feats}) == 3
+    assert len(gdelt.prune_window(feats)) == 3
+
+
+def test_prune_window_prefers_event_sig_without_eventid():
+    today = datetime.now(timezone.utc).strftime("%Y%m%d")
+    a = create_mock_gdelt_event(eventid="", date=today, lat=1.0, lng=2.0)
+    b = create_mock_gdelt_event(eventid="", date=today, lat=3.0, lng=4.0)
+    a["properties"]["event_sig"] = b["properties"]["event_sig"] = "url:https://same.example"
+    old = create_mock_gdelt_event(eventid="OLD", date="20000101")
+    out = gdelt.prune_window([a, b, old], min_date=date.today())
+    assert len(out) == 1
+
+
+def test_encode_collection_is_compact():
+    payload = gdelt.encode_collection({"type": "FeatureCollection", "features": [{"a": 1}]})
+    assert payload == b'{"type":"FeatureCollection","features":[{"a":1}]}'
+    assert json.loads(payload)["features"] == [{"a": 1}]
+
+
+def _without_nulls(collection):
+    return [
+        {**f, "properties": {k: v for k, v in f["properties"].items() if v is not None}}
+        for f in collection["features"]
+    ]
+
+
+def test_columnar_round_trip_and_palette():
+    ingest = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    mentions = {"1": {"https://m.example/1"}}
+    rows = [export_row(eid=str(i)) for i in range(6)]
+    features = list(gdelt.stream_export("u", mentions, ingest_time=ingest, rows=rows))[0].features
+    features += gdelt.parse_gkg_counts_row(
+        ["id", "20240101120000", "1", "bbc.co.uk", "https://bbc.co.uk/a", "", "ARREST#2##1#Z#Z#Z#0#1.5#2.5#Z#9"])
+    collection = {"type": "FeatureCollection", "features": features}
+
+    payload = gdelt.to_columnar(collection)
+    assert payload["length"] == 7
+    assert payload["palette"] == {"CONFLICT": "#ef4444", "CRIME": "#db2777"}
+    assert "color" not in payload["columns"]
+    assert "dictionary" in payload["columns"]["category"]
+    # the primary URL is stored once, shared by sourceurl and sources
+    assert payload["urls"].count("https://a.example/x") == 1
+
+    decoded = gdelt.from_columnar(json.loads(gdelt.encode_columnar(collection)))
+    assert decoded["features"] == _without_nulls(collection)
+    assert len(gdelt.encode_columnar(collection)) < len(gdelt.encode_collection(collection))
+
+
+def test_arrow_payload_columns():
+    pa = pytest.importorskip("pyarrow")
+    rows = [export_row(eid=str(i)) for i in range(4)]
+    features = list(gdelt.stream_export("u", rows=rows))[0].features
+    table = pa.ipc.open_stream(gdelt.encode_arrow({"features": features})).read_all()
+
+    assert table.num_rows == 4
+    assert table.column("lng").to_pylist() == [36.3] * 4
+    assert pa.types.is_dictionary(table.schema.field("category").type)
+    assert table.column("sources").to_pylist()[0] == ["https://a.example/x"]
+    assert json.loads(table.schema.metadata[b"palette"]) == {"CONFLICT": "#ef4444"}
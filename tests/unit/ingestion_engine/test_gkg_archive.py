@@ -0,0 +1,129 @@
+import json
+from datetime import date
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from ingestion_engine.gkg_pipeline.archive_store import ArchiveStore
+
+pytestmark = pytest.mark.unit
+
+
+def write_fragment(root, kind, day, name, rows):
+    path = root / kind / day.strftime("%Y/%m/%d") / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(pa.Table.from_pylist(rows), path)
+    return path
+
+
+@pytest.fixture
+def archive(tmp_path):
+    root = tmp_path / "archive"
+    day = date(2024, 1, 1)
+    for minute in ("0030", "0000", "0015"):
+        write_fragment(root, "raw_gkg", day, f"20240101{minute}00.gkg.parquet",
+                       [{"gkgrecordid": f"r{minute}", "date": f"20240101{minute}00", "v2themes": "T"}])
+    for d in (1, 2):
+        write_fragment(root, "raw_gkgcounts", date(2024, 1, d), f"202401{d:02d}.gkgcounts.parquet",
+                       [{"date": f"202401{d:02d}", "country": c, "count_type": "KILL", "number": str(d)}
+                        for c in ("SY", "AF")])
+    write_fragment(root, "raw_gkgcounts", date(2024, 3, 14), "20240314.gkgcounts.parquet",
+                   [{"date": "20240314", "country": "SY", "count_type": "KILL", "number": "9"}])
+    return root
+
+
+def test_day_fragments_merged_sorted_and_recorded(archive):
+    store = ArchiveStore(archive)
+    report = store.compact(today=date(2024, 3, 15))
+
+    day_file = store.day_file("raw_gkg", date(2024, 1, 1))
+    assert [p.name for p in day_file.parent.iterdir()] == [day_file.name]
+    assert pq.read_table(day_file).column("date").to_pylist() == [
+        "20240101000000", "20240101001500", "20240101003000"]
+    assert report["raw_gkg"]["days"] == [{"day": "2024-01-01", "fragments": 3, "rows": 3}]
+
+    # finished January counts are merged into one month file; March is only per-day
+    month = store.month_file("raw_gkgcounts", 2024, 1)
+    table = pq.read_table(month)
+    assert (table.column("date").to_pylist(), table.column("country").to_pylist()) == (
+        ["20240101", "20240101", "20240102", "20240102"], ["AF", "SY", "AF", "SY"])
+    assert not (archive / "raw_gkgcounts/2024/01/01").exists()
+    assert store.ranges("raw_gkgcounts") == [(date(2024, 1, 1), date(2024, 1, 31)), (date(2024, 3, 14), date(2024, 3, 14))]
+
+    manifest = json.loads((archive / "manifest.json").read_text())
+    entry = manifest["files"]["raw_gkgcounts/2024/01/202401.month.parquet"]
+    assert entry["level"] == "month" and entry["rows"] == 4
+    assert entry["sources"] == ["20240101.gkgcounts.parquet", "20240102.gkgcounts.parquet"]
+
+
+def test_scan_prunes_files_by_date_range(archive):
+    store = ArchiveStore(archive)
+    store.compact(today=date(2024, 3, 15))
+
+    source = store.scan_sql("raw_gkgcounts", start=date(2024, 3, 1), end=date(2024, 3, 31))
+    assert "202401.month" not in source
+    df = store.query("raw_gkgcounts", "SELECT country, number FROM {archive}", date(2024, 3, 1))
+    assert df.values.tolist() == [["SY", "9"]]
+    assert store.scan_sql("raw_gkg", start=date(2025, 1, 1)) is None
+
+
+def test_interrupted_compaction_never_double_counts(archive):
+    store = ArchiveStore(archive)
+    store.compact(today=date(2024, 3, 15))
+    # a merged fragment left behind by a run that stopped before deleting it
+    write_fragment(archive, "raw_gkg", date(2024, 1, 1), "20240101000000.gkg.parquet",
+                   [{"gkgrecordid": "r0000", "date": "20240101000000", "v2themes": "T"}])
+    assert store.query("raw_gkg", "SELECT COUNT(*) AS n FROM {archive}")["n"][0] == 3
+
+    # new fragment for an already compacted day is merged in
+    write_fragment(archive, "raw_gkg", date(2024, 1, 1), "20240101004500.gkg.parquet",
+                   [{"gkgrecordid": "r0045", "date": "20240101004500", "v2themes": "T"}])
+    store = ArchiveStore(archive)
+    store.compact(today=date(2024, 3, 15))
+    assert store.query("raw_gkg", "SELECT COUNT(*) AS n FROM {archive}")["n"][0] == 4
+    assert len(list((archive / "raw_gkg/2024/01/01").iterdir())) == 1
+
+
+def _crash_before_recording(monkeypatch):
+    def crash(*args, **kwargs):
+        raise RuntimeError("killed")
+    monkeypatch.setattr(ArchiveStore, "_record", crash)
+
+
+def test_crash_between_rewrite_and_manifest_keeps_day_consistent(archive, monkeypatch):
+    ArchiveStore(archive).compact(today=date(2024, 3, 15))
+    write_fragment(archive, "raw_gkg", date(2024, 1, 1), "20240101004500.gkg.parquet",
+                   [{"gkgrecordid": "r0045", "date": "20240101004500", "v2themes": "T"}])
+    with monkeypatch.context() as m:
+        _crash_before_recording(m)
+        with pytest.raises(RuntimeError):
+            ArchiveStore(archive).compact(today=date(2024, 3, 15))
+
+    store = ArchiveStore(archive)
+    count = "SELECT COUNT(*) AS n FROM {archive}"
+    assert store.query("raw_gkg", count)["n"][0] == 4
+    store.compact(today=date(2024, 3, 15))
+    assert store.query("raw_gkg", count)["n"][0] == 4
+    assert [p.name for p in (archive / "raw_gkg/2024/01/01").iterdir()] == [store.day_file("raw_gkg", date(2024, 1, 1)).name]
+
+
+def test_crash_between_rewrite_and_manifest_keeps_month_consistent(archive, monkeypatch):
+    ArchiveStore(archive).compact(today=date(2024, 3, 15))
+    write_fragment(archive, "raw_gkgcounts", date(2024, 1, 3), "20240103.gkgcounts.parquet",
+                   [{"date": "20240103", "country": "SY", "count_type": "KILL", "number": "3"}])
+    store = ArchiveStore(archive)
+    store.compact_day("raw_gkgcounts", date(2024, 1, 3), store.fragments_by_day("raw_gkgcounts")[date(2024, 1, 3)])
+    with monkeypatch.context() as m:
+        _crash_before_recording(m)
+        with pytest.raises(RuntimeError):
+            store.compact_month("raw_gkgcounts", 2024, 1)
+
+    store = ArchiveStore(archive)
+    count = "SELECT COUNT(*) AS n FROM {archive}"
+    assert store.query("raw_gkgcounts", count, end=date(2024, 1, 31))["n"][0] == 5
+    store.compact(today=date(2024, 3, 15))
+    assert store.query("raw_gkgcounts", count, end=date(2024, 1, 31))["n"][0] == 5
+    month = store.month_file("raw_gkgcounts", 2024, 1)
+    assert [p.name for p in month.parent.glob("*.parquet")] == [month.name]
+    assert not (archive / "raw_gkgcounts/2024/01/03").exists()
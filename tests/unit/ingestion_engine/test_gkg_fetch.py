@@ -0,0 +1,88 @@
+import threading
+import zipfile
+from datetime import datetime
+from functools import partial
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+import yaml
+
+from ingestion_engine.gkg_pipeline.fetch_gdelt import GDELTFetcher
+
+pytestmark = pytest.mark.unit
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def gkg_server(tmp_path):
+    served = tmp_path / "served"
+    served.mkdir()
+    httpd = HTTPServer(("127.0.0.1", 0), partial(_QuietHandler, directory=str(served)))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield served, f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def fetcher(tmp_path, gkg_server):
+    _, base_url = gkg_server
+    config = {
+        "gdelt": {"base_url": base_url, "gkg_counts_url": base_url},
+        "paths": {"raw_gkg_dir": str(tmp_path / "raw_gkg"), "raw_gkgcounts_dir": str(tmp_path / "raw_counts")},
+    }
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config))
+    return GDELTFetcher(str(config_path))
+
+
+def _write_counts_zip(served, date_str, body):
+    with zipfile.ZipFile(served / f"{date_str}.gkgcounts.csv.zip", "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr(f"{date_str}.gkgcounts.csv", body)
+
+
+def test_zip_member_streamed_to_disk_without_leftovers(fetcher, gkg_server):
+    served, _ = gkg_server
+    body = "20240101\t3\tKILL\t5\tpeople\t1\tSY\tSY01\t0\t0\tX\turl\n" * 50000
+    _write_counts_zip(served, "20240101", body)
+
+    path = fetcher.fetch_daily_counts(datetime(2024, 1, 1))
+    assert path.read_text() == body
+    assert sorted(p.name for p in fetcher.raw_counts_dir.iterdir()) == ["20240101.gkgcounts.csv"]
+
+
+def test_csv_fallback_when_zip_missing(fetcher, gkg_server):
+    served, _ = gkg_server
+    (served / "20240102.gkgcounts.csv").write_text("plain\n")
+    path = fetcher.fetch_daily_counts(datetime(2024, 1, 2))
+    assert path.name == "20240102.gkgcounts.csv"
+    assert path.read_text() == "plain\n"
+
+
+def test_fetch_counts_range_parallel_backfill(fetcher, gkg_server):
+    served, _ = gkg_server
+    for day in ("20240103", "20240105"):
+        _write_counts_zip(served, day, f"{day}\n")
+
+    results = fetcher.fetch_counts_range(datetime(2024, 1, 3), datetime(2024, 1, 5), max_workers=3)
+    assert list(results) == ["20240103", "20240104", "20240105"]
+    assert results["20240104"] is None
+    assert results["20240105"].read_text() == "20240105\n"
+    assert not list(fetcher.raw_counts_dir.glob("*.part"))
+
+
+def test_failed_extraction_leaves_no_part_file(fetcher, tmp_path):
+    zip_path = tmp_path / "corrupt.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as z:
+        z.writestr("20240106.gkgcounts.csv", "20240106\t1\tKILL\n" * 1000)
+    data = bytearray(zip_path.read_bytes())
+    data[100] ^= 0xFF  # inside the stored member: fails its CRC check on read
+    zip_path.write_bytes(bytes(data))
+
+    with pytest.raises(zipfile.BadZipFile):
+        fetcher._extract_first_member(zip_path, fetcher.raw_counts_dir)
+    assert list(fetcher.raw_counts_dir.iterdir()) == []
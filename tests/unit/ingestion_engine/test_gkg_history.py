@@ -0,0 +1,87 @@
+from datetime import date
+
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from ingestion_engine.gkg_pipeline.metrics_history import MetricsHistory
+from ingestion_engine.gkg_pipeline.metrics_store import MetricsStore
+
+pytestmark = pytest.mark.unit
+
+
+def archive_processed(root, day, rows, table="gdelt_metrics"):
+    path = root / "processed" / day.strftime("%Y/%m/%d") / f"{table}_{day:%Y%m%d}.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # processed CSVs archived by pyarrow keep inferred types (date32, int64)
+    pq.write_table(pa.Table.from_pylist([
+        {"date": day, "country": c, "metric_type": m, "count": n, "num_sources": 1, "source": "GDELT"}
+        for c, m, n in rows
+    ]), path)
+
+
+@pytest.fixture
+def history(tmp_path):
+    metrics_dir, archive_dir = tmp_path / "gkg_metrics", tmp_path / "archive"
+    store = MetricsStore(duckdb.connect(), metrics_dir)
+    store.upsert("gdelt_metrics", """(
+        SELECT * FROM (VALUES
+            (DATE '2024-01-02', 'Syria', 'KILL', 5, 2, 'GDELT'),
+            (DATE '2024-01-02', 'Syria', 'CRISISLEXT03DEAD', 1, 1, 'GDELT'),
+            (DATE '2024-01-03', 'Syria', 'KILL', 7, 1, 'GDELT'),
+            (DATE '2024-01-03', 'Iraq', 'KILL', 100, 1, 'GDELT')
+        ) t(date, country, metric_type, count, num_sources, source)
+    )""")
+    archive_processed(archive_dir, date(2019, 6, 1), [("Syria", "KILL", 40), ("Syria", "PROTEST", 3)])
+    archive_processed(archive_dir, date(2023, 12, 31), [("Syria", "KILL", 2)])
+    # stale cold copy of a day that is still hot: must not be counted
+    archive_processed(archive_dir, date(2024, 1, 2), [("Syria", "KILL", 999)])
+    archive_processed(archive_dir, date(2024, 1, 2), [("Syria", "KILL", 999)], table="gdelt_admin1_metrics")
+    return MetricsHistory(metrics_dir, archive_dir)
+
+
+def test_plan_prefers_hot_partitions_and_fills_gaps_from_archive(history):
+    plan = history.plan("gdelt_metrics", date(2019, 1, 1), date(2024, 1, 31))
+    assert [p.name for p in plan["hot"]] == ["2024-01-02.parquet", "2024-01-03.parquet"]
+    assert [p.name for p in plan["cold"]] == ["gdelt_metrics_20190601.parquet", "gdelt_metrics_20231231.parquet"]
+
+    recent = history.plan("gdelt_metrics", date(2024, 1, 3), date(2024, 1, 3))
+    assert (len(recent["hot"]), recent["cold"]) == (1, [])
+
+
+def test_timeseries_spans_hot_and_cold(history):
+    page = history.timeseries("Syria", "deaths", start=date(2019, 1, 1), end=date(2024, 1, 31), limit=5000)
+    assert [(r["date"], r["value"]) for r in page["results"]] == [
+        ("2019-06-01", 40), ("2023-12-31", 2), ("2024-01-02", 6), ("2024-01-03", 7)]
+    assert page["sources"] == {"hot_files": 2, "cold_files": 2}
+    assert page["next_cursor"] is None
+
+
+def test_timeseries_paginates_by_date_window(history):
+    pages, cursor = [], None
+    while True:
+        page = history.timeseries("Syria", "KILL", start=date(2023, 12, 30), end=date(2024, 1, 3),
+                                  limit=2, cursor=cursor)
+        pages.append([r["date"] for r in page["results"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        cursor = date.fromisoformat(cursor)
+    assert pages == [["2023-12-31"], ["2024-01-02"], ["2024-01-03"]]
+
+
+def test_empty_range_returns_no_rows(history):
+    page = history.timeseries("Syria", start=date(2010, 1, 1), end=date(2010, 1, 31))
+    assert page["results"] == [] and page["sources"] == {"hot_files": 0, "cold_files": 0}
+
+
+def test_timeseries_from_many_threads(history):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def query(_):
+        return history.timeseries("Syria", "deaths", start=date(2019, 1, 1), end=date(2024, 1, 31), limit=5000)
+
+    expected = query(0)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(page == expected for page in pool.map(query, range(32)))
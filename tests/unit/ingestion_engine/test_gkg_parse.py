@@ -0,0 +1,76 @@
+import pyarrow.parquet as pq
+import pytest
+
+from ingestion_engine.gkg_pipeline.parse_gkg import SCHEMAS, is_parsed, parse_files, parse_gkg_file
+
+pytestmark = pytest.mark.unit
+
+
+def gkg_row(record_id, counts="", themes="", locations="", persons="", orgs="",
+            tone="-3.5,1.2,4.7,5.9,20.1,0.5,350"):
+    row = [record_id, "20240101120000", "1", "example.com", f"https://example.com/{record_id}",
+           "", counts, "", themes, "", locations, "", persons, "", orgs, tone]
+    return "\t".join(row + [""] * 11)
+
+
+ROWS = [
+    gkg_row(
+        "20240101120000-1",
+        counts="KILL#12#people#4#Kabul, Kabol, Afghanistan#AF#AF13#4426#34.5167#69.1833#-3378435#120;"
+               "ARREST#3#protesters#1#Syria#SY#SY##35#38#SY#400",
+        themes="TAX_FNCACT_PROTESTERS,10;ARMEDCONFLICT,55;",
+        locations="4#Kabul, Kabol, Afghanistan#AF#AF13#4426#34.5167#69.1833#-3378435#130",
+        persons="john smith,22;jane doe,80",
+        orgs="united nations,5",
+    ),
+    gkg_row("20240101120000-2", tone="1,2,1,3,4,0,100"),
+    "truncated\trow",
+]
+
+
+@pytest.fixture
+def gkg_file(tmp_path):
+    path = tmp_path / "20240101120000.gkg.csv"
+    path.write_text("\n".join(ROWS) + "\n")
+    return path
+
+
+def test_records_exploded_into_tables_with_offsets(gkg_file):
+    tables = parse_gkg_file(gkg_file)
+    assert set(tables) == set(SCHEMAS)
+
+    docs = tables["gkg_documents"].to_pylist()
+    assert [d["record_id"] for d in docs] == ["20240101120000-1", "20240101120000-2"]
+    assert docs[0]["date"].isoformat() == "2024-01-01T12:00:00"
+    assert (docs[0]["tone"], docs[0]["polarity"], docs[0]["word_count"]) == (-3.5, 5.9, 350)
+
+    counts = tables["gkg_counts"].to_pylist()
+    assert [(c["count_type"], c["number"], c["char_offset"]) for c in counts] == [("KILL", 12, 120), ("ARREST", 3, 400)]
+    assert (counts[0]["lat"], counts[0]["lon"], counts[0]["adm2_code"]) == (34.5167, 69.1833, "4426")
+
+    themes = tables["gkg_themes"].to_pylist()
+    assert [(t["theme"], t["char_offset"]) for t in themes] == [("TAX_FNCACT_PROTESTERS", 10), ("ARMEDCONFLICT", 55)]
+    locations = tables["gkg_locations"].to_pylist()
+    assert [(l["country_code"], l["char_offset"]) for l in locations] == [("AF", 130)]
+    assert tables["gkg_persons"].column("name").to_pylist() == ["john smith", "jane doe"]
+    assert tables["gkg_organizations"].column("char_offset").to_pylist() == [5]
+
+
+def test_parse_files_writes_parquet_per_table(tmp_path, gkg_file):
+    second = tmp_path / "20240101121500.gkg.csv"
+    second.write_text(ROWS[1] + "\n")
+    out_dir = tmp_path / "parsed"
+
+    results = parse_files([gkg_file, second], out_dir, max_workers=2)
+    assert [r["error"] for r in results] == [None, None]
+    assert [r["records"] for r in results] == [2, 1]
+    assert pq.read_table(out_dir / "gkg_themes" / "20240101120000.gkg.parquet").num_rows == 2
+    assert pq.read_table(out_dir / "gkg_themes" / "20240101121500.gkg.parquet").num_rows == 0
+    assert is_parsed(gkg_file, out_dir)
+
+    assert parse_files([gkg_file, second], out_dir) == []
+
+
+def test_unreadable_file_reported_not_raised(tmp_path):
+    results = parse_files([tmp_path / "missing.gkg.csv"], tmp_path / "parsed")
+    assert results[0]["error"]
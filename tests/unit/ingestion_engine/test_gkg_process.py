@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+
+import duckdb
+import pytest
+import yaml
+
+from ingestion_engine.gkg_pipeline.process_data import DataProcessor
+
+pytestmark = pytest.mark.unit
+
+ROWS = [
+    "20240101\t3\tKILL\t5\tpeople\t4\tAleppo, Halab, Syria\tSY\tSY09\t1.0\t2.0\tX\t123\tsrc\thttp://a\"b",
+    "20240101\t2\tKILL\t4\tpeople\t1\tSyria\tSY\tSY\t1.0\t2.0\tX\t\t\t",
+    "notadate\t2\tKILL\t7\tpeople\t1\tSyria\tSY\tSY02\t1.0\t2.0\tX\t\t\t",
+    "20240101\t2\tPROTEST\t4\tpeople\t1\tIraq\t\t\t1.0\t2.0\tX\t\t\t",
+    "20240101\t9\tOTHER\t4\tpeople\t1\tIraq\tIZ\t\t1.0\t2.0\tX\t\t\t",
+]
+
+
+@pytest.fixture
+def processor(tmp_path):
+    config = {
+        "paths": {
+            "db_path": str(tmp_path / "metrics.duckdb"),
+            "processed_dir": str(tmp_path / "processed"),
+            "metrics_dir": str(tmp_path / "gkg_metrics"),
+        },
+        "metrics": ["KILL", "PROTEST"],
+    }
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config))
+    return DataProcessor(str(config_path))
+
+
+@pytest.fixture
+def counts_file(tmp_path):
+    path = tmp_path / "20240101.gkgcounts.csv"
+    path.write_text("\n".join(ROWS) + "\n")
+    return path
+
+
+def test_counts_aggregated_by_country_and_admin1(processor, counts_file):
+    result = processor.process_gdelt_counts(counts_file)
+    assert result == {"country_rows": 2, "admin1_rows": 1, "date": "20240101"}
+
+    country = processor.conn.execute(
+        "SELECT country, metric_type, count, num_sources FROM gdelt_metrics ORDER BY country"
+    ).fetchall()
+    assert country == [("Iraq", "PROTEST", 4, 2), ("Syria", "KILL", 9, 5)]
+    # GEO_ADM1CODE of the city-level row; the country-level row has no admin1
+    admin1 = processor.conn.execute("SELECT country, admin1, count FROM gdelt_admin1_metrics").fetchall()
+    assert admin1 == [("Syria", "SY09", 5)]
+    assert (processor.processed_dir / "gdelt_metrics_20240101.csv").exists()
+
+
+def test_reprocessing_same_day_is_idempotent(processor, counts_file):
+    processor.process_gdelt_counts(counts_file)
+    processor.process_gdelt_counts(counts_file)
+    total = processor.conn.execute("SELECT COUNT(*), SUM(count) FROM gdelt_metrics").fetchone()
+    assert total == (2, 13)
+
+
+def test_upsert_replaces_only_matching_keys(processor, counts_file, tmp_path):
+    processor.process_gdelt_counts(counts_file)
+    update = tmp_path / "update.gkgcounts.csv"
+    update.write_text("20240101\t1\tKILL\t20\tpeople\t1\tSyria\tSY\tSY01\t1.0\t2.0\tX\t\t\t\n")
+    processor.process_gdelt_counts(update)
+    rows = processor.conn.execute(
+        "SELECT country, metric_type, count FROM gdelt_metrics ORDER BY country"
+    ).fetchall()
+    assert rows == [("Iraq", "PROTEST", 4), ("Syria", "KILL", 20)]
+    assert [p.name for _, p in processor.store.partitions("gdelt_metrics")] == ["2024-01-01.parquet"]
+
+
+def test_legacy_tables_migrated_to_partitions(tmp_path, processor):
+    processor.conn.close()
+    con = duckdb.connect(str(tmp_path / "metrics.duckdb"))
+    con.execute("DROP VIEW gdelt_metrics")
+    con.execute("""
+        CREATE TABLE gdelt_metrics (date DATE, country VARCHAR, metric_type VARCHAR, count BIGINT,
+                                    num_sources BIGINT, source VARCHAR, updated_at TIMESTAMP)
+    """)
+    con.execute("""
+        INSERT INTO gdelt_metrics VALUES
+            ('2024-02-01', 'Syria', 'KILL', 3, 1, 'GDELT', '2024-02-02 00:00:00'),
+            ('2024-02-01', 'Syria', 'KILL', 3, 1, 'GDELT', '2024-02-02 00:00:00')
+    """)
+    con.close()
+
+    migrated = DataProcessor(str(tmp_path / "config.yaml"))
+    assert migrated.conn.execute("SELECT COUNT(*), SUM(count) FROM gdelt_metrics").fetchone() == (1, 3)
+    assert not migrated.store.is_legacy_table("gdelt_metrics")
+
+
+def test_daily_summary_reads_recent_partitions_only(processor, tmp_path):
+    today = datetime.now(timezone.utc).date()
+    for offset in (1, 60):
+        day = (today - timedelta(days=offset)).strftime("%Y%m%d")
+        path = tmp_path / f"{day}.gkgcounts.csv"
+        path.write_text(f"{day}\t1\tKILL\t{offset}\tpeople\t1\tSyria\tSY\tSY01\t0\t0\tX\t\t\t\n")
+        processor.process_gdelt_counts(path)
+
+    since = today - timedelta(days=30)
+    assert "gdelt_metrics/" + (today - timedelta(days=60)).isoformat() not in processor.store.scan_sql("gdelt_metrics", since)
+    summary = processor.get_daily_summary(days=30)
+    assert summary["deaths"].tolist() == [1]
+
+
+def test_file_without_tracked_metrics_returns_none(processor, tmp_path):
+    path = tmp_path / "other.gkgcounts.csv"
+    path.write_text(ROWS[-1] + "\n")
+    assert processor.process_gdelt_counts(path) is None
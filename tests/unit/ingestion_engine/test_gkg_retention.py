@@ -0,0 +1,107 @@
+import pyarrow.parquet as pq
+import pytest
+import yaml
+
+from ingestion_engine.gkg_pipeline import retention_cleanup
+from ingestion_engine.gkg_pipeline.retention_cleanup import GKG_COLS, GKGCOUNTS_COLS, run_retention, scan_dir
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def layout(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # reports are written to ./logs/retention
+    paths = {
+        "raw_gkg_dir": tmp_path / "raw" / "gkg",
+        "raw_gkgcounts_dir": tmp_path / "raw" / "gkgcounts",
+        "processed_dir": tmp_path / "processed",
+        "archive_dir": tmp_path / "archive",
+        "db_path": tmp_path / "metrics.duckdb",
+        "metrics_dir": tmp_path / "gkg_metrics",
+    }
+    for key in ("raw_gkg_dir", "raw_gkgcounts_dir", "processed_dir"):
+        paths[key].mkdir(parents=True)
+
+    gkg_row = "\t".join(f"v{i}" for i in range(len(GKG_COLS)))
+    (paths["raw_gkg_dir"] / "20200101000000.gkg.csv").write_text((gkg_row + "\n") * 3)
+    (paths["raw_gkg_dir"] / "20200101001500.gkg.csv").write_text(gkg_row + "\nshort\trow\n")
+    (paths["raw_gkg_dir"] / "29990101000000.gkg.csv").write_text(gkg_row + "\n")
+    counts_row = "\t".join(f'c{i}"' for i in range(len(GKGCOUNTS_COLS)))
+    (paths["raw_gkgcounts_dir"] / "20200101.gkgcounts.csv").write_text((counts_row + "\n") * 2)
+    (paths["processed_dir"] / "gdelt_metrics_20200101.csv").write_text("date,country,count\n20200101,Syria,3\n")
+
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump({"paths": {k: str(v) for k, v in paths.items()}}))
+    return config_path, paths
+
+
+def test_dry_run_archives_without_deleting(layout):
+    config_path, paths = layout
+    report = run_retention(str(config_path), apply=False, workers=2)
+
+    files = report["files"]
+    assert (files["raw_gkg"]["candidates"], files["raw_gkg"]["archived"]) == (2, 1)
+    assert "malformed" in files["raw_gkg"]["errors"][0]["error"]
+    assert files["raw_gkgcounts"]["rows"] == 2
+    assert files["processed"]["rows"] == 1
+    assert all(f["deleted"] == 0 for f in files.values())
+    assert (paths["raw_gkg_dir"] / "20200101000000.gkg.csv").exists()
+
+    archived = pq.read_table(paths["archive_dir"] / "raw_gkgcounts/2020/01/01/20200101.gkgcounts.parquet")
+    assert archived.column_names == GKGCOUNTS_COLS
+    assert archived.column("urls").to_pylist() == ['c14"', 'c14"']
+
+    assert report["archive"]["rows"] == 3 + 2 + 1
+    assert report["archive"]["workers"] == 2
+    assert report["archive"]["peak_rss_mb"]["worker_max"] > 0
+
+
+def test_apply_deletes_archived_files_and_tracks_sizes(layout):
+    config_path, paths = layout
+    report = run_retention(str(config_path), apply=True, workers=2)
+
+    remaining = sorted(p.name for p in paths["raw_gkg_dir"].iterdir())
+    # the file with a malformed row is neither archived nor deleted
+    assert remaining == ["20200101001500.gkg.csv", "29990101000000.gkg.csv"]
+    assert not (paths["archive_dir"] / "raw_gkg/2020/01/01/20200101001500.gkg.parquet").exists()
+    assert not (paths["raw_gkgcounts_dir"] / "20200101.gkgcounts.csv").exists()
+
+    for name in ("raw_gkg_dir", "raw_gkgcounts_dir", "processed_dir", "archive_dir"):
+        scan = scan_dir(paths[name])
+        assert report["sizes_after_bytes"][name] == scan["bytes"]
+        assert report["file_counts_after"][name] == scan["files"]
+
+    again = run_retention(str(config_path), apply=True, workers=2)
+    assert again["files"]["raw_gkg"]["skipped"] == 1
+    assert (paths["raw_gkg_dir"] / "20200101001500.gkg.csv").exists()
+
+
+def test_all_kinds_submitted_to_one_pool_and_awaited_once(layout, monkeypatch):
+    config_path, _ = layout
+    waits = []
+    collect = retention_cleanup.collect_archives
+
+    def recording_collect(futures, apply):
+        waits.append(sorted(str(file.parent.name) for _, file, _ in futures.values()))
+        collect(futures, apply)
+
+    monkeypatch.setattr(retention_cleanup, "collect_archives", recording_collect)
+    report = run_retention(str(config_path), apply=False, workers=2)
+
+    assert waits == [["gkg", "gkg", "gkgcounts", "processed"]]
+    assert report["archive"]["rows"] == 3 + 2 + 1
+
+
+def test_compacted_files_not_archived_again(layout):
+    config_path, paths = layout
+    (paths["raw_gkg_dir"] / "20200101001500.gkg.csv").unlink()
+    first = run_retention(str(config_path), apply=False, workers=2, compact=True)
+    assert first["compaction"]["raw_gkg"]["days"][0]["fragments"] == 1
+    day_dir = paths["archive_dir"] / "raw_gkg/2020/01/01"
+    assert [p.name for p in day_dir.iterdir()] == ["20200101.day.parquet"]
+
+    # raw file is still there (dry run); it must not be re-archived next to the day file
+    second = run_retention(str(config_path), apply=True, workers=2)
+    assert (second["files"]["raw_gkg"]["archived"], second["files"]["raw_gkg"]["written"]) == (1, 0)
+    assert [p.name for p in day_dir.iterdir()] == ["20200101.day.parquet"]
+    assert not (paths["raw_gkg_dir"] / "20200101000000.gkg.csv").exists()
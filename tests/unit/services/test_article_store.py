@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from ingestion_engine.services.article_store import ArticleStore, _legacy_key
+
+pytestmark = pytest.mark.unit
+
+TEXT = "Delegations met in Geneva to discuss a ceasefire along the border. " * 200
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArticleStore(tmp_path / "store", legacy_dir=tmp_path / "legacy")
+    yield store
+    store.close()
+
+
+def test_put_get_round_trip_compressed(store):
+    store.put("https://a.example/1", TEXT, extractor="readability", meta={"title": "Talks"})
+    entry = store.get("https://a.example/1")
+    assert entry.ok and entry.text == TEXT
+    assert (entry.status, entry.extractor, entry.meta) == (200, "readability", {"title": "Talks"})
+    stats = store.stats()
+    assert stats["blobs"] == 1 and stats["stored_bytes"] < len(TEXT) / 5
+
+
+def test_same_text_shares_one_blob(store):
+    store.put("https://a.example/1", TEXT)
+    store.put("https://mirror.example/1", TEXT)
+    stats = store.stats()
+    assert (stats["entries"], stats["blobs"]) == (2, 1)
+
+
+def test_negative_caching_expiry(store):
+    store.put_failure("https://a.example/gone", status=404, error="HTTP 404")
+    store.put_failure("https://a.example/flaky", status=503, error="HTTP 503")
+    gone = store.get("https://a.example/gone")
+    assert gone is not None and not gone.ok and gone.status == 404
+
+    evicted = store.evict(now=time.time() + store.retry_after_seconds + 1)
+    assert evicted["expired"] == 1
+    assert store.get("https://a.example/flaky") is None
+    assert store.get("https://a.example/gone") is not None
+
+
+def test_lru_eviction_under_byte_budget(tmp_path):
+    store = ArticleStore(tmp_path / "store", max_bytes=10_000, legacy_dir=None)
+    for i in range(40):
+        # distinct, poorly compressible texts
+        store.put(f"https://a.example/{i}", " ".join(str(i * 7919 + j * 104729 % 9973) for j in range(600)))
+    assert store.total_bytes <= 10_000
+    assert store.get("https://a.example/39") is not None
+    assert store.get("https://a.example/0") is None
+    assert len(list((tmp_path / "store" / "blobs").rglob("*.z*"))) == store.stats()["blobs"]
+    store.close()
+
+
+def test_legacy_txt_imported_on_first_read(store, tmp_path):
+    url = "https://old.example/story"
+    (tmp_path / "legacy").mkdir()
+    (tmp_path / "legacy" / f"{_legacy_key(url)}.txt").write_text("legacy text", encoding="utf-8")
+    assert store.get(url).text == "legacy text"
+    assert store.stats()["entries"] == 1
@@ -0,0 +1,82 @@
+import random
+import re
+
+import pytest
+
+from ingestion_engine.services import context_builder
+from ingestion_engine.services.context_builder import (
+    build_article_context,
+    count_tokens,
+    split_passages,
+    truncate_tokens,
+)
+
+pytestmark = pytest.mark.unit
+
+FILLER = [
+    "Markets in the region were calm on Monday as traders waited for new economic figures from the central bank.",
+    "The weather service forecast heavy rain across the coastal provinces for the rest of the week.",
+    "A local football club announced the signing of a new coach after a disappointing season.",
+    "Commuters faced delays on the main rail line after a signal failure near the northern terminal.",
+]
+RELEVANT = ("Israeli and Lebanese negotiators met in Beirut to discuss the maritime border, "
+            "the first direct talks between Israel and Lebanon in two years.")
+
+
+def _article(relevant_at=None, paragraphs=12):
+    parts = [FILLER[i % len(FILLER)] + f" (report {i})" for i in range(paragraphs)]
+    if relevant_at is not None:
+        parts[relevant_at] = RELEVANT
+    return "\n\n".join(parts)
+
+
+def test_count_and_truncate_tokens():
+    text = "Delegations from both governments met in the capital on Tuesday to discuss the ceasefire."
+    assert len(text.split()) <= count_tokens(text) <= 2 * len(text.split())
+    assert count_tokens("") == 0
+    cut = truncate_tokens(text, 5)
+    assert text.startswith(cut) and 0 < count_tokens(cut) <= 5
+    assert truncate_tokens(text, 1000) == text
+
+
+def test_long_paragraphs_split_at_sentences():
+    paragraph = " ".join(FILLER * 10)
+    passages = split_passages(paragraph, max_tokens=60)
+    assert len(passages) > 5
+    assert all(count_tokens(p) <= 60 for p in passages)
+    assert all(p.endswith(".") for p in passages)
+
+
+def test_relevant_passage_wins_a_small_budget():
+    event = {"participants": ["ISR", "LBN"], "description": "Maritime border talks", "type": "diplomacy"}
+    articles = {"https://a.example/1": _article(relevant_at=9), "https://b.example/2": _article(paragraphs=8)}
+    context = build_article_context(articles, event, budget_tokens=120)
+    assert RELEVANT in context
+    assert count_tokens(context) <= 120
+    # cutting each article from the top, as the character limits did, would have missed it
+    assert RELEVANT not in truncate_tokens(articles["https://a.example/1"], 120)
+
+
+def _random_article(rng, source, paragraphs=10):
+    vocabulary = " ".join(FILLER).lower().replace(".", "").split()
+    return "\n\n".join(f"{' '.join(rng.choices(vocabulary, k=20)).capitalize()} (s{source} p{j})."
+                        for j in range(paragraphs))
+
+
+def test_budget_is_filled_and_passages_keep_article_order():
+    rng = random.Random(7)
+    articles = {f"https://s{i}.example/x": _random_article(rng, i) for i in range(3)}
+    for budget in (80, 300, 900):
+        context = build_article_context(articles, {"description": "rail signal failure"}, budget)
+        assert budget * 0.8 <= count_tokens(context) <= budget
+        if budget >= 300:
+            assert context.count("[Source:") == 3
+        for i in range(3):
+            positions = [int(m) for m in re.findall(rf"\(s{i} p(\d+)\)", context)]
+            assert positions == sorted(positions)
+    assert build_article_context({}, {}, 500) == context_builder.NO_ARTICLES
+
+
+def test_country_codes_expand_to_names():
+    terms = context_builder.query_terms({"participants": ["LBN"], "location": {"iso": "ISR"}})
+    assert {"lebanon", "beirut", "israel"} <= set(terms)
@@ -0,0 +1,154 @@
+import json
+
+import pytest
+
+from ingestion_engine.conflict_monitor import ConflictMonitor
+from ingestion_engine.sources import gdelt
+from server.app.services.checkpoint import CheckpointManager
+from server.app.services.dedup import RollingDedup
+from server.app.services.firehose import FirehoseService
+from tests.fixtures import create_mock_gdelt_event
+
+pytestmark = pytest.mark.unit
+
+HOUR = 3600
+
+
+class TestRollingDedup:
+    def test_add_and_membership(self):
+        dedup = RollingDedup(window_hours=2)
+        assert dedup.add("eid:1", now=0) is True
+        assert dedup.add("eid:1", now=10) is False
+        assert "eid:1" in dedup and "eid:2" not in dedup
+        assert dedup.filter_new(["eid:1", "eid:2", "eid:2"], now=20) == [False, True, False]
+
+    def test_window_bounds_memory(self):
+        dedup = RollingDedup(window_hours=2)
+        for hour in range(100):
+            for i in range(50):
+                dedup.add(f"eid:{hour}-{i}", now=hour * HOUR)
+            dedup.prune(now=hour * HOUR)
+        assert len(dedup) == 3 * 50
+        assert "eid:99-0" in dedup and "eid:50-0" not in dedup
+
+    def test_seen_again_refreshes_expiry(self):
+        dedup = RollingDedup(window_hours=1)
+        dedup.add("export:a", now=0)
+        dedup.add("export:a", now=HOUR)
+        dedup.prune(now=2 * HOUR)
+        assert "export:a" in dedup
+
+    def test_state_round_trip(self):
+        dedup = RollingDedup(window_hours=5)
+        dedup.filter_new([f"eid:{i}" for i in range(1000)], now=HOUR)
+        state = json.loads(json.dumps(dedup.to_state()))
+        restored = RollingDedup.from_state(state, window_hours=5, now=2 * HOUR)
+        assert len(restored) == 1000 and "eid:999" in restored
+        assert len(RollingDedup.from_state(state, window_hours=5, now=100 * HOUR)) == 0
+
+
+class TestFirehoseRestart:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        self.tmp_path = tmp_path
+        self.fail_stage = False
+        self.features = [create_mock_gdelt_event(eventid=str(i)) for i in range(3)]
+        for feat in self.features:
+            feat["properties"]["event_sig"] = gdelt.event_signature(feat)
+        monkeypatch.setattr(gdelt, "fetch_lastupdate", lambda timeout=30: gdelt.UpdateUrls(
+            export="http://x/1.export.CSV.zip", mentions="http://x/1.mentions.CSV.zip"))
+        monkeypatch.setattr(gdelt, "iter_remote_rows", lambda url, timeout=60: iter(()))
+        monkeypatch.setattr(gdelt, "stream_export", lambda url, *a, **kw: iter([
+            gdelt.FeatureBatch("export", url, [dict(f) for f in self.features], 3, kw["ingest_time"], last=True)]))
+
+    def service(self):
+        firehose = FirehoseService()
+        firehose.output_file = str(self.tmp_path / "gdelt_latest.json")
+        firehose.history_file = str(self.tmp_path / "gdelt_window.json")
+        firehose.checkpoint_manager = CheckpointManager(str(self.tmp_path / "state.json"))
+        firehose.processed = []
+
+        def run_pipeline(features, ingest_time, fresh):
+            firehose.processed.append(len(fresh))
+            return {"conflicts": {"ok": not self.fail_stage}}
+
+        firehose._run_pipeline = run_pipeline
+        firehose._reorganize_tables = lambda: None
+        return firehose
+
+    def test_export_skipped_after_restart(self):
+        first = self.service()
+        first._fetch_cycle()
+        assert first.processed == [3]
+        assert "dedup" in json.loads((self.tmp_path / "state.json").read_text())
+
+        restarted = self.service()
+        restarted._fetch_cycle()
+        assert restarted.processed == []
+
+    def test_known_events_not_reprocessed_from_new_export(self, monkeypatch):
+        self.service()._fetch_cycle()
+        monkeypatch.setattr(gdelt, "fetch_lastupdate", lambda timeout=30: gdelt.UpdateUrls(
+            export="http://x/2.export.CSV.zip", mentions="http://x/2.mentions.CSV.zip"))
+        self.features.append(create_mock_gdelt_event(eventid="new"))
+        self.features[-1]["properties"]["event_sig"] = "eid:new"
+
+        restarted = self.service()
+        restarted._fetch_cycle()
+        assert restarted.processed == [1]
+        assert len(restarted.latest_data["features"]) == 4
+
+    def test_failed_cycle_is_retried(self):
+        self.fail_stage = True
+        firehose = self.service()
+        firehose._fetch_cycle()
+        self.fail_stage = False
+        firehose._fetch_cycle()
+        firehose._fetch_cycle()
+        assert firehose.processed == [3, 3]
+
+    def test_history_refreshed_for_known_events(self, monkeypatch):
+        firehose = self.service()
+        firehose._run_pipeline = FirehoseService._run_pipeline.__get__(firehose)
+        firehose._process_conflicts = firehose._process_diplomacy = lambda features: None
+        firehose._fetch_cycle()
+        monkeypatch.setattr(gdelt, "fetch_lastupdate", lambda timeout=30: gdelt.UpdateUrls(
+            export="http://x/2.export.CSV.zip", mentions="http://x/2.mentions.CSV.zip"))
+        for feat in self.features:
+            feat["properties"] = {**feat["properties"], "ingested_at": "2030-01-01T00:00:00+00:00"}
+        firehose._fetch_cycle()
+        assert {f["properties"]["ingested_at"] for f in firehose.history_data["features"]} == {
+            "2030-01-01T00:00:00+00:00"}
+
+    def test_conflict_store_failure_leaves_events_unmarked(self, monkeypatch):
+        monitor = ConflictMonitor(db_path=str(self.tmp_path / "conflicts.duckdb"))
+
+        def failing_store(events):
+            raise RuntimeError("write failed")
+
+        monkeypatch.setattr(monitor, "store_events", failing_store)
+        firehose = self.service()
+        firehose._run_pipeline = FirehoseService._run_pipeline.__get__(firehose)
+        firehose.conflict_monitor = lambda: monitor
+        firehose._process_diplomacy = lambda features: None
+        firehose._fetch_cycle()
+        assert firehose.last_cycle_stages["conflicts"]["ok"] is False
+        assert not any(f["properties"]["event_sig"] in firehose.dedup for f in self.features)
+        assert "export:http://x/1.export.CSV.zip" not in firehose.dedup
+
+    def test_retry_skips_events_a_succeeded_stage_handled(self):
+        firehose = self.service()
+        firehose._run_pipeline = FirehoseService._run_pipeline.__get__(firehose)
+        handled = {"conflicts": [], "diplomacy": []}
+
+        def diplomacy(features):
+            handled["diplomacy"].append(len(features))
+            if len(handled["diplomacy"]) == 1:
+                raise RuntimeError("write failed")
+
+        firehose._process_conflicts = lambda features: handled["conflicts"].append(len(features))
+        firehose._process_diplomacy = diplomacy
+        firehose._fetch_cycle()
+        firehose._fetch_cycle()
+        assert handled == {"conflicts": [3, 0], "diplomacy": [3, 3]}
+        assert all(f["properties"]["event_sig"] in firehose.dedup for f in self.features)
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from ingestion_engine.services import article_fetcher
+from ingestion_engine.services.article_store import ArticleStore
+from ingestion_engine.services.fetch_engine import FetchEngine
+from tests.fixtures.http import ARTICLE_HTML
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def server(http_server):
+    http_server.routes = {
+        "/slow": (200, ARTICLE_HTML, 1.5, "text/html"),
+        "/busy": (200, ARTICLE_HTML, 0.1, "text/html"),
+        "/missing": (404, "", 0, "text/html"),
+        "/unavailable": (503, "", 0, "text/html"),
+    }
+    return http_server
+
+
+@pytest.fixture
+def engine():
+    engine = FetchEngine(max_workers=8, per_host=2, per_host_delay=0, timeout=5)
+    yield engine
+    engine.close()
+
+
+def test_deadline_returns_finished_results(server, engine):
+    urls = [f"{server.base}/fast/{i}" for i in range(3)] + [f"{server.base}/slow"]
+    start = time.monotonic()
+    results = engine.fetch_many(urls, deadline=0.8)
+    assert time.monotonic() - start < 1.4
+    assert [u for u, r in results.items() if r.ok] == urls[:3]
+    assert all("Ceasefire" in results[u].text for u in urls[:3])
+    # the deadline also capped the slow request's timeout
+    assert urls[3] not in results or results[urls[3]].error
+
+
+def test_backoff_stops_at_deadline(server, engine):
+    start = time.monotonic()
+    result = engine.get(f"{server.base}/unavailable", retries=3, backoff=2, deadline_at=start + 0.5)
+    assert time.monotonic() - start < 0.5
+    assert (result.ok, result.error) == (False, "HTTP 503")
+    assert server.hits["/unavailable"] == 1
+
+
+def test_per_host_concurrency_cap(server, engine):
+    results = engine.fetch_many([f"{server.base}/busy/{i}" for i in range(8)], deadline=10)
+    assert len(results) == 8
+    assert server.max_active <= 2
+
+
+def test_client_errors_are_not_retried(server, engine):
+    result = engine.get(f"{server.base}/missing", retries=2, backoff=0)
+    assert (result.ok, result.status, result.error) == (False, 404, "HTTP 404")
+    assert server.hits["/missing"] == 1
+
+
+def test_fetch_articles_concurrent_in_input_order(server, engine, tmp_path, monkeypatch):
+    store = ArticleStore(tmp_path, legacy_dir=None)
+    monkeypatch.setattr(article_fetcher, "get_store", lambda: store)
+    monkeypatch.setattr(article_fetcher, "get_engine", lambda: engine)
+    urls = [f"{server.base}/slow", f"{server.base}/busy/1", f"{server.base}/missing", f"{server.base}/busy/2"]
+
+    # timeout < deadline, so nothing is still writing to the store after the test
+    articles = article_fetcher.fetch_articles(urls, timeout=0.5, deadline=1.0)
+    assert list(articles) == [urls[1], urls[3]]
+    assert "Ceasefire talks" in articles[urls[1]]
+
+    # Second call is served from the store without new requests, the 404 included
+    hits = dict(server.hits)
+    assert list(article_fetcher.fetch_articles(urls[1:3])) == urls[1:2]
+    assert server.hits == hits
+
+
+def test_fetch_articles_skips_syndicated_copies(server, engine, tmp_path, monkeypatch):
+    store = ArticleStore(tmp_path, legacy_dir=None)
+    monkeypatch.setattr(article_fetcher, "get_store", lambda: store)
+    monkeypatch.setattr(article_fetcher, "get_engine", lambda: engine)
+    slug = "2024/03/05/ceasefire-talks-resume-in-cairo.html"
+    store.put(f"https://wire.example/{slug}", "cached wire copy")
+    urls = [f"{server.base}/mirror/{slug}", f"{server.base}/busy/un-envoy-urges-access-for-aid-convoys",
+            f"{server.base}/busy/2024/un-envoy-urges-access-for-aid-convoys/"]
+
+    articles = article_fetcher.fetch_articles(urls)
+    assert articles == {urls[0]: "cached wire copy", urls[1]: articles[urls[1]]}
+    assert sum(server.hits.values()) == 1
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from server.app.services.firehose import FirehoseService
+from tests.fixtures import create_mock_gdelt_event
+
+pytestmark = pytest.mark.unit
+
+
+class TestFirehoseStartup:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.latest_file = tmp_path / "gdelt_latest.json"
+        self.history_file = tmp_path / "gdelt_window.json"
+        self.snapshot = {"type": "FeatureCollection", "features": [create_mock_gdelt_event(eventid="1")]}
+        self.latest_file.write_text(json.dumps(self.snapshot))
+        self.history_file.write_text(json.dumps({
+            "type": "FeatureCollection",
+            "features": [create_mock_gdelt_event(eventid=str(i)) for i in range(3)],
+        }))
+        self.firehose = FirehoseService()
+        self.firehose.output_file = str(self.latest_file)
+        self.firehose.history_file = str(self.history_file)
+
+    def test_construction_does_not_parse_state(self):
+        assert self.firehose.latest_data["features"] == []
+        assert self.firehose.history_index == {}
+        assert self.firehose.readiness()["phase"] == "starting"
+
+    def test_snapshot_served_before_hydration(self):
+        self.firehose.load_snapshot()
+        view = self.firehose.latest_json()
+        assert isinstance(view, memoryview)
+        assert json.loads(bytes(view)) == self.snapshot
+        readiness = self.firehose.readiness()
+        assert readiness["phase"] == "snapshot"
+        assert readiness["ready"] is False
+        assert readiness["history_events"] == 0
+
+    def test_hydrate_loads_latest_and_history_once(self):
+        self.firehose.hydrate()
+        self.firehose.hydrate()
+        assert len(self.firehose.latest_data["features"]) == 1
+        assert len(self.firehose.history_index) == 3
+        assert self.firehose.readiness()["phases"]["hydrated"] is not None
+
+    def test_missing_snapshot_falls_back_to_memory(self):
+        self.latest_file.unlink()
+        self.firehose.load_snapshot()
+        assert self.firehose.latest_json() is None
+
+    def test_columnar_encoded_once_per_state(self):
+        self.firehose.load_snapshot()
+        payload = self.firehose.latest_encoded("columnar")
+        assert json.loads(payload)["length"] == 1
+        assert self.firehose.latest_encoded("columnar") is payload
+
+        self.firehose._generation += 1
+        self.firehose._encoded = {}
+        assert self.firehose.latest_encoded("columnar") is not payload
+        with pytest.raises(ValueError):
+            self.firehose.latest_encoded("xml")
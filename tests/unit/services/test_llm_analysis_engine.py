@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from ingestion_engine.services import llm_analysis_engine, llm_cache
+from ingestion_engine.services.llm_cache import LLMCache
+from ingestion_engine.services.llm_engine import LLMEngine, Provider
+from tests.fixtures.llm import MockLLMServer, analysis_reply
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = LLMCache(tmp_path / "llm.sqlite")
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Start a MockLLMServer(**kwargs) and point the analysis engine at it."""
+    servers, engines = [], []
+
+    def start(**kwargs):
+        server = MockLLMServer(**kwargs).__enter__()
+        engine = LLMEngine([Provider("p0", server.url, "test-model", "key", rpm=6000, tpm=10_000_000)])
+        monkeypatch.setattr(llm_analysis_engine, "_engine", engine)
+        servers.append(server)
+        engines.append(engine)
+        return server
+
+    monkeypatch.setattr(llm_analysis_engine, "_fetch_wiki_context", lambda event: "")
+    yield start
+    for engine in engines:
+        engine.close()
+    for server in servers:
+        server.__exit__()
+
+
+def _events(n):
+    return [{"id": f"ev{i}", "type": "diplomacy", "participants": ["USA", "CHN"], "description": f"Talks round {i}"}
+            for i in range(n)]
+
+
+def test_batches_share_rules_and_map_results_by_event(cache, llm):
+    server = llm(reply=analysis_reply())
+    stats = {}
+    results = llm_analysis_engine.analyze_events_batched(_events(8), max_events=4, stats=stats)
+    assert server.hits == 2
+    assert [r["analysis"] for r in results] == [f"Talks round {i}" for i in range(8)]
+    assert all(p.count("RULES for each event") == 1 for p in server.prompts)
+    assert stats == {"batches": 2, "batched": 8, "cached": 0, "single": 0, "fallback": 0}
+
+    # each item was cached under its single-event prompt
+    server.reply = lambda prompt: pytest.fail("should be served from the cache")
+    again = llm_analysis_engine.analyze_event(_events(8)[5])
+    assert again["analysis"] == "Talks round 5"
+
+
+def test_invalid_items_fall_back_to_single_calls(cache, llm):
+    server = llm(reply=analysis_reply(invalid_descriptions={"Talks round 1"}))
+    stats = {}
+    results = llm_analysis_engine.analyze_events_batched(_events(5), max_events=4, stats=stats)
+    # one batch of 4, one event alone (sent as a single call), one invalid item retried
+    assert server.hits == 3
+    assert all(r and r["analysis"] for r in results)
+    assert results[2]["analysis"] == "Talks round 2"
+    assert stats == {"batches": 1, "batched": 3, "cached": 0, "single": 1, "fallback": 1}
+
+
+def test_unparseable_batch_reply_retries_every_event(cache, llm):
+    server = llm(reply=lambda prompt: "not json" if "Events (JSON array)" in prompt
+                 else json.dumps({"analysis": "single", "visualization_type": "geodesic"}))
+    results = llm_analysis_engine.analyze_events_batched(_events(3), max_events=3)
+    assert server.hits == 4
+    assert [r["analysis"] for r in results] == ["single"] * 3
+
+
+def test_token_budget_limits_batch_size():
+    items = [{"event_id": str(i), "articles": "word " * 2000} for i in range(4)]  # ~2500 tokens each
+    batches = llm_analysis_engine._pack_batches(items, max_events=4, token_budget=8000, output_tokens=800)
+    assert [len(b) for b in batches] == [2, 2]
+    assert len(llm_analysis_engine._pack_batches(items[:1], 4, 100, 800)) == 1  # oversized event still sent
+
+
+def test_analyze_events_with_articles_batch_mode(cache, llm):
+    server = llm(reply=analysis_reply())
+    events = _events(6)
+    events[0]["confidence"] = 0.9
+    results = llm_analysis_engine.analyze_events_with_articles(
+        events, fetch_articles_fn=lambda urls, use_cache=True: {}, batch_size=5,
+    )
+    assert server.hits == 1
+    assert [r["id"] for r in results] == [e["id"] for e in events]
+    assert results[0]["llm_analysis"] == "" and not results[0]["llm_analysis_cached"]
+    assert [r["llm_analysis"] for r in results[1:]] == [f"Talks round {i}" for i in range(1, 6)]
@@ -0,0 +1,109 @@
+import random
+import threading
+import time
+
+import pytest
+
+from ingestion_engine.services import llm_analysis_engine, llm_cache
+from ingestion_engine.services.llm_cache import LLMCache, prompt_key
+from ingestion_engine.services.llm_engine import LLMEngine, Provider
+from tests.fixtures.llm import MockLLMServer, analysis_reply
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMCache(tmp_path / "llm.sqlite", ttl_seconds=3600)
+    yield cache
+    cache.close()
+
+
+def test_key_is_stable_and_whitespace_insensitive():
+    key = prompt_key("gpt-4o-mini", "Analyze  this\n\nevent.")
+    assert key == prompt_key("gpt-4o-mini", "Analyze this event. ")
+    assert key != prompt_key("llama-3.1-8b-instant", "Analyze this event.")
+    assert key != prompt_key("gpt-4o-mini", "Analyze that event.")
+    assert len(key) == 64
+
+
+def test_put_get_and_expiry(cache):
+    cache.put("k", '{"analysis": "x"}' * 50, model="m")
+    assert cache.get("k") == '{"analysis": "x"}' * 50
+    assert cache.stats()["stored_bytes"] < len('{"analysis": "x"}' * 50)
+    assert cache.evict(now=time.time() + 7200)["expired"] == 1
+    assert cache.get("k") is None
+
+
+def test_size_eviction_drops_least_recently_read(tmp_path):
+    cache = LLMCache(tmp_path / "llm.sqlite", max_bytes=10_000)
+    rng = random.Random(3)
+    texts = {f"k{i}": "%x" % rng.getrandbits(24_000) for i in range(6)}  # ~3 KB each compressed
+    for key, text in texts.items():
+        cache.put(key, text)
+        if key == "k0":
+            cache.conn.execute("UPDATE responses SET accessed_at = accessed_at + 1000 WHERE key = 'k0'")
+    assert cache.total_bytes <= 10_000
+    assert cache.get("k0") is not None  # recently read, kept
+    assert cache.get("k1") is None
+    cache.close()
+
+
+def test_concurrent_identical_requests_are_coalesced(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.3)
+        return '{"analysis": "once"}'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ['{"analysis": "once"}'] * 5
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
+    assert cache.get_or_compute("k", compute) == '{"analysis": "once"}' and len(calls) == 1
+
+
+def test_uncacheable_results_are_not_stored(cache):
+    assert cache.get_or_compute("k", lambda: "not json", cacheable=lambda t: t.startswith("{")) == "not json"
+    assert cache.get("k") is None
+    assert cache.get_or_compute("empty", lambda: None) is None
+    assert cache.get("empty") is None
+
+
+def test_analyze_event_reuses_response_across_event_ids(cache, monkeypatch):
+    with MockLLMServer(latency=0.2) as server:
+        engine = LLMEngine([Provider("p0", server.url, "test-model", "key", rpm=6000, tpm=10_000_000)])
+        monkeypatch.setattr(llm_analysis_engine, "_engine", engine)
+        monkeypatch.setattr(llm_analysis_engine, "_fetch_wiki_context", lambda event: "")
+        monkeypatch.setattr(llm_cache, "_cache", cache)
+        event = {"type": "diplomacy", "participants": ["USA", "CHN"], "description": "Talks resumed"}
+        # the same interaction requested twice at once, under ids from two different runs
+        results = engine.map(lambda i: llm_analysis_engine.analyze_event({**event, "id": f"gdelt_{i}"}), [1, 2])
+        again = llm_analysis_engine.analyze_event({**event, "id": "gdelt_3"})
+        engine.close()
+    assert server.hits == 1
+    assert results[0]["analysis"] == results[1]["analysis"] == again["analysis"]
+    assert cache.stats()["entries"] == 1
+
+
+def test_failover_replies_are_not_cached_as_the_primary_model(cache, monkeypatch):
+    with MockLLMServer(script=[500] * 10) as down, MockLLMServer(reply=analysis_reply()) as backup:
+        engine = LLMEngine([Provider("p0", down.url, "primary-model", "key", rpm=6000, tpm=10_000_000),
+                            Provider("p1", backup.url, "backup-model", "key", rpm=6000, tpm=10_000_000)],
+                           retries=0)
+        monkeypatch.setattr(llm_analysis_engine, "_engine", engine)
+        monkeypatch.setattr(llm_analysis_engine, "_fetch_wiki_context", lambda event: "")
+        monkeypatch.setattr(llm_cache, "_cache", cache)
+        event = {"id": "e1", "type": "diplomacy", "participants": ["USA", "CHN"], "description": "Talks resumed"}
+        assert llm_analysis_engine.analyze_event(event)["analysis"]
+        assert llm_analysis_engine.analyze_events_batched([event, {**event, "id": "e2", "description": "Other"}])
+        engine.close()
+    assert backup.hits == 2
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from ingestion_engine.services import llm_analysis_engine
+from ingestion_engine.services.llm_engine import LLMEngine, Provider, TokenBucket
+from tests.fixtures.llm import MockLLMServer
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def llm_server():
+    with MockLLMServer(latency=0.3) as server:
+        yield server
+
+
+def _engine(*servers, **kwargs):
+    providers = [Provider(f"p{i}", s.url, "test-model", "key", rpm=6000, tpm=10_000_000)
+                 for i, s in enumerate(servers)]
+    kwargs.setdefault("backoff", 0.05)
+    return LLMEngine(providers, **kwargs)
+
+
+def test_concurrent_calls_overlap(llm_server):
+    engine = _engine(llm_server, max_concurrency=8)
+    start = time.monotonic()
+    results = engine.map(lambda i: engine.complete(f"event {i}"), range(8))
+    elapsed = time.monotonic() - start
+    engine.close()
+    assert all(r.ok and r.provider == "p0" for r in results)
+    assert llm_server.max_active > 1
+    assert elapsed < 8 * 0.3 / 2
+    assert results[0].usage["total_tokens"] > 0
+
+
+def test_rate_limited_request_is_retried(llm_server):
+    llm_server.script = [429, 503]
+    engine = _engine(llm_server, retries=2)
+    result = engine.complete("event")
+    engine.close()
+    assert result.ok
+    assert result.attempts == 3
+    assert llm_server.statuses == [429, 503, 200]
+
+
+def test_fails_over_to_next_provider():
+    with MockLLMServer(script=[500] * 10) as down, MockLLMServer() as backup:
+        engine = _engine(down, backup, retries=1)
+        result = engine.complete("event")
+        engine.close()
+    assert result.ok and result.provider == "p1" and result.model == "test-model"
+    assert down.hits == 2 and backup.hits == 1
+    assert engine.provider_stats() == {"p0_fail": 1, "p1_ok": 1}
+
+
+def test_client_errors_are_not_retried():
+    with MockLLMServer(script=[401]) as server:
+        engine = _engine(server, retries=3)
+        result = engine.complete("event")
+        engine.close()
+    assert not result.ok and result.status == 401 and server.hits == 1
+
+
+def test_token_bucket_paces_requests():
+    bucket = TokenBucket(per_minute=600, capacity=2)  # 10 per second after a burst of 2
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire(1)
+    assert 0.3 < time.monotonic() - start < 1.0
+    assert not bucket.acquire(5, deadline_at=time.monotonic() + 0.05)
+
+
+def test_analyze_events_runs_concurrently(llm_server, monkeypatch):
+    engine = _engine(llm_server, max_concurrency=6)
+    monkeypatch.setattr(llm_analysis_engine, "_engine", engine)
+    monkeypatch.setattr(llm_analysis_engine, "_fetch_wiki_context", lambda event: "")
+    events = [{"id": f"ev{i}", "type": "diplomacy", "participants": ["USA"], "confidence": 0.4}
+              for i in range(6)]
+    start = time.monotonic()
+    results = llm_analysis_engine.analyze_events_with_articles(
+        events, fetch_articles_fn=lambda urls, use_cache=True: {}, use_cache=False, delay_sec=0,
+    )
+    elapsed = time.monotonic() - start
+    engine.close()
+    assert [r["id"] for r in results] == [e["id"] for e in events]
+    assert all(r["llm_analysis_cached"] and r["toast_message"] == "Talks resumed" for r in results)
+    assert llm_server.max_active > 1
+    assert elapsed < 6 * 0.3 / 2
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from ingestion_engine.services import near_dup
+from ingestion_engine.services.article_store import ArticleStore
+
+pytestmark = pytest.mark.unit
+
+VOCAB = [f"word{i}" for i in range(5000)]
+
+
+def _story(seed: int, words: int = 600) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCAB) for _ in range(words))
+
+
+def _copy(text: str) -> str:
+    """Syndicated copy: own byline and footer, last paragraph trimmed."""
+    words = text.split()
+    return "By Staff Reporter " + " ".join(words[: int(len(words) * 0.93)]) + " Copyright Example Media 2024"
+
+
+def test_minhash_separates_copies_from_other_stories():
+    for seed in range(20):
+        story = _story(seed)
+        signature = near_dup.minhash(story)
+        assert near_dup.similarity(signature, near_dup.minhash(_copy(story))) >= near_dup.DEFAULT_THRESHOLD
+        assert near_dup.similarity(signature, near_dup.minhash(_story(seed + 100))) < 0.2
+    assert near_dup.minhash("") is None
+
+
+def test_index_lookup_matches_brute_force():
+    index = near_dup.MinHashIndex()
+    signatures = {}
+    for i in range(60):
+        text = _story(i % 20) if i < 20 else _copy(_story(i % 20))
+        signatures[f"k{i}"] = near_dup.minhash(text)
+        index.add(f"k{i}", signatures[f"k{i}"])
+    probe = near_dup.minhash(_copy(_story(3)))
+    brute = [k for k, s in signatures.items() if near_dup.similarity(probe, s) >= index.threshold]
+    assert len(brute) == 3
+    assert index.near(probe) == brute
+    assert {index.cluster(k) for k in brute} == {"k3"}
+
+
+def test_representatives_keep_longest_copy_in_first_position():
+    story, other = _story(1), _story(2)
+    texts = {"a": _copy(story), "b": other, "c": story, "d": _copy(story)}
+    assert near_dup.representatives(texts) == {"c": (story, 2), "b": (other, 0)}
+
+
+def test_title_keys():
+    assert near_dup.title_key("Ceasefire talks resume in Cairo") == near_dup.title_key("CEASEFIRE: Talks Resume in Cairo!")
+    assert near_dup.title_key("Live updates") is None
+    assert near_dup.slug_title("https://x.example/2024/03/05/ceasefire-talks-resume-in-cairo.html?src=rss") \
+        == "ceasefire talks resume in cairo"
+    assert near_dup.url_title_keys("https://x.example/world/12345", "Ceasefire talks resume in Cairo") \
+        == ["ceasefire talks resume cairo"]
+
+
+def test_dated_slugs_stay_distinct(tmp_path):
+    jan = "https://edition.example/world/live-news/russia-ukraine-war-news-01-15-24/index.html"
+    feb = "https://edition.example/world/live-news/russia-ukraine-war-news-02-20-24/index.html"
+    assert near_dup.url_title_keys(jan) == ["russia ukraine war news 01 15 24"]
+    assert near_dup.url_title_keys(jan) != near_dup.url_title_keys(feb)
+    assert near_dup.title_key("Live updates 2024 01 15") is None
+    store = ArticleStore(tmp_path / "store", legacy_dir=None)
+    store.put(jan, _story(1, 300))
+    assert store.find_title(feb) is None
+    store.close()
+
+
+def test_store_finds_known_titles(tmp_path):
+    store = ArticleStore(tmp_path / "store", legacy_dir=None)
+    store.put("https://wire.example/a", _story(7), meta={"title": "Ceasefire talks resume in Cairo"})
+    store.put("https://other.example/b", _story(8))
+    assert store.find_title("https://mirror.example/x", "Ceasefire Talks Resume in Cairo").url == "https://wire.example/a"
+    assert store.find_title("https://wire.example/a", "Ceasefire talks resume in Cairo") is None
+    store.close()
+
+
+def test_prompt_excerpts_keep_one_copy_per_story():
+    from ingestion_engine.services.llm_analysis_engine import _article_excerpts
+
+    story, other = _story(1, 300), _story(2, 300)
+    articles = {f"https://copy{i}.example/a": _copy(story) for i in range(5)}
+    articles["https://wire.example/a"] = story
+    articles["https://other.example/b"] = other
+    excerpts = _article_excerpts(articles)
+    assert excerpts.count("[Source:") == 2
+    assert "[Source: https://wire.example/a (+5 near-identical copies)]" in excerpts
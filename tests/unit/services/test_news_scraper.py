@@ -90,3 +90,75 @@ def test_url_normalization_dedup(mock_parse):
     )
     urls = [e["source_url"] for e in result["events"]]
     assert len(urls) == len(set(urls))
+
+
+def _rss(port: int, host: str, n: int) -> str:
+    items = "".join(
+        f"<item><title>Story {i}</title><link>http://{host}:{port}/article/{host}/{i}</link>"
+        f"<description>short</description></item>"
+        for i in range(n)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{items}</channel></rss>'
+
+
+def test_run_pipelines_feeds_and_articles(http_server, tmp_path, monkeypatch):
+    from ingestion_engine.services import article_store, news_scraper
+    from tests.fixtures.http import ARTICLE_HTML
+
+    port = http_server.port
+    http_server.routes = {
+        "/feed/a": (200, _rss(port, "127.0.0.1", 4), 0.2, "application/rss+xml"),
+        "/feed/b": (200, _rss(port, "localhost", 4), 0.2, "application/rss+xml"),
+        "/article/127.0.0.1/3": (404, "", 0, "text/html"),
+        "/article": (200, ARTICLE_HTML, 0.2, "text/html"),
+    }
+    store = article_store.ArticleStore(tmp_path, legacy_dir=None)
+    monkeypatch.setattr(article_store, "get_store", lambda: store)
+    config = {"timeout": 5, "delay_sec": 0.05, "max_retries": 0, "use_newspaper3k": False,
+              "workers": 8, "extract_workers": 2}
+    monkeypatch.setattr(news_scraper, "_get_config", lambda: config)
+
+    feeds = [f"http://127.0.0.1:{port}/feed/a", f"http://127.0.0.1:{port}/feed/b"]
+    result = news_scraper.run(feed_urls=feeds, write_events=False)
+
+    assert result["count"] == 8
+    assert result["articles"] == {"cached": 0, "downloaded": 7, "failed": 1, "duplicates": 0}
+    assert sum("Ceasefire talks" in e["description"] for e in result["events"]) == 7
+    # two hosts, one request at a time each: well under the sequential 8 x 0.25s plus feeds
+    assert result["elapsed_seconds"] < 1.8
+    assert http_server.max_active <= 2
+    assert set(result["timings"]) == {"feeds_seconds", "articles_seconds"}
+
+    rerun = news_scraper.run(feed_urls=feeds, write_events=False)
+    assert rerun["articles"] == {"cached": 8, "downloaded": 0, "failed": 0, "duplicates": 0}
+
+
+def test_run_is_incremental_with_conditional_get(http_server, tmp_path, monkeypatch):
+    from ingestion_engine.services import news_scraper
+
+    port = http_server.port
+    feed_url = f"http://127.0.0.1:{port}/feed/a"
+    http_server.routes = {"/feed/a": (200, _rss(port, "127.0.0.1", 3), 0, "application/rss+xml")}
+    monkeypatch.setattr(news_scraper, "_get_feed_state_path", lambda: tmp_path / "feed_state.json")
+    monkeypatch.setattr(news_scraper, "_get_raw_news_path", lambda: tmp_path / "raw_news_events.json")
+
+    first = news_scraper.run(feed_urls=[feed_url], fetch_full_text=False)
+    assert first["count"] == 3
+    assert first["feeds"]["modified"] == 1
+
+    # unchanged feed: 304 with no body, nothing emitted
+    sent = http_server.bytes_sent
+    second = news_scraper.run(feed_urls=[feed_url], fetch_full_text=False)
+    assert second["count"] == 0
+    assert second["feeds"]["not_modified"] == 1
+    assert http_server.bytes_sent == sent
+
+    # one new entry: only it becomes an event
+    http_server.routes["/feed/a"] = (200, _rss(port, "127.0.0.1", 4), 0, "application/rss+xml")
+    third = news_scraper.run(feed_urls=[feed_url], fetch_full_text=False)
+    assert [e["source_url"] for e in third["events"]] == [f"http://127.0.0.1:{port}/article/127.0.0.1/3"]
+    assert third["feeds"]["skipped_entries"] == 3
+
+    # dry runs neither skip nor advance the state
+    dry = news_scraper.run(feed_urls=[feed_url], fetch_full_text=False, write_events=False, incremental=False)
+    assert dry["count"] == 4
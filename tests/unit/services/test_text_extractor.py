@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from ingestion_engine.services import text_extractor
+from tests.fixtures.articles import SENTENCES, article_corpus, br_page, semantic_page, short_page
+
+pytestmark = pytest.mark.unit
+
+
+def test_cheap_tier_handles_typical_pages_without_escalating():
+    for kind, html in article_corpus(8):
+        if kind not in ("semantic", "div_soup"):
+            continue
+        article = text_extractor.extract(html, "http://example.com/a")
+        assert article.tried == ["lxml"]
+        assert text_extractor.good_enough(article.text)
+        assert "Section 3" not in article.text  # nav
+        assert "Most read" not in article.text  # link-heavy sidebar
+        assert "cookies" not in article.text
+
+
+def test_escalates_and_always_returns_plain_text():
+    article = text_extractor.extract(br_page(random.Random(1), 0))
+    assert article.tried == ["lxml", "readability"]
+    assert article.extractor == "readability"
+    assert "<" not in article.text and "ceasefire" in article.text
+
+
+def test_short_page_keeps_cleanest_text_and_meta():
+    article = text_extractor.extract(short_page(random.Random(1), 2))
+    assert article.tried == ["lxml", "readability", "bs4"]
+    assert article.extractor == "lxml"
+    assert article.text == SENTENCES[2]
+    assert article.meta() == {"title": "Brief 2", "published": "2024-03-05T10:00:00Z", "authors": ["Jane Reporter"]}
+
+
+def test_metadata_and_empty_input():
+    article = text_extractor.extract(semantic_page(random.Random(1), 5))
+    assert (article.title, article.authors) == ("Talks resume 5", ["Jane Reporter"])
+    assert text_extractor.extract("").text is None